@@ -58,6 +58,141 @@ const validateDailyPrices = [
     .isInt({ min: 1, max: 10000 })
     .withMessage('Limit must be between 1 and 10000')
     .toInt(),
+  query('adjusted')
+    .optional()
+    .isBoolean()
+    .withMessage('adjusted must be true or false')
+    .toBoolean(),
+  handleValidationErrors
+];
+
+// 주봉/월봉 조회 검증
+const validateBars = [
+  param('code')
+    .notEmpty()
+    .withMessage('Stock code is required')
+    .matches(/^[0-9A-Z]{6,10}$/)
+    .withMessage('Invalid stock code format'),
+  query('interval')
+    .optional()
+    .isIn(['weekly', 'monthly'])
+    .withMessage('interval must be one of: weekly, monthly'),
+  query('limit')
+    .optional()
+    .isInt({ min: 1, max: 10000 })
+    .withMessage('Limit must be between 1 and 10000')
+    .toInt(),
+  handleValidationErrors
+];
+
+// 축소 차트 시계열 조회 검증
+const validateChartSeries = [
+  param('code')
+    .notEmpty()
+    .withMessage('Stock code is required')
+    .matches(/^[0-9A-Z]{6,10}$/)
+    .withMessage('Invalid stock code format'),
+  query('type')
+    .optional()
+    .isIn(['line', 'ohlc'])
+    .withMessage('type must be one of: line, ohlc'),
+  query('points')
+    .optional()
+    .isInt({ min: 3, max: 10000 })
+    .withMessage('points must be between 3 and 10000')
+    .toInt(),
+  query('start_date')
+    .optional()
+    .isISO8601()
+    .withMessage('start_date must be YYYY-MM-DD'),
+  query('end_date')
+    .optional()
+    .isISO8601()
+    .withMessage('end_date must be YYYY-MM-DD'),
+  handleValidationErrors
+];
+
+// 순위 지표
+const RANK_METRICS = ['market_cap', 'trading_value', 'volume', 'return'];
+
+// 거래일별 상위 순위 조회 검증
+const validateRankings = [
+  query('market_type')
+    .optional()
+    .isIn(['KOSPI', 'KOSDAQ', 'ETF'])
+    .withMessage('market_type must be one of: KOSPI, KOSDAQ, ETF'),
+  query('metric')
+    .optional()
+    .isIn(RANK_METRICS)
+    .withMessage(`metric must be one of: ${RANK_METRICS.join(', ')}`),
+  query('date')
+    .optional()
+    .isISO8601()
+    .withMessage('date must be YYYY-MM-DD'),
+  query('limit')
+    .optional()
+    .isInt({ min: 1, max: 1000 })
+    .withMessage('Limit must be between 1 and 1000')
+    .toInt(),
+  handleValidationErrors
+];
+
+// 종목 순위 이력 조회 검증
+const validateRankHistory = [
+  param('code')
+    .notEmpty()
+    .withMessage('Stock code is required')
+    .matches(/^[0-9A-Z]{6,10}$/)
+    .withMessage('Invalid stock code format'),
+  query('metric')
+    .optional()
+    .isIn(RANK_METRICS)
+    .withMessage(`metric must be one of: ${RANK_METRICS.join(', ')}`),
+  query('limit')
+    .optional()
+    .isInt({ min: 1, max: 10000 })
+    .withMessage('Limit must be between 1 and 10000')
+    .toInt(),
+  handleValidationErrors
+];
+
+// 52주 신고가/신저가 목록 조회 검증
+const validateExtremes = [
+  query('market_type')
+    .optional()
+    .isIn(['KOSPI', 'KOSDAQ', 'ETF'])
+    .withMessage('market_type must be one of: KOSPI, KOSDAQ, ETF'),
+  query('type')
+    .optional()
+    .isIn(['high', 'low'])
+    .withMessage('type must be one of: high, low'),
+  query('date')
+    .optional()
+    .isISO8601()
+    .withMessage('date must be YYYY-MM-DD'),
+  query('limit')
+    .optional()
+    .isInt({ min: 1, max: 1000 })
+    .withMessage('Limit must be between 1 and 1000')
+    .toInt(),
+  handleValidationErrors
+];
+
+// 이상 거래 목록 조회 검증
+const validateUnusualActivity = [
+  query('event_type')
+    .optional()
+    .isIn(['volume_spike', 'price_jump', 'price_drop'])
+    .withMessage('event_type must be one of: volume_spike, price_jump, price_drop'),
+  query('date')
+    .optional()
+    .isISO8601()
+    .withMessage('date must be YYYY-MM-DD'),
+  query('limit')
+    .optional()
+    .isInt({ min: 1, max: 1000 })
+    .withMessage('Limit must be between 1 and 1000')
+    .toInt(),
   handleValidationErrors
 ];
 
@@ -66,5 +201,11 @@ module.exports = {
   validateStockSearch,
   validateStockCode,
   validateDailyPrices,
+  validateBars,
+  validateChartSeries,
+  validateRankings,
+  validateRankHistory,
+  validateExtremes,
+  validateUnusualActivity,
   handleValidationErrors
 };
@@ -288,60 +288,52 @@ router.get('/stats/db', async (req, res) => {
   }
 });
 
-// 데이터 범위 조회 (시작일, 최근 적재일)
-router.get('/stats/data-range', async (req, res) => {
-  const pool = new Pool(config.database);
-
-  try {
-    // 각 자산 유형별 데이터 범위 조회
-    const query = `
+// 데이터 범위 집계 쿼리
+// stock_coverage(수집기가 커버리지 비트맵에서 갱신하는 종목별 요약)가 있으면 종목당 한 행만 읽고,
+// 아직 생성되지 않았으면 daily_prices를 직접 집계
+const dataRangeQuery = (groupColumn, whereClause, useCoverage) => (useCoverage ? `
       SELECT
-        s.asset_type,
-        COUNT(DISTINCT s.stock_code) as stock_count,
-        MIN(dp.trade_date) as start_date,
-        MAX(dp.trade_date) as latest_date,
-        COUNT(*) as total_records
+        s.${groupColumn},
+        COUNT(*) as stock_count,
+        MIN(c.first_date) as start_date,
+        MAX(c.last_date) as latest_date,
+        COALESCE(SUM(c.trading_days), 0) as total_records
       FROM stocks s
-      LEFT JOIN daily_prices dp ON s.stock_code = dp.stock_code
-      WHERE s.asset_type IN ('STOCK', 'ETF')
-      GROUP BY s.asset_type
-      ORDER BY s.asset_type
-    `;
-
-    const result = await pool.query(query);
-
-    // KOSPI/KOSDAQ 구분을 위한 추가 쿼리
-    const marketQuery = `
+      LEFT JOIN stock_coverage c ON s.stock_code = c.stock_code
+      WHERE ${whereClause}
+      GROUP BY s.${groupColumn}
+      ORDER BY s.${groupColumn}
+    ` : `
       SELECT
-        s.market_type,
+        s.${groupColumn},
         COUNT(DISTINCT s.stock_code) as stock_count,
         MIN(dp.trade_date) as start_date,
         MAX(dp.trade_date) as latest_date,
-        COUNT(*) as total_records
+        COUNT(dp.stock_code) as total_records
       FROM stocks s
       LEFT JOIN daily_prices dp ON s.stock_code = dp.stock_code
-      WHERE s.asset_type = 'STOCK' AND s.market_type IN ('KOSPI', 'KOSDAQ')
-      GROUP BY s.market_type
-      ORDER BY s.market_type
-    `;
+      WHERE ${whereClause}
+      GROUP BY s.${groupColumn}
+      ORDER BY s.${groupColumn}
+    `);
 
-    const marketResult = await pool.query(marketQuery);
+// 데이터 범위 조회 (시작일, 최근 적재일)
+router.get('/stats/data-range', async (req, res) => {
+  const pool = new Pool(config.database);
 
-    // ETF 데이터
-    const etfQuery = `
-      SELECT
-        s.asset_type,
-        COUNT(DISTINCT s.stock_code) as stock_count,
-        MIN(dp.trade_date) as start_date,
-        MAX(dp.trade_date) as latest_date,
-        COUNT(*) as total_records
-      FROM stocks s
-      LEFT JOIN daily_prices dp ON s.stock_code = dp.stock_code
-      WHERE s.asset_type = 'ETF'
-      GROUP BY s.asset_type
-    `;
+  try {
+    const coverageTable = await pool.query("SELECT to_regclass('stock_coverage') IS NOT NULL as exists");
+    const useCoverage = coverageTable.rows[0].exists;
+
+    // KOSPI/KOSDAQ 구분
+    const marketResult = await pool.query(
+      dataRangeQuery('market_type', "s.asset_type = 'STOCK' AND s.market_type IN ('KOSPI', 'KOSDAQ')", useCoverage)
+    );
 
-    const etfResult = await pool.query(etfQuery);
+    // ETF 데이터
+    const etfResult = await pool.query(
+      dataRangeQuery('asset_type', "s.asset_type = 'ETF'", useCoverage)
+    );
 
     logger.info('데이터 범위 조회');
     res.json({
@@ -357,99 +349,62 @@ router.get('/stats/data-range', async (req, res) => {
   }
 });
 
-// 데이터 누락 현황 조회 (컬럼별)
-router.get('/stats/missing-data', async (req, res) => {
-  const pool = new Pool(config.database);
-
-  try {
-    // 각 자산 유형별 컬럼 누락 현황 조회
-    const query = `
+const MISSING_DATA_COLUMNS = [
+  'open_price', 'high_price', 'low_price', 'close_price',
+  'volume', 'vs', 'change_rate', 'trading_value'
+];
+
+// 컬럼별 누락 집계 쿼리 (daily_prices 직접 집계)
+const missingDataQuery = (groupColumn, whereClause) => {
+  const columns = MISSING_DATA_COLUMNS.map((column) => `
+        COUNT(dp.${column}) as has_${column},
+        COUNT(*) - COUNT(dp.${column}) as missing_${column}`).join(',');
+  return `
       SELECT
-        s.asset_type,
-        COUNT(*) as total_records,
-        COUNT(dp.open_price) as has_open_price,
-        COUNT(*) - COUNT(dp.open_price) as missing_open_price,
-        COUNT(dp.high_price) as has_high_price,
-        COUNT(*) - COUNT(dp.high_price) as missing_high_price,
-        COUNT(dp.low_price) as has_low_price,
-        COUNT(*) - COUNT(dp.low_price) as missing_low_price,
-        COUNT(dp.close_price) as has_close_price,
-        COUNT(*) - COUNT(dp.close_price) as missing_close_price,
-        COUNT(dp.volume) as has_volume,
-        COUNT(*) - COUNT(dp.volume) as missing_volume,
-        COUNT(dp.vs) as has_vs,
-        COUNT(*) - COUNT(dp.vs) as missing_vs,
-        COUNT(dp.change_rate) as has_change_rate,
-        COUNT(*) - COUNT(dp.change_rate) as missing_change_rate,
-        COUNT(dp.trading_value) as has_trading_value,
-        COUNT(*) - COUNT(dp.trading_value) as missing_trading_value
+        s.${groupColumn},
+        COUNT(*) as total_records,${columns}
       FROM stocks s
       LEFT JOIN daily_prices dp ON s.stock_code = dp.stock_code
-      WHERE s.asset_type IN ('STOCK', 'ETF')
-      GROUP BY s.asset_type
-      ORDER BY s.asset_type
+      WHERE ${whereClause}
+      GROUP BY s.${groupColumn}
+      ORDER BY s.${groupColumn}
     `;
-
-    const result = await pool.query(query);
-
-    // KOSPI/KOSDAQ 구분
-    const marketQuery = `
+};
+
+// 컬럼별 누락 합산 쿼리 (daily_coverage: 수집기가 시세 저장 트랜잭션에서 기록하는 거래일 × 시장구분 요약)
+const missingDataSummaryQuery = (groupColumn, groupExpr, whereClause) => {
+  const columns = MISSING_DATA_COLUMNS.map((column) => `
+        SUM(c.row_count - c.missing_${column}) as has_${column},
+        SUM(c.missing_${column}) as missing_${column}`).join(',');
+  return `
       SELECT
-        s.market_type,
-        COUNT(*) as total_records,
-        COUNT(dp.open_price) as has_open_price,
-        COUNT(*) - COUNT(dp.open_price) as missing_open_price,
-        COUNT(dp.high_price) as has_high_price,
-        COUNT(*) - COUNT(dp.high_price) as missing_high_price,
-        COUNT(dp.low_price) as has_low_price,
-        COUNT(*) - COUNT(dp.low_price) as missing_low_price,
-        COUNT(dp.close_price) as has_close_price,
-        COUNT(*) - COUNT(dp.close_price) as missing_close_price,
-        COUNT(dp.volume) as has_volume,
-        COUNT(*) - COUNT(dp.volume) as missing_volume,
-        COUNT(dp.vs) as has_vs,
-        COUNT(*) - COUNT(dp.vs) as missing_vs,
-        COUNT(dp.change_rate) as has_change_rate,
-        COUNT(*) - COUNT(dp.change_rate) as missing_change_rate,
-        COUNT(dp.trading_value) as has_trading_value,
-        COUNT(*) - COUNT(dp.trading_value) as missing_trading_value
-      FROM stocks s
-      LEFT JOIN daily_prices dp ON s.stock_code = dp.stock_code
-      WHERE s.asset_type = 'STOCK' AND s.market_type IN ('KOSPI', 'KOSDAQ')
-      GROUP BY s.market_type
-      ORDER BY s.market_type
+        ${groupExpr} as ${groupColumn},
+        SUM(c.row_count) as total_records,${columns}
+      FROM daily_coverage c
+      WHERE ${whereClause}
+      GROUP BY 1
+      ORDER BY 1
     `;
+};
 
-    const marketResult = await pool.query(marketQuery);
+// 데이터 누락 현황 조회 (컬럼별)
+router.get('/stats/missing-data', async (req, res) => {
+  const pool = new Pool(config.database);
 
-    // ETF 데이터
-    const etfQuery = `
-      SELECT
-        s.asset_type,
-        COUNT(*) as total_records,
-        COUNT(dp.open_price) as has_open_price,
-        COUNT(*) - COUNT(dp.open_price) as missing_open_price,
-        COUNT(dp.high_price) as has_high_price,
-        COUNT(*) - COUNT(dp.high_price) as missing_high_price,
-        COUNT(dp.low_price) as has_low_price,
-        COUNT(*) - COUNT(dp.low_price) as missing_low_price,
-        COUNT(dp.close_price) as has_close_price,
-        COUNT(*) - COUNT(dp.close_price) as missing_close_price,
-        COUNT(dp.volume) as has_volume,
-        COUNT(*) - COUNT(dp.volume) as missing_volume,
-        COUNT(dp.vs) as has_vs,
-        COUNT(*) - COUNT(dp.vs) as missing_vs,
-        COUNT(dp.change_rate) as has_change_rate,
-        COUNT(*) - COUNT(dp.change_rate) as missing_change_rate,
-        COUNT(dp.trading_value) as has_trading_value,
-        COUNT(*) - COUNT(dp.trading_value) as missing_trading_value
-      FROM stocks s
-      LEFT JOIN daily_prices dp ON s.stock_code = dp.stock_code
-      WHERE s.asset_type = 'ETF'
-      GROUP BY s.asset_type
-    `;
+  try {
+    const summaryTable = await pool.query("SELECT to_regclass('daily_coverage') IS NOT NULL as exists");
+    const useSummary = summaryTable.rows[0].exists;
 
-    const etfResult = await pool.query(etfQuery);
+    // 요약 테이블이 있으면 거래일 × 시장구분 행만 합산, 없으면 daily_prices 직접 집계
+    // KOSPI/KOSDAQ 구분
+    const marketResult = await pool.query(useSummary
+      ? missingDataSummaryQuery('market_type', 'c.market_type', "c.market_type IN ('KOSPI', 'KOSDAQ')")
+      : missingDataQuery('market_type', "s.asset_type = 'STOCK' AND s.market_type IN ('KOSPI', 'KOSDAQ')"));
+
+    // ETF 데이터
+    const etfResult = await pool.query(useSummary
+      ? missingDataSummaryQuery('asset_type', "'ETF'", "c.market_type = 'ETF'")
+      : missingDataQuery('asset_type', "s.asset_type = 'ETF'"));
 
     logger.info('데이터 누락 현황 조회');
     res.json({
@@ -465,6 +420,33 @@ router.get('/stats/missing-data', async (req, res) => {
   }
 });
 
+// 거래일 × 시장구분 수집 현황 (daily_coverage 요약 행)
+router.get('/stats/daily-coverage', async (req, res) => {
+  const pool = new Pool(config.database);
+  const days = Math.min(Math.max(parseInt(req.query.days, 10) || 30, 1), 365);
+
+  try {
+    const result = await pool.query(`
+      SELECT trade_date, market_type, row_count, expected_count, source, collected_at
+      FROM daily_coverage
+      WHERE trade_date >= CURRENT_DATE - $1::int
+      ORDER BY trade_date DESC, market_type
+    `, [days]);
+
+    logger.info('수집 현황 조회', { days });
+    res.json({
+      days,
+      coverage: result.rows,
+      timestamp: new Date().toISOString()
+    });
+  } catch (err) {
+    logger.error('수집 현황 조회 실패', { error: err.message });
+    res.status(500).json({ error: err.message });
+  } finally {
+    await pool.end();
+  }
+});
+
 // 헬퍼 함수
 function formatUptime(seconds) {
   const days = Math.floor(seconds / 86400);
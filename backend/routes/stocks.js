@@ -7,7 +7,13 @@ const {
   validateStockList,
   validateStockSearch,
   validateStockCode,
-  validateDailyPrices
+  validateDailyPrices,
+  validateBars,
+  validateChartSeries,
+  validateRankings,
+  validateRankHistory,
+  validateExtremes,
+  validateUnusualActivity
 } = require('../middleware/validator');
 const { cacheMiddleware } = require('../middleware/cache');
 
@@ -156,6 +162,193 @@ router.get('/search', validateStockSearch, async (req, res) => {
   }
 });
 
+/**
+ * @swagger
+ * /api/stocks/ranks:
+ *   get:
+ *     summary: 거래일별 상위 순위 조회
+ *     description: 수집기가 미리 계산한 시장구분별 순위(daily_ranks)에서 상위 N개 종목을 조회합니다. date를 생략하면 가장 최근 거래일입니다.
+ *     tags: [Stocks]
+ *     parameters:
+ *       - name: market_type
+ *         in: query
+ *         schema:
+ *           type: string
+ *           enum: [KOSPI, KOSDAQ, ETF]
+ *           default: KOSPI
+ *       - name: metric
+ *         in: query
+ *         schema:
+ *           type: string
+ *           enum: [market_cap, trading_value, volume, return]
+ *           default: market_cap
+ *       - name: date
+ *         in: query
+ *         schema:
+ *           type: string
+ *           format: date
+ *       - name: limit
+ *         in: query
+ *         schema:
+ *           type: integer
+ *           default: 50
+ *     responses:
+ *       200:
+ *         description: 성공
+ *       400:
+ *         $ref: '#/components/responses/BadRequest'
+ *       500:
+ *         $ref: '#/components/responses/ServerError'
+ */
+router.get('/ranks', validateRankings, async (req, res) => {
+  try {
+    const { market_type = 'KOSPI', metric = 'market_cap', date = null, limit = 50 } = req.query;
+
+    const ranks = await findMany(
+      `SELECT to_char(r.trade_date, 'YYYY-MM-DD') as trade_date,
+              r.market_type, r.rank_metric, r.rank, r.value,
+              r.stock_code, s.stock_name
+       FROM daily_ranks r
+       JOIN stocks s ON s.stock_code = r.stock_code
+       WHERE r.trade_date = COALESCE($3::date, (
+               SELECT MAX(trade_date) FROM daily_ranks
+               WHERE market_type = $1 AND rank_metric = $2
+             ))
+         AND r.market_type = $1
+         AND r.rank_metric = $2
+       ORDER BY r.rank, r.stock_code
+       LIMIT $4`,
+      [market_type, metric, date, parseInt(limit)],
+      '거래일별 순위 조회'
+    );
+
+    res.json(ranks);
+  } catch (err) {
+    logger.error('거래일별 순위 조회 실패', { error: err.message, stack: err.stack, query: req.query });
+    res.status(500).json({ error: err.message });
+  }
+});
+
+/**
+ * @swagger
+ * /api/stocks/extremes:
+ *   get:
+ *     summary: 52주 신고가/신저가 종목 조회
+ *     description: 수집기가 계산한 52주(250거래일) 최고/최저(price_extremes)에서 해당 거래일에 신고가(신저가)를 기록한 종목을 조회합니다. date를 생략하면 가장 최근 거래일입니다.
+ *     tags: [Stocks]
+ *     parameters:
+ *       - name: market_type
+ *         in: query
+ *         schema:
+ *           type: string
+ *           enum: [KOSPI, KOSDAQ, ETF]
+ *       - name: type
+ *         in: query
+ *         schema:
+ *           type: string
+ *           enum: [high, low]
+ *           default: high
+ *       - name: date
+ *         in: query
+ *         schema:
+ *           type: string
+ *           format: date
+ *       - name: limit
+ *         in: query
+ *         schema:
+ *           type: integer
+ *           default: 100
+ *     responses:
+ *       200:
+ *         description: 성공
+ *       400:
+ *         $ref: '#/components/responses/BadRequest'
+ *       500:
+ *         $ref: '#/components/responses/ServerError'
+ */
+router.get('/extremes', validateExtremes, async (req, res) => {
+  try {
+    const { market_type = null, type = 'high', date = null, limit = 100 } = req.query;
+
+    const stocks = await findMany(
+      `SELECT to_char(x.trade_date, 'YYYY-MM-DD') as trade_date,
+              x.stock_code, s.stock_name, s.market_type,
+              x.high_52w, x.low_52w, x.pct_from_high, x.pct_from_low,
+              x.drawdown, x.max_drawdown
+       FROM price_extremes x
+       JOIN stocks s ON s.stock_code = x.stock_code
+       WHERE x.trade_date = COALESCE($1::date, (SELECT MAX(trade_date) FROM price_extremes))
+         AND ($2::text IS NULL OR s.market_type = $2)
+         AND CASE WHEN $3 = 'high' THEN x.is_new_high ELSE x.is_new_low END
+       ORDER BY CASE WHEN $3 = 'high' THEN -x.pct_from_low ELSE x.pct_from_high END, x.stock_code
+       LIMIT $4`,
+      [date, market_type, type, parseInt(limit)],
+      '52주 신고가/신저가 조회'
+    );
+
+    res.json(stocks);
+  } catch (err) {
+    logger.error('52주 신고가/신저가 조회 실패', { error: err.message, stack: err.stack, query: req.query });
+    res.status(500).json({ error: err.message });
+  }
+});
+
+/**
+ * @swagger
+ * /api/stocks/unusual-activity:
+ *   get:
+ *     summary: 이상 거래 종목 조회
+ *     description: 수집기가 시세 저장 시 탐지한 거래량 급증(volume_spike), 급등(price_jump), 급락(price_drop) 이벤트를 조회합니다. score는 최근 20거래일 기준선(중앙값/MAD) 대비 z-score입니다. date를 생략하면 가장 최근 탐지일입니다.
+ *     tags: [Stocks]
+ *     parameters:
+ *       - name: event_type
+ *         in: query
+ *         schema:
+ *           type: string
+ *           enum: [volume_spike, price_jump, price_drop]
+ *       - name: date
+ *         in: query
+ *         schema:
+ *           type: string
+ *           format: date
+ *       - name: limit
+ *         in: query
+ *         schema:
+ *           type: integer
+ *           default: 100
+ *     responses:
+ *       200:
+ *         description: 성공
+ *       400:
+ *         $ref: '#/components/responses/BadRequest'
+ *       500:
+ *         $ref: '#/components/responses/ServerError'
+ */
+router.get('/unusual-activity', validateUnusualActivity, async (req, res) => {
+  try {
+    const { event_type = null, date = null, limit = 100 } = req.query;
+
+    const events = await findMany(
+      `SELECT to_char(u.trade_date, 'YYYY-MM-DD') as trade_date,
+              u.stock_code, s.stock_name, s.market_type,
+              u.event_type, u.value, u.baseline, u.score
+       FROM unusual_activity u
+       JOIN stocks s ON s.stock_code = u.stock_code
+       WHERE u.trade_date = COALESCE($1::date, (SELECT MAX(trade_date) FROM unusual_activity))
+         AND ($2::text IS NULL OR u.event_type = $2)
+       ORDER BY ABS(u.score) DESC, u.stock_code
+       LIMIT $3`,
+      [date, event_type, parseInt(limit)],
+      '이상 거래 조회'
+    );
+
+    res.json(events);
+  } catch (err) {
+    logger.error('이상 거래 조회 실패', { error: err.message, stack: err.stack, query: req.query });
+    res.status(500).json({ error: err.message });
+  }
+});
+
 /**
  * @swagger
  * /api/stocks/{code}:
@@ -207,6 +400,12 @@ router.get('/:code', validateStockCode, async (req, res) => {
  *     parameters:
  *       - $ref: '#/components/parameters/stockCode'
  *       - $ref: '#/components/parameters/limit'
+ *       - name: adjusted
+ *         in: query
+ *         description: 수정주가 여부 (분할/병합 등 조정계수 적용)
+ *         schema:
+ *           type: boolean
+ *           default: false
  *     responses:
  *       200:
  *         description: 성공
@@ -224,9 +423,30 @@ router.get('/:code', validateStockCode, async (req, res) => {
 router.get('/:code/daily', validateDailyPrices, async (req, res) => {
   try {
     const { code } = req.params;
-    const { limit = 365 } = req.query;
+    const { limit = 365, adjusted = false } = req.query;
 
-    const prices = await findMany(
+    // 수정주가: 거래일이 속한 조정 구간의 누적계수를 곱함 (수집기가 adjustment_factors에 저장)
+    const prices = adjusted ? await findMany(
+      `SELECT dp.id, dp.stock_code,
+              to_char(dp.trade_date, 'YYYY-MM-DD') as trade_date,
+              ROUND(dp.open_price * COALESCE(af.cum_factor, 1)) as open_price,
+              ROUND(dp.high_price * COALESCE(af.cum_factor, 1)) as high_price,
+              ROUND(dp.low_price * COALESCE(af.cum_factor, 1)) as low_price,
+              ROUND(dp.close_price * COALESCE(af.cum_factor, 1)) as close_price,
+              ROUND(dp.volume / COALESCE(af.cum_factor, 1)) as volume,
+              dp.trading_value, dp.created_at, dp.vs, dp.change_rate,
+              COALESCE(af.cum_factor, 1) as adj_factor
+       FROM daily_prices dp
+       LEFT JOIN adjustment_factors af
+         ON af.stock_code = dp.stock_code
+        AND dp.trade_date >= af.valid_from
+        AND dp.trade_date < af.ex_date
+       WHERE dp.stock_code = $1
+       ORDER BY dp.trade_date DESC
+       LIMIT $2`,
+      [code, parseInt(limit)],
+      '수정주가 일별 시세 조회'
+    ) : await findMany(
       `SELECT id, stock_code,
               to_char(trade_date, 'YYYY-MM-DD') as trade_date,
               open_price, high_price, low_price, close_price,
@@ -246,4 +466,353 @@ router.get('/:code/daily', validateDailyPrices, async (req, res) => {
   }
 });
 
+/**
+ * @swagger
+ * /api/stocks/{code}/bars:
+ *   get:
+ *     summary: 주봉/월봉 조회
+ *     description: 수집기가 미리 집계한 주봉(weekly_bars) 또는 월봉(monthly_bars)을 조회합니다. 장기 차트용입니다.
+ *     tags: [Stocks]
+ *     parameters:
+ *       - $ref: '#/components/parameters/stockCode'
+ *       - name: interval
+ *         in: query
+ *         schema:
+ *           type: string
+ *           enum: [weekly, monthly]
+ *           default: weekly
+ *       - $ref: '#/components/parameters/limit'
+ *     responses:
+ *       200:
+ *         description: 성공
+ *       400:
+ *         $ref: '#/components/responses/BadRequest'
+ *       500:
+ *         $ref: '#/components/responses/ServerError'
+ */
+router.get('/:code/bars', validateBars, async (req, res) => {
+  try {
+    const { code } = req.params;
+    const { interval = 'weekly', limit = 520 } = req.query;
+
+    // interval은 validator에서 weekly/monthly로 제한됨
+    const table = interval === 'monthly' ? 'monthly_bars' : 'weekly_bars';
+
+    const bars = await findMany(
+      `SELECT stock_code,
+              to_char(period_start, 'YYYY-MM-DD') as trade_date,
+              to_char(period_end, 'YYYY-MM-DD') as period_end,
+              open_price, high_price, low_price, close_price,
+              volume, trading_value, trading_days
+       FROM ${table}
+       WHERE stock_code = $1
+       ORDER BY period_start DESC
+       LIMIT $2`,
+      [code, parseInt(limit)],
+      `${interval} 봉 조회`
+    );
+
+    res.json(bars);
+  } catch (err) {
+    logger.error('주봉/월봉 조회 실패', { error: err.message, stack: err.stack, stock_code: req.params.code, interval: req.query.interval });
+    res.status(500).json({ error: err.message });
+  }
+});
+
+/**
+ * @swagger
+ * /api/stocks/{code}/chart:
+ *   get:
+ *     summary: 축소 차트 시계열 조회
+ *     description: |
+ *       수집기가 미리 계산한 축소 시계열(chart_series)을 조회합니다. 요청 포인트 수 이하인 가장 큰 해상도를 반환합니다.
+ *       start_date/end_date를 지정하면 해상도별로 구간 안의 포인트만 잘라 구간 포인트 수가 예산 이하인 가장 큰 해상도를 반환합니다.
+ *       축소 시계열은 전체 히스토리 기준(최대 1000포인트)이므로 짧은 구간을 촘촘하게 그릴 때는 /daily 또는 /bars를 사용합니다.
+ *     tags: [Stocks]
+ *     parameters:
+ *       - $ref: '#/components/parameters/stockCode'
+ *       - name: type
+ *         in: query
+ *         schema:
+ *           type: string
+ *           enum: [line, ohlc]
+ *           default: line
+ *       - name: points
+ *         in: query
+ *         schema:
+ *           type: integer
+ *           default: 500
+ *       - name: start_date
+ *         in: query
+ *         schema:
+ *           type: string
+ *           format: date
+ *       - name: end_date
+ *         in: query
+ *         schema:
+ *           type: string
+ *           format: date
+ *     responses:
+ *       200:
+ *         description: 성공
+ *       400:
+ *         $ref: '#/components/responses/BadRequest'
+ *       404:
+ *         description: 축소 시계열 없음
+ *       500:
+ *         $ref: '#/components/responses/ServerError'
+ */
+// 축소 시계열을 [start, end] 구간으로 자르기 (OHLC는 버킷 시작일 기준)
+function sliceChartSeries(series, start, end) {
+  const dates = series.points.date;
+  const from = start ? dates.findIndex((date) => date >= start) : 0;
+  const lower = from === -1 ? dates.length : from;
+  let upper = dates.length;
+  if (end) {
+    while (upper > lower && dates[upper - 1] > end) upper -= 1;
+  }
+
+  const points = {};
+  for (const [key, values] of Object.entries(series.points)) {
+    points[key] = values.slice(lower, upper);
+  }
+  return {
+    ...series,
+    start_date: points.date[0] || null,
+    end_date: points.date[points.date.length - 1] || null,
+    points
+  };
+}
+
+router.get('/:code/chart', validateChartSeries, async (req, res) => {
+  try {
+    const { code } = req.params;
+    const { type = 'line', points = 500, start_date, end_date } = req.query;
+    const budget = parseInt(points);
+
+    if (!start_date && !end_date) {
+      // 예산 이하 해상도 중 가장 큰 것, 없으면 가장 작은 해상도
+      const series = await findOne(
+        `SELECT stock_code, resolution, series_type,
+                to_char(start_date, 'YYYY-MM-DD') as start_date,
+                to_char(end_date, 'YYYY-MM-DD') as end_date,
+                source_points, points
+         FROM chart_series
+         WHERE stock_code = $1 AND series_type = $2
+         ORDER BY (resolution <= $3) DESC,
+                  CASE WHEN resolution <= $3 THEN resolution END DESC,
+                  resolution ASC
+         LIMIT 1`,
+        [code, type, budget],
+        '축소 차트 시계열 조회'
+      );
+
+      if (!series) {
+        return res.status(404).json({ error: '축소 시계열을 찾을 수 없습니다.' });
+      }
+      return res.json(series);
+    }
+
+    // 구간 지정: 해상도별로 구간을 잘라 구간 포인트 수가 예산 이하인 가장 큰 것, 없으면 가장 적은 것
+    const candidates = await findMany(
+      `SELECT stock_code, resolution, series_type,
+              to_char(start_date, 'YYYY-MM-DD') as start_date,
+              to_char(end_date, 'YYYY-MM-DD') as end_date,
+              source_points, points
+       FROM chart_series
+       WHERE stock_code = $1 AND series_type = $2
+       ORDER BY resolution ASC`,
+      [code, type],
+      '축소 차트 시계열 구간 조회'
+    );
+
+    if (candidates.length === 0) {
+      return res.status(404).json({ error: '축소 시계열을 찾을 수 없습니다.' });
+    }
+
+    const sliced = candidates.map((series) => sliceChartSeries(series, start_date, end_date));
+    const fitting = sliced.filter((series) => series.points.date.length <= budget);
+    res.json(fitting.length > 0 ? fitting[fitting.length - 1] : sliced[0]);
+  } catch (err) {
+    logger.error('축소 차트 시계열 조회 실패', { error: err.message, stack: err.stack, stock_code: req.params.code });
+    res.status(500).json({ error: err.message });
+  }
+});
+
+/**
+ * @swagger
+ * /api/stocks/{code}/indicators:
+ *   get:
+ *     summary: 기술적 지표 조회
+ *     description: 수집기가 계산한 기술적 지표(SMA, EMA, MACD, RSI, 볼린저 밴드, ATR)를 조회합니다. 차트 오버레이용입니다.
+ *     tags: [Stocks]
+ *     parameters:
+ *       - $ref: '#/components/parameters/stockCode'
+ *       - $ref: '#/components/parameters/limit'
+ *     responses:
+ *       200:
+ *         description: 성공
+ *       400:
+ *         $ref: '#/components/responses/BadRequest'
+ *       500:
+ *         $ref: '#/components/responses/ServerError'
+ */
+router.get('/:code/indicators', validateDailyPrices, async (req, res) => {
+  try {
+    const { code } = req.params;
+    const { limit = 365 } = req.query;
+
+    const indicators = await findMany(
+      `SELECT stock_code,
+              to_char(trade_date, 'YYYY-MM-DD') as trade_date,
+              sma_5, sma_20, sma_60, sma_120,
+              ema_12, ema_26, macd, macd_signal, macd_hist,
+              rsi_14, sma_20 as bb_middle, bb_upper, bb_lower, atr_14
+       FROM indicators
+       WHERE stock_code = $1
+       ORDER BY trade_date DESC
+       LIMIT $2`,
+      [code, parseInt(limit)],
+      '기술적 지표 조회'
+    );
+
+    res.json(indicators);
+  } catch (err) {
+    logger.error('기술적 지표 조회 실패', { error: err.message, stack: err.stack, stock_code: req.params.code });
+    res.status(500).json({ error: err.message });
+  }
+});
+
+/**
+ * @swagger
+ * /api/stocks/{code}/ranks:
+ *   get:
+ *     summary: 종목 순위 이력 조회
+ *     description: 종목의 거래일별 시장 내 순위(daily_ranks) 이력을 조회합니다.
+ *     tags: [Stocks]
+ *     parameters:
+ *       - $ref: '#/components/parameters/stockCode'
+ *       - name: metric
+ *         in: query
+ *         schema:
+ *           type: string
+ *           enum: [market_cap, trading_value, volume, return]
+ *           default: market_cap
+ *       - $ref: '#/components/parameters/limit'
+ *     responses:
+ *       200:
+ *         description: 성공
+ *       400:
+ *         $ref: '#/components/responses/BadRequest'
+ *       500:
+ *         $ref: '#/components/responses/ServerError'
+ */
+router.get('/:code/ranks', validateRankHistory, async (req, res) => {
+  try {
+    const { code } = req.params;
+    const { metric = 'market_cap', limit = 365 } = req.query;
+
+    const history = await findMany(
+      `SELECT to_char(trade_date, 'YYYY-MM-DD') as trade_date,
+              market_type, rank_metric, rank, value
+       FROM daily_ranks
+       WHERE stock_code = $1 AND rank_metric = $2
+       ORDER BY trade_date DESC
+       LIMIT $3`,
+      [code, metric, parseInt(limit)],
+      '종목 순위 이력 조회'
+    );
+
+    res.json(history);
+  } catch (err) {
+    logger.error('종목 순위 이력 조회 실패', { error: err.message, stack: err.stack, stock_code: req.params.code });
+    res.status(500).json({ error: err.message });
+  }
+});
+
+/**
+ * @swagger
+ * /api/stocks/{code}/extremes:
+ *   get:
+ *     summary: 52주 최고/최저 및 낙폭 이력 조회
+ *     description: 종목의 거래일별 52주 최고/최저(수정주가), 고점 대비 위치, 최고 종가 대비 낙폭과 최대 낙폭을 조회합니다.
+ *     tags: [Stocks]
+ *     parameters:
+ *       - $ref: '#/components/parameters/stockCode'
+ *       - $ref: '#/components/parameters/limit'
+ *     responses:
+ *       200:
+ *         description: 성공
+ *       400:
+ *         $ref: '#/components/responses/BadRequest'
+ *       500:
+ *         $ref: '#/components/responses/ServerError'
+ */
+router.get('/:code/extremes', validateDailyPrices, async (req, res) => {
+  try {
+    const { code } = req.params;
+    const { limit = 365 } = req.query;
+
+    const history = await findMany(
+      `SELECT to_char(trade_date, 'YYYY-MM-DD') as trade_date,
+              high_52w, low_52w, pct_from_high, pct_from_low,
+              peak_close, drawdown, max_drawdown, is_new_high, is_new_low
+       FROM price_extremes
+       WHERE stock_code = $1
+       ORDER BY trade_date DESC
+       LIMIT $2`,
+      [code, parseInt(limit)],
+      '52주 최고/최저 이력 조회'
+    );
+
+    res.json(history);
+  } catch (err) {
+    logger.error('52주 최고/최저 이력 조회 실패', { error: err.message, stack: err.stack, stock_code: req.params.code });
+    res.status(500).json({ error: err.message });
+  }
+});
+
+/**
+ * @swagger
+ * /api/stocks/{code}/risk:
+ *   get:
+ *     summary: 변동성/베타 이력 조회
+ *     description: 종목의 거래일별 60/120/250거래일 실현 변동성, 시장(KOSPI/KOSDAQ 시가총액 가중) 대비 베타, 고유 변동성(연환산)을 조회합니다.
+ *     tags: [Stocks]
+ *     parameters:
+ *       - $ref: '#/components/parameters/stockCode'
+ *       - $ref: '#/components/parameters/limit'
+ *     responses:
+ *       200:
+ *         description: 성공
+ *       400:
+ *         $ref: '#/components/responses/BadRequest'
+ *       500:
+ *         $ref: '#/components/responses/ServerError'
+ */
+router.get('/:code/risk', validateDailyPrices, async (req, res) => {
+  try {
+    const { code } = req.params;
+    const { limit = 365 } = req.query;
+
+    const history = await findMany(
+      `SELECT to_char(trade_date, 'YYYY-MM-DD') as trade_date, benchmark,
+              vol_60, vol_120, vol_250,
+              beta_60, beta_120, beta_250,
+              idio_vol_60, idio_vol_120, idio_vol_250
+       FROM risk_metrics
+       WHERE stock_code = $1
+       ORDER BY trade_date DESC
+       LIMIT $2`,
+      [code, parseInt(limit)],
+      '변동성/베타 이력 조회'
+    );
+
+    res.json(history);
+  } catch (err) {
+    logger.error('변동성/베타 이력 조회 실패', { error: err.message, stack: err.stack, stock_code: req.params.code });
+    res.status(500).json({ error: err.message });
+  }
+});
+
 module.exports = router;
@@ -0,0 +1 @@
+"""분석 엔진 모듈 (수집 이후 단계에서 사용하는 집계/지표 계산)"""
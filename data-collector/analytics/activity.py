@@ -0,0 +1,276 @@
+"""이상 거래 탐지 모듈
+
+수집기가 거래일 시세를 저장하는 트랜잭션 안에서 종목별 최근 WINDOW 거래일의
+로그 거래량과 수익률(등락률) 기준선(중앙값/MAD)과 비교하여 거래량 급증, 급등락을
+unusual_activity 테이블에 기록한다.
+
+- 기준선은 당일을 제외한 최근 관측치로 계산 (중앙값/MAD라 이전 급증에 덜 흔들림)
+- 종목별 최근 관측치 윈도우는 activity_state에 보관하여 당일 종목 수만큼만 조회/갱신
+- 같은 거래일을 재수집하면 해당 거래일 관측치를 교체하고 이벤트도 다시 기록
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from common.database import bulk_upsert
+from common.frames import as_day_array, frame_rows, load_daily_prices
+from common.logger import get_logger
+
+logger = get_logger(__name__)
+
+WINDOW = 20
+MIN_OBSERVATIONS = 10
+
+# 정규분포 기준 MAD → 표준편차 환산 계수
+MAD_SCALE = 1.4826
+
+# 거래량: 로그 거래량 robust z-score와 기준 거래량 대비 배수
+VOLUME_Z = 4.0
+VOLUME_RATIO = 3.0
+# 로그 거래량 MAD 하한 (거래량이 거의 일정한 종목의 과민 반응 방지)
+MIN_VOLUME_SCALE = 0.1
+
+# 수익률: robust z-score와 절대 등락률 하한
+RETURN_Z = 4.0
+MIN_ABS_RETURN = 0.05
+MIN_RETURN_SCALE = 0.005
+
+EVENT_COLUMNS = ['stock_code', 'trade_date', 'event_type', 'value', 'baseline', 'score']
+
+CREATE_ACTIVITY_TABLES_SQL = """
+    CREATE TABLE IF NOT EXISTS unusual_activity (
+        stock_code VARCHAR(10) NOT NULL,
+        trade_date DATE NOT NULL,
+        event_type VARCHAR(20) NOT NULL,
+        value DOUBLE PRECISION,
+        baseline DOUBLE PRECISION,
+        score REAL,
+        detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (stock_code, trade_date, event_type)
+    );
+    CREATE INDEX IF NOT EXISTS idx_unusual_activity_date ON unusual_activity(trade_date DESC, score DESC);
+
+    CREATE TABLE IF NOT EXISTS activity_state (
+        stock_code VARCHAR(10) PRIMARY KEY,
+        trade_date DATE NOT NULL,
+        volume_window DOUBLE PRECISION[],
+        return_window DOUBLE PRECISION[],
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+
+class ActivityState:
+    """종목별 최근 관측치 윈도우 (행: 종목, 열: 오래된 순, 빈 칸은 NaN)"""
+
+    def __init__(self, codes):
+        self.codes = [str(code) for code in codes]
+        self.rows = {code: i for i, code in enumerate(self.codes)}
+        n = len(self.codes)
+
+        self.last_date = np.full(n, np.datetime64('NaT'), dtype='datetime64[D]')
+        self.volume = np.full((n, WINDOW), np.nan)
+        self.returns = np.full((n, WINDOW), np.nan)
+
+    def step(self, rows, trade_date, volume, returns):
+        """
+        당일 관측치를 기준선과 비교하고 윈도우에 추가
+
+        Args:
+            rows: 상태 행 번호 배열
+            trade_date: 거래일
+            volume: 거래량 배열
+            returns: 수익률 배열 (등락률 / 100, 없으면 NaN)
+
+        Returns:
+            pandas.DataFrame: EVENT_COLUMNS (탐지된 이벤트만)
+        """
+        log_volume = np.log1p(np.asarray(volume, dtype=np.float64))
+        returns = np.asarray(returns, dtype=np.float64)
+
+        # 관측치가 없는 종목의 nanmedian 경고(All-NaN slice)는 무시
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            window = self.volume[rows]
+            count = np.isfinite(window).sum(axis=1)
+            median = np.nanmedian(window, axis=1)
+            scale = np.maximum(np.nanmedian(np.abs(window - median[:, None]), axis=1) * MAD_SCALE, MIN_VOLUME_SCALE)
+            volume_z = (log_volume - median) / scale
+            baseline_volume = np.expm1(median)
+
+            window = self.returns[rows]
+            return_count = np.isfinite(window).sum(axis=1)
+            return_median = np.nanmedian(window, axis=1)
+            return_scale = np.maximum(
+                np.nanmedian(np.abs(window - return_median[:, None]), axis=1) * MAD_SCALE, MIN_RETURN_SCALE
+            )
+            return_z = (returns - return_median) / return_scale
+
+        volume = np.expm1(log_volume)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = volume / baseline_volume
+        volume_spike = (count >= MIN_OBSERVATIONS) & (volume_z >= VOLUME_Z) & (ratio >= VOLUME_RATIO)
+        moved = (return_count >= MIN_OBSERVATIONS) & (np.abs(return_z) >= RETURN_Z) & \
+            (np.abs(returns) >= MIN_ABS_RETURN)
+
+        codes = np.array(self.codes, dtype=object)[rows]
+        events = [
+            pd.DataFrame({
+                'stock_code': codes[volume_spike], 'event_type': 'volume_spike',
+                'value': volume[volume_spike], 'baseline': baseline_volume[volume_spike],
+                'score': volume_z[volume_spike],
+            }),
+            pd.DataFrame({
+                'stock_code': codes[moved], 'event_type': np.where(returns[moved] > 0, 'price_jump', 'price_drop'),
+                'value': returns[moved], 'baseline': return_median[moved], 'score': return_z[moved],
+            }),
+        ]
+
+        # 윈도우를 한 칸 밀고 당일 관측치 추가
+        self.volume[rows, :-1] = self.volume[rows, 1:]
+        self.volume[rows, -1] = log_volume
+        self.returns[rows, :-1] = self.returns[rows, 1:]
+        self.returns[rows, -1] = returns
+        self.last_date[rows] = trade_date
+
+        frame = pd.concat(events, ignore_index=True)
+        frame['trade_date'] = pd.Timestamp(trade_date)
+        return frame[EVENT_COLUMNS]
+
+    def drop_last(self, rows):
+        """마지막 관측치 제거 (같은 거래일 재수집 시 교체용)"""
+        self.volume[rows, 1:] = self.volume[rows, :-1]
+        self.volume[rows, 0] = np.nan
+        self.returns[rows, 1:] = self.returns[rows, :-1]
+        self.returns[rows, 0] = np.nan
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        activity_state 조회 결과로 복원
+
+        Args:
+            records: [(stock_code, trade_date, volume_window, return_window), ...]
+                (저장된 상태가 없는 종목은 trade_date 이하 None)
+        """
+        state = cls([record[0] for record in records])
+        for i, (_, trade_date, volumes, returns) in enumerate(records):
+            if trade_date is None:
+                continue
+            state.last_date[i] = np.datetime64(trade_date, 'D')
+            volumes = np.asarray(volumes or [], dtype=np.float64)[-WINDOW:]
+            returns = np.asarray(returns or [], dtype=np.float64)[-WINDOW:]
+            if len(volumes):
+                state.volume[i, -len(volumes):] = volumes
+            if len(returns):
+                state.returns[i, -len(returns):] = returns
+        return state
+
+    def to_rows(self, rows=None):
+        """activity_state 저장용 행 튜플 목록 (NaN 빈 칸 제외)"""
+        rows = range(len(self.codes)) if rows is None else rows
+        result = []
+        for i in rows:
+            code = self.codes[i]
+            volumes = self.volume[i][np.isfinite(self.volume[i])]
+            returns = self.returns[i]
+            returns = returns[WINDOW - len(volumes):]
+            result.append((code, self.last_date[i].astype(object), volumes.tolist(),
+                           [None if np.isnan(value) else float(value) for value in returns]))
+        return result
+
+
+def _to_number(value):
+    try:
+        return float(value) if value not in (None, '') else np.nan
+    except (ValueError, TypeError):
+        return np.nan
+
+
+def detect_unusual_activity(cursor, items, trade_date):
+    """
+    수집기 API 응답 항목으로 이상 거래 탐지 후 저장 (시세 저장과 같은 트랜잭션, 커밋은 호출자 담당)
+
+    상태 기준일이 당일 이후인 종목(과거 거래일 재수집)은 기준선이 맞지 않으므로 건너뛴다.
+
+    Args:
+        cursor: 시세를 저장한 트랜잭션의 커서
+        items: API 응답 항목 (srtnCd, clpr, trqu, fltRt)
+        trade_date: 거래일 ('YYYY-MM-DD')
+
+    Returns:
+        int: 탐지된 이벤트 수
+    """
+    parsed = [
+        (item.get('srtnCd', ''), _to_number(item.get('trqu')), _to_number(item.get('fltRt')) / 100)
+        for item in items
+        if _to_number(item.get('clpr')) > 0 and item.get('srtnCd')
+    ]
+    if not parsed:
+        return 0
+
+    codes = [code for code, _, _ in parsed]
+    day = np.datetime64(trade_date, 'D')
+
+    cursor.execute(CREATE_ACTIVITY_TABLES_SQL)
+    cursor.execute(
+        "SELECT stock_code, trade_date, volume_window, return_window FROM activity_state WHERE stock_code = ANY(%s)",
+        (codes,)
+    )
+    saved = {record[0]: record for record in cursor.fetchall()}
+    state = ActivityState.from_records([saved.get(code, (code, None, None, None)) for code in codes])
+
+    rows = np.arange(len(codes))
+    state.drop_last(rows[state.last_date == day])
+    active = rows[~(state.last_date > day)]
+
+    volume = np.array([v for _, v, _ in parsed])[active]
+    returns = np.array([r for _, _, r in parsed])[active]
+    events = state.step(active, day, np.nan_to_num(volume), returns)
+
+    cursor.execute(
+        "DELETE FROM unusual_activity WHERE trade_date = %s AND stock_code = ANY(%s)",
+        (trade_date, [codes[i] for i in active])
+    )
+    count = bulk_upsert(cursor, 'unusual_activity', EVENT_COLUMNS, frame_rows(events, EVENT_COLUMNS),
+                        conflict_columns=['stock_code', 'trade_date', 'event_type'])
+    bulk_upsert(cursor, 'activity_state', ['stock_code', 'trade_date', 'volume_window', 'return_window'],
+                state.to_rows(active),
+                conflict_columns=['stock_code'])
+
+    if count:
+        logger.info(f"  🚨 이상 거래 {count}건 탐지 ({trade_date})")
+    return count
+
+
+def rebuild_unusual_activity(conn):
+    """전체 히스토리를 거래일 순서대로 재생하여 이상 거래와 상태 재계산 (초기 적재용, 커밋은 호출자 담당)"""
+    prices = load_daily_prices()
+    prices = prices[prices['close_price'] > 0].sort_values(['trade_date', 'stock_code'], kind='stable')
+    if prices.empty:
+        return 0
+
+    codes = prices['stock_code'].astype(str).to_numpy()
+    state = ActivityState(np.unique(codes))
+    rows = np.array([state.rows[code] for code in codes], dtype=np.int64)
+    days = as_day_array(prices['trade_date'])
+    volume = prices['volume'].to_numpy(dtype=np.float64)
+    returns = prices['change_rate'].to_numpy(dtype=np.float64, na_value=np.nan) / 100
+
+    boundaries = np.flatnonzero(days[1:] != days[:-1]) + 1
+    starts = np.concatenate([[0], boundaries])
+    ends = np.append(starts[1:], len(days))
+    events = [state.step(rows[s:e], days[s], volume[s:e], returns[s:e]) for s, e in zip(starts, ends)]
+    events = pd.concat(events, ignore_index=True)
+
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_ACTIVITY_TABLES_SQL)
+        cursor.execute("TRUNCATE unusual_activity")
+        count = bulk_upsert(cursor, 'unusual_activity', EVENT_COLUMNS, frame_rows(events, EVENT_COLUMNS),
+                            conflict_columns=['stock_code', 'trade_date', 'event_type'], page_size=5000)
+        bulk_upsert(cursor, 'activity_state', ['stock_code', 'trade_date', 'volume_window', 'return_window'],
+                    state.to_rows(), conflict_columns=['stock_code'], page_size=5000)
+
+    logger.info(f"🚨 unusual_activity {len(days):,}건 재생, 이벤트 {count:,}건")
+    return count
@@ -0,0 +1,322 @@
+"""수정주가(액면분할/무상증자 등) 조정계수 모듈
+
+daily_prices는 원시 종가를 저장하므로 분할/병합일에 가짜 급등락이 생긴다.
+API의 전일대비(vs)는 거래소 기준가(수정 전일종가) 대비 값이므로
+기준가 = 종가 - vs 가 직전 원시 종가와 다르면 기준가 조정(권리락, 분할 등)이 있었던 날로 본다.
+
+- 탐지: 기준가/직전 종가 비율이 1에서 벗어난 날을 이벤트로 기록
+- 분류: 상장주식수 변화(daily_market_cap의 API 값, 없으면 stocks.listed_shares 스냅샷 대비)로
+  분할/병합 여부 확인
+- 저장: 이벤트별 누적 조정계수와 적용 구간(valid_from ~ ex_date 전일)을 adjustment_factors 테이블에 저장하여
+  수정주가 조회가 구간 조인 + 곱셈 한 번으로 끝나도록 한다.
+"""
+import numpy as np
+import pandas as pd
+
+from common.database import bulk_upsert
+from common.frames import as_day_array, frame_rows, load_daily_prices, read_frame
+from common.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 직전 거래일과 연속된 날: 기준가 차이가 이 비율을 넘으면 이벤트로 판단
+MIN_GAP = 0.005
+# 거래정지 등으로 직전 시세와 떨어진 날: 구조적 변경(분할/병합 규모)만 이벤트로 판단
+MIN_GAP_AFTER_HALT = 0.25
+# 상장주식수 변화가 비율의 역수와 이 범위 안에서 맞으면 분할/병합으로 분류
+SHARES_MATCH_TOLERANCE = 0.05
+
+# 첫 이벤트의 적용 시작일
+FIRST_VALID_FROM = '1900-01-01'
+
+FACTOR_COLUMNS = [
+    'stock_code', 'ex_date', 'valid_from', 'ratio', 'cum_factor',
+    'prev_close', 'base_price', 'shares_ratio', 'event_type'
+]
+
+CREATE_ADJUSTMENT_TABLES_SQL = """
+    CREATE TABLE IF NOT EXISTS adjustment_factors (
+        stock_code VARCHAR(10) NOT NULL,
+        ex_date DATE NOT NULL,
+        valid_from DATE NOT NULL,
+        ratio DOUBLE PRECISION NOT NULL,
+        cum_factor DOUBLE PRECISION NOT NULL,
+        prev_close INTEGER,
+        base_price INTEGER,
+        shares_ratio DOUBLE PRECISION,
+        event_type VARCHAR(20),
+        detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (stock_code, ex_date)
+    );
+    CREATE INDEX IF NOT EXISTS idx_adjustment_factors_range ON adjustment_factors(stock_code, valid_from, ex_date);
+
+    CREATE TABLE IF NOT EXISTS listed_shares_snapshot (
+        stock_code VARCHAR(10) PRIMARY KEY,
+        listed_shares BIGINT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+
+def _classify(ratio, shares_ratio):
+    """이벤트 유형 (상장주식수 변화가 있으면 가격 비율과 맞는지 확인)"""
+    shares_ratio = np.asarray(shares_ratio, dtype=np.float64)
+    has_shares = np.isfinite(shares_ratio) & (shares_ratio != 1)
+    matches = has_shares & (np.abs(ratio * shares_ratio - 1) <= SHARES_MATCH_TOLERANCE)
+
+    split_like = np.where(has_shares, matches, np.abs(np.log(ratio)) >= np.log(1 + MIN_GAP_AFTER_HALT))
+    return np.where(split_like & (ratio < 1), 'split',
+                    np.where(split_like & (ratio > 1), 'reverse_split',
+                             np.where(has_shares, 'capital_change', 'base_price')))
+
+
+def detect_corporate_actions(frame):
+    """
+    기준가 조정 이벤트 탐지
+
+    Args:
+        frame: stock_code, trade_date, close_price, vs, prev_close, consecutive(직전 거래일 연속 여부),
+            shares_ratio(선택, 상장주식수 변화 비율) 컬럼을 가진 DataFrame
+
+    Returns:
+        pandas.DataFrame: stock_code, ex_date, ratio(기준가/직전 종가), prev_close, base_price,
+            shares_ratio, event_type
+    """
+    close = frame['close_price'].to_numpy(dtype=np.float64)
+    vs = pd.to_numeric(frame['vs']).to_numpy(dtype=np.float64, na_value=np.nan)
+    prev_close = pd.to_numeric(frame['prev_close']).to_numpy(dtype=np.float64, na_value=np.nan)
+    base_price = close - vs
+
+    valid = (close > 0) & (prev_close > 0) & (base_price > 0) & np.isfinite(base_price)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(valid, base_price / prev_close, 1.0)
+
+    threshold = np.where(frame['consecutive'].to_numpy(dtype=bool), MIN_GAP, MIN_GAP_AFTER_HALT)
+    is_event = valid & (np.abs(ratio - 1) > threshold)
+
+    shares_ratio = pd.to_numeric(frame['shares_ratio']).to_numpy(dtype=np.float64, na_value=np.nan) \
+        if 'shares_ratio' in frame else np.full(len(frame), np.nan)
+
+    events = pd.DataFrame({
+        'stock_code': frame['stock_code'].astype(str).to_numpy()[is_event],
+        'ex_date': pd.to_datetime(as_day_array(frame['trade_date'])[is_event]),
+        'ratio': ratio[is_event],
+        'prev_close': prev_close[is_event].astype(np.int64),
+        'base_price': base_price[is_event].astype(np.int64),
+        'shares_ratio': shares_ratio[is_event],
+    })
+    events['event_type'] = _classify(events['ratio'].to_numpy(), events['shares_ratio'].to_numpy())
+    return events
+
+
+def build_factors(events):
+    """
+    이벤트 목록으로 누적 조정계수 계산
+
+    ex_date 이전 거래일의 가격에 곱할 계수 = 그 이후 모든 이벤트 비율의 곱.
+    각 행은 [valid_from, ex_date) 구간에 적용된다.
+    """
+    factors = events.sort_values(['stock_code', 'ex_date'], ascending=[True, False], kind='stable').copy()
+    factors['cum_factor'] = factors.groupby('stock_code', sort=False)['ratio'].cumprod()
+    factors.sort_values(['stock_code', 'ex_date'], inplace=True, kind='stable')
+
+    previous = factors.groupby('stock_code', sort=False)['ex_date'].shift(1)
+    factors['valid_from'] = previous.fillna(pd.Timestamp(FIRST_VALID_FROM))
+    return factors[FACTOR_COLUMNS].reset_index(drop=True)
+
+
+def adjust_prices(prices, factors):
+    """
+    일별 시세에 누적 조정계수 적용 (가격 × 계수, 거래량 ÷ 계수)
+
+    종목 번호와 일자를 하나의 정렬 키로 만들어 searchsorted 한 번으로 계수를 찾는다.
+
+    Args:
+        prices: stock_code, trade_date, OHLC, volume 컬럼을 가진 DataFrame
+        factors: build_factors 결과 (또는 adjustment_factors 조회 결과)
+
+    Returns:
+        pandas.DataFrame: 가격/거래량이 수정된 복사본 (adj_factor 컬럼 추가)
+    """
+    adjusted = prices.copy()
+    factor = np.ones(len(prices))
+
+    if len(factors) and len(prices):
+        codes = pd.Index(np.union1d(factors['stock_code'].astype(str), prices['stock_code'].astype(str)))
+        span = np.int64(1) << 32
+
+        event_keys = codes.get_indexer(factors['stock_code'].astype(str)) * span + \
+            as_day_array(factors['ex_date']).astype(np.int64)
+        order = np.argsort(event_keys, kind='stable')
+        event_keys = event_keys[order]
+        cum_factor = factors['cum_factor'].to_numpy(dtype=np.float64)[order]
+
+        price_codes = codes.get_indexer(prices['stock_code'].astype(str))
+        price_keys = price_codes * span + as_day_array(prices['trade_date']).astype(np.int64)
+
+        # 거래일 이후 첫 이벤트 (같은 종목일 때만 적용)
+        position = np.searchsorted(event_keys, price_keys, side='right')
+        found = position < len(event_keys)
+        same_stock = np.zeros(len(prices), dtype=bool)
+        same_stock[found] = event_keys[position[found]] // span == price_codes[found]
+        factor[same_stock] = cum_factor[position[same_stock]]
+
+    for name in ('open_price', 'high_price', 'low_price', 'close_price'):
+        if name in adjusted:
+            adjusted[name] = np.round(adjusted[name].to_numpy(dtype=np.float64) * factor).astype(np.int64)
+    if 'volume' in adjusted:
+        adjusted['volume'] = np.round(adjusted['volume'].to_numpy(dtype=np.float64) / factor).astype(np.int64)
+    adjusted['adj_factor'] = factor
+    return adjusted
+
+
+def load_factors(stock_codes=None, conn=None):
+    """adjustment_factors 조회 (테이블이 없으면 빈 DataFrame)"""
+    exists = read_frame("SELECT to_regclass('adjustment_factors') IS NOT NULL AS exists", conn=conn)
+    if exists.empty or not exists['exists'].iloc[0]:
+        return pd.DataFrame(columns=FACTOR_COLUMNS)
+
+    codes = sorted(set(stock_codes)) if stock_codes else None
+    factors = read_frame(f"""
+        SELECT {', '.join(FACTOR_COLUMNS)}
+        FROM adjustment_factors
+        WHERE (%s::text[] IS NULL OR stock_code = ANY(%s::text[]))
+        ORDER BY stock_code, ex_date
+    """, (codes, codes), conn=conn)
+    return factors if not factors.empty else pd.DataFrame(columns=FACTOR_COLUMNS)
+
+
+def load_adjusted_prices(start_date=None, end_date=None, stock_codes=None, use_cache=True):
+    """수정주가 기준 일별 시세 조회 (load_daily_prices + 저장된 조정계수)"""
+    prices = load_daily_prices(start_date, end_date, stock_codes, use_cache=use_cache)
+    return adjust_prices(prices, load_factors(stock_codes))
+
+
+def _with_previous(prices):
+    """전체 히스토리에서 종목별 직전 종가와 거래일 연속 여부 계산"""
+    prices = prices.sort_values(['stock_code', 'trade_date'], kind='stable')
+    days = as_day_array(prices['trade_date'])
+    calendar = np.unique(days)
+    position = np.searchsorted(calendar, days)
+
+    same_stock = prices['stock_code'].astype(str).to_numpy()
+    same_stock = np.concatenate([[False], same_stock[1:] == same_stock[:-1]])
+    prev_close = np.concatenate([[np.nan], prices['close_price'].to_numpy(dtype=np.float64)[:-1]])
+    prev_position = np.concatenate([[-2], position[:-1]])
+
+    return prices.assign(
+        prev_close=np.where(same_stock, prev_close, np.nan),
+        consecutive=same_stock & (position - prev_position == 1),
+    )
+
+
+def _save(cursor, events):
+    """이벤트를 기존 이벤트와 합쳐 종목별 누적계수를 다시 계산하여 저장"""
+    codes = sorted(set(events['stock_code']))
+    existing = load_factors(codes, conn=cursor.connection)
+    if not existing.empty:
+        existing = existing.assign(ex_date=pd.to_datetime(existing['ex_date']))
+        keys = set(zip(events['stock_code'], events['ex_date']))
+        existing = existing[[key not in keys for key in zip(existing['stock_code'], existing['ex_date'])]]
+        events = pd.concat([existing.drop(columns=['valid_from', 'cum_factor']), events], ignore_index=True)
+
+    factors = build_factors(events)
+    return bulk_upsert(cursor, 'adjustment_factors', FACTOR_COLUMNS, frame_rows(factors, FACTOR_COLUMNS),
+                       conflict_columns=['stock_code', 'ex_date'],
+                       update_columns=['valid_from', 'ratio', 'cum_factor', 'prev_close',
+                                       'base_price', 'shares_ratio', 'event_type'])
+
+
+def _snapshot_shares(cursor):
+    """현재 stocks.listed_shares를 스냅샷으로 저장"""
+    cursor.execute("""
+        INSERT INTO listed_shares_snapshot (stock_code, listed_shares, updated_at)
+        SELECT stock_code, listed_shares, CURRENT_TIMESTAMP
+        FROM stocks
+        WHERE listed_shares IS NOT NULL
+        ON CONFLICT (stock_code) DO UPDATE SET
+            listed_shares = EXCLUDED.listed_shares,
+            updated_at = EXCLUDED.updated_at
+        WHERE listed_shares_snapshot.listed_shares IS DISTINCT FROM EXCLUDED.listed_shares
+    """)
+
+
+def update_adjustments(conn, trade_dates):
+    """
+    적재된 거래일의 기준가 조정 이벤트를 탐지하여 조정계수 갱신 (커밋은 호출자 담당)
+
+    상장주식수 변화는 daily_market_cap에 저장된 당일/직전 거래일 API 값을 비교하고,
+    없으면 직전 실행 때 저장한 listed_shares_snapshot과 현재 stocks 값을 비교한다.
+    """
+    from .market_cap import CREATE_DAILY_MARKET_CAP_SQL
+
+    days = [str(d) for d in np.unique(as_day_array(trade_dates))]
+    if not days:
+        return 0
+
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_ADJUSTMENT_TABLES_SQL)
+        cursor.execute(CREATE_DAILY_MARKET_CAP_SQL)
+
+        frame = read_frame("""
+            SELECT dp.stock_code, dp.trade_date, dp.close_price, dp.vs,
+                   prev.close_price AS prev_close,
+                   prev.trade_date = cal.prev_trade_date AS consecutive,
+                   COALESCE(
+                       mc.listed_shares::float8 / NULLIF(mc_prev.listed_shares, 0),
+                       s.listed_shares::float8 / NULLIF(snap.listed_shares, 0)
+                   ) AS shares_ratio
+            FROM unnest(%s::date[]) AS d(trade_date)
+            CROSS JOIN LATERAL (
+                SELECT MAX(trade_date) AS prev_trade_date FROM daily_prices WHERE trade_date < d.trade_date
+            ) cal
+            JOIN daily_prices dp ON dp.trade_date = d.trade_date
+            CROSS JOIN LATERAL (
+                SELECT p.trade_date, p.close_price
+                FROM daily_prices p
+                WHERE p.stock_code = dp.stock_code AND p.trade_date < dp.trade_date
+                ORDER BY p.trade_date DESC
+                LIMIT 1
+            ) prev
+            LEFT JOIN stocks s ON s.stock_code = dp.stock_code
+            LEFT JOIN listed_shares_snapshot snap ON snap.stock_code = dp.stock_code
+            LEFT JOIN daily_market_cap mc
+              ON mc.stock_code = dp.stock_code AND mc.trade_date = dp.trade_date AND mc.source = 'api'
+            LEFT JOIN daily_market_cap mc_prev
+              ON mc_prev.stock_code = dp.stock_code AND mc_prev.trade_date = prev.trade_date
+             AND mc_prev.source = 'api'
+        """, (days,), conn=conn)
+
+        count = 0
+        if not frame.empty:
+            frame['consecutive'] = frame['consecutive'].fillna(False).astype(bool)
+            events = detect_corporate_actions(frame)
+            if not events.empty:
+                count = _save(cursor, events)
+                for event in events.itertuples():
+                    logger.info(f"  🔀 기준가 조정 {event.stock_code} {event.ex_date.date()}: "
+                                f"{event.prev_close:,} → {event.base_price:,} ({event.event_type})")
+
+        _snapshot_shares(cursor)
+
+    return count
+
+
+def rebuild_adjustments(conn):
+    """전체 히스토리에서 조정계수 재계산 (초기 적재용, 커밋은 호출자 담당)"""
+    prices = load_daily_prices()
+    if prices.empty:
+        return 0
+
+    events = detect_corporate_actions(_with_previous(prices))
+    factors = build_factors(events)
+
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_ADJUSTMENT_TABLES_SQL)
+        cursor.execute("DELETE FROM adjustment_factors")
+        count = bulk_upsert(cursor, 'adjustment_factors', FACTOR_COLUMNS, frame_rows(factors, FACTOR_COLUMNS),
+                            conflict_columns=['stock_code', 'ex_date'])
+        _snapshot_shares(cursor)
+
+    logger.info(f"🔀 조정계수 재계산 완료: {events['stock_code'].nunique():,}개 종목 {count:,}건")
+    return count
@@ -0,0 +1,314 @@
+"""벡터화 백테스트 모듈
+
+거래일 × 종목 가격 패널 위에서 신호 생성, 비중 결정, 손익 계산을 배열 연산으로 처리한다.
+
+- 체결: t일 종가 기준 신호 → t+1일 종가에 목표 비중으로 체결
+- 가격제한폭: 종가가 상한가(전일 대비 +30%)면 매수, 하한가(-30%)면 매도 불가
+  (거래정지 등 시세가 없는 날은 매매 불가)
+- 비용: 매수/매도 수수료 + 슬리피지, 매도 시 거래세
+- 파라미터 스윕: 가격 패널을 공유 메모리에 한 번만 올리고 프로세스 풀 워커가 복사 없이 참조
+"""
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from common.frames import as_day_array, load_stocks
+from common.logger import get_logger
+
+from .adjustments import load_adjusted_prices
+
+logger = get_logger(__name__)
+
+TRADING_DAYS_PER_YEAR = 250
+
+# 가격제한폭 (2015-06-15 이후 ±30%), 호가 단위 반올림 여유
+PRICE_LIMIT = 0.30
+PRICE_LIMIT_TOLERANCE = 0.005
+
+DEFAULT_COSTS = {
+    'commission': 0.00015,  # 매수/매도 수수료
+    'slippage': 0.0005,     # 매수/매도 슬리피지
+    'sell_tax': 0.0018,     # 매도 거래세
+}
+
+
+def build_panel(prices):
+    """
+    일별 시세(수정주가 권장) → 가격 패널
+
+    Returns:
+        dict: close/volume [거래일 × 종목] float64 배열 (시세 없는 날 NaN),
+            calendar(거래일), codes(종목코드)
+    """
+    prices = prices[prices['close_price'] > 0]
+    codes, columns = np.unique(prices['stock_code'].astype(str).to_numpy(), return_inverse=True)
+    calendar, rows = np.unique(as_day_array(prices['trade_date']), return_inverse=True)
+
+    panel = {'calendar': calendar, 'codes': codes}
+    for name, column in (('close', 'close_price'), ('volume', 'volume')):
+        matrix = np.full((len(calendar), len(codes)), np.nan)
+        matrix[rows, columns] = prices[column].to_numpy(dtype=np.float64)
+        panel[name] = matrix
+    return panel
+
+
+def load_panel(start_date=None, end_date=None, stock_codes=None, market_types=None):
+    """수정주가 기준 가격 패널 로드 (종목 미지정 시 market_types 또는 전체 주식)"""
+    if not stock_codes:
+        stocks = load_stocks(market_types)
+        stocks = stocks[stocks['asset_type'] != 'ETF']
+        stock_codes = stocks['stock_code'].astype(str).tolist()
+
+    panel = build_panel(load_adjusted_prices(start_date, end_date, stock_codes))
+    logger.info(f"🧪 백테스트 패널: {len(panel['codes']):,}개 종목 × {len(panel['calendar']):,}거래일")
+    return panel
+
+
+def _ffill(matrix):
+    """시간축 방향 직전 값 채우기"""
+    filled = matrix.copy()
+    for t in range(1, len(filled)):
+        missing = np.isnan(filled[t])
+        filled[t, missing] = filled[t - 1, missing]
+    return filled
+
+
+def _rolling_mean(matrix, window):
+    """시간축 이동평균 (구간 내 결측이 있으면 NaN)"""
+    valid = np.isfinite(matrix)
+    total = np.cumsum(np.where(valid, matrix, 0.0), axis=0)
+    count = np.cumsum(valid, axis=0)
+    total = np.vstack([np.zeros((1, matrix.shape[1])), total])
+    count = np.vstack([np.zeros((1, matrix.shape[1])), count])
+
+    mean = np.full(matrix.shape, np.nan)
+    if window <= len(matrix):
+        full = (count[window:] - count[:-window]) == window
+        mean[window - 1:] = np.where(full, (total[window:] - total[:-window]) / window, np.nan)
+    return mean
+
+
+def top_n_weights(score, n):
+    """
+    거래일마다 점수 상위 n개 종목 동일 비중
+
+    Args:
+        score: [거래일 × 종목] 점수 (NaN/음의 무한대는 제외)
+        n: 최대 보유 종목 수
+    """
+    score = np.where(np.isfinite(score), score, -np.inf)
+    order = np.argsort(-score, axis=1, kind='stable')
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(score.shape[1])[None, :], axis=1)
+
+    selected = (ranks < n) & np.isfinite(score)
+    counts = selected.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(selected, 1.0 / counts, 0.0)
+
+
+def _hold_between_rebalances(weights, rebalance):
+    """rebalance 거래일마다 계산한 비중을 다음 리밸런싱까지 유지"""
+    if rebalance <= 1:
+        return weights
+    index = (np.arange(len(weights)) // rebalance) * rebalance
+    return weights[index]
+
+
+# ----------------------------------------------------------------------
+# 전략 (패널과 파라미터 → 목표 비중 [거래일 × 종목])
+# ----------------------------------------------------------------------
+def sma_cross_strategy(panel, fast=20, slow=60, max_positions=20, rebalance=1):
+    """단기 이동평균이 장기 이동평균 위에 있는 종목 중 괴리율 상위 종목 보유"""
+    close = panel['close']
+    ratio = _rolling_mean(close, fast) / _rolling_mean(close, slow)
+    score = np.where(ratio > 1, ratio, np.nan)
+    return _hold_between_rebalances(top_n_weights(score, max_positions), rebalance)
+
+
+def momentum_strategy(panel, lookback=120, skip=20, max_positions=20, rebalance=20, min_value=0):
+    """(lookback ~ skip) 거래일 수익률 상위 종목 보유 (최근 skip일 단기 반전 제외)"""
+    close = _ffill(panel['close'])
+    past = np.full(close.shape, np.nan)
+    recent = np.full(close.shape, np.nan)
+    past[lookback:] = close[:-lookback]
+    recent[skip:] = close[:len(close) - skip]
+    score = recent / past - 1
+    # 당일 시세가 없는 종목(거래정지/상장폐지)은 채운 종가의 오래된 점수로 선택되지 않도록 제외
+    score = np.where(np.isnan(panel['close']), np.nan, score)
+
+    if min_value:
+        # 최근 20일 평균 거래대금 하한 (유동성 필터)
+        value = _rolling_mean(np.nan_to_num(panel['close'] * panel['volume']), 20)
+        score = np.where(value >= min_value, score, np.nan)
+    return _hold_between_rebalances(top_n_weights(score, max_positions), rebalance)
+
+
+STRATEGIES = {
+    'sma_cross': sma_cross_strategy,
+    'momentum': momentum_strategy,
+}
+
+
+# ----------------------------------------------------------------------
+# 체결/손익
+# ----------------------------------------------------------------------
+def simulate(panel, targets, commission=DEFAULT_COSTS['commission'], slippage=DEFAULT_COSTS['slippage'],
+             sell_tax=DEFAULT_COSTS['sell_tax'], price_limit=PRICE_LIMIT):
+    """
+    목표 비중 → 일별 순수익률
+
+    t일 목표 비중은 t+1일 종가에 체결한다. 보유 비중은 매일 수익률만큼 변하고(drift),
+    체결 불가 종목(상한가 매수, 하한가 매도, 시세 없음)은 직전 비중을 유지한다.
+
+    Returns:
+        dict: returns(일별 순수익률), turnover(일별 매매 비중), costs(일별 비용),
+            exposure(일별 주식 비중 합)
+    """
+    close = panel['close']
+    previous = _ffill(close)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = np.vstack([np.full((1, close.shape[1]), np.nan), close[1:] / previous[:-1]])
+
+    tradable = np.isfinite(close)
+    daily_return = np.where(np.isfinite(change), change - 1, 0.0)
+    limit_up = change >= 1 + price_limit - PRICE_LIMIT_TOLERANCE
+    limit_down = change <= 1 - price_limit + PRICE_LIMIT_TOLERANCE
+    targets = np.nan_to_num(targets)
+
+    buy_cost = commission + slippage
+    sell_cost = commission + slippage + sell_tax
+
+    size = len(close)
+    net = np.zeros(size)
+    turnover = np.zeros(size)
+    costs = np.zeros(size)
+    exposure = np.zeros(size)
+    weights = np.zeros(close.shape[1])
+
+    for t in range(1, size):
+        gross = weights @ daily_return[t]
+        if 1 + gross > 0:
+            weights = weights * (1 + daily_return[t]) / (1 + gross)
+
+        delta = targets[t - 1] - weights
+        blocked = ~tradable[t] | ((delta > 0) & limit_up[t]) | ((delta < 0) & limit_down[t])
+        delta[blocked] = 0.0
+
+        bought = delta[delta > 0].sum()
+        sold = -delta[delta < 0].sum()
+        costs[t] = bought * buy_cost + sold * sell_cost
+        turnover[t] = bought + sold
+        weights = weights + delta
+
+        net[t] = gross - costs[t]
+        exposure[t] = weights.sum()
+
+    return {'returns': net, 'turnover': turnover, 'costs': costs, 'exposure': exposure}
+
+
+def performance(returns, periods=TRADING_DAYS_PER_YEAR):
+    """일별 수익률 → 성과 지표 (누적/연환산 수익률, 변동성, 샤프, 최대낙폭)"""
+    returns = np.asarray(returns, dtype=np.float64)
+    equity = np.cumprod(1 + returns)
+    years = max(len(returns) / periods, 1e-9)
+    volatility = returns.std(ddof=1) * np.sqrt(periods) if len(returns) > 1 else 0.0
+    drawdown = equity / np.maximum.accumulate(equity) - 1 if len(equity) else np.zeros(1)
+
+    return {
+        'total_return': float(equity[-1] - 1) if len(equity) else 0.0,
+        'cagr': float(equity[-1] ** (1 / years) - 1) if len(equity) and equity[-1] > 0 else -1.0,
+        'volatility': float(volatility),
+        'sharpe': float(returns.mean() * periods / volatility) if volatility > 0 else 0.0,
+        'max_drawdown': float(drawdown.min()),
+        'hit_rate': float((returns > 0).mean()) if len(returns) else 0.0,
+    }
+
+
+def run_backtest(panel, strategy, costs=None, **params):
+    """
+    전략 하나 실행
+
+    Args:
+        panel: build_panel 결과
+        strategy: STRATEGIES 키 또는 전략 함수
+        costs: 비용 설정 (DEFAULT_COSTS 형식, None이면 기본값)
+        **params: 전략 파라미터
+
+    Returns:
+        dict: simulate 결과 + performance 지표(stats)
+    """
+    strategy_fn = STRATEGIES[strategy] if isinstance(strategy, str) else strategy
+    result = simulate(panel, strategy_fn(panel, **params), **{**DEFAULT_COSTS, **(costs or {})})
+    result['stats'] = performance(result['returns'][1:])
+    result['stats']['avg_turnover'] = float(result['turnover'][1:].mean()) if len(panel['close']) > 1 else 0.0
+    return result
+
+
+# ----------------------------------------------------------------------
+# 파라미터 스윕 (공유 메모리 + 프로세스 풀)
+# ----------------------------------------------------------------------
+_SHARED_ARRAYS = ('close', 'volume')
+_worker_panel = None
+_worker_segments = []
+
+
+def _share_panel(panel):
+    """패널 배열을 공유 메모리에 복사 (프로세스당 복사 없이 참조하기 위함)"""
+    segments, spec = [], {}
+    for name in _SHARED_ARRAYS:
+        array = np.ascontiguousarray(panel[name])
+        segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+        segments.append(segment)
+        spec[name] = (segment.name, array.shape, array.dtype.str)
+    return segments, spec
+
+
+def _attach_panel(spec):
+    """워커 초기화: 공유 메모리 배열을 numpy 뷰로 연결"""
+    global _worker_panel, _worker_segments
+    _worker_panel, _worker_segments = {}, []
+    for name, (segment_name, shape, dtype) in spec.items():
+        segment = shared_memory.SharedMemory(name=segment_name)
+        _worker_segments.append(segment)
+        _worker_panel[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
+
+
+def _run_worker(task):
+    strategy, params, costs = task
+    stats = run_backtest(_worker_panel, strategy, costs, **params)['stats']
+    return {**params, **stats}
+
+
+def run_sweep(panel, strategy, grid, costs=None, processes=None):
+    """
+    파라미터 그리드 전체 백테스트
+
+    Args:
+        panel: build_panel 결과
+        strategy: STRATEGIES 키 (워커에서 이름으로 찾음)
+        grid: {파라미터: [값, ...]} (모든 조합 실행)
+        costs: 비용 설정
+        processes: 워커 수 (None이면 CPU 수)
+
+    Returns:
+        pandas.DataFrame: 조합별 파라미터와 성과 지표 (샤프 내림차순)
+    """
+    names = list(grid)
+    tasks = [(strategy, dict(zip(names, values)), costs) for values in itertools.product(*grid.values())]
+
+    segments, spec = _share_panel(panel)
+    try:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_attach_panel, initargs=(spec,)) as pool:
+            results = list(pool.map(_run_worker, tasks))
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+
+    logger.info(f"🧪 {strategy} 파라미터 {len(tasks)}개 조합 백테스트 완료")
+    return pd.DataFrame(results).sort_values('sharpe', ascending=False, ignore_index=True)
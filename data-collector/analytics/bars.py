@@ -0,0 +1,189 @@
+"""주봉/월봉 사전 집계 모듈
+
+daily_prices를 주 단위(월요일 시작)와 월 단위로 집계하여
+weekly_bars, monthly_bars 테이블에 저장한다.
+수집기가 거래일을 적재하면 그 거래일이 속한 구간(bucket)만 다시 계산한다.
+"""
+import numpy as np
+
+from common.database import bulk_upsert
+from common.frames import as_day_array, frame_rows, load_daily_prices, read_frame
+from common.logger import get_logger
+
+logger = get_logger(__name__)
+
+BAR_TABLES = {
+    'weekly': 'weekly_bars',
+    'monthly': 'monthly_bars',
+}
+
+BAR_COLUMNS = [
+    'stock_code', 'period_start', 'period_end',
+    'open_price', 'high_price', 'low_price', 'close_price',
+    'volume', 'trading_value', 'trading_days'
+]
+
+CREATE_BAR_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        stock_code VARCHAR(10) NOT NULL,
+        period_start DATE NOT NULL,
+        period_end DATE NOT NULL,
+        open_price INTEGER,
+        high_price INTEGER,
+        low_price INTEGER,
+        close_price INTEGER,
+        volume BIGINT,
+        trading_value BIGINT,
+        trading_days SMALLINT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (stock_code, period_start)
+    );
+    CREATE INDEX IF NOT EXISTS idx_{table}_period_start ON {table}(period_start DESC);
+"""
+
+
+def ensure_bar_tables(cursor):
+    """주봉/월봉 테이블 생성 (없을 때만)"""
+    for table in BAR_TABLES.values():
+        cursor.execute(CREATE_BAR_TABLE_SQL.format(table=table))
+
+
+def period_start(trade_dates, interval):
+    """거래일이 속한 구간의 시작일 (주봉: 월요일, 월봉: 1일)"""
+    days = as_day_array(trade_dates)
+    if interval == 'weekly':
+        # datetime64[W]는 1970-01-01(목요일) 기준이므로 3일 밀어서 월요일 시작으로 맞춤
+        return (days + 3).astype('datetime64[W]').astype('datetime64[D]') - 3
+    if interval == 'monthly':
+        return days.astype('datetime64[M]').astype('datetime64[D]')
+    raise ValueError(f"지원하지 않는 봉 주기: {interval}")
+
+
+def period_end_exclusive(starts, interval):
+    """구간 시작일 배열에 대한 다음 구간 시작일"""
+    if interval == 'weekly':
+        return starts + 7
+    return (starts.astype('datetime64[M]') + 1).astype('datetime64[D]')
+
+
+def aggregate_bars(prices, interval):
+    """
+    일별 시세를 주봉/월봉으로 집계 (벡터화 group-by)
+
+    시가/고가/저가가 0인 날(거래 없음)은 집계에서 제외하고,
+    구간 내 유효한 값이 없으면 종가로 채운다.
+
+    Args:
+        prices: stock_code, trade_date, OHLC, volume, trading_value 컬럼을 가진 DataFrame
+        interval: 'weekly' 또는 'monthly'
+
+    Returns:
+        pandas.DataFrame: BAR_COLUMNS 컬럼의 봉 데이터
+    """
+    df = prices[['stock_code', 'trade_date', 'open_price', 'high_price', 'low_price',
+                 'close_price', 'volume', 'trading_value']].copy()
+    df['stock_code'] = df['stock_code'].astype(str)
+    df['trade_date'] = as_day_array(df['trade_date'])
+    df['period_start'] = period_start(df['trade_date'], interval)
+
+    for name in ('open_price', 'high_price', 'low_price'):
+        df[name] = df[name].astype('float64').where(df[name] > 0)
+    for name in ('close_price', 'volume', 'trading_value'):
+        df[name] = df[name].astype('float64')
+
+    df.sort_values(['stock_code', 'trade_date'], inplace=True, kind='stable')
+    bars = df.groupby(['stock_code', 'period_start'], sort=False).agg(
+        period_end=('trade_date', 'max'),
+        open_price=('open_price', 'first'),
+        high_price=('high_price', 'max'),
+        low_price=('low_price', 'min'),
+        close_price=('close_price', 'last'),
+        volume=('volume', 'sum'),
+        trading_value=('trading_value', 'sum'),
+        trading_days=('trade_date', 'size'),
+    ).reset_index()
+
+    for name in ('open_price', 'high_price', 'low_price'):
+        bars[name] = bars[name].fillna(bars['close_price'])
+    for name in ('open_price', 'high_price', 'low_price', 'close_price', 'volume', 'trading_value'):
+        bars[name] = bars[name].round().astype('int64')
+
+    return bars[BAR_COLUMNS]
+
+
+def _write_bars(cursor, bars, interval):
+    return bulk_upsert(
+        cursor,
+        BAR_TABLES[interval],
+        BAR_COLUMNS,
+        frame_rows(bars, BAR_COLUMNS),
+        conflict_columns=['stock_code', 'period_start']
+    )
+
+
+def update_bars(conn, trade_dates, intervals=('weekly', 'monthly')):
+    """
+    새로 적재된 거래일이 속한 주봉/월봉만 다시 계산하여 저장 (커밋은 호출자 담당)
+
+    Args:
+        conn: 데이터베이스 연결
+        trade_dates: 적재된 거래일 목록 (date 또는 'YYYY-MM-DD')
+        intervals: 갱신할 봉 주기
+
+    Returns:
+        dict: 주기별 저장 건수
+    """
+    counts = {}
+    with conn.cursor() as cursor:
+        ensure_bar_tables(cursor)
+
+        for interval in intervals:
+            starts = np.unique(period_start(trade_dates, interval))
+            ends = period_end_exclusive(starts, interval)
+
+            prices = read_frame("""
+                SELECT dp.stock_code, dp.trade_date, dp.open_price, dp.high_price,
+                       dp.low_price, dp.close_price, dp.volume, dp.trading_value
+                FROM unnest(%s::date[], %s::date[]) AS p(period_start, period_end)
+                JOIN daily_prices dp
+                  ON dp.trade_date >= p.period_start AND dp.trade_date < p.period_end
+            """, ([str(d) for d in starts], [str(d) for d in ends]), conn=conn)
+
+            if prices.empty:
+                counts[interval] = 0
+                continue
+
+            bars = aggregate_bars(prices, interval)
+            counts[interval] = _write_bars(cursor, bars, interval)
+            logger.info(f"  📊 {BAR_TABLES[interval]} {len(starts)}개 구간 갱신 ({counts[interval]:,}건)")
+
+    return counts
+
+
+def rebuild_bars(conn, start_date=None, end_date=None, intervals=('weekly', 'monthly')):
+    """
+    주봉/월봉 전체 재계산 (초기 적재용, 커밋은 호출자 담당)
+
+    구간 경계가 잘리지 않도록 조회 기간을 구간 시작/끝으로 확장한다.
+    """
+    counts = {}
+    with conn.cursor() as cursor:
+        ensure_bar_tables(cursor)
+
+        for interval in intervals:
+            lo = period_start(start_date, interval)[0] if start_date else None
+            hi = period_end_exclusive(period_start(end_date, interval), interval)[0] - 1 if end_date else None
+
+            prices = load_daily_prices(
+                str(lo) if lo is not None else None,
+                str(hi) if hi is not None else None
+            )
+            if prices.empty:
+                counts[interval] = 0
+                continue
+
+            bars = aggregate_bars(prices, interval)
+            counts[interval] = _write_bars(cursor, bars, interval)
+            logger.info(f"📊 {BAR_TABLES[interval]} 재계산 완료: {counts[interval]:,}건")
+
+    return counts
@@ -0,0 +1,240 @@
+"""상관/공분산 행렬 계산 모듈
+
+저장된 시세(수정주가)로 거래일 × 종목 수익률 행렬을 만들고,
+종목 쌍마다 둘 다 시세가 있는 거래일만 사용하는(pairwise-complete) 상관/공분산 행렬을 계산한다.
+
+결측 마스크 M과 0으로 채운 수익률 X에 대해
+n = MᵀM, Σx = XᵀM, Σy = MᵀX, Σx² = (X²)ᵀM, Σy² = Mᵀ(X²), Σxy = XᵀX
+를 종목 블록(tile) 단위 행렬곱으로 구하므로 메모리는 블록 크기로 제한되고,
+대칭이므로 위쪽 삼각 블록만 계산한다. 결과는 (구간, 종목 집합, 워터마크) 단위로 디스크에 캐시한다.
+"""
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from common.config import CACHE_DIR
+from common.database import get_db_cursor
+from common.frames import as_day_array, get_watermark, load_stocks
+from common.logger import get_logger
+
+from .adjustments import load_adjusted_prices
+
+logger = get_logger(__name__)
+
+CORRELATION_CACHE_DIR = os.path.join(CACHE_DIR, 'correlation')
+
+# 종목 블록 크기 (블록당 작업 메모리 ≈ 6 × TILE² × 8바이트)
+TILE = 512
+
+
+def return_matrix(prices, min_observations=2):
+    """
+    일별 시세 → 거래일 × 종목 로그수익률 행렬
+
+    Args:
+        prices: stock_code, trade_date, close_price 컬럼을 가진 DataFrame (수정주가 권장)
+        min_observations: 종목별 최소 수익률 관측 수 (미달 종목 제외)
+
+    Returns:
+        tuple: (수익률 행렬 float64 [거래일 × 종목], 거래일 배열, 종목코드 배열)
+            결측은 NaN, 첫 거래일 행은 제외
+    """
+    prices = prices[prices['close_price'] > 0]
+    codes, columns = np.unique(prices['stock_code'].astype(str).to_numpy(), return_inverse=True)
+    days = as_day_array(prices['trade_date'])
+    calendar, rows = np.unique(days, return_inverse=True)
+
+    close = np.full((len(calendar), len(codes)), np.nan)
+    close[rows, columns] = prices['close_price'].to_numpy(dtype=np.float64)
+
+    # 직전 시세 대비 수익률 (거래정지 후 첫날은 정지 기간 전체 수익률)
+    last_close = close.copy()
+    for i in range(1, len(calendar)):
+        missing = np.isnan(last_close[i])
+        last_close[i, missing] = last_close[i - 1, missing]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.log(close[1:] / last_close[:-1])
+
+    keep = np.isfinite(returns).sum(axis=0) >= min_observations
+    return returns[:, keep], calendar[1:], codes[keep]
+
+
+def pairwise_moments(returns, min_periods=20, tile=TILE):
+    """
+    결측을 허용하는 상관/공분산 행렬 (블록 행렬곱)
+
+    Args:
+        returns: 거래일 × 종목 수익률 행렬 (결측 NaN)
+        min_periods: 쌍별 최소 공통 관측 수 (미달이면 NaN)
+        tile: 종목 블록 크기
+
+    Returns:
+        tuple: (상관 행렬 float32, 공분산 행렬 float32, 공통 관측 수 int32)
+    """
+    mask = np.isfinite(returns)
+    x = np.where(mask, returns, 0.0)
+    m = mask.astype(np.float64)
+    x2 = x * x
+
+    size = returns.shape[1]
+    corr = np.full((size, size), np.nan, dtype=np.float32)
+    cov = np.full((size, size), np.nan, dtype=np.float32)
+    counts = np.zeros((size, size), dtype=np.int32)
+
+    for i in range(0, size, tile):
+        bi = slice(i, min(i + tile, size))
+        for j in range(i, size, tile):
+            bj = slice(j, min(j + tile, size))
+
+            n = m[:, bi].T @ m[:, bj]
+            sx = x[:, bi].T @ m[:, bj]
+            sy = m[:, bi].T @ x[:, bj]
+            sxx = x2[:, bi].T @ m[:, bj]
+            syy = m[:, bi].T @ x2[:, bj]
+            sxy = x[:, bi].T @ x[:, bj]
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                block_cov = (sxy - sx * sy / n) / (n - 1)
+                var_x = (sxx - sx * sx / n) / (n - 1)
+                var_y = (syy - sy * sy / n) / (n - 1)
+                block_corr = np.clip(block_cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+
+            enough = n >= min_periods
+            block_cov = np.where(enough, block_cov, np.nan)
+            block_corr = np.where(enough, block_corr, np.nan)
+
+            cov[bi, bj] = block_cov
+            corr[bi, bj] = block_corr
+            counts[bi, bj] = n
+            if i != j:
+                cov[bj, bi] = block_cov.T
+                corr[bj, bi] = block_corr.T
+                counts[bj, bi] = n.T
+
+    return corr, cov, counts
+
+
+def rolling_correlation(returns, window, min_periods=None):
+    """
+    소수 종목의 이동 상관 행렬 시계열 (누적합 차분, 종목 비교용)
+
+    Args:
+        returns: 거래일 × k 수익률 행렬 (결측 NaN)
+        window: 이동 구간 거래일 수
+        min_periods: 최소 공통 관측 수 (기본 window의 절반)
+
+    Returns:
+        numpy.ndarray: [거래일, k, k] 상관 행렬 (구간이 부족하면 NaN)
+    """
+    min_periods = min_periods or max(window // 2, 2)
+    mask = np.isfinite(returns)
+    x = np.where(mask, returns, 0.0)
+    m = mask.astype(np.float64)
+
+    def windowed(a, b):
+        total = np.cumsum(np.einsum('ti,tj->tij', a, b), axis=0)
+        total = np.concatenate([np.zeros((1,) + total.shape[1:]), total])
+        return total[window:] - total[:-window]
+
+    n = windowed(m, m)
+    sx = windowed(x, m)
+    sy = windowed(m, x)
+    sxx = windowed(x * x, m)
+    syy = windowed(m, x * x)
+    sxy = windowed(x, x)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sxy - sx * sy / n
+        corr = cov / np.sqrt((sxx - sx * sx / n) * (syy - sy * sy / n))
+    corr = np.where(n >= min_periods, np.clip(corr, -1.0, 1.0), np.nan)
+
+    head = np.full((min(window - 1, len(returns)),) + corr.shape[1:], np.nan)
+    return np.concatenate([head, corr])[:len(returns)]
+
+
+def _cache_file(params, watermark):
+    payload = json.dumps(params, sort_keys=True, default=str)
+    key = f"corr_{hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]}"
+    return key, os.path.join(CORRELATION_CACHE_DIR, f"{key}_{watermark}.npz")
+
+
+def correlation_matrix(window=250, end_date=None, stock_codes=None, market_types=None,
+                       min_coverage=0.8, use_cache=True):
+    """
+    종목 집합의 상관/공분산 행렬 (구간 × 워터마크 단위 캐시)
+
+    Args:
+        window: 사용할 최근 거래일 수 (None이면 전체 히스토리)
+        end_date: 구간 마지막 거래일 (None이면 최근 거래일)
+        stock_codes: 종목코드 목록 (None이면 market_types 또는 전체 주식)
+        market_types: 시장구분 목록 (예: ['KOSPI'])
+        min_coverage: 구간 내 최소 관측 비율 (미달 종목 제외)
+        use_cache: 디스크 캐시 사용 여부
+
+    Returns:
+        dict: codes, start_date, end_date, corr, cov, counts
+    """
+    params = {
+        'window': window, 'end_date': end_date, 'min_coverage': min_coverage,
+        'stock_codes': sorted(set(stock_codes)) if stock_codes else None,
+        'market_types': sorted(set(market_types)) if market_types else None,
+    }
+    with get_db_cursor(commit=False) as cursor:
+        watermark = get_watermark(cursor)
+    key, path = _cache_file(params, watermark)
+
+    if use_cache and os.path.exists(path):
+        with np.load(path, allow_pickle=False) as cached:
+            logger.debug(f"상관 행렬 캐시 적중: {key}")
+            return {name: cached[name] for name in cached.files}
+
+    if not stock_codes:
+        stocks = load_stocks(market_types)
+        stocks = stocks[stocks['asset_type'] != 'ETF']
+        stock_codes = stocks['stock_code'].astype(str).tolist()
+
+    prices = load_adjusted_prices(end_date=end_date, stock_codes=stock_codes)
+    returns, calendar, codes = return_matrix(prices)
+    if window:
+        returns, calendar = returns[-window:], calendar[-window:]
+
+    coverage = np.isfinite(returns).mean(axis=0) if len(returns) else np.zeros(len(codes))
+    keep = coverage >= min_coverage
+    returns, codes = returns[:, keep], codes[keep]
+
+    corr, cov, counts = pairwise_moments(returns, min_periods=max(int(len(calendar) * min_coverage * 0.5), 2))
+    result = {
+        'codes': codes.astype(str),
+        'start_date': calendar[:1],
+        'end_date': calendar[-1:],
+        'corr': corr,
+        'cov': cov,
+        'counts': counts,
+    }
+    logger.info(f"📐 상관 행렬 계산: {len(codes):,}개 종목 × {len(calendar):,}거래일")
+
+    if use_cache:
+        os.makedirs(CORRELATION_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **result)
+        os.replace(tmp_path, path)
+        for stale in glob.glob(os.path.join(CORRELATION_CACHE_DIR, f"{key}_*.npz")):
+            if stale != path:
+                os.remove(stale)
+
+    return result
+
+
+def top_correlated(result, stock_code, n=10):
+    """상관 행렬 결과에서 특정 종목과 상관이 높은 종목 n개 [(종목코드, 상관계수), ...]"""
+    codes = result['codes']
+    index = np.flatnonzero(codes == stock_code)
+    if not len(index):
+        return []
+    row = result['corr'][index[0]].astype(np.float64)
+    row[index[0]] = np.nan
+    order = np.argsort(np.where(np.isnan(row), -np.inf, row))[::-1][:n]
+    return [(str(codes[i]), float(row[i])) for i in order if np.isfinite(row[i])]
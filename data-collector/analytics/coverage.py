@@ -0,0 +1,275 @@
+"""종목×거래일 커버리지 비트맵 인덱스 모듈
+
+종목마다 거래일 캘린더 길이의 비트맵(1 = 해당 거래일 시세 있음)을 유지한다.
+"어떤 종목이 어떤 날 누락됐나", "종목별 첫/마지막 거래일", "X일에 거래된 종목 수" 같은
+커버리지 질의를 daily_prices 집계 대신 비트 연산으로 처리한다.
+
+- 저장: cache/coverage.npz (캘린더, 종목코드, packbits 비트맵)
+- 요약: stock_coverage 테이블 (종목별 첫/마지막 거래일, 거래일 수, 누락일 수) - 백엔드 조회용
+"""
+import os
+
+import numpy as np
+
+from common.config import CACHE_DIR
+from common.database import bulk_upsert, stream_query_chunks
+from common.frames import as_day_array, frame_rows
+from common.logger import get_logger
+
+logger = get_logger(__name__)
+
+COVERAGE_PATH = os.path.join(CACHE_DIR, 'coverage.npz')
+
+CREATE_STOCK_COVERAGE_SQL = """
+    CREATE TABLE IF NOT EXISTS stock_coverage (
+        stock_code VARCHAR(10) PRIMARY KEY,
+        first_date DATE,
+        last_date DATE,
+        trading_days INTEGER,
+        missing_days INTEGER,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# 바이트별 켜진 비트 수 / 가장 낮은·높은 켜진 비트 위치 (bitorder='little')
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.int64)
+_LOWEST_BIT = np.array([(i & -i).bit_length() - 1 if i else -1 for i in range(256)], dtype=np.int64)
+_HIGHEST_BIT = np.array([i.bit_length() - 1 for i in range(256)], dtype=np.int64)
+
+
+class CoverageIndex:
+    """종목×거래일 비트맵 (행: 종목, 열: 거래일 캘린더)"""
+
+    def __init__(self, calendar=None, codes=None, bits=None):
+        self.calendar = as_day_array(calendar) if calendar is not None and len(calendar) else \
+            np.array([], dtype='datetime64[D]')
+        self.codes = [str(code) for code in codes] if codes is not None else []
+        self._rows = {code: i for i, code in enumerate(self.codes)}
+        if bits is None:
+            bits = np.zeros((len(self.codes), (len(self.calendar) + 7) // 8), dtype=np.uint8)
+        self.bits = bits
+
+    # ------------------------------------------------------------------
+    # 생성/저장
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_pairs(cls, stock_codes, trade_dates):
+        """(종목코드, 거래일) 쌍 배열로 비트맵 생성"""
+        stock_codes = np.asarray(stock_codes).astype(str)
+        days = as_day_array(trade_dates)
+
+        codes, rows = np.unique(stock_codes, return_inverse=True)
+        calendar, cols = np.unique(days, return_inverse=True)
+
+        matrix = np.zeros((len(codes), len(calendar)), dtype=bool)
+        matrix[rows, cols] = True
+        return cls(calendar, codes, np.packbits(matrix, axis=1, bitorder='little'))
+
+    @classmethod
+    def build(cls, conn=None):
+        """daily_prices 전체를 스트리밍으로 읽어 비트맵 생성"""
+        code_chunks, date_chunks = [], []
+        for chunk in stream_query_chunks(
+            "SELECT stock_code, trade_date FROM daily_prices",
+            chunk_size=200000, columnar=True, conn=conn
+        ):
+            code_chunks.append(np.asarray(chunk['stock_code']))
+            date_chunks.append(as_day_array(chunk['trade_date']))
+
+        if not code_chunks:
+            return cls()
+        return cls.from_pairs(np.concatenate(code_chunks), np.concatenate(date_chunks))
+
+    @classmethod
+    def load(cls, path=COVERAGE_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['calendar'], data['codes'], data['bits'])
+
+    @classmethod
+    def load_or_build(cls, path=COVERAGE_PATH, conn=None):
+        """디스크의 비트맵을 읽고, 없으면 DB에서 생성 후 저장"""
+        if os.path.exists(path):
+            try:
+                return cls.load(path)
+            except Exception as e:
+                logger.warning(f"커버리지 비트맵 읽기 실패, 재생성합니다: {e}")
+
+        index = cls.build(conn=conn)
+        index.save(path)
+        logger.info(f"커버리지 비트맵 생성: {len(index.codes):,}개 종목 × {len(index.calendar):,}거래일")
+        return index
+
+    def save(self, path=COVERAGE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, calendar=self.calendar, codes=np.array(self.codes, dtype=str), bits=self.bits)
+        os.replace(tmp_path, path)
+
+    # ------------------------------------------------------------------
+    # 갱신
+    # ------------------------------------------------------------------
+    def _unpacked(self):
+        return np.unpackbits(self.bits, axis=1, count=len(self.calendar), bitorder='little').astype(bool)
+
+    def _add_codes(self, codes):
+        new_codes = [code for code in dict.fromkeys(codes) if code not in self._rows]
+        if not new_codes:
+            return
+        for code in new_codes:
+            self._rows[code] = len(self.codes)
+            self.codes.append(code)
+        padding = np.zeros((len(new_codes), self.bits.shape[1]), dtype=np.uint8)
+        self.bits = np.vstack([self.bits, padding])
+
+    def _day_column(self, trade_date):
+        """거래일의 열 위치 (캘린더에 없으면 추가)"""
+        day = as_day_array(trade_date)[0]
+        col = int(np.searchsorted(self.calendar, day))
+        if col < len(self.calendar) and self.calendar[col] == day:
+            return col
+
+        if col == len(self.calendar):
+            # 마지막 거래일 뒤에 추가 (일반적인 일일 수집): 필요할 때만 바이트 열 확장
+            self.calendar = np.append(self.calendar, day)
+            if self.bits.shape[1] * 8 < len(self.calendar):
+                self.bits = np.hstack([self.bits, np.zeros((len(self.codes), 1), dtype=np.uint8)])
+        else:
+            # 과거 거래일 재수집: 열 삽입 후 다시 압축
+            matrix = np.insert(self._unpacked(), col, False, axis=1)
+            self.calendar = np.insert(self.calendar, col, day)
+            self.bits = np.packbits(matrix, axis=1, bitorder='little')
+        return col
+
+    def set_day(self, trade_date, stock_codes):
+        """거래일의 시세 보유 종목을 설정 (같은 날을 다시 적재해도 결과 동일)"""
+        stock_codes = [str(code) for code in stock_codes]
+        self._add_codes(stock_codes)
+        col = self._day_column(trade_date)
+
+        byte, mask = col >> 3, np.uint8(1 << (col & 7))
+        self.bits[:, byte] &= ~mask
+        rows = [self._rows[code] for code in stock_codes]
+        self.bits[rows, byte] |= mask
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    def _column_range(self, start_date=None, end_date=None):
+        lo = 0 if start_date is None else int(np.searchsorted(self.calendar, as_day_array(start_date)[0], 'left'))
+        hi = len(self.calendar) if end_date is None else \
+            int(np.searchsorted(self.calendar, as_day_array(end_date)[0], 'right'))
+        return lo, hi
+
+    def day_column(self, trade_date):
+        """거래일의 종목별 보유 여부 (bool 배열, 캘린더에 없으면 None)"""
+        day = as_day_array(trade_date)[0]
+        col = int(np.searchsorted(self.calendar, day))
+        if col >= len(self.calendar) or self.calendar[col] != day:
+            return None
+        return ((self.bits[:, col >> 3] >> (col & 7)) & 1).astype(bool)
+
+    def count_on(self, trade_date, rows=None):
+        """거래일에 시세가 있는 종목 수 (rows로 종목 부분집합 지정 가능)"""
+        column = self.day_column(trade_date)
+        if column is None:
+            return 0
+        return int(column[rows].sum() if rows is not None else column.sum())
+
+    def trading_days(self):
+        """종목별 시세 보유 거래일 수"""
+        return _POPCOUNT[self.bits].sum(axis=1)
+
+    def first_last_columns(self):
+        """종목별 첫/마지막 거래일 열 위치 (시세가 없으면 -1)"""
+        nonzero = self.bits != 0
+        has_any = nonzero.any(axis=1)
+        rows = np.arange(len(self.codes))
+
+        first_byte = nonzero.argmax(axis=1)
+        last_byte = self.bits.shape[1] - 1 - nonzero[:, ::-1].argmax(axis=1)
+        first = first_byte * 8 + _LOWEST_BIT[self.bits[rows, first_byte]]
+        last = last_byte * 8 + _HIGHEST_BIT[self.bits[rows, last_byte]]
+        return np.where(has_any, first, -1), np.where(has_any, last, -1)
+
+    def first_last_dates(self):
+        """종목별 첫/마지막 거래일 (시세가 없으면 NaT)"""
+        first, last = self.first_last_columns()
+        calendar = np.append(self.calendar, np.datetime64('NaT', 'D'))
+        return calendar[first], calendar[last]
+
+    def missing_days(self):
+        """종목별 첫~마지막 거래일 사이의 누락 거래일 수"""
+        first, last = self.first_last_columns()
+        span = np.where(first >= 0, last - first + 1, 0)
+        return span - self.trading_days()
+
+    def missing_dates(self, stock_code, start_date=None, end_date=None):
+        """종목의 누락 거래일 목록 (기간 미지정 시 첫~마지막 거래일 사이)"""
+        row = self._rows.get(str(stock_code))
+        if row is None:
+            return self.calendar[slice(*self._column_range(start_date, end_date))]
+
+        present = np.unpackbits(self.bits[row], count=len(self.calendar), bitorder='little').astype(bool)
+        lo, hi = self._column_range(start_date, end_date)
+        if start_date is None or end_date is None:
+            first, last = np.flatnonzero(present)[[0, -1]] if present.any() else (0, -1)
+            lo = first if start_date is None else lo
+            hi = last + 1 if end_date is None else hi
+        return self.calendar[lo:hi][~present[lo:hi]]
+
+    def presence_matrix(self, start_date=None, end_date=None):
+        """기간 내 (종목 × 거래일) bool 행렬과 해당 캘린더"""
+        lo, hi = self._column_range(start_date, end_date)
+        matrix = np.unpackbits(self.bits[:, lo >> 3:(hi + 7) >> 3], axis=1, bitorder='little')
+        offset = lo & 7
+        return matrix[:, offset:offset + (hi - lo)].astype(bool), self.calendar[lo:hi]
+
+    def rows_for(self, stock_codes):
+        """종목코드 목록 → 비트맵 행 번호 (비트맵에 없는 종목은 제외)"""
+        return np.array([self._rows[code] for code in stock_codes if code in self._rows], dtype=np.int64)
+
+
+def write_stock_coverage(cursor, index):
+    """종목별 커버리지 요약을 stock_coverage 테이블에 저장 (커밋은 호출자 담당)"""
+    import pandas as pd
+
+    first, last = index.first_last_dates()
+    summary = pd.DataFrame({
+        'stock_code': index.codes,
+        'first_date': pd.to_datetime(first),
+        'last_date': pd.to_datetime(last),
+        'trading_days': index.trading_days(),
+        'missing_days': index.missing_days(),
+    })
+    columns = list(summary.columns)
+
+    cursor.execute(CREATE_STOCK_COVERAGE_SQL)
+    return bulk_upsert(cursor, 'stock_coverage', columns, frame_rows(summary, columns),
+                       conflict_columns=['stock_code'])
+
+
+def update_coverage(conn, trade_dates):
+    """적재된 거래일의 비트맵 열을 갱신하고 저장 (커밋은 호출자 담당)"""
+    index = CoverageIndex.load_or_build(conn=conn)
+
+    for day in np.unique(as_day_array(trade_dates)):
+        codes = [row[0] for chunk in stream_query_chunks(
+            "SELECT stock_code FROM daily_prices WHERE trade_date = %s",
+            (str(day),), conn=conn
+        ) for row in chunk]
+        index.set_day(day, codes)
+        logger.info(f"  🧮 커버리지 비트맵 {day}: {len(codes):,}개 종목")
+
+    index.save()
+    with conn.cursor() as cursor:
+        return write_stock_coverage(cursor, index)
+
+
+def rebuild_coverage(conn):
+    """비트맵 전체 재생성 (초기 적재용, 커밋은 호출자 담당)"""
+    index = CoverageIndex.build(conn=conn)
+    index.save()
+    logger.info(f"🧮 커버리지 비트맵 재생성: {len(index.codes):,}개 종목 × {len(index.calendar):,}거래일")
+
+    with conn.cursor() as cursor:
+        return write_stock_coverage(cursor, index)
@@ -0,0 +1,147 @@
+"""거래일 × 시장구분 수집 현황 요약 모듈
+
+수집기가 일별 시세를 저장하는 트랜잭션 안에서 API 응답으로 거래일·시장구분별
+저장 행 수, 응답 종목 수, 컬럼별 결측 수를 daily_coverage에 기록한다.
+누락 점검 스크립트와 관리자 대시보드는 daily_prices를 집계하지 않고 이 요약만 읽는다.
+
+- row_count: 저장된 시세 행 수 (종가 0 제외)
+- expected_count: 해당 시장구분의 API 응답 종목 수
+- missing_*: 저장된 행 중 API 값이 비어 있는 컬럼 수 (daily_prices NULL과 대응)
+"""
+from datetime import datetime
+
+from common.assets import SOURCE_ETF, stock_market_type
+from common.database import bulk_upsert
+from common.logger import get_logger
+
+logger = get_logger(__name__)
+
+# (daily_prices 컬럼, API 필드)
+PRICE_FIELDS = [
+    ('open_price', 'mkp'),
+    ('high_price', 'hipr'),
+    ('low_price', 'lopr'),
+    ('close_price', 'clpr'),
+    ('volume', 'trqu'),
+    ('vs', 'vs'),
+    ('change_rate', 'fltRt'),
+    ('trading_value', 'trPrc'),
+]
+
+COVERAGE_COLUMNS = ['trade_date', 'market_type', 'row_count', 'expected_count', 'source'] + \
+    [f'missing_{column}' for column, _ in PRICE_FIELDS]
+
+CREATE_DAILY_COVERAGE_SQL = """
+    CREATE TABLE IF NOT EXISTS daily_coverage (
+        trade_date DATE NOT NULL,
+        market_type VARCHAR(20) NOT NULL,
+        row_count INTEGER NOT NULL,
+        expected_count INTEGER NOT NULL,
+        source VARCHAR(30) NOT NULL,
+        missing_open_price INTEGER NOT NULL DEFAULT 0,
+        missing_high_price INTEGER NOT NULL DEFAULT 0,
+        missing_low_price INTEGER NOT NULL DEFAULT 0,
+        missing_close_price INTEGER NOT NULL DEFAULT 0,
+        missing_volume INTEGER NOT NULL DEFAULT 0,
+        missing_vs INTEGER NOT NULL DEFAULT 0,
+        missing_change_rate INTEGER NOT NULL DEFAULT 0,
+        missing_trading_value INTEGER NOT NULL DEFAULT 0,
+        collected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (trade_date, market_type)
+    );
+"""
+
+
+def _is_blank(value):
+    if value in (None, ''):
+        return True
+    try:
+        float(value)
+        return False
+    except (ValueError, TypeError):
+        return True
+
+
+def _is_saved(item):
+    """수집기가 저장하는 항목인지 (종목코드가 있고 종가가 0이 아님)"""
+    if not item.get('srtnCd'):
+        return False
+    try:
+        return int(float(item.get('clpr') or 0)) != 0
+    except (ValueError, TypeError):
+        return False
+
+
+def coverage_rows(items, trade_date, source, written=None):
+    """
+    API 응답 항목 → daily_coverage 행 (시장구분별 한 행)
+
+    Args:
+        items: API 응답 항목
+        trade_date: 거래일 ('YYYY-MM-DD')
+        source: SOURCE_STOCK 또는 SOURCE_ETF (ETF 엔드포인트는 시장구분 ETF로 집계)
+        written: 실제로 저장된 종목코드 집합 (None이면 종가가 0이 아닌 항목을 저장된 것으로 봄)
+
+    Returns:
+        list: COVERAGE_COLUMNS 순서의 행 튜플 목록
+    """
+    summary = {}
+    for item in items:
+        if not item.get('srtnCd'):
+            continue
+        market_type = 'ETF' if source == SOURCE_ETF else stock_market_type(item.get('mrktCtg'))
+        counts = summary.setdefault(market_type, [0, 0] + [0] * len(PRICE_FIELDS))
+        counts[1] += 1
+        saved = item['srtnCd'] in written if written is not None else _is_saved(item)
+        if not saved:
+            continue
+        counts[0] += 1
+        for i, (_, field) in enumerate(PRICE_FIELDS):
+            if _is_blank(item.get(field)):
+                counts[2 + i] += 1
+
+    return [
+        (trade_date, market_type, counts[0], counts[1], source, *counts[2:])
+        for market_type, counts in sorted(summary.items())
+    ]
+
+
+def save_coverage_rows(cursor, rows):
+    """수집기 응답 요약을 daily_coverage에 저장 (커밋은 호출자 담당)"""
+    if not rows:
+        return 0
+    collected_at = datetime.now()
+    cursor.execute(CREATE_DAILY_COVERAGE_SQL)
+    return bulk_upsert(cursor, 'daily_coverage', COVERAGE_COLUMNS + ['collected_at'],
+                       [row + (collected_at,) for row in rows],
+                       conflict_columns=['trade_date', 'market_type'])
+
+
+def rebuild_daily_coverage(conn):
+    """
+    daily_prices 전체를 한 번 집계하여 daily_coverage 초기 적재 (커밋은 호출자 담당)
+
+    API 응답 종목 수는 알 수 없으므로 expected_count는 저장 행 수로 채운다.
+    """
+    missing = ",\n".join(
+        f"COUNT(*) FILTER (WHERE dp.{column} IS NULL)" for column, _ in PRICE_FIELDS
+    )
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_DAILY_COVERAGE_SQL)
+        cursor.execute("TRUNCATE daily_coverage")
+        cursor.execute(f"""
+            INSERT INTO daily_coverage ({", ".join(COVERAGE_COLUMNS)})
+            SELECT dp.trade_date,
+                   COALESCE(s.market_type, 'ETC'),
+                   COUNT(*),
+                   COUNT(*),
+                   'rebuild',
+                   {missing}
+            FROM daily_prices dp
+            LEFT JOIN stocks s ON s.stock_code = dp.stock_code
+            GROUP BY dp.trade_date, COALESCE(s.market_type, 'ETC')
+        """)
+        count = cursor.rowcount
+
+    logger.info(f"📋 daily_coverage {count:,}행 재계산")
+    return count
@@ -0,0 +1,288 @@
+"""차트용 시계열 축소(downsampling) 모듈
+
+장기 차트의 전송 포인트 수를 고정 예산 이하로 유지하기 위해
+종목별 전체 히스토리를 몇 가지 해상도로 미리 축소하여 chart_series 테이블에 저장한다.
+
+- 라인 차트(종가): Largest-Triangle-Three-Buckets (LTTB)
+- 캔들 차트(OHLC): 구간별 시가(첫 값)/고가(최대)/저가(최소)/종가(마지막 값) 보존 버킷팅
+
+여러 종목을 이어 붙인 평탄(flat) 배열과 종목별 길이를 입력으로 받아
+종목 전체를 한 번에 벡터 연산으로 처리한다.
+"""
+import numpy as np
+from psycopg2.extras import Json
+
+from common.database import bulk_upsert
+from common.frames import as_day_array, load_daily_prices
+from common.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 미리 계산할 포인트 예산 (차트는 요청 포인트 이하인 가장 큰 해상도, 없으면 가장 작은 해상도를 사용)
+RESOLUTIONS = (200, 500, 1000)
+
+CREATE_CHART_SERIES_SQL = """
+    CREATE TABLE IF NOT EXISTS chart_series (
+        stock_code VARCHAR(10) NOT NULL,
+        resolution SMALLINT NOT NULL,
+        series_type VARCHAR(10) NOT NULL,
+        start_date DATE,
+        end_date DATE,
+        source_points INTEGER,
+        points JSONB NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (stock_code, resolution, series_type)
+    )
+"""
+
+
+def _offsets(lengths):
+    """종목별 길이 → 평탄 배열 내 시작 위치"""
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+def _concat_ranges(starts, lengths):
+    """[start, start+length) 구간들을 이어 붙인 인덱스 배열"""
+    return np.repeat(starts - _offsets(lengths)[:-1], lengths) + np.arange(int(lengths.sum()))
+
+
+def lttb_batch(x, y, lengths, n_out):
+    """
+    여러 시계열에 LTTB를 동시에 적용
+
+    첫 점과 마지막 점은 항상 유지하고, 가운데 점들을 n_out-2개 버킷으로 나눠
+    (이전 선택점, 후보점, 다음 버킷 평균점)이 이루는 삼각형 넓이가 가장 큰 점을 고른다.
+    버킷 순서대로만 순차 처리하고, 종목 방향과 버킷 내부는 벡터 연산으로 처리한다.
+
+    Args:
+        x: 평탄화된 x 값 (종목별로 오름차순)
+        y: 평탄화된 y 값
+        lengths: 종목별 포인트 수
+        n_out: 종목당 최대 출력 포인트 수 (3 이상)
+
+    Returns:
+        tuple: (선택된 평탄 인덱스 배열, 종목별 출력 포인트 수)
+    """
+    if n_out < 3:
+        raise ValueError("n_out은 3 이상이어야 합니다")
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    offsets = _offsets(lengths)
+
+    out_lengths = np.minimum(lengths, n_out)
+    selected = np.empty(int(out_lengths.sum()), dtype=np.int64)
+    out_offsets = _offsets(out_lengths)
+
+    # 예산 이하인 종목은 그대로 사용
+    short = np.flatnonzero(lengths <= n_out)
+    if len(short):
+        selected[_concat_ranges(out_offsets[short], lengths[short])] = \
+            _concat_ranges(offsets[short], lengths[short])
+
+    long = np.flatnonzero(lengths > n_out)
+    if len(long) == 0:
+        return selected, out_lengths
+
+    n = lengths[long]
+    first = offsets[long]
+    last = first + n - 1
+    buckets = n_out - 2
+
+    # 버킷 경계 (가운데 n-2개 점을 buckets개로 분할)
+    every = (n - 2) / buckets
+    edges = np.floor(np.arange(buckets + 1)[None, :] * every[:, None]).astype(np.int64) + 1
+    edges[:, -1] = n - 1
+    starts = edges[:, :-1] + first[:, None]
+    ends = edges[:, 1:] + first[:, None]
+    counts = ends - starts
+
+    # 버킷 평균 (누적합으로 한 번에 계산), 마지막 버킷의 "다음 점"은 마지막 점
+    cx = np.concatenate([[0.0], np.cumsum(x)])
+    cy = np.concatenate([[0.0], np.cumsum(y)])
+    avg_x = (cx[ends] - cx[starts]) / counts
+    avg_y = (cy[ends] - cy[starts]) / counts
+    next_x = np.concatenate([avg_x[:, 1:], x[last][:, None]], axis=1)
+    next_y = np.concatenate([avg_y[:, 1:], y[last][:, None]], axis=1)
+
+    width = np.arange(counts.max())[None, :]
+    rows = np.arange(len(long))
+    result = np.empty((len(long), n_out), dtype=np.int64)
+    result[:, 0] = first
+    result[:, -1] = last
+
+    prev = first
+    for j in range(buckets):
+        candidates = starts[:, j, None] + width
+        valid = candidates < ends[:, j, None]
+        candidates = np.where(valid, candidates, starts[:, j, None])
+
+        xa = x[prev][:, None]
+        ya = y[prev][:, None]
+        area = np.abs(
+            (xa - next_x[:, j, None]) * (y[candidates] - ya)
+            - (xa - x[candidates]) * (next_y[:, j, None] - ya)
+        )
+        area = np.where(valid, area, -1.0)
+
+        prev = candidates[rows, area.argmax(axis=1)]
+        result[:, j + 1] = prev
+
+    long_positions = out_offsets[long][:, None] + np.arange(n_out)[None, :]
+    selected[long_positions.ravel()] = result.ravel()
+    return selected, out_lengths
+
+
+def lttb(x, y, n_out):
+    """단일 시계열 LTTB (선택된 인덱스 반환)"""
+    selected, _ = lttb_batch(x, y, [len(x)], n_out)
+    return selected
+
+
+def ohlc_bucket_batch(open_, high, low, close, volume, lengths, n_out):
+    """
+    여러 OHLC 시계열을 종목당 최대 n_out개 구간으로 묶음 (min/max 보존)
+
+    시가/고가/저가가 0인 날(거래 없음)은 종가로 대체한 뒤 집계한다.
+
+    Returns:
+        dict: start(구간 첫 평탄 인덱스), open, high, low, close, volume 배열과
+            lengths(종목별 구간 수)
+    """
+    close = np.asarray(close, dtype=np.int64)
+    open_ = np.where(np.asarray(open_) > 0, open_, close).astype(np.int64)
+    high = np.where(np.asarray(high) > 0, high, close).astype(np.int64)
+    low = np.where(np.asarray(low) > 0, low, close).astype(np.int64)
+    volume = np.asarray(volume, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    offsets = _offsets(lengths)
+
+    out_lengths = np.minimum(lengths, n_out)
+    # 종목별 구간 시작 위치: floor(k * n / m) (m = 출력 구간 수)
+    series_index = np.repeat(np.arange(len(lengths)), out_lengths)
+    k = np.arange(int(out_lengths.sum())) - np.repeat(_offsets(out_lengths)[:-1], out_lengths)
+    starts = offsets[series_index] + (k * lengths[series_index]) // out_lengths[series_index]
+    ends = np.append(starts[1:], offsets[-1])
+
+    return {
+        'start': starts,
+        'open': open_[starts],
+        'high': np.maximum.reduceat(high, starts),
+        'low': np.minimum.reduceat(low, starts),
+        'close': close[ends - 1],
+        'volume': np.add.reduceat(volume, starts),
+        'lengths': out_lengths,
+    }
+
+
+def build_chart_series(prices, resolutions=RESOLUTIONS):
+    """
+    종목별 축소 시계열 생성
+
+    Args:
+        prices: stock_code, trade_date 순으로 정렬된 일별 시세 DataFrame
+        resolutions: 포인트 예산 목록
+
+    Returns:
+        list: chart_series 저장용 행 튜플 목록
+    """
+    codes = prices['stock_code'].astype(str).to_numpy()
+    days = as_day_array(prices['trade_date'])
+    day_numbers = days.astype(np.int64)
+    date_strings = np.datetime_as_string(days, unit='D')
+
+    boundaries = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+    series_starts = np.concatenate([[0], boundaries])
+    lengths = np.diff(np.append(series_starts, len(codes)))
+    series_codes = codes[series_starts]
+
+    close = prices['close_price'].to_numpy(dtype=np.int64)
+    columns = {
+        name: prices[name].to_numpy(dtype=np.int64)
+        for name in ('open_price', 'high_price', 'low_price', 'volume')
+    }
+
+    rows = []
+    for resolution in resolutions:
+        selected, line_lengths = lttb_batch(day_numbers, close, lengths, resolution)
+        line_offsets = _offsets(line_lengths)
+
+        ohlc = ohlc_bucket_batch(columns['open_price'], columns['high_price'], columns['low_price'],
+                                 close, columns['volume'], lengths, resolution)
+        ohlc_offsets = _offsets(ohlc['lengths'])
+
+        for i, code in enumerate(series_codes):
+            start_date = date_strings[series_starts[i]]
+            end_date = date_strings[series_starts[i] + lengths[i] - 1]
+
+            line = selected[line_offsets[i]:line_offsets[i + 1]]
+            rows.append((code, resolution, 'line', start_date, end_date, int(lengths[i]), Json({
+                'date': date_strings[line].tolist(),
+                'close': close[line].tolist(),
+            })))
+
+            part = slice(ohlc_offsets[i], ohlc_offsets[i + 1])
+            rows.append((code, resolution, 'ohlc', start_date, end_date, int(lengths[i]), Json({
+                'date': date_strings[ohlc['start'][part]].tolist(),
+                'open': ohlc['open'][part].tolist(),
+                'high': ohlc['high'][part].tolist(),
+                'low': ohlc['low'][part].tolist(),
+                'close': ohlc['close'][part].tolist(),
+                'volume': ohlc['volume'][part].tolist(),
+            })))
+
+    return rows
+
+
+def _write_chart_series(cursor, rows):
+    return bulk_upsert(
+        cursor,
+        'chart_series',
+        ['stock_code', 'resolution', 'series_type', 'start_date', 'end_date', 'source_points', 'points'],
+        rows,
+        conflict_columns=['stock_code', 'resolution', 'series_type'],
+        page_size=200
+    )
+
+
+def update_chart_series(conn, trade_dates):
+    """
+    적재된 거래일에 시세가 있는 종목의 축소 시계열 재계산 (커밋은 호출자 담당)
+
+    전체 히스토리는 워터마크 캐시된 DataFrame을 사용한다.
+    """
+    prices = load_daily_prices()
+    if prices.empty:
+        return 0
+
+    days = as_day_array(prices['trade_date'])
+    touched = prices.loc[np.isin(days, as_day_array(trade_dates)), 'stock_code'].unique()
+    subset = prices[prices['stock_code'].isin(touched)]
+    if subset.empty:
+        return 0
+
+    rows = build_chart_series(subset)
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_CHART_SERIES_SQL)
+        count = _write_chart_series(cursor, rows)
+
+    logger.info(f"  📈 chart_series {len(touched):,}개 종목 갱신 ({count:,}건)")
+    return count
+
+
+def rebuild_chart_series(conn):
+    """전체 종목 축소 시계열 재계산 (초기 적재용, 커밋은 호출자 담당)"""
+    prices = load_daily_prices()
+    if prices.empty:
+        return 0
+
+    rows = build_chart_series(prices)
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_CHART_SERIES_SQL)
+        count = _write_chart_series(cursor, rows)
+
+    logger.info(f"📈 chart_series 재계산 완료: {count:,}건")
+    return count
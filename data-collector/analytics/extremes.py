@@ -0,0 +1,404 @@
+"""52주 최고/최저가 및 낙폭 추적 모듈
+
+종목별 최근 WINDOW 거래일(수정주가)의 최고가/최저가, 고점 대비 위치, 최고 종가 대비 낙폭과
+최대 낙폭(MDD)을 price_extremes 테이블에 저장한다.
+
+- 일일 갱신: 종목별 단조 덱(monotonic deque, 윈도우 최댓값/최솟값 후보)과 최고 종가,
+  최대 낙폭을 extremes_state 테이블에 보관하여 새 거래일마다 종목당 상각 O(1)로 갱신
+- 전체 계산: 종목 × 블록 단위 누적 최댓값(prefix/suffix)을 조합하여 이동 최댓값/최솟값을
+  반복문 없이 한 번에 계산하고, 마지막 윈도우에서 덱 상태를 만든다.
+- 적재일 이후 새 수정주가 이벤트가 있는 종목은 과거 가격 기준이 바뀌므로 전체 히스토리로 재계산
+"""
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from common.database import bulk_upsert
+from common.frames import as_day_array, current_state_codes, frame_rows, read_frame
+from common.logger import get_logger
+
+from .adjustments import CREATE_ADJUSTMENT_TABLES_SQL, load_adjusted_prices
+
+logger = get_logger(__name__)
+
+# 52주 = 250거래일 (종목별 시세가 있는 거래일 기준)
+WINDOW = 250
+
+EXTREME_COLUMNS = [
+    'high_52w', 'low_52w', 'pct_from_high', 'pct_from_low',
+    'peak_close', 'drawdown', 'max_drawdown', 'is_new_high', 'is_new_low'
+]
+
+STATE_COLUMNS = [
+    'stock_code', 'trade_date', 'observations', 'peak_close', 'max_drawdown',
+    'max_positions', 'max_values', 'min_positions', 'min_values'
+]
+
+CREATE_EXTREMES_TABLES_SQL = """
+    CREATE TABLE IF NOT EXISTS price_extremes (
+        stock_code VARCHAR(10) NOT NULL,
+        trade_date DATE NOT NULL,
+        high_52w INTEGER,
+        low_52w INTEGER,
+        pct_from_high REAL,
+        pct_from_low REAL,
+        peak_close INTEGER,
+        drawdown REAL,
+        max_drawdown REAL,
+        is_new_high BOOLEAN NOT NULL DEFAULT FALSE,
+        is_new_low BOOLEAN NOT NULL DEFAULT FALSE,
+        PRIMARY KEY (stock_code, trade_date)
+    );
+    CREATE INDEX IF NOT EXISTS idx_price_extremes_date ON price_extremes(trade_date DESC, pct_from_high DESC);
+
+    CREATE TABLE IF NOT EXISTS extremes_state (
+        stock_code VARCHAR(10) PRIMARY KEY,
+        trade_date DATE NOT NULL,
+        observations INTEGER NOT NULL,
+        peak_close DOUBLE PRECISION,
+        max_drawdown DOUBLE PRECISION,
+        max_positions INTEGER[],
+        max_values DOUBLE PRECISION[],
+        min_positions INTEGER[],
+        min_values DOUBLE PRECISION[],
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+
+def _high_low_close(prices):
+    """고가/저가가 0이면 종가로 대체한 (고가, 저가, 종가) 배열"""
+    close = prices['close_price'].to_numpy(dtype=np.float64)
+    high = prices['high_price'].to_numpy(dtype=np.float64)
+    low = prices['low_price'].to_numpy(dtype=np.float64)
+    return np.where(high > 0, high, close), np.where(low > 0, low, close), close
+
+
+def _values(high, low, close, high_52w, low_52w, peak, max_drawdown, observations):
+    """윈도우 최고/최저와 최고 종가로 EXTREME_COLUMNS 값 계산"""
+    return {
+        'high_52w': high_52w,
+        'low_52w': low_52w,
+        'pct_from_high': close / high_52w - 1,
+        'pct_from_low': close / low_52w - 1,
+        'peak_close': peak,
+        'drawdown': close / peak - 1,
+        'max_drawdown': max_drawdown,
+        # 첫 거래일은 비교 대상이 없으므로 신고가/신저가로 보지 않음
+        'is_new_high': (high >= high_52w) & (observations > 1),
+        'is_new_low': (low <= low_52w) & (observations > 1),
+    }
+
+
+class ExtremesState:
+    """종목별 윈도우 최댓값/최솟값 덱과 최고 종가 상태 (행: 종목)"""
+
+    def __init__(self, codes):
+        self.codes = [str(code) for code in codes]
+        self.rows = {code: i for i, code in enumerate(self.codes)}
+        n = len(self.codes)
+
+        self.last_date = np.full(n, np.datetime64('NaT'), dtype='datetime64[D]')
+        self.count = np.zeros(n, dtype=np.int64)
+        self.peak = np.zeros(n)
+        self.max_drawdown = np.zeros(n)
+        # (관측 번호, 값) 덱: 앞쪽이 윈도우 최댓값(최솟값), 뒤로 갈수록 이후 후보
+        self.max_deques = [deque() for _ in range(n)]
+        self.min_deques = [deque() for _ in range(n)]
+
+    def step(self, rows, trade_date, high, low, close):
+        """
+        한 거래일 시세로 상태를 갱신하고 그날의 값을 반환
+
+        Args:
+            rows: 상태 행 번호 배열 (해당 거래일에 시세가 있는 종목)
+            trade_date: 거래일
+            high, low, close: rows 순서의 시세 배열
+
+        Returns:
+            dict: EXTREME_COLUMNS별 값 배열
+        """
+        high_52w = np.empty(len(rows))
+        low_52w = np.empty(len(rows))
+        counts = self.count[rows]
+
+        for i, row in enumerate(rows):
+            position = counts[i]
+            expired = position - WINDOW
+
+            window = self.max_deques[row]
+            while window and window[-1][1] <= high[i]:
+                window.pop()
+            window.append((position, high[i]))
+            while window[0][0] <= expired:
+                window.popleft()
+            high_52w[i] = window[0][1]
+
+            window = self.min_deques[row]
+            while window and window[-1][1] >= low[i]:
+                window.pop()
+            window.append((position, low[i]))
+            while window[0][0] <= expired:
+                window.popleft()
+            low_52w[i] = window[0][1]
+
+        peak = np.where(counts == 0, close, np.maximum(self.peak[rows], close))
+        max_drawdown = np.minimum(np.where(counts == 0, 0.0, self.max_drawdown[rows]), close / peak - 1)
+
+        self.count[rows] = counts + 1
+        self.peak[rows] = peak
+        self.max_drawdown[rows] = max_drawdown
+        self.last_date[rows] = trade_date
+
+        return _values(high, low, close, high_52w, low_52w, peak, max_drawdown, counts + 1)
+
+    @classmethod
+    def from_frame(cls, df):
+        """extremes_state 조회 결과로 상태 복원"""
+        state = cls(df['stock_code'])
+        if df.empty:
+            return state
+
+        state.last_date[:] = as_day_array(df['trade_date'])
+        state.count[:] = df['observations'].to_numpy(dtype=np.int64)
+        state.peak[:] = df['peak_close'].to_numpy(dtype=np.float64)
+        state.max_drawdown[:] = df['max_drawdown'].to_numpy(dtype=np.float64)
+        deques = df[['max_positions', 'max_values', 'min_positions', 'min_values']].itertuples(index=False)
+        for i, (max_positions, max_values, min_positions, min_values) in enumerate(deques):
+            state.max_deques[i].extend(zip(max_positions, max_values))
+            state.min_deques[i].extend(zip(min_positions, min_values))
+        return state
+
+    def to_rows(self, rows=None):
+        """extremes_state 저장용 행 튜플 목록"""
+        rows = range(len(self.codes)) if rows is None else rows
+        result = []
+        for row in rows:
+            max_window, min_window = self.max_deques[row], self.min_deques[row]
+            result.append((
+                self.codes[row], self.last_date[row].astype(object), int(self.count[row]),
+                float(self.peak[row]), float(self.max_drawdown[row]),
+                [int(p) for p, _ in max_window], [float(v) for _, v in max_window],
+                [int(p) for p, _ in min_window], [float(v) for _, v in min_window],
+            ))
+        return result
+
+
+def rolling_extreme(values, groups, window, largest=True):
+    """
+    그룹(종목)별 이동 최댓값/최솟값 (윈도우가 덜 찼으면 그룹 시작부터)
+
+    그룹 내 위치를 window 크기 블록으로 나누어 블록별 누적값(prefix)과 역방향 누적값(suffix)을 구하면
+    [i - window + 1, i] 구간의 극값은 max(suffix[i - window + 1], prefix[i])이다.
+
+    Args:
+        values: 그룹, 시간 순으로 정렬된 값 배열
+        groups: 그룹 번호 배열 (같은 그룹은 연속)
+        window: 윈도우 크기
+        largest: True면 최댓값, False면 최솟값
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if not n:
+        return values.copy()
+
+    starts = np.concatenate([[True], groups[1:] != groups[:-1]])
+    group_start = np.maximum.accumulate(np.where(starts, np.arange(n), 0))
+    offset = np.arange(n) - group_start
+
+    series = pd.Series(values)
+    cumulative = 'cummax' if largest else 'cummin'
+    blocks = np.cumsum(starts) * (n // window + 2) + offset // window
+    prefix = getattr(series.groupby(blocks), cumulative)().to_numpy()
+    suffix = getattr(series[::-1].groupby(blocks[::-1]), cumulative)().to_numpy()[::-1]
+    partial = getattr(series.groupby(group_start), cumulative)().to_numpy()
+
+    full = offset >= window
+    combine = np.maximum if largest else np.minimum
+    result = partial.copy()
+    result[full] = combine(suffix[np.flatnonzero(full) - window + 1], prefix[full])
+    return result
+
+
+def _deque_members(values, groups, largest=True):
+    """
+    덱에 남는 원소 마스크 (뒤에 같거나 더 큰(작은) 값이 없는 원소)
+
+    Args:
+        values: 그룹별 마지막 윈도우 값 (그룹, 시간 순)
+        groups: 그룹 번호 배열
+    """
+    reverse = pd.Series(values[::-1])
+    cumulative = 'cummax' if largest else 'cummin'
+    later = getattr(reverse.groupby(groups[::-1]), cumulative)().groupby(groups[::-1]).shift(1)
+    later = later.to_numpy()[::-1]
+    fill = -np.inf if largest else np.inf
+    later = np.where(np.isnan(later), fill, later)
+    return values > later if largest else values < later
+
+
+def compute_extremes(prices):
+    """
+    일별 시세(수정주가) 전체로 52주 최고/최저와 낙폭 계산
+
+    Args:
+        prices: stock_code, trade_date, high_price, low_price, close_price 컬럼을 가진 DataFrame
+
+    Returns:
+        tuple: (EXTREME_COLUMNS DataFrame, 마지막 거래일 기준 ExtremesState)
+    """
+    prices = prices[prices['close_price'] > 0].sort_values(['stock_code', 'trade_date'], kind='stable')
+    codes = prices['stock_code'].astype(str).to_numpy()
+    days = as_day_array(prices['trade_date'])
+    high, low, close = _high_low_close(prices)
+
+    # 종목코드 순으로 정렬되어 있으므로 factorize 순서가 곧 정렬 순서
+    groups, unique_codes = pd.factorize(codes)
+    n = len(codes)
+    starts = np.concatenate([[True], groups[1:] != groups[:-1]]) if n else np.array([], dtype=bool)
+    group_start = np.maximum.accumulate(np.where(starts, np.arange(n), 0)) if n else np.array([], dtype=np.int64)
+    observations = np.arange(n) - group_start + 1
+
+    high_52w = rolling_extreme(high, groups, WINDOW, largest=True)
+    low_52w = rolling_extreme(low, groups, WINDOW, largest=False)
+    series = pd.Series(close)
+    peak = series.groupby(groups).cummax().to_numpy()
+    max_drawdown = pd.Series(close / peak - 1).groupby(groups).cummin().to_numpy()
+
+    frame = pd.DataFrame({'stock_code': codes, 'trade_date': pd.to_datetime(days)})
+    for name, values in _values(high, low, close, high_52w, low_52w, peak, max_drawdown, observations).items():
+        frame[name] = values
+
+    # 마지막 거래일 상태: 종목별 마지막 윈도우에서 덱 구성
+    state = ExtremesState(unique_codes)
+    if n:
+        last = np.append(np.flatnonzero(starts[1:]), n - 1)
+        counts = observations[last]
+        state.count[:] = counts
+        state.last_date[:] = days[last]
+        state.peak[:] = peak[last]
+        state.max_drawdown[:] = max_drawdown[last]
+
+        total = np.repeat(counts, counts)
+        in_window = observations > total - WINDOW
+        positions = observations[in_window] - 1
+        window_groups = groups[in_window]
+        for values, deques, largest in ((high, state.max_deques, True), (low, state.min_deques, False)):
+            keep = _deque_members(values[in_window], window_groups, largest)
+            for group, position, value in zip(window_groups[keep], positions[keep], values[in_window][keep]):
+                deques[group].append((int(position), float(value)))
+
+    return frame, state
+
+
+def _write(cursor, frame, state, state_rows=None):
+    columns = ['stock_code', 'trade_date'] + EXTREME_COLUMNS
+    count = bulk_upsert(cursor, 'price_extremes', columns, frame_rows(frame, columns),
+                        conflict_columns=['stock_code', 'trade_date'], page_size=5000)
+    bulk_upsert(cursor, 'extremes_state', STATE_COLUMNS, state.to_rows(state_rows),
+                conflict_columns=['stock_code'])
+    return count
+
+
+def _recompute(cursor, stock_codes, since):
+    """종목 전체 히스토리(수정주가)로 다시 계산하고 since 이후 행만 저장"""
+    prices = load_adjusted_prices(stock_codes=list(stock_codes))
+    if prices.empty:
+        return 0
+
+    frame, state = compute_extremes(prices)
+    frame = frame[as_day_array(frame['trade_date']) >= since]
+    return _write(cursor, frame, state)
+
+
+def update_extremes(conn, trade_dates):
+    """
+    적재된 거래일의 52주 최고/최저를 저장된 덱 상태에서 이어서 계산 (커밋은 호출자 담당)
+
+    상태가 없거나 상태 기준일이 첫 적재일 직전 거래일이 아닌 종목, 적재일 이후 수정주가 이벤트가
+    생긴 종목은 해당 종목 전체 히스토리로 다시 계산한다.
+    """
+    days = np.unique(as_day_array(trade_dates))
+    if not len(days):
+        return 0
+
+    prices = read_frame("""
+        SELECT stock_code, trade_date, high_price, low_price, close_price
+        FROM daily_prices
+        WHERE trade_date = ANY(%s::date[]) AND close_price > 0
+        ORDER BY trade_date, stock_code
+    """, ([str(d) for d in days],), conn=conn)
+    if prices.empty:
+        return 0
+
+    codes = prices['stock_code'].astype(str).unique().tolist()
+
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_ADJUSTMENT_TABLES_SQL)
+        cursor.execute(CREATE_EXTREMES_TABLES_SQL)
+
+        saved = read_frame(
+            f"SELECT {', '.join(STATE_COLUMNS)} FROM extremes_state WHERE stock_code = ANY(%s)",
+            (codes,), conn=conn
+        )
+        adjusted = read_frame(
+            "SELECT DISTINCT stock_code FROM adjustment_factors WHERE ex_date >= %s AND stock_code = ANY(%s)",
+            (str(days[0]), codes), conn=conn
+        )
+        if not saved.empty:
+            saved = saved[saved['stock_code'].astype(str).isin(current_state_codes(saved, days, conn=conn))]
+            if not adjusted.empty:
+                saved = saved[~saved['stock_code'].isin(adjusted['stock_code'])]
+        state = ExtremesState.from_frame(saved) if not saved.empty else ExtremesState([])
+
+        stock_codes = prices['stock_code'].astype(str)
+        carried = prices[stock_codes.isin(state.rows)]
+        recompute_codes = sorted(set(codes) - set(state.rows))
+
+        count = 0
+        if not carried.empty:
+            carried_codes = carried['stock_code'].astype(str).to_numpy()
+            carried_days = as_day_array(carried['trade_date'])
+            rows = np.array([state.rows[code] for code in carried_codes], dtype=np.int64)
+            high, low, close = _high_low_close(carried)
+
+            output = {name: np.empty(len(carried)) for name in EXTREME_COLUMNS}
+            for day in np.unique(carried_days):
+                index = np.flatnonzero(carried_days == day)
+                values = state.step(rows[index], day, high[index], low[index], close[index])
+                for name in EXTREME_COLUMNS:
+                    output[name][index] = values[name]
+
+            frame = pd.DataFrame({'stock_code': carried_codes, 'trade_date': pd.to_datetime(carried_days)})
+            for name in EXTREME_COLUMNS:
+                frame[name] = output[name]
+            for name in ('is_new_high', 'is_new_low'):
+                frame[name] = frame[name].astype(bool)
+            count += _write(cursor, frame, state)
+        if recompute_codes:
+            count += _recompute(cursor, recompute_codes, days[0])
+
+    logger.info(f"  📈 price_extremes {len(codes):,}개 종목 갱신 "
+                f"(이어서 계산 {len(state.codes):,}, 전체 재계산 {len(recompute_codes):,}) {count:,}건")
+    return count
+
+
+def rebuild_extremes(conn, batch_size=500):
+    """전체 종목 52주 최고/최저 재계산 (초기 적재용, 커밋은 호출자 담당)"""
+    prices = load_adjusted_prices()
+    if prices.empty:
+        return 0
+
+    codes = np.unique(prices['stock_code'].astype(str))
+    stock_codes = prices['stock_code'].astype(str)
+
+    count = 0
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_EXTREMES_TABLES_SQL)
+        for i in range(0, len(codes), batch_size):
+            frame, state = compute_extremes(prices[stock_codes.isin(codes[i:i + batch_size])])
+            count += _write(cursor, frame, state)
+            logger.info(f"📈 price_extremes {min(i + batch_size, len(codes)):,}/{len(codes):,} 종목 ({count:,}건)")
+
+    return count
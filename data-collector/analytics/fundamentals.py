@@ -0,0 +1,339 @@
+"""TTM 재무 지표 및 일별 밸류에이션 모듈
+
+financial_data(사업연도 누적 손익, 기준일 잔액)로 종목·보고기간별 최근 4분기(TTM) 매출/이익과
+자본을 fundamentals_ttm에 저장하고, 일별 시가총액과 결합하여 PER/PBR/PSR/EPS/BPS를
+daily_valuation에 저장한다.
+
+- TTM 손익: 4분기(사업보고서)는 연간 값, 그 외는 누적(Y,q) + 연간(Y-1) - 누적(Y-1,q)
+- 순이익/자본은 지배주주 귀속분 우선 (별도재무제표 등으로 없으면 전체 값)
+- 재무 값은 공시 접수일(rcept_dt, 없으면 법정 제출기한)부터 적용하여 미래 정보를 쓰지 않음
+  (같은 날 기준으로 공시된 보고서 중 가장 최근 보고기간 사용)
+- 지표 계산은 시가총액 × 1 / TTM 값의 벡터 연산 한 번 (이익/자본/매출이 0 이하이면 NULL)
+- 일일 갱신: 적재 거래일만 계산, 새 공시: 해당 종목의 TTM과 적용일 이후 지표만 다시 계산
+"""
+import numpy as np
+import pandas as pd
+
+from common.database import bulk_upsert
+from common.frames import as_day_array, frame_rows, read_frame
+from common.logger import get_logger
+
+from .market_cap import CREATE_DAILY_MARKET_CAP_SQL
+
+logger = get_logger(__name__)
+
+FLOW_FIELDS = ['revenue', 'operating_profit', 'net_profit']
+
+TTM_COLUMNS = [
+    'stock_code', 'year', 'quarter', 'available_date',
+    'ttm_revenue', 'ttm_operating_profit', 'ttm_net_profit', 'equity',
+]
+
+VALUATION_COLUMNS = [
+    'stock_code', 'trade_date', 'year', 'quarter', 'market_cap', 'listed_shares',
+    'eps', 'bps', 'per', 'pbr', 'psr',
+]
+
+CREATE_FUNDAMENTALS_TABLES_SQL = """
+    CREATE TABLE IF NOT EXISTS fundamentals_ttm (
+        stock_code VARCHAR(10) NOT NULL,
+        year INTEGER NOT NULL,
+        quarter INTEGER NOT NULL,
+        available_date DATE NOT NULL,
+        ttm_revenue BIGINT,
+        ttm_operating_profit BIGINT,
+        ttm_net_profit BIGINT,
+        equity BIGINT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (stock_code, year, quarter)
+    );
+
+    CREATE TABLE IF NOT EXISTS daily_valuation (
+        stock_code VARCHAR(10) NOT NULL,
+        trade_date DATE NOT NULL,
+        year INTEGER NOT NULL,
+        quarter INTEGER NOT NULL,
+        market_cap BIGINT,
+        listed_shares BIGINT,
+        eps REAL,
+        bps REAL,
+        per REAL,
+        pbr REAL,
+        psr REAL,
+        PRIMARY KEY (stock_code, trade_date)
+    );
+    CREATE INDEX IF NOT EXISTS idx_daily_valuation_date ON daily_valuation(trade_date DESC, per);
+"""
+
+STATEMENTS_SQL = """
+    SELECT stock_code, year, quarter, rcept_dt,
+           revenue, operating_profit,
+           COALESCE(net_profit_controlling, net_profit) AS net_profit,
+           COALESCE(equity_controlling, total_equity) AS equity
+    FROM financial_data
+    WHERE source IS NOT NULL
+      AND (%s::text[] IS NULL OR stock_code = ANY(%s::text[]))
+"""
+
+MARKET_CAP_SQL = """
+    SELECT stock_code, trade_date, market_cap, listed_shares
+    FROM daily_market_cap
+    WHERE market_cap > 0
+      AND (%s::date[] IS NULL OR trade_date = ANY(%s::date[]))
+      AND (%s::date IS NULL OR trade_date >= %s::date)
+      AND (%s::text[] IS NULL OR stock_code = ANY(%s::text[]))
+"""
+
+# 보고기간 종료 후 법정 제출기한 (분기/반기 45일, 사업보고서 90일)
+_FILING_DAYS = {1: 45, 2: 45, 3: 45, 4: 90}
+
+
+def _has_financials(cursor):
+    cursor.execute("SELECT to_regclass('financial_data') IS NOT NULL")
+    return cursor.fetchone()[0]
+
+
+def _filing_deadline(year, quarter):
+    """보고기간 종료일 + 제출기한 (datetime64[D] 배열)"""
+    period_end = pd.to_datetime(pd.DataFrame({
+        'year': year, 'month': quarter * 3, 'day': 1,
+    })) + pd.offsets.MonthEnd(0)
+    days = np.vectorize(_FILING_DAYS.get, otypes=[np.int64])(quarter)
+    return as_day_array(period_end) + days.astype('timedelta64[D]')
+
+
+def compute_ttm(statements):
+    """
+    보고기간별 TTM 손익과 자본 계산
+
+    Args:
+        statements: stock_code, year, quarter, rcept_dt, revenue, operating_profit, net_profit, equity
+                    (손익은 사업연도 누적)
+
+    Returns:
+        pandas.DataFrame: TTM_COLUMNS (전년도 보고서가 없어 TTM을 만들 수 없는 손익은 NaN)
+    """
+    if statements.empty:
+        return pd.DataFrame(columns=TTM_COLUMNS)
+
+    frame = statements.copy()
+    frame['stock_code'] = frame['stock_code'].astype(str)
+    frame['year'] = frame['year'].astype(np.int64)
+    frame['quarter'] = frame['quarter'].astype(np.int64)
+    for name in FLOW_FIELDS + ['equity']:
+        frame[name] = pd.to_numeric(frame[name], errors='coerce').astype(np.float64)
+
+    keys = ['stock_code', 'year', 'quarter']
+    previous = frame[keys + FLOW_FIELDS].assign(year=frame['year'] + 1)
+    annual = previous[previous['quarter'] == 4].drop(columns='quarter')
+    merged = frame.merge(previous, on=keys, how='left', suffixes=('', '_prev')) \
+                  .merge(annual, on=['stock_code', 'year'], how='left', suffixes=('', '_annual'))
+
+    is_annual = merged['quarter'].to_numpy() == 4
+    result = pd.DataFrame({
+        'stock_code': merged['stock_code'],
+        'year': merged['year'],
+        'quarter': merged['quarter'],
+    })
+    for name in FLOW_FIELDS:
+        trailing = merged[name] + merged[f"{name}_annual"] - merged[f"{name}_prev"]
+        result[f"ttm_{name}"] = np.where(is_annual, merged[name], trailing)
+    result['equity'] = merged['equity']
+
+    deadline = _filing_deadline(merged['year'].to_numpy(), merged['quarter'].to_numpy())
+    filed = merged['rcept_dt']
+    result['available_date'] = pd.to_datetime(
+        np.where(filed.notna(), as_day_array(filed.fillna(pd.NaT)), deadline)
+    )
+    return result[TTM_COLUMNS]
+
+
+def compute_valuation(market_caps, ttm):
+    """
+    일별 시가총액 × 적용 가능한 최근 TTM → 밸류에이션 지표
+
+    Args:
+        market_caps: stock_code, trade_date, market_cap, listed_shares
+        ttm: compute_ttm 결과
+
+    Returns:
+        pandas.DataFrame: VALUATION_COLUMNS (적용 가능한 재무 값이 없는 행 제외)
+    """
+    if market_caps.empty or ttm.empty:
+        return pd.DataFrame(columns=VALUATION_COLUMNS)
+
+    # 접수일 순으로 보고기간이 앞선 적이 없는 행만 유지 (늦게 낸 과거 보고서가 최신 보고서를 덮지 않도록)
+    ttm = ttm.copy()
+    ttm['stock_code'] = ttm['stock_code'].astype(str)
+    ttm['available_date'] = pd.to_datetime(as_day_array(ttm['available_date']))
+    ttm = ttm.sort_values(['available_date', 'year', 'quarter'], kind='mergesort')
+    period = ttm['year'].to_numpy(dtype=np.int64) * 10 + ttm['quarter'].to_numpy(dtype=np.int64)
+    ttm = ttm[period >= ttm.assign(period=period).groupby('stock_code')['period'].cummax().to_numpy()]
+
+    prices = market_caps[['stock_code', 'trade_date', 'market_cap', 'listed_shares']].copy()
+    prices['stock_code'] = prices['stock_code'].astype(str)
+    prices['trade_date'] = pd.to_datetime(as_day_array(prices['trade_date']))
+    prices = prices.sort_values('trade_date', kind='mergesort')
+
+    frame = pd.merge_asof(prices, ttm, left_on='trade_date', right_on='available_date',
+                          by='stock_code', direction='backward')
+    frame = frame.dropna(subset=['year'])
+    if frame.empty:
+        return pd.DataFrame(columns=VALUATION_COLUMNS)
+
+    market_cap = frame['market_cap'].to_numpy(dtype=np.float64)
+    shares = pd.to_numeric(frame['listed_shares'], errors='coerce').to_numpy(dtype=np.float64)
+    profit = frame['ttm_net_profit'].to_numpy(dtype=np.float64)
+    equity = frame['equity'].to_numpy(dtype=np.float64)
+    revenue = frame['ttm_revenue'].to_numpy(dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = pd.DataFrame({
+            'stock_code': frame['stock_code'].to_numpy(),
+            'trade_date': frame['trade_date'].to_numpy(),
+            'year': frame['year'].to_numpy(dtype=np.int64),
+            'quarter': frame['quarter'].to_numpy(dtype=np.int64),
+            'market_cap': market_cap.astype(np.int64),
+            'listed_shares': frame['listed_shares'].to_numpy(),
+            'eps': np.where(shares > 0, profit / shares, np.nan),
+            'bps': np.where(shares > 0, equity / shares, np.nan),
+            'per': np.where(profit > 0, market_cap / profit, np.nan),
+            'pbr': np.where(equity > 0, market_cap / equity, np.nan),
+            'psr': np.where(revenue > 0, market_cap / revenue, np.nan),
+        })
+    return result[VALUATION_COLUMNS]
+
+
+def _load_ttm(conn, stock_codes=None):
+    codes = sorted(set(stock_codes)) if stock_codes else None
+    return read_frame(
+        f"SELECT {', '.join(TTM_COLUMNS)} FROM fundamentals_ttm "
+        "WHERE (%s::text[] IS NULL OR stock_code = ANY(%s::text[]))",
+        (codes, codes), conn=conn
+    )
+
+
+def _market_caps(conn, days=None, since=None, stock_codes=None):
+    codes = sorted(set(stock_codes)) if stock_codes else None
+    return read_frame(MARKET_CAP_SQL, (days, days, since, since, codes, codes), conn=conn)
+
+
+def _write_valuation(cursor, frame):
+    return bulk_upsert(cursor, 'daily_valuation', VALUATION_COLUMNS, frame_rows(frame, VALUATION_COLUMNS),
+                       conflict_columns=['stock_code', 'trade_date'], page_size=5000)
+
+
+def _changed_since(previous, ttm):
+    """새 TTM 중 저장된 값과 다른(또는 새로 생긴) 행의 가장 이른 적용일 (없으면 None)"""
+    keys = ['stock_code', 'year', 'quarter']
+    if previous.empty:
+        changed = ttm
+    else:
+        previous = previous.copy()
+        previous['stock_code'] = previous['stock_code'].astype(str)
+        previous['available_date'] = pd.to_datetime(as_day_array(previous['available_date']))
+        merged = ttm.merge(previous, on=keys, how='left', suffixes=('', '_old'))
+        # 새로 생긴 보고기간은 이전 값이 모두 NaN이므로 다른 값으로 판정됨
+        different = np.zeros(len(merged), dtype=bool)
+        for name in TTM_COLUMNS[3:]:
+            new, old = merged[name], merged[f"{name}_old"]
+            if name != 'available_date':
+                old = pd.to_numeric(old, errors='coerce')
+            different |= ~(new.eq(old) | (new.isna() & old.isna())).to_numpy()
+        changed = ttm[different]
+    if changed.empty:
+        return None
+    return str(as_day_array(changed['available_date']).min())
+
+
+def refresh_ttm(conn, cursor, stock_codes=None):
+    """financial_data로 fundamentals_ttm 다시 계산 (stock_codes가 None이면 전체)"""
+    codes = sorted(set(stock_codes)) if stock_codes else None
+    ttm = compute_ttm(read_frame(STATEMENTS_SQL, (codes, codes), conn=conn))
+    if ttm.empty:
+        return ttm
+    bulk_upsert(cursor, 'fundamentals_ttm', TTM_COLUMNS, frame_rows(ttm, TTM_COLUMNS),
+                conflict_columns=['stock_code', 'year', 'quarter'], page_size=5000)
+    return ttm
+
+
+def update_valuation(conn, trade_dates):
+    """
+    적재된 거래일의 밸류에이션 지표 계산 (수집 후처리 단계, 커밋은 호출자 담당)
+
+    재무 값은 저장된 fundamentals_ttm을 그대로 사용한다 (새 공시 반영은 update_after_filings).
+    """
+    days = [str(d) for d in np.unique(as_day_array(trade_dates))]
+    if not days:
+        return 0
+
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_DAILY_MARKET_CAP_SQL)
+        cursor.execute(CREATE_FUNDAMENTALS_TABLES_SQL)
+        frame = compute_valuation(_market_caps(conn, days=days), _load_ttm(conn))
+        count = _write_valuation(cursor, frame)
+
+    logger.info(f"  🧾 daily_valuation {count:,}건 갱신 ({', '.join(days[-3:])})")
+    return count
+
+
+def update_after_filings(conn, stock_codes, batch_size=500):
+    """
+    새 재무 데이터가 저장된 종목의 TTM과 적용일 이후 밸류에이션 재계산 (커밋은 호출자 담당)
+
+    저장된 TTM과 비교하여 값이 바뀐 보고기간의 가장 이른 적용일부터만 다시 계산한다
+    (그 이전 거래일은 새 공시의 영향을 받지 않음).
+
+    Args:
+        stock_codes: financial_data가 갱신된 종목코드 목록
+
+    Returns:
+        int: 저장된 daily_valuation 행 수
+    """
+    codes = sorted(set(stock_codes))
+    if not codes:
+        return 0
+
+    count = 0
+    with conn.cursor() as cursor:
+        if not _has_financials(cursor):
+            return 0
+        cursor.execute(CREATE_DAILY_MARKET_CAP_SQL)
+        cursor.execute(CREATE_FUNDAMENTALS_TABLES_SQL)
+        for i in range(0, len(codes), batch_size):
+            batch = codes[i:i + batch_size]
+            previous = _load_ttm(conn, batch)
+            ttm = refresh_ttm(conn, cursor, batch)
+            since = _changed_since(previous, ttm) if not ttm.empty else None
+            if since is None:
+                continue
+            frame = compute_valuation(_market_caps(conn, since=since, stock_codes=batch), ttm)
+            count += _write_valuation(cursor, frame)
+
+    logger.info(f"  🧾 공시 반영: {len(codes):,}개 종목 TTM 갱신, daily_valuation {count:,}건")
+    return count
+
+
+def rebuild_fundamentals(conn, batch_size=500):
+    """전체 TTM과 밸류에이션 히스토리 재계산 (초기 적재용, 커밋은 호출자 담당)"""
+    with conn.cursor() as cursor:
+        if not _has_financials(cursor):
+            logger.info("🧾 financial_data가 없어 건너뜀")
+            return 0
+        cursor.execute(CREATE_DAILY_MARKET_CAP_SQL)
+        cursor.execute(CREATE_FUNDAMENTALS_TABLES_SQL)
+        cursor.execute("TRUNCATE fundamentals_ttm")
+        ttm = refresh_ttm(conn, cursor)
+        logger.info(f"🧾 fundamentals_ttm {len(ttm):,}건")
+        if ttm.empty:
+            return 0
+
+        codes = sorted(ttm['stock_code'].astype(str).unique())
+        count = 0
+        for i in range(0, len(codes), batch_size):
+            batch = codes[i:i + batch_size]
+            frame = compute_valuation(_market_caps(conn, stock_codes=batch), ttm[ttm['stock_code'].isin(batch)])
+            count += _write_valuation(cursor, frame)
+            logger.info(f"🧾 daily_valuation {min(i + batch_size, len(codes)):,}/{len(codes):,} 종목 ({count:,}건)")
+
+    return count
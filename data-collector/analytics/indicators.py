@@ -0,0 +1,361 @@
+"""기술적 지표 계산 모듈
+
+전 종목의 SMA/EMA/RSI/MACD/볼린저 밴드/ATR을 계산하여 indicators 테이블에 저장한다.
+
+하루치 갱신(step)은 종목 방향으로 벡터화되어 있고, 전체 재계산은 거래일 순서대로
+같은 step을 반복한다. 종목별 이동 상태(EMA 값, Wilder 평균, 이동합과 최근 종가 윈도우)를
+indicator_state 테이블에 보관하여 일일 적재 후에는 새 거래일만 이어서 계산한다.
+"""
+import numpy as np
+import pandas as pd
+
+from common.database import bulk_upsert
+from common.frames import as_day_array, current_state_codes, frame_rows, load_daily_prices, read_frame
+from common.logger import get_logger
+
+logger = get_logger(__name__)
+
+SMA_WINDOWS = (5, 20, 60, 120)
+EMA_FAST = 12
+EMA_SLOW = 26
+MACD_SIGNAL = 9
+RSI_PERIOD = 14
+BB_WINDOW = 20
+BB_WIDTH = 2
+ATR_PERIOD = 14
+
+# 이동합 계산에 필요한 최근 종가 수
+WINDOW = max(SMA_WINDOWS + (BB_WINDOW,))
+
+INDICATOR_COLUMNS = [
+    'sma_5', 'sma_20', 'sma_60', 'sma_120',
+    'ema_12', 'ema_26', 'macd', 'macd_signal', 'macd_hist',
+    'rsi_14', 'bb_upper', 'bb_lower', 'atr_14'
+]
+
+STATE_COLUMNS = [
+    'stock_code', 'trade_date', 'observations', 'prev_close',
+    'ema_fast', 'ema_slow', 'macd_signal', 'avg_gain', 'avg_loss', 'atr',
+    'close_sums', 'close_sumsq', 'close_window'
+]
+
+CREATE_INDICATOR_TABLES_SQL = """
+    CREATE TABLE IF NOT EXISTS indicators (
+        stock_code VARCHAR(10) NOT NULL,
+        trade_date DATE NOT NULL,
+        sma_5 REAL,
+        sma_20 REAL,
+        sma_60 REAL,
+        sma_120 REAL,
+        ema_12 REAL,
+        ema_26 REAL,
+        macd REAL,
+        macd_signal REAL,
+        macd_hist REAL,
+        rsi_14 REAL,
+        bb_upper REAL,
+        bb_lower REAL,
+        atr_14 REAL,
+        PRIMARY KEY (stock_code, trade_date)
+    );
+    CREATE INDEX IF NOT EXISTS idx_indicators_trade_date ON indicators(trade_date DESC);
+
+    CREATE TABLE IF NOT EXISTS indicator_state (
+        stock_code VARCHAR(10) PRIMARY KEY,
+        trade_date DATE NOT NULL,
+        observations INTEGER NOT NULL,
+        prev_close DOUBLE PRECISION,
+        ema_fast DOUBLE PRECISION,
+        ema_slow DOUBLE PRECISION,
+        macd_signal DOUBLE PRECISION,
+        avg_gain DOUBLE PRECISION,
+        avg_loss DOUBLE PRECISION,
+        atr DOUBLE PRECISION,
+        close_sums DOUBLE PRECISION[],
+        close_sumsq DOUBLE PRECISION,
+        close_window DOUBLE PRECISION[],
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+
+class IndicatorState:
+    """종목별 지표 이동 상태 (행: 종목)"""
+
+    def __init__(self, codes):
+        self.codes = [str(code) for code in codes]
+        self.rows = {code: i for i, code in enumerate(self.codes)}
+        n = len(self.codes)
+
+        self.last_date = np.full(n, np.datetime64('NaT'), dtype='datetime64[D]')
+        self.count = np.zeros(n, dtype=np.int64)
+        self.prev_close = np.zeros(n)
+        self.ema_fast = np.zeros(n)
+        self.ema_slow = np.zeros(n)
+        self.macd_signal = np.zeros(n)
+        self.avg_gain = np.zeros(n)
+        self.avg_loss = np.zeros(n)
+        self.atr = np.zeros(n)
+        self.sums = np.zeros((n, len(SMA_WINDOWS)))
+        self.sumsq = np.zeros(n)
+        # 최근 종가 링 버퍼 (observations % WINDOW 위치에 기록)
+        self.window = np.zeros((n, WINDOW))
+
+    def step(self, rows, trade_date, open_, high, low, close):
+        """
+        한 거래일의 시세로 상태를 갱신하고 그날의 지표 값을 반환
+
+        Args:
+            rows: 상태 행 번호 배열 (해당 거래일에 시세가 있는 종목)
+            trade_date: 거래일
+            open_, high, low, close: rows 순서의 시세 배열 (0은 종가로 대체)
+
+        Returns:
+            dict: INDICATOR_COLUMNS별 값 배열 (계산 기간이 부족하면 NaN)
+        """
+        close = np.asarray(close, dtype=np.float64)
+        high = np.where(np.asarray(high) > 0, high, close).astype(np.float64)
+        low = np.where(np.asarray(low) > 0, low, close).astype(np.float64)
+
+        n = self.count[rows]
+        first = n == 0
+        k = n + 1
+        prev = np.where(first, close, self.prev_close[rows])
+
+        # EMA (첫 종가로 시작)
+        ema_fast = np.where(first, close, self.ema_fast[rows] + (close - self.ema_fast[rows]) * (2 / (EMA_FAST + 1)))
+        ema_slow = np.where(first, close, self.ema_slow[rows] + (close - self.ema_slow[rows]) * (2 / (EMA_SLOW + 1)))
+        macd = ema_fast - ema_slow
+        signal = np.where(first, macd,
+                          self.macd_signal[rows] + (macd - self.macd_signal[rows]) * (2 / (MACD_SIGNAL + 1)))
+
+        # RSI (Wilder: 처음 RSI_PERIOD개 변화량은 단순 평균, 이후 1/RSI_PERIOD 지수 평활)
+        diff = close - prev
+        divisor = np.clip(n, 1, RSI_PERIOD)
+        avg_gain = np.where(first, 0.0, self.avg_gain[rows] + (np.maximum(diff, 0) - self.avg_gain[rows]) / divisor)
+        avg_loss = np.where(first, 0.0, self.avg_loss[rows] + (np.maximum(-diff, 0) - self.avg_loss[rows]) / divisor)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(avg_loss > 0, 100 - 100 / (1 + avg_gain / avg_loss),
+                           np.where(avg_gain > 0, 100.0, 50.0))
+
+        # ATR (Wilder 평활, 첫날은 고가-저가)
+        true_range = np.maximum.reduce([high - low, np.abs(high - prev), np.abs(low - prev)])
+        atr = self.atr[rows] + (true_range - self.atr[rows]) / np.minimum(k, ATR_PERIOD)
+
+        # 이동합: 새 종가를 더하고 윈도우를 벗어난 종가를 뺀다
+        sums = self.sums[rows]
+        for j, w in enumerate(SMA_WINDOWS):
+            evicted = self.window[rows, (n - w) % WINDOW]
+            sums[:, j] += close - np.where(n >= w, evicted, 0.0)
+        evicted = self.window[rows, (n - BB_WINDOW) % WINDOW]
+        sumsq = self.sumsq[rows] + close ** 2 - np.where(n >= BB_WINDOW, evicted ** 2, 0.0)
+
+        values = {}
+        for j, w in enumerate(SMA_WINDOWS):
+            values[f'sma_{w}'] = np.where(k >= w, sums[:, j] / w, np.nan)
+
+        bb_mean = sums[:, SMA_WINDOWS.index(BB_WINDOW)] / BB_WINDOW
+        bb_std = np.sqrt(np.maximum(sumsq / BB_WINDOW - bb_mean ** 2, 0.0))
+        values['bb_upper'] = np.where(k >= BB_WINDOW, bb_mean + BB_WIDTH * bb_std, np.nan)
+        values['bb_lower'] = np.where(k >= BB_WINDOW, bb_mean - BB_WIDTH * bb_std, np.nan)
+
+        values['ema_12'] = np.where(k >= EMA_FAST, ema_fast, np.nan)
+        values['ema_26'] = np.where(k >= EMA_SLOW, ema_slow, np.nan)
+        values['macd'] = np.where(k >= EMA_SLOW, macd, np.nan)
+        values['macd_signal'] = np.where(k >= EMA_SLOW + MACD_SIGNAL - 1, signal, np.nan)
+        values['macd_hist'] = values['macd'] - values['macd_signal']
+        values['rsi_14'] = np.where(n >= RSI_PERIOD, rsi, np.nan)
+        values['atr_14'] = np.where(k >= ATR_PERIOD, atr, np.nan)
+
+        # 상태 반영
+        self.window[rows, n % WINDOW] = close
+        self.sums[rows] = sums
+        self.sumsq[rows] = sumsq
+        self.count[rows] = k
+        self.prev_close[rows] = close
+        self.ema_fast[rows] = ema_fast
+        self.ema_slow[rows] = ema_slow
+        self.macd_signal[rows] = signal
+        self.avg_gain[rows] = avg_gain
+        self.avg_loss[rows] = avg_loss
+        self.atr[rows] = atr
+        self.last_date[rows] = trade_date
+
+        return values
+
+    @classmethod
+    def from_frame(cls, df):
+        """indicator_state 조회 결과로 상태 복원"""
+        state = cls(df['stock_code'])
+        if df.empty:
+            return state
+
+        state.last_date[:] = as_day_array(df['trade_date'])
+        state.count[:] = df['observations'].to_numpy(dtype=np.int64)
+        for name in ('prev_close', 'ema_fast', 'ema_slow', 'macd_signal', 'avg_gain', 'avg_loss', 'atr'):
+            getattr(state, name)[:] = df[name].to_numpy(dtype=np.float64)
+        state.sums[:] = np.array(df['close_sums'].tolist(), dtype=np.float64)
+        state.sumsq[:] = df['close_sumsq'].to_numpy(dtype=np.float64)
+
+        # 저장된 윈도우(오래된 순)를 링 버퍼 위치로 되돌림
+        for i, closes in enumerate(df['close_window']):
+            closes = np.asarray(closes, dtype=np.float64)
+            positions = (state.count[i] - len(closes) + np.arange(len(closes))) % WINDOW
+            state.window[i, positions] = closes
+
+        return state
+
+    def to_rows(self, rows=None):
+        """indicator_state 저장용 행 튜플 목록"""
+        rows = np.arange(len(self.codes)) if rows is None else np.asarray(rows)
+        counts = self.count[rows]
+        ordered = np.take_along_axis(
+            self.window[rows],
+            (counts[:, None] - WINDOW + np.arange(WINDOW)[None, :]) % WINDOW,
+            axis=1
+        )
+        dates = self.last_date[rows].astype(object)
+
+        result = []
+        for i, row in enumerate(rows):
+            size = int(min(counts[i], WINDOW))
+            result.append((
+                self.codes[row], dates[i], int(counts[i]), float(self.prev_close[row]),
+                float(self.ema_fast[row]), float(self.ema_slow[row]), float(self.macd_signal[row]),
+                float(self.avg_gain[row]), float(self.avg_loss[row]), float(self.atr[row]),
+                self.sums[row].tolist(), float(self.sumsq[row]), ordered[i, WINDOW - size:].tolist()
+            ))
+        return result
+
+
+def _valid_prices(prices):
+    """종가가 있는 행만 거래일, 종목 순으로 정렬"""
+    prices = prices[prices['close_price'] > 0]
+    return prices.sort_values(['trade_date', 'stock_code'], kind='stable')
+
+
+def _run_days(state, prices):
+    """거래일 순서대로 step을 적용하여 지표 DataFrame 생성"""
+    codes = prices['stock_code'].astype(str).to_numpy()
+    days = as_day_array(prices['trade_date'])
+    rows = np.array([state.rows[code] for code in codes], dtype=np.int64)
+    ohlc = [prices[name].to_numpy(dtype=np.float64)
+            for name in ('open_price', 'high_price', 'low_price', 'close_price')]
+
+    output = {name: np.empty(len(codes), dtype=np.float32) for name in INDICATOR_COLUMNS}
+    boundaries = np.flatnonzero(days[1:] != days[:-1]) + 1
+    starts = np.concatenate([[0], boundaries]) if len(days) else np.array([], dtype=np.int64)
+    ends = np.append(starts[1:], len(days))
+
+    for start, end in zip(starts, ends):
+        values = state.step(rows[start:end], days[start], *(column[start:end] for column in ohlc))
+        for name in INDICATOR_COLUMNS:
+            output[name][start:end] = values[name]
+
+    frame = pd.DataFrame({'stock_code': codes, 'trade_date': pd.to_datetime(days)})
+    for name in INDICATOR_COLUMNS:
+        frame[name] = output[name]
+    return frame
+
+
+def compute_indicators(prices):
+    """
+    일별 시세 전체로 지표 계산
+
+    Args:
+        prices: stock_code, trade_date, OHLC 컬럼을 가진 DataFrame
+
+    Returns:
+        tuple: (지표 DataFrame, 마지막 거래일 기준 IndicatorState)
+    """
+    prices = _valid_prices(prices)
+    state = IndicatorState(np.unique(prices['stock_code'].astype(str)))
+    return _run_days(state, prices), state
+
+
+def _write(cursor, frame, state, state_rows=None):
+    columns = ['stock_code', 'trade_date'] + INDICATOR_COLUMNS
+    count = bulk_upsert(cursor, 'indicators', columns, frame_rows(frame, columns),
+                        conflict_columns=['stock_code', 'trade_date'], page_size=5000)
+    bulk_upsert(cursor, 'indicator_state', STATE_COLUMNS, state.to_rows(state_rows),
+                conflict_columns=['stock_code'])
+    return count
+
+
+def _recompute(cursor, stock_codes, since):
+    """종목 전체 히스토리로 지표를 다시 계산하고 since 이후 행만 저장"""
+    prices = load_daily_prices(stock_codes=list(stock_codes))
+    if prices.empty:
+        return 0
+
+    frame, state = compute_indicators(prices)
+    frame = frame[as_day_array(frame['trade_date']) >= since]
+    return _write(cursor, frame, state)
+
+
+def update_indicators(conn, trade_dates):
+    """
+    적재된 거래일의 지표를 이동 상태에서 이어서 계산 (커밋은 호출자 담당)
+
+    저장된 상태가 없거나 상태 기준일이 첫 적재일 직전 거래일이 아닌 종목(재적재, 과거 데이터 보충,
+    적재가 빠진 거래일이 있는 경우)은 해당 종목 전체 히스토리로 다시 계산한다.
+    """
+    days = np.unique(as_day_array(trade_dates))
+    if not len(days):
+        return 0
+
+    prices = _valid_prices(read_frame("""
+        SELECT stock_code, trade_date, open_price, high_price, low_price, close_price
+        FROM daily_prices
+        WHERE trade_date = ANY(%s::date[])
+    """, ([str(d) for d in days],), conn=conn))
+    if prices.empty:
+        return 0
+
+    codes = prices['stock_code'].astype(str).unique().tolist()
+
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_INDICATOR_TABLES_SQL)
+
+        saved = read_frame(
+            f"SELECT {', '.join(STATE_COLUMNS)} FROM indicator_state WHERE stock_code = ANY(%s)",
+            (codes,), conn=conn
+        )
+        if not saved.empty:
+            saved = saved[saved['stock_code'].astype(str).isin(current_state_codes(saved, days, conn=conn))]
+        state = IndicatorState.from_frame(saved) if not saved.empty else IndicatorState([])
+
+        carried = prices['stock_code'].astype(str).isin(state.rows)
+        recompute_codes = sorted(set(codes) - set(state.rows))
+
+        count = 0
+        if carried.any():
+            frame = _run_days(state, prices[carried])
+            count += _write(cursor, frame, state)
+        if recompute_codes:
+            count += _recompute(cursor, recompute_codes, days[0])
+
+    logger.info(f"  📐 indicators {len(codes):,}개 종목 갱신 "
+                f"(이어서 계산 {len(state.codes):,}, 전체 재계산 {len(recompute_codes):,}) {count:,}건")
+    return count
+
+
+def rebuild_indicators(conn, batch_size=500):
+    """전체 종목 지표 재계산 (초기 적재용, 커밋은 호출자 담당)"""
+    prices = load_daily_prices()
+    if prices.empty:
+        return 0
+
+    codes = np.unique(prices['stock_code'].astype(str))
+    stock_codes = prices['stock_code'].astype(str)
+
+    count = 0
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_INDICATOR_TABLES_SQL)
+        for i in range(0, len(codes), batch_size):
+            batch = prices[stock_codes.isin(codes[i:i + batch_size])]
+            frame, state = compute_indicators(batch)
+            count += _write(cursor, frame, state)
+            logger.info(f"📐 indicators {min(i + batch_size, len(codes)):,}/{len(codes):,} 종목 ({count:,}건)")
+
+    return count
@@ -0,0 +1,161 @@
+"""일별 시가총액 이력 모듈
+
+stocks.market_cap은 최신 값만 가지므로 거래일별 상장주식수(lstgStCnt)와 시가총액(mrktTotAmt)을
+daily_market_cap 테이블에 누적한다.
+
+- 수집기: 일별 시세와 같은 트랜잭션에서 API 값을 저장 (source='api')
+- 과거 구간/누락분: 종가 × 상장주식수를 벡터 연산으로 계산하여 채움 (source='computed')
+  상장주식수는 종목별 가장 최근 API 값(없으면 stocks.listed_shares)을 기준으로
+  수정주가 조정계수(분할/병합)만큼 되돌려 추정한다.
+"""
+import numpy as np
+import pandas as pd
+
+from common.database import bulk_upsert
+from common.frames import as_day_array, frame_rows, read_frame
+from common.logger import get_logger
+
+from .adjustments import adjust_prices, load_factors
+
+logger = get_logger(__name__)
+
+MARKET_CAP_COLUMNS = ['stock_code', 'trade_date', 'close_price', 'listed_shares', 'market_cap', 'source']
+
+CREATE_DAILY_MARKET_CAP_SQL = """
+    CREATE TABLE IF NOT EXISTS daily_market_cap (
+        stock_code VARCHAR(10) NOT NULL,
+        trade_date DATE NOT NULL,
+        close_price INTEGER,
+        listed_shares BIGINT,
+        market_cap BIGINT,
+        source VARCHAR(10) NOT NULL DEFAULT 'api',
+        PRIMARY KEY (stock_code, trade_date)
+    );
+    CREATE INDEX IF NOT EXISTS idx_daily_market_cap_date ON daily_market_cap(trade_date DESC, market_cap DESC);
+"""
+
+
+def _to_int(value):
+    try:
+        return int(float(value)) if value not in (None, '') else None
+    except (ValueError, TypeError):
+        return None
+
+
+def market_cap_rows(items, trade_date):
+    """API 응답 항목 → daily_market_cap 저장용 행 (종가 0 또는 주식수/시총이 모두 없는 항목 제외)"""
+    rows = []
+    for item in items:
+        close_price = _to_int(item.get('clpr'))
+        listed_shares = _to_int(item.get('lstgStCnt'))
+        market_cap = _to_int(item.get('mrktTotAmt'))
+        if not close_price or (listed_shares is None and market_cap is None):
+            continue
+        if market_cap is None:
+            market_cap = close_price * listed_shares
+        rows.append((item.get('srtnCd', ''), trade_date, close_price, listed_shares, market_cap, 'api'))
+    return rows
+
+
+def save_market_cap_rows(cursor, rows):
+    """수집기 API 값을 daily_market_cap에 일괄 저장 (커밋은 호출자 담당)"""
+    if not rows:
+        return 0
+    cursor.execute(CREATE_DAILY_MARKET_CAP_SQL)
+    return bulk_upsert(cursor, 'daily_market_cap', MARKET_CAP_COLUMNS, rows,
+                       conflict_columns=['stock_code', 'trade_date'])
+
+
+def compute_market_cap(prices, anchors, factors):
+    """
+    종가 × 추정 상장주식수로 시가총액 계산
+
+    Args:
+        prices: stock_code, trade_date, close_price 컬럼의 채울 대상 시세
+        anchors: stock_code, anchor_date, anchor_shares (종목별 기준 상장주식수)
+        factors: 수정주가 조정계수 (adjustment_factors)
+
+    Returns:
+        pandas.DataFrame: MARKET_CAP_COLUMNS 컬럼 (주식수를 알 수 없는 종목 제외)
+    """
+    anchors = anchors.dropna(subset=['anchor_shares'])
+    frame = prices[['stock_code', 'trade_date', 'close_price']].copy()
+    frame['stock_code'] = frame['stock_code'].astype(str)
+    frame = frame.merge(anchors, on='stock_code', how='inner')
+    if frame.empty:
+        return pd.DataFrame(columns=MARKET_CAP_COLUMNS)
+
+    # 주식수(t) = 기준 주식수 × 계수(t) / 계수(기준일): 분할 전 주식수는 분할 비율만큼 적음
+    price_factor = adjust_prices(frame[['stock_code', 'trade_date']], factors)['adj_factor'].to_numpy()
+    anchor_factor = adjust_prices(
+        frame[['stock_code']].assign(trade_date=frame['anchor_date']), factors
+    )['adj_factor'].to_numpy()
+    shares = np.round(frame['anchor_shares'].to_numpy(dtype=np.float64) * price_factor / anchor_factor)
+
+    result = pd.DataFrame({
+        'stock_code': frame['stock_code'],
+        'trade_date': pd.to_datetime(as_day_array(frame['trade_date'])),
+        'close_price': frame['close_price'].to_numpy(dtype=np.int64),
+        'listed_shares': shares.astype(np.int64),
+    })
+    result['market_cap'] = result['close_price'] * result['listed_shares']
+    result['source'] = 'computed'
+    return result[MARKET_CAP_COLUMNS]
+
+
+def _anchors(conn):
+    """종목별 기준 상장주식수 (가장 최근 API 값, 없으면 stocks.listed_shares)"""
+    return read_frame("""
+        SELECT s.stock_code,
+               COALESCE(mc.trade_date, CURRENT_DATE) AS anchor_date,
+               COALESCE(mc.listed_shares, s.listed_shares) AS anchor_shares
+        FROM stocks s
+        LEFT JOIN LATERAL (
+            SELECT trade_date, listed_shares
+            FROM daily_market_cap m
+            WHERE m.stock_code = s.stock_code AND m.source = 'api' AND m.listed_shares IS NOT NULL
+            ORDER BY trade_date DESC
+            LIMIT 1
+        ) mc ON true
+    """, conn=conn)
+
+
+def fill_market_cap_gaps(conn, trade_dates=None):
+    """
+    daily_prices에는 있고 daily_market_cap에는 없는 행을 계산값으로 채움 (커밋은 호출자 담당)
+
+    Args:
+        trade_dates: 대상 거래일 목록 (None이면 전체 히스토리)
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_DAILY_MARKET_CAP_SQL)
+
+    days = [str(d) for d in np.unique(as_day_array(trade_dates))] if trade_dates is not None else None
+    missing = read_frame("""
+        SELECT dp.stock_code, dp.trade_date, dp.close_price
+        FROM daily_prices dp
+        LEFT JOIN daily_market_cap mc
+          ON mc.stock_code = dp.stock_code AND mc.trade_date = dp.trade_date
+        WHERE mc.stock_code IS NULL
+          AND dp.close_price > 0
+          AND (%s::date[] IS NULL OR dp.trade_date = ANY(%s::date[]))
+    """, (days, days), conn=conn)
+    if missing.empty:
+        return 0
+
+    codes = missing['stock_code'].astype(str).unique().tolist()
+    computed = compute_market_cap(missing, _anchors(conn), load_factors(codes, conn=conn))
+
+    with conn.cursor() as cursor:
+        count = bulk_upsert(cursor, 'daily_market_cap', MARKET_CAP_COLUMNS,
+                            frame_rows(computed, MARKET_CAP_COLUMNS),
+                            conflict_columns=['stock_code', 'trade_date'], update_columns=[],
+                            page_size=5000)
+
+    logger.info(f"  💰 daily_market_cap 누락분 계산 {count:,}건 (대상 {len(missing):,}건)")
+    return count
+
+
+def rebuild_market_cap(conn):
+    """전체 히스토리 누락분 계산 (초기 적재용, API 값은 유지)"""
+    return fill_market_cap_gaps(conn)
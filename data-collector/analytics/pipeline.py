@@ -0,0 +1,112 @@
+"""수집 후처리 파이프라인 모듈
+
+수집기가 거래일 시세를 저장한 뒤 호출하여, 사전 집계 테이블 등
+파생 데이터를 해당 거래일 기준으로 증분 갱신한다.
+각 단계는 독립적으로 커밋되며, 한 단계가 실패해도 나머지 단계는 계속 실행한다.
+"""
+from common.database import get_db_connection
+from common.frames import mark_ingested
+from common.logger import get_logger, log_exception
+
+from . import (activity, adjustments, bars, coverage, daily_coverage, downsample, extremes, fundamentals, indicators,
+               market_cap, ranks, risk, screener)
+
+logger = get_logger(__name__)
+
+# (단계 키, 설명, 함수(conn, trade_dates)) - 등록 순서대로 실행
+POST_INGEST_STAGES = [
+    ('coverage', '커버리지 비트맵', coverage.update_coverage),
+    ('adjustments', '수정주가 조정계수', adjustments.update_adjustments),
+    ('market_cap', '일별 시가총액', market_cap.fill_market_cap_gaps),
+    ('ranks', '거래일별 순위', ranks.update_ranks),
+    ('bars', '주봉/월봉 집계', bars.update_bars),
+    ('chart_series', '차트 축소 시계열', downsample.update_chart_series),
+    ('indicators', '기술적 지표', indicators.update_indicators),
+    ('extremes', '52주 최고/최저', extremes.update_extremes),
+    ('risk', '변동성/베타', risk.update_risk),
+    ('valuation', 'PER/PBR/PSR', fundamentals.update_valuation),
+    ('screener', '스크리너 스냅샷', screener.refresh_snapshot),
+]
+
+# (단계 키, 설명, 함수(conn)) - 전체 히스토리 재계산 (초기 적재용)
+REBUILD_STAGES = [
+    ('coverage', '커버리지 비트맵', coverage.rebuild_coverage),
+    ('adjustments', '수정주가 조정계수', adjustments.rebuild_adjustments),
+    ('market_cap', '일별 시가총액', market_cap.rebuild_market_cap),
+    ('ranks', '거래일별 순위', ranks.rebuild_ranks),
+    ('bars', '주봉/월봉 집계', bars.rebuild_bars),
+    ('chart_series', '차트 축소 시계열', downsample.rebuild_chart_series),
+    ('indicators', '기술적 지표', indicators.rebuild_indicators),
+    ('extremes', '52주 최고/최저', extremes.rebuild_extremes),
+    ('risk', '변동성/베타', risk.rebuild_risk),
+    ('valuation', 'TTM 재무/PER/PBR/PSR', fundamentals.rebuild_fundamentals),
+    # 이상 거래와 수집 현황 요약은 수집기가 시세 저장 트랜잭션에서 기록하므로 재계산 단계만 등록
+    ('activity', '이상 거래', activity.rebuild_unusual_activity),
+    ('daily_coverage', '수집 현황 요약', daily_coverage.rebuild_daily_coverage),
+    ('screener', '스크리너 스냅샷', screener.rebuild_snapshot),
+]
+
+
+def run_post_ingest(trade_dates, conn=None):
+    """
+    거래일 적재 후처리 실행
+
+    Args:
+        trade_dates: 적재된 거래일 ('YYYY-MM-DD' 문자열 또는 목록)
+        conn: 사용할 연결 (None이면 커넥션 풀 사용)
+
+    Returns:
+        dict: 단계별 성공 여부
+    """
+    if isinstance(trade_dates, str):
+        trade_dates = [trade_dates]
+
+    if conn is None:
+        with get_db_connection() as pooled_conn:
+            return run_post_ingest(trade_dates, conn=pooled_conn)
+
+    # DataFrame 캐시 무효화 (후처리 단계들은 갱신된 전체 히스토리 캐시를 공유)
+    with conn.cursor() as cursor:
+        mark_ingested(cursor, max(trade_dates))
+    conn.commit()
+
+    results = {}
+    for key, label, stage in POST_INGEST_STAGES:
+        try:
+            stage(conn, trade_dates)
+            conn.commit()
+            results[key] = True
+        except Exception as e:
+            conn.rollback()
+            log_exception(logger, f"  ❌ 후처리 실패: {label} ({e})")
+            results[key] = False
+
+    return results
+
+
+def run_rebuild(stage_keys=None):
+    """
+    파생 데이터 전체 재계산
+
+    Args:
+        stage_keys: 실행할 단계 키 목록 (None이면 전체)
+
+    Returns:
+        dict: 단계별 성공 여부
+    """
+    results = {}
+    with get_db_connection() as conn:
+        for key, label, stage in REBUILD_STAGES:
+            if stage_keys and key not in stage_keys:
+                continue
+            try:
+                logger.info(f"🔄 재계산 시작: {label}")
+                stage(conn)
+                conn.commit()
+                results[key] = True
+            except Exception as e:
+                conn.rollback()
+                log_exception(logger, f"❌ 재계산 실패: {label} ({e})")
+                results[key] = False
+
+    return results
@@ -0,0 +1,175 @@
+"""거래일별 횡단면 순위 모듈
+
+적재된 거래일마다 시장구분(market_type)별로 시가총액, 거래대금, 거래량, 등락률의
+dense rank(값이 클수록 1위, 동일 값은 같은 순위)를 계산하여 daily_ranks 테이블에 저장한다.
+상위 N개 목록과 종목별 순위 이력을 인덱스 범위 조회로 처리하기 위한 사전 계산이다.
+"""
+import numpy as np
+import pandas as pd
+
+from common.database import bulk_upsert
+from common.frames import as_day_array, frame_rows, read_frame
+from common.logger import get_logger
+
+from .market_cap import CREATE_DAILY_MARKET_CAP_SQL
+
+logger = get_logger(__name__)
+
+# 순위 지표 → 값 컬럼
+RANK_METRICS = {
+    'market_cap': 'market_cap',
+    'trading_value': 'trading_value',
+    'volume': 'volume',
+    'return': 'change_rate',
+}
+
+RANK_COLUMNS = ['trade_date', 'market_type', 'rank_metric', 'stock_code', 'value', 'rank']
+
+CREATE_DAILY_RANKS_SQL = """
+    CREATE TABLE IF NOT EXISTS daily_ranks (
+        trade_date DATE NOT NULL,
+        market_type VARCHAR(20) NOT NULL,
+        rank_metric VARCHAR(20) NOT NULL,
+        stock_code VARCHAR(10) NOT NULL,
+        value DOUBLE PRECISION,
+        rank INTEGER NOT NULL,
+        PRIMARY KEY (trade_date, rank_metric, stock_code)
+    );
+    CREATE INDEX IF NOT EXISTS idx_daily_ranks_top
+        ON daily_ranks(trade_date, market_type, rank_metric, rank);
+    CREATE INDEX IF NOT EXISTS idx_daily_ranks_stock
+        ON daily_ranks(stock_code, rank_metric, trade_date DESC);
+"""
+
+
+def dense_rank_desc(groups, values):
+    """
+    그룹별 내림차순 dense rank (정렬 한 번으로 전체 그룹 처리)
+
+    Args:
+        groups: 그룹 번호 배열 (정수)
+        values: 값 배열 (NaN 없음)
+
+    Returns:
+        numpy.ndarray: 입력 순서의 순위 (1부터)
+    """
+    groups = np.asarray(groups)
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return np.array([], dtype=np.int64)
+
+    order = np.lexsort((-values, groups))
+    g = groups[order]
+    v = values[order]
+
+    group_start = np.concatenate([[True], g[1:] != g[:-1]])
+    new_value = group_start | np.concatenate([[True], v[1:] != v[:-1]])
+    counter = np.cumsum(new_value)
+    # 그룹 시작 위치의 카운터를 1로 맞춤
+    base = np.maximum.accumulate(np.where(group_start, counter - 1, 0))
+
+    ranks = np.empty(len(values), dtype=np.int64)
+    ranks[order] = counter - base
+    return ranks
+
+
+def compute_ranks(frame):
+    """
+    거래일 × 시장구분별 지표 순위 계산
+
+    Args:
+        frame: trade_date, market_type, stock_code와 RANK_METRICS 값 컬럼을 가진 DataFrame
+
+    Returns:
+        pandas.DataFrame: RANK_COLUMNS 컬럼
+    """
+    if frame.empty:
+        return pd.DataFrame(columns=RANK_COLUMNS)
+
+    days = as_day_array(frame['trade_date'])
+    markets = frame['market_type'].astype(str).to_numpy()
+    codes = frame['stock_code'].astype(str).to_numpy()
+
+    # (거래일, 시장구분) 조합을 정수 그룹 번호로
+    market_ids, market_names = pd.factorize(markets)
+    day_numbers = days.astype(np.int64)
+    groups = (day_numbers - day_numbers.min()) * len(market_names) + market_ids
+
+    results = []
+    for metric, column in RANK_METRICS.items():
+        values = pd.to_numeric(frame[column]).to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = np.isfinite(values)
+        if not valid.any():
+            continue
+        results.append(pd.DataFrame({
+            'trade_date': pd.to_datetime(days[valid]),
+            'market_type': markets[valid],
+            'rank_metric': metric,
+            'stock_code': codes[valid],
+            'value': values[valid],
+            'rank': dense_rank_desc(groups[valid], values[valid]),
+        }))
+
+    if not results:
+        return pd.DataFrame(columns=RANK_COLUMNS)
+    return pd.concat(results, ignore_index=True)[RANK_COLUMNS]
+
+
+def _rank_inputs(conn, days):
+    return read_frame("""
+        SELECT dp.trade_date, s.market_type, dp.stock_code,
+               mc.market_cap,
+               COALESCE(dp.trading_value, CAST(dp.close_price AS BIGINT) * dp.volume) AS trading_value,
+               dp.volume,
+               dp.change_rate
+        FROM daily_prices dp
+        JOIN stocks s ON s.stock_code = dp.stock_code
+        LEFT JOIN daily_market_cap mc
+          ON mc.stock_code = dp.stock_code AND mc.trade_date = dp.trade_date
+        WHERE dp.close_price > 0
+          AND s.market_type IS NOT NULL
+          AND dp.trade_date = ANY(%s::date[])
+    """, (days,), conn=conn)
+
+
+def _write_ranks(cursor, ranks):
+    return bulk_upsert(cursor, 'daily_ranks', RANK_COLUMNS, frame_rows(ranks, RANK_COLUMNS),
+                       conflict_columns=['trade_date', 'rank_metric', 'stock_code'], page_size=5000)
+
+
+def update_ranks(conn, trade_dates):
+    """적재된 거래일의 순위 재계산 (해당 거래일 기존 순위는 교체, 커밋은 호출자 담당)"""
+    days = [str(d) for d in np.unique(as_day_array(trade_dates))]
+    if not days:
+        return 0
+
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_DAILY_MARKET_CAP_SQL)
+        cursor.execute(CREATE_DAILY_RANKS_SQL)
+
+        ranks = compute_ranks(_rank_inputs(conn, days))
+        cursor.execute("DELETE FROM daily_ranks WHERE trade_date = ANY(%s::date[])", (days,))
+        count = _write_ranks(cursor, ranks)
+
+    logger.info(f"  🏆 daily_ranks {len(days)}개 거래일 갱신 ({count:,}건)")
+    return count
+
+
+def rebuild_ranks(conn, batch_days=20):
+    """전체 거래일 순위 재계산 (초기 적재용, 거래일 묶음 단위로 계산, 커밋은 호출자 담당)"""
+    days = read_frame("SELECT DISTINCT trade_date FROM daily_prices ORDER BY trade_date", conn=conn)
+    if days.empty:
+        return 0
+    days = [str(d) for d in as_day_array(days['trade_date'])]
+
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_DAILY_MARKET_CAP_SQL)
+        cursor.execute(CREATE_DAILY_RANKS_SQL)
+        cursor.execute("TRUNCATE daily_ranks")
+
+        count = 0
+        for i in range(0, len(days), batch_days):
+            count += _write_ranks(cursor, compute_ranks(_rank_inputs(conn, days[i:i + batch_days])))
+            logger.info(f"🏆 daily_ranks {min(i + batch_days, len(days)):,}/{len(days):,} 거래일 ({count:,}건)")
+
+    return count
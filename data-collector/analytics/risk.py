@@ -0,0 +1,365 @@
+"""변동성/베타 계산 모듈
+
+시장구분별 시가총액 가중 수익률(KOSPI, KOSDAQ)을 벤치마크로 만들어 benchmark_returns에 저장하고,
+종목마다 60/120/250거래일 이동 구간의 실현 변동성, 벤치마크 대비 베타, 고유 변동성(잔차 변동성)을
+risk_metrics 테이블에 저장한다.
+
+- 수익률: API 등락률(fltRt, 기준가 대비이므로 분할/병합일에도 연속) / 100
+- 벤치마크: Σ 전일 시가총액 × 수익률 / Σ 전일 시가총액 (전일 시가총액 = 당일 시가총액 / (1 + 수익률))
+- 이동 합(Σx, Σy, Σx², Σy², Σxy)과 최근 수익률 윈도우를 risk_state에 보관하여
+  일일 적재 후에는 새 거래일만 이어서 계산한다 (하루치 갱신은 종목 방향으로 벡터화).
+"""
+import numpy as np
+import pandas as pd
+
+from common.database import bulk_upsert
+from common.frames import as_day_array, current_state_codes, frame_rows, read_frame
+from common.logger import get_logger
+
+from .market_cap import CREATE_DAILY_MARKET_CAP_SQL
+
+logger = get_logger(__name__)
+
+RISK_WINDOWS = (60, 120, 250)
+WINDOW = max(RISK_WINDOWS)
+TRADING_DAYS_PER_YEAR = 250
+
+# 시장구분 → 벤치마크 (그 외 시장구분은 DEFAULT_BENCHMARK)
+BENCHMARKS = ('KOSPI', 'KOSDAQ')
+DEFAULT_BENCHMARK = 'KOSPI'
+
+RISK_COLUMNS = (
+    [f'vol_{w}' for w in RISK_WINDOWS]
+    + [f'beta_{w}' for w in RISK_WINDOWS]
+    + [f'idio_vol_{w}' for w in RISK_WINDOWS]
+)
+
+# 윈도우별 이동 합 순서
+_SUM_FIELDS = ('x', 'y', 'xx', 'yy', 'xy')
+
+STATE_COLUMNS = ['stock_code', 'trade_date', 'benchmark', 'observations', 'sums', 'stock_window', 'benchmark_window']
+
+CREATE_RISK_TABLES_SQL = """
+    CREATE TABLE IF NOT EXISTS benchmark_returns (
+        benchmark VARCHAR(20) NOT NULL,
+        trade_date DATE NOT NULL,
+        ret DOUBLE PRECISION NOT NULL,
+        constituents INTEGER NOT NULL,
+        PRIMARY KEY (benchmark, trade_date)
+    );
+
+    CREATE TABLE IF NOT EXISTS risk_metrics (
+        stock_code VARCHAR(10) NOT NULL,
+        trade_date DATE NOT NULL,
+        benchmark VARCHAR(20) NOT NULL,
+        vol_60 REAL,
+        vol_120 REAL,
+        vol_250 REAL,
+        beta_60 REAL,
+        beta_120 REAL,
+        beta_250 REAL,
+        idio_vol_60 REAL,
+        idio_vol_120 REAL,
+        idio_vol_250 REAL,
+        PRIMARY KEY (stock_code, trade_date)
+    );
+    CREATE INDEX IF NOT EXISTS idx_risk_metrics_trade_date ON risk_metrics(trade_date DESC);
+
+    CREATE TABLE IF NOT EXISTS risk_state (
+        stock_code VARCHAR(10) PRIMARY KEY,
+        trade_date DATE NOT NULL,
+        benchmark VARCHAR(20) NOT NULL,
+        observations INTEGER NOT NULL,
+        sums DOUBLE PRECISION[],
+        stock_window DOUBLE PRECISION[],
+        benchmark_window DOUBLE PRECISION[],
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+BENCHMARK_SQL = f"""
+    SELECT dp.trade_date, s.market_type AS benchmark,
+           SUM(mc.market_cap / (1 + dp.change_rate / 100.0) * dp.change_rate / 100.0)
+               / SUM(mc.market_cap / (1 + dp.change_rate / 100.0)) AS ret,
+           COUNT(*) AS constituents
+    FROM daily_prices dp
+    JOIN stocks s ON s.stock_code = dp.stock_code
+    JOIN daily_market_cap mc ON mc.stock_code = dp.stock_code AND mc.trade_date = dp.trade_date
+    WHERE s.market_type IN ({', '.join(f"'{name}'" for name in BENCHMARKS)})
+      AND dp.close_price > 0
+      AND dp.change_rate IS NOT NULL
+      AND dp.change_rate > -100
+      AND mc.market_cap > 0
+      AND (%s::date[] IS NULL OR dp.trade_date = ANY(%s::date[]))
+    GROUP BY dp.trade_date, s.market_type
+"""
+
+RETURNS_SQL = f"""
+    SELECT dp.stock_code, dp.trade_date, b.benchmark,
+           dp.change_rate / 100.0 AS stock_ret, b.ret AS benchmark_ret
+    FROM daily_prices dp
+    JOIN stocks s ON s.stock_code = dp.stock_code
+    JOIN benchmark_returns b
+      ON b.trade_date = dp.trade_date
+     AND b.benchmark = CASE WHEN s.market_type IN ({', '.join(f"'{name}'" for name in BENCHMARKS)})
+                            THEN s.market_type ELSE '{DEFAULT_BENCHMARK}' END
+    WHERE dp.close_price > 0
+      AND dp.change_rate IS NOT NULL
+      AND (%s::date[] IS NULL OR dp.trade_date = ANY(%s::date[]))
+      AND (%s::text[] IS NULL OR dp.stock_code = ANY(%s::text[]))
+"""
+
+
+class RiskState:
+    """종목별 수익률 이동 합과 최근 수익률 링 버퍼 (행: 종목)"""
+
+    def __init__(self, codes):
+        self.codes = [str(code) for code in codes]
+        self.rows = {code: i for i, code in enumerate(self.codes)}
+        n = len(self.codes)
+
+        self.last_date = np.full(n, np.datetime64('NaT'), dtype='datetime64[D]')
+        self.benchmark = np.full(n, DEFAULT_BENCHMARK, dtype=object)
+        self.count = np.zeros(n, dtype=np.int64)
+        # [종목, 윈도우, Σx/Σy/Σx²/Σy²/Σxy]
+        self.sums = np.zeros((n, len(RISK_WINDOWS), len(_SUM_FIELDS)))
+        # 최근 수익률 링 버퍼 (observations % WINDOW 위치에 기록)
+        self.x_window = np.zeros((n, WINDOW))
+        self.y_window = np.zeros((n, WINDOW))
+
+    def step(self, rows, trade_date, stock_ret, benchmark_ret):
+        """
+        한 거래일 수익률로 상태를 갱신하고 그날의 위험 지표를 반환
+
+        Args:
+            rows: 상태 행 번호 배열 (해당 거래일에 수익률이 있는 종목)
+            trade_date: 거래일
+            stock_ret, benchmark_ret: rows 순서의 종목/벤치마크 수익률
+
+        Returns:
+            dict: RISK_COLUMNS별 값 배열 (구간이 덜 찼으면 NaN)
+        """
+        x = np.asarray(stock_ret, dtype=np.float64)
+        y = np.asarray(benchmark_ret, dtype=np.float64)
+        n = self.count[rows]
+        k = n + 1
+        added = np.stack([x, y, x * x, y * y, x * y], axis=1)
+
+        sums = self.sums[rows]
+        values = {}
+        for j, w in enumerate(RISK_WINDOWS):
+            position = (n - w) % WINDOW
+            old_x = np.where(n >= w, self.x_window[rows, position], 0.0)
+            old_y = np.where(n >= w, self.y_window[rows, position], 0.0)
+            removed = np.stack([old_x, old_y, old_x * old_x, old_y * old_y, old_x * old_y], axis=1)
+            sums[:, j] += added - removed
+
+            sx, sy, sxx, syy, sxy = sums[:, j].T
+            var_x = np.maximum(sxx - sx * sx / w, 0.0) / (w - 1)
+            var_y = np.maximum(syy - sy * sy / w, 0.0) / (w - 1)
+            cov = (sxy - sx * sy / w) / (w - 1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                beta = np.where(var_y > 0, cov / var_y, np.nan)
+            residual = np.maximum(var_x - np.nan_to_num(beta) * cov, 0.0)
+
+            full = k >= w
+            values[f'vol_{w}'] = np.where(full, np.sqrt(var_x * TRADING_DAYS_PER_YEAR), np.nan)
+            values[f'beta_{w}'] = np.where(full, beta, np.nan)
+            values[f'idio_vol_{w}'] = np.where(full & np.isfinite(beta),
+                                               np.sqrt(residual * TRADING_DAYS_PER_YEAR), np.nan)
+
+        self.x_window[rows, n % WINDOW] = x
+        self.y_window[rows, n % WINDOW] = y
+        self.sums[rows] = sums
+        self.count[rows] = k
+        self.last_date[rows] = trade_date
+
+        return values
+
+    @classmethod
+    def from_frame(cls, df):
+        """risk_state 조회 결과로 상태 복원"""
+        state = cls(df['stock_code'])
+        if df.empty:
+            return state
+
+        state.last_date[:] = as_day_array(df['trade_date'])
+        state.benchmark[:] = df['benchmark'].astype(str).to_numpy()
+        state.count[:] = df['observations'].to_numpy(dtype=np.int64)
+        state.sums[:] = np.array(df['sums'].tolist(), dtype=np.float64).reshape(state.sums.shape)
+
+        # 저장된 윈도우(오래된 순)를 링 버퍼 위치로 되돌림
+        for i, (xs, ys) in enumerate(zip(df['stock_window'], df['benchmark_window'])):
+            xs = np.asarray(xs, dtype=np.float64)
+            positions = (state.count[i] - len(xs) + np.arange(len(xs))) % WINDOW
+            state.x_window[i, positions] = xs
+            state.y_window[i, positions] = np.asarray(ys, dtype=np.float64)
+
+        return state
+
+    def to_rows(self, rows=None):
+        """risk_state 저장용 행 튜플 목록"""
+        rows = np.arange(len(self.codes)) if rows is None else np.asarray(rows)
+        counts = self.count[rows]
+        order = (counts[:, None] - WINDOW + np.arange(WINDOW)[None, :]) % WINDOW
+        x_ordered = np.take_along_axis(self.x_window[rows], order, axis=1)
+        y_ordered = np.take_along_axis(self.y_window[rows], order, axis=1)
+        dates = self.last_date[rows].astype(object)
+
+        result = []
+        for i, row in enumerate(rows):
+            size = int(min(counts[i], WINDOW))
+            result.append((
+                self.codes[row], dates[i], self.benchmark[row], int(counts[i]),
+                self.sums[row].ravel().tolist(),
+                x_ordered[i, WINDOW - size:].tolist(), y_ordered[i, WINDOW - size:].tolist()
+            ))
+        return result
+
+
+def _run_days(state, returns):
+    """거래일 순서대로 step을 적용하여 위험 지표 DataFrame 생성"""
+    returns = returns.sort_values(['trade_date', 'stock_code'], kind='stable')
+    codes = returns['stock_code'].astype(str).to_numpy()
+    days = as_day_array(returns['trade_date'])
+    rows = np.array([state.rows[code] for code in codes], dtype=np.int64)
+    x = returns['stock_ret'].to_numpy(dtype=np.float64)
+    y = returns['benchmark_ret'].to_numpy(dtype=np.float64)
+    if len(rows):
+        state.benchmark[rows] = returns['benchmark'].astype(str).to_numpy()
+
+    output = {name: np.empty(len(codes), dtype=np.float32) for name in RISK_COLUMNS}
+    boundaries = np.flatnonzero(days[1:] != days[:-1]) + 1
+    starts = np.concatenate([[0], boundaries]) if len(days) else np.array([], dtype=np.int64)
+    ends = np.append(starts[1:], len(days))
+
+    for start, end in zip(starts, ends):
+        values = state.step(rows[start:end], days[start], x[start:end], y[start:end])
+        for name in RISK_COLUMNS:
+            output[name][start:end] = values[name]
+
+    frame = pd.DataFrame({
+        'stock_code': codes,
+        'trade_date': pd.to_datetime(days),
+        'benchmark': returns['benchmark'].astype(str).to_numpy(),
+    })
+    for name in RISK_COLUMNS:
+        frame[name] = output[name]
+    return frame
+
+
+def compute_risk(returns):
+    """
+    종목/벤치마크 수익률 전체로 위험 지표 계산
+
+    Args:
+        returns: stock_code, trade_date, benchmark, stock_ret, benchmark_ret 컬럼을 가진 DataFrame
+
+    Returns:
+        tuple: (위험 지표 DataFrame, 마지막 거래일 기준 RiskState)
+    """
+    returns = returns.dropna(subset=['stock_ret', 'benchmark_ret'])
+    state = RiskState(pd.unique(returns['stock_code'].astype(str)))
+    return _run_days(state, returns), state
+
+
+def _returns(conn, days=None, stock_codes=None):
+    codes = sorted(set(stock_codes)) if stock_codes else None
+    return read_frame(RETURNS_SQL, (days, days, codes, codes), conn=conn)
+
+
+def _save_benchmarks(conn, cursor, days=None):
+    """벤치마크 수익률 계산 후 저장 (days가 None이면 전체 히스토리)"""
+    benchmarks = read_frame(BENCHMARK_SQL, (days, days), conn=conn)
+    if benchmarks.empty:
+        return 0
+    return bulk_upsert(cursor, 'benchmark_returns', ['benchmark', 'trade_date', 'ret', 'constituents'],
+                       frame_rows(benchmarks, ['benchmark', 'trade_date', 'ret', 'constituents']),
+                       conflict_columns=['benchmark', 'trade_date'], page_size=5000)
+
+
+def _write(cursor, frame, state):
+    columns = ['stock_code', 'trade_date', 'benchmark'] + RISK_COLUMNS
+    count = bulk_upsert(cursor, 'risk_metrics', columns, frame_rows(frame, columns),
+                        conflict_columns=['stock_code', 'trade_date'], page_size=5000)
+    bulk_upsert(cursor, 'risk_state', STATE_COLUMNS, state.to_rows(),
+                conflict_columns=['stock_code'])
+    return count
+
+
+def _recompute(conn, cursor, stock_codes, since):
+    """종목 전체 히스토리로 다시 계산하고 since 이후 행만 저장"""
+    returns = _returns(conn, stock_codes=stock_codes)
+    if returns.empty:
+        return 0
+
+    frame, state = compute_risk(returns)
+    frame = frame[as_day_array(frame['trade_date']) >= since]
+    return _write(cursor, frame, state)
+
+
+def update_risk(conn, trade_dates):
+    """
+    적재된 거래일의 벤치마크 수익률과 위험 지표를 이동 상태에서 이어서 계산 (커밋은 호출자 담당)
+
+    저장된 상태가 없거나 상태 기준일이 첫 적재일 직전 거래일이 아닌 종목, 벤치마크가 바뀐 종목은
+    해당 종목 전체 히스토리로 다시 계산한다.
+    """
+    days = [str(d) for d in np.unique(as_day_array(trade_dates))]
+    if not days:
+        return 0
+
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_DAILY_MARKET_CAP_SQL)
+        cursor.execute(CREATE_RISK_TABLES_SQL)
+        _save_benchmarks(conn, cursor, days)
+
+        returns = _returns(conn, days).dropna(subset=['stock_ret', 'benchmark_ret'])
+        if returns.empty:
+            return 0
+        codes = returns['stock_code'].astype(str).unique().tolist()
+
+        saved = read_frame(
+            f"SELECT {', '.join(STATE_COLUMNS)} FROM risk_state WHERE stock_code = ANY(%s)",
+            (codes,), conn=conn
+        )
+        if not saved.empty:
+            saved = saved[saved['stock_code'].astype(str).isin(current_state_codes(saved, days, conn=conn))]
+            current = returns.drop_duplicates('stock_code').set_index('stock_code')['benchmark']
+            saved = saved[saved['benchmark'].to_numpy() == saved['stock_code'].map(current).to_numpy()]
+        state = RiskState.from_frame(saved) if not saved.empty else RiskState([])
+
+        carried = returns['stock_code'].astype(str).isin(state.rows)
+        recompute_codes = sorted(set(codes) - set(state.rows))
+
+        count = 0
+        if carried.any():
+            count += _write(cursor, _run_days(state, returns[carried]), state)
+        if recompute_codes:
+            count += _recompute(conn, cursor, recompute_codes, np.datetime64(days[0]))
+
+    logger.info(f"  📉 risk_metrics {len(codes):,}개 종목 갱신 "
+                f"(이어서 계산 {len(state.codes):,}, 전체 재계산 {len(recompute_codes):,}) {count:,}건")
+    return count
+
+
+def rebuild_risk(conn, batch_size=500):
+    """전체 히스토리 벤치마크 수익률과 위험 지표 재계산 (초기 적재용, 커밋은 호출자 담당)"""
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_DAILY_MARKET_CAP_SQL)
+        cursor.execute(CREATE_RISK_TABLES_SQL)
+        days = _save_benchmarks(conn, cursor)
+        logger.info(f"📉 benchmark_returns {days:,}건")
+
+        codes = read_frame("SELECT DISTINCT stock_code FROM daily_prices ORDER BY stock_code", conn=conn)
+        codes = codes['stock_code'].astype(str).tolist() if not codes.empty else []
+
+        count = 0
+        for i in range(0, len(codes), batch_size):
+            returns = _returns(conn, stock_codes=codes[i:i + batch_size])
+            if not returns.empty:
+                frame, state = compute_risk(returns)
+                count += _write(cursor, frame, state)
+            logger.info(f"📉 risk_metrics {min(i + batch_size, len(codes)):,}/{len(codes):,} 종목 ({count:,}건)")
+
+    return count
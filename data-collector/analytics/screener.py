@@ -0,0 +1,485 @@
+"""종목 스크리너 모듈
+
+최근 거래일 횡단면(시세, 기간 수익률, 시가총액, 거래량, 기본 지표, 기술적 지표, 52주 최고/최저, 변동성/베타,
+PER/PBR/PSR)을
+수집 후처리 단계에서 스냅샷 파일(Feather)로 만들어 두고, 메모리에 컬럼 배열로 올려
+필터/정렬 식을 벡터화 마스크로 평가한다. 스크리닝마다 DB를 조회하지 않는다.
+
+식 문법 (대소문자 무시):
+    필터: market_cap >= 1e12 and ret_20 > 0.05 and market_type in ('KOSPI', 'KOSDAQ')
+          close_price > sma_20 * 1.05 and not (rsi_14 > 70) and nav is not null
+    정렬: ret_20 desc, market_cap  (기본 오름차순, 결측은 항상 마지막)
+    지원: 산술(+ - * /), 비교(< <= > >= = == != <>), and/or/not, in (...), is [not] null, abs(), true/false
+"""
+import functools
+import operator
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from common.config import CACHE_DIR
+from common.frames import as_day_array, read_frame
+from common.logger import get_logger
+
+from .adjustments import adjust_prices, load_factors
+from .extremes import CREATE_EXTREMES_TABLES_SQL
+from .fundamentals import CREATE_FUNDAMENTALS_TABLES_SQL
+from .indicators import CREATE_INDICATOR_TABLES_SQL, INDICATOR_COLUMNS
+from .market_cap import CREATE_DAILY_MARKET_CAP_SQL
+from .risk import CREATE_RISK_TABLES_SQL, RISK_COLUMNS
+
+logger = get_logger(__name__)
+
+SNAPSHOT_DIR = os.path.join(CACHE_DIR, 'screener')
+SNAPSHOT_PATH = os.path.join(SNAPSHOT_DIR, 'snapshot.feather')
+
+# 기간 수익률 (거래일 수) → ret_{n} 컬럼
+RETURN_WINDOWS = (5, 20, 60, 120, 250)
+
+DEFAULT_COLUMNS = ['stock_code', 'stock_name', 'market_type', 'close_price', 'change_rate', 'market_cap']
+
+
+# ----------------------------------------------------------------------
+# 스냅샷 생성 (수집 후처리)
+# ----------------------------------------------------------------------
+def _period_returns(conn, frame, latest):
+    """최근 거래일 대비 N거래일 전 종가 수익률 (수정주가 기준, 그날 시세가 없으면 NaN)"""
+    calendar = read_frame("""
+        SELECT trade_date FROM (
+            SELECT DISTINCT trade_date FROM daily_prices
+            WHERE trade_date <= %s
+            ORDER BY trade_date DESC
+            LIMIT %s
+        ) d
+    """, (latest, max(RETURN_WINDOWS) + 1), conn=conn)
+    calendar = np.sort(as_day_array(calendar['trade_date']))[::-1]
+    offsets = {n: str(calendar[n]) for n in RETURN_WINDOWS if n < len(calendar)}
+    if not offsets:
+        return {f"ret_{n}": np.full(len(frame), np.nan) for n in RETURN_WINDOWS}
+
+    past = read_frame("""
+        SELECT stock_code, trade_date, close_price
+        FROM daily_prices
+        WHERE trade_date = ANY(%s::date[]) AND close_price > 0
+    """, (list(offsets.values()),), conn=conn)
+
+    codes = frame['stock_code'].astype(str)
+    factors = load_factors(codes.tolist(), conn=conn)
+    now = frame['close_price'].to_numpy(dtype=np.float64) * \
+        adjust_prices(frame[['stock_code', 'trade_date']], factors)['adj_factor'].to_numpy()
+
+    if not past.empty:
+        past['stock_code'] = past['stock_code'].astype(str)
+        past['adj_close'] = past['close_price'].to_numpy(dtype=np.float64) * \
+            adjust_prices(past[['stock_code', 'trade_date']], factors)['adj_factor'].to_numpy()
+        past['trade_date'] = as_day_array(past['trade_date']).astype(str)
+
+    returns = {}
+    for n in RETURN_WINDOWS:
+        if n not in offsets or past.empty:
+            returns[f"ret_{n}"] = np.full(len(frame), np.nan)
+            continue
+        day = past[past['trade_date'] == offsets[n]].set_index('stock_code')['adj_close']
+        base = codes.map(day).to_numpy(dtype=np.float64, na_value=np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns[f"ret_{n}"] = now / base - 1
+    return returns
+
+
+def build_snapshot(conn):
+    """
+    최근 거래일 횡단면 스냅샷 생성
+
+    Returns:
+        pandas.DataFrame: 종목별 한 행 (시세, 수익률, 시가총액, ETF NAV, 기술적 지표, 밸류에이션)
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_DAILY_MARKET_CAP_SQL)
+        cursor.execute(CREATE_INDICATOR_TABLES_SQL)
+        cursor.execute(CREATE_EXTREMES_TABLES_SQL)
+        cursor.execute(CREATE_RISK_TABLES_SQL)
+        cursor.execute(CREATE_FUNDAMENTALS_TABLES_SQL)
+
+    latest = read_frame("SELECT MAX(trade_date) AS trade_date FROM daily_prices", conn=conn)
+    if latest.empty or latest['trade_date'].iloc[0] is None:
+        return pd.DataFrame()
+    latest = latest['trade_date'].iloc[0]
+
+    indicator_columns = ', '.join(f"i.{name}" for name in INDICATOR_COLUMNS)
+    risk_columns = ', '.join(f"r.{name}" for name in RISK_COLUMNS)
+    frame = read_frame(f"""
+        SELECT s.stock_code, s.stock_name, s.market_type, s.asset_type,
+               dp.trade_date, dp.close_price, dp.change_rate, dp.volume,
+               COALESCE(dp.trading_value, CAST(dp.close_price AS BIGINT) * dp.volume) AS trading_value,
+               COALESCE(mc.market_cap, s.market_cap) AS market_cap,
+               COALESCE(mc.listed_shares, s.listed_shares) AS listed_shares,
+               s.nav, s.net_asset_total,
+               {indicator_columns},
+               x.high_52w, x.low_52w, x.pct_from_high, x.pct_from_low,
+               x.drawdown, x.max_drawdown, x.is_new_high, x.is_new_low,
+               {risk_columns},
+               v.eps, v.bps, v.per, v.pbr, v.psr
+        FROM daily_prices dp
+        JOIN stocks s ON s.stock_code = dp.stock_code
+        LEFT JOIN daily_market_cap mc
+          ON mc.stock_code = dp.stock_code AND mc.trade_date = dp.trade_date
+        LEFT JOIN indicators i
+          ON i.stock_code = dp.stock_code AND i.trade_date = dp.trade_date
+        LEFT JOIN price_extremes x
+          ON x.stock_code = dp.stock_code AND x.trade_date = dp.trade_date
+        LEFT JOIN risk_metrics r
+          ON r.stock_code = dp.stock_code AND r.trade_date = dp.trade_date
+        LEFT JOIN daily_valuation v
+          ON v.stock_code = dp.stock_code AND v.trade_date = dp.trade_date
+        WHERE dp.trade_date = %s AND dp.close_price > 0
+    """, (latest,), conn=conn)
+    if frame.empty:
+        return frame
+
+    for name, values in _period_returns(conn, frame, latest).items():
+        frame[name] = values
+
+    numeric = frame.columns.difference(['stock_code', 'stock_name', 'market_type', 'asset_type', 'trade_date'])
+    frame[numeric] = frame[numeric].apply(pd.to_numeric, errors='coerce').astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frame['nav_premium'] = frame['close_price'] / frame['nav'] - 1
+    frame['trade_date'] = pd.to_datetime(as_day_array(frame['trade_date']))
+    return frame
+
+
+def save_snapshot(frame, path=SNAPSHOT_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    feather.write_feather(pa.Table.from_pandas(frame, preserve_index=False), tmp_path, compression='lz4')
+    os.replace(tmp_path, path)
+
+
+def refresh_snapshot(conn, trade_dates=None):
+    """스냅샷 갱신 (수집 후처리 단계, DB 쓰기 없음)"""
+    frame = build_snapshot(conn)
+    if frame.empty:
+        return 0
+    save_snapshot(frame)
+    logger.info(f"  🔎 스크리너 스냅샷 갱신: {len(frame):,}개 종목 ({frame['trade_date'].iloc[0]:%Y-%m-%d})")
+    return len(frame)
+
+
+def rebuild_snapshot(conn):
+    return refresh_snapshot(conn)
+
+
+# ----------------------------------------------------------------------
+# 식 파서 (토큰 → 컬럼 배열을 받아 결과 배열을 돌려주는 함수)
+# ----------------------------------------------------------------------
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)
+      | '(?P<string>[^']*)'
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<op><=|>=|==|!=|<>|[<>=+\-*/(),])
+    )""", re.VERBOSE)
+
+_KEYWORDS = {'and', 'or', 'not', 'in', 'is', 'null', 'asc', 'desc', 'true', 'false'}
+
+_COMPARE = {
+    '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+    '=': operator.eq, '==': operator.eq, '!=': operator.ne, '<>': operator.ne,
+}
+_ARITHMETIC = {'+': np.add, '-': np.subtract, '*': np.multiply, '/': np.divide}
+_FUNCTIONS = {'abs': np.abs}
+
+
+def _tokenize(text):
+    tokens, position = [], 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN_RE.match(text, position)
+        if not match:
+            raise ValueError(f"식 해석 실패: '{text[position:].strip()[:20]}' (위치 {position})")
+        position = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'name' and value.lower() in _KEYWORDS:
+            kind, value = 'keyword', value.lower()
+        tokens.append((kind, value))
+    return tokens
+
+
+def _is_null(values):
+    if values.dtype == object:
+        return pd.isna(values)
+    return np.isnan(values) if np.issubdtype(values.dtype, np.floating) else np.zeros(len(values), dtype=bool)
+
+
+class _Parser:
+    """재귀 하강 파서 (결과는 columns dict → 배열 함수)"""
+
+    def __init__(self, text):
+        self.tokens = _tokenize(text)
+        self.index = 0
+
+    def peek(self, kind=None, value=None):
+        if self.index >= len(self.tokens):
+            return False
+        token_kind, token_value = self.tokens[self.index]
+        return (kind is None or token_kind == kind) and (value is None or token_value == value)
+
+    def take(self, kind=None, value=None):
+        if not self.peek(kind, value):
+            found = self.tokens[self.index][1] if self.index < len(self.tokens) else '식의 끝'
+            raise ValueError(f"식 해석 실패: '{value or kind}' 필요, '{found}' 발견")
+        token = self.tokens[self.index]
+        self.index += 1
+        return token[1]
+
+    def done(self):
+        if self.index < len(self.tokens):
+            raise ValueError(f"식 해석 실패: 예상하지 않은 '{self.tokens[self.index][1]}'")
+
+    def expression(self):
+        left = self.conjunction()
+        while self.peek('keyword', 'or'):
+            self.take()
+            left = functools.partial(lambda a, b, c: a(c) | b(c), left, self.conjunction())
+        return left
+
+    def conjunction(self):
+        left = self.negation()
+        while self.peek('keyword', 'and'):
+            self.take()
+            left = functools.partial(lambda a, b, c: a(c) & b(c), left, self.negation())
+        return left
+
+    def negation(self):
+        if self.peek('keyword', 'not'):
+            self.take()
+            inner = self.negation()
+            return lambda c: ~inner(c)
+        return self.comparison()
+
+    def comparison(self):
+        left = self.sum()
+        if self.peek('op') and self.tokens[self.index][1] in _COMPARE:
+            compare = _COMPARE[self.take()]
+            right = self.sum()
+            return lambda c: compare(left(c), right(c))
+
+        negate = False
+        if self.peek('keyword', 'not'):
+            self.take()
+            negate = True
+            if not self.peek('keyword', 'in'):
+                raise ValueError("식 해석 실패: 'not' 다음에는 'in' 필요")
+        if self.peek('keyword', 'in'):
+            self.take()
+            values = self.literal_list()
+            return lambda c: np.isin(left(c), values) ^ negate
+
+        if self.peek('keyword', 'is'):
+            self.take()
+            negate = self.peek('keyword', 'not')
+            if negate:
+                self.take()
+            self.take('keyword', 'null')
+            return lambda c: _is_null(left(c)) ^ negate
+        return left
+
+    def literal_list(self):
+        self.take('op', '(')
+        values = []
+        while True:
+            if self.peek('string'):
+                values.append(self.take())
+            else:
+                sign = 1
+                if self.peek('op', '-'):
+                    self.take()
+                    sign = -1
+                values.append(sign * float(self.take('number')))
+            if self.peek('op', ')'):
+                self.take()
+                return np.array(values, dtype=object if isinstance(values[0], str) else np.float64)
+            self.take('op', ',')
+
+    def sum(self):
+        left = self.product()
+        while self.peek('op') and self.tokens[self.index][1] in '+-':
+            operation = _ARITHMETIC[self.take()]
+            left = functools.partial(lambda f, a, b, c: f(a(c), b(c)), operation, left, self.product())
+        return left
+
+    def product(self):
+        left = self.unary()
+        while self.peek('op') and self.tokens[self.index][1] in '*/':
+            operation = _ARITHMETIC[self.take()]
+            left = functools.partial(lambda f, a, b, c: f(a(c), b(c)), operation, left, self.unary())
+        return left
+
+    def unary(self):
+        if self.peek('op', '-'):
+            self.take()
+            inner = self.unary()
+            return lambda c: -inner(c)
+        return self.atom()
+
+    def atom(self):
+        if self.peek('number'):
+            value = float(self.take())
+            return lambda c: value
+        if self.peek('string'):
+            value = self.take()
+            return lambda c: value
+        if self.peek('keyword', 'true') or self.peek('keyword', 'false'):
+            value = float(self.take() == 'true')
+            return lambda c: value
+        if self.peek('op', '('):
+            self.take()
+            inner = self.expression()
+            self.take('op', ')')
+            return inner
+
+        name = self.take('name')
+        if self.peek('op', '('):
+            if name.lower() not in _FUNCTIONS:
+                raise ValueError(f"알 수 없는 함수: {name}")
+            function = _FUNCTIONS[name.lower()]
+            self.take()
+            inner = self.sum()
+            self.take('op', ')')
+            return lambda c: function(inner(c))
+
+        key = name.lower()
+
+        def column(c):
+            if key not in c:
+                raise ValueError(f"알 수 없는 컬럼: {name}")
+            return c[key]
+        return column
+
+    def order_terms(self):
+        terms = []
+        while True:
+            key = self.sum()
+            descending = False
+            if self.peek('keyword', 'asc') or self.peek('keyword', 'desc'):
+                descending = self.take() == 'desc'
+            terms.append((key, descending))
+            if not self.peek('op', ','):
+                return terms
+            self.take()
+
+
+@functools.lru_cache(maxsize=256)
+def compile_filter(text):
+    """필터 식 → 컬럼 dict를 받아 불리언 마스크를 돌려주는 함수"""
+    parser = _Parser(text)
+    result = parser.expression()
+    parser.done()
+    return result
+
+
+@functools.lru_cache(maxsize=256)
+def compile_order(text):
+    """정렬 식 → [(키 함수, 내림차순 여부), ...]"""
+    parser = _Parser(text)
+    result = parser.order_terms()
+    parser.done()
+    return tuple(result)
+
+
+# ----------------------------------------------------------------------
+# 스크리너
+# ----------------------------------------------------------------------
+class Screener:
+    """스냅샷 컬럼 배열 위에서 필터/정렬 식을 평가하는 스크리너"""
+
+    def __init__(self, frame):
+        self.size = len(frame)
+        self.trade_date = frame['trade_date'].iloc[0] if self.size else None
+        self.columns = {}
+        for name in frame.columns:
+            series = frame[name]
+            if pd.api.types.is_numeric_dtype(series):
+                self.columns[name] = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            else:
+                self.columns[name] = series.astype(object).where(series.notna(), None).to_numpy()
+
+    @classmethod
+    def load(cls, path=SNAPSHOT_PATH):
+        """스냅샷 파일 로드 (없으면 FileNotFoundError)"""
+        return cls(feather.read_feather(path))
+
+    def mask(self, where):
+        if not where:
+            return np.ones(self.size, dtype=bool)
+        try:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result = compile_filter(where)(self.columns)
+        except TypeError as e:
+            raise ValueError(f"식 타입 오류: 문자열 컬럼은 =, !=, in, is null로만 비교할 수 있고 산술 연산은 쓸 수 없습니다 ({where}: {e})")
+        if np.ndim(result) == 0 or np.asarray(result).dtype != bool:
+            raise ValueError(f"필터 식의 결과가 조건이 아닙니다: {where}")
+        return np.asarray(result)
+
+    def order(self, rows, order_by):
+        """rows(행 번호 배열)를 정렬 식 순서로 (결측은 마지막)"""
+        if not order_by or not len(rows):
+            return rows
+        keys = []
+        for key, descending in reversed(compile_order(order_by)):
+            try:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    values = np.broadcast_to(key(self.columns), (self.size,))[rows]
+            except TypeError as e:
+                raise ValueError(f"식 타입 오류: 문자열 컬럼에는 산술 연산을 쓸 수 없습니다 ({order_by}: {e})")
+            if values.dtype == object:
+                missing = pd.isna(values)
+                values = pd.factorize(np.where(missing, '', values).astype(str), sort=True)[0].astype(np.float64)
+            else:
+                missing = np.isnan(values)
+            keys.extend([-values if descending else values, missing])
+        return rows[np.lexsort(keys)]
+
+    def screen(self, where=None, order_by=None, limit=50, columns=None, mask=None):
+        """
+        스크리닝 실행
+
+        Args:
+            where: 필터 식 (None이면 전체)
+            order_by: 정렬 식 (예: 'ret_20 desc, market_cap')
+            limit: 최대 행 수 (None이면 전체)
+            columns: 결과 컬럼 목록 (None이면 DEFAULT_COLUMNS)
+            mask: 이미 계산한 필터 마스크 (지정하면 where를 다시 평가하지 않음)
+
+        Returns:
+            pandas.DataFrame: 조건을 만족하는 종목
+        """
+        if mask is None:
+            mask = self.mask(where)
+        rows = self.order(np.flatnonzero(mask), order_by)
+        if limit is not None:
+            rows = rows[:limit]
+        columns = columns or [name for name in DEFAULT_COLUMNS if name in self.columns]
+        unknown = [name for name in columns if name not in self.columns]
+        if unknown:
+            raise ValueError(f"알 수 없는 컬럼: {', '.join(unknown)}")
+        return pd.DataFrame({name: self.columns[name][rows] for name in columns})
+
+
+_screener = None
+_screener_mtime = None
+
+
+def get_screener(path=SNAPSHOT_PATH):
+    """프로세스 공용 스크리너 (스냅샷 파일이 갱신되면 다시 로드)"""
+    global _screener, _screener_mtime
+    mtime = os.stat(path).st_mtime_ns
+    if _screener is None or mtime != _screener_mtime:
+        _screener = Screener.load(path)
+        _screener_mtime = mtime
+        logger.debug(f"스크리너 스냅샷 로드: {_screener.size:,}개 종목")
+    return _screener
@@ -2,82 +2,107 @@
 # -*- coding: utf-8 -*-
 """
 DART API로 삼성전자와 SK하이닉스의 최신 실적 데이터 확인
+
+최신 보고서는 보고서 제출 여부 인덱스(dart_report_availability)에서 조회하고,
+확인 기한이 지난 셀만 한 번에 묶어 DART에 확인한다.
 """
 
 import requests
 import os
+from datetime import datetime
 from dotenv import load_dotenv
 import json
+from common.database import get_db_connection
+from dart.availability import latest_available, refresh_availability
+from dart.corp_codes import get_corp_index
+from dart.quota import QuotaBudget
 
 load_dotenv()
 
 DART_API_KEY = os.getenv('DART_API_KEY', '')
 
-def check_latest_report(corp_code, corp_name):
-    """최신 공시 보고서 확인"""
+QUARTER_NAMES = {1: '1분기', 2: '반기', 3: '3분기', 4: '사업보고서'}
 
-    if not DART_API_KEY:
-        print(f"❌ DART_API_KEY가 설정되지 않았습니다")
-        return
+def check_latest_report(cursor, corp_code, corp_name):
+    """최신 공시 보고서 확인 (인덱스 조회 후 해당 보고서만 요청)"""
 
     print(f"\n{'='*80}")
     print(f"📊 {corp_name} 최신 실적 보고서 확인")
     print(f"{'='*80}")
 
-    # 2024년 분기보고서 조회
-    for year in [2024]:
-        for quarter in [3, 2, 1]:  # 3분기부터 역순으로
-            reprt_code = f'110{quarter:02d}'  # 11011(1분기), 11012(2분기), 11013(3분기)
-
-            url = "https://opendart.fss.or.kr/api/fnlttSinglAcnt.json"
-            params = {
-                'crtfc_key': DART_API_KEY,
-                'corp_code': corp_code,
-                'bsns_year': year,
-                'reprt_code': reprt_code
-            }
-
-            try:
-                response = requests.get(url, params=params, timeout=10)
-                data = response.json()
-
-                status = data.get('status', 'error')
-                message = data.get('message', '')
-
-                if status == '000':
-                    print(f"\n✅ {year}년 {quarter}분기 보고서 존재")
-                    print(f"   상태: {status} - {message}")
-
-                    # 데이터 샘플 출력
-                    if 'list' in data and len(data['list']) > 0:
-                        print(f"   데이터 건수: {len(data['list'])}건")
-                        # 주요 계정 찾기
-                        for item in data['list'][:10]:
-                            account_nm = item.get('account_nm', '')
-                            thstrm_amount = item.get('thstrm_amount', '0')
-                            if account_nm in ['매출액', '당기순이익', '영업이익']:
-                                print(f"   - {account_nm}: {thstrm_amount}")
-                    return  # 최신 데이터를 찾았으므로 종료
-
-                elif status == '013':
-                    print(f"⚠️  {year}년 {quarter}분기: 데이터 없음 ({message})")
-                else:
-                    print(f"❌ {year}년 {quarter}분기: {status} - {message}")
-
-            except Exception as e:
-                print(f"❌ {year}년 {quarter}분기 조회 실패: {e}")
-                continue
+    latest = latest_available(cursor, corp_code)
+    if latest is None:
+        print("⚠️  제출된 정기보고서가 없습니다")
+        return
+
+    year, quarter, reprt_code, rcept_no = latest
+    print(f"\n✅ {year}년 {QUARTER_NAMES[quarter]} ({reprt_code}) 보고서 존재 (접수번호 {rcept_no or '-'})")
+
+    url = "https://opendart.fss.or.kr/api/fnlttSinglAcnt.json"
+    params = {
+        'crtfc_key': DART_API_KEY,
+        'corp_code': corp_code,
+        'bsns_year': year,
+        'reprt_code': reprt_code
+    }
+
+    try:
+        response = requests.get(url, params=params, timeout=10)
+        data = response.json()
+    except Exception as e:
+        print(f"❌ 재무제표 조회 실패: {e}")
+        return
+
+    # 데이터 샘플 출력
+    if data.get('status') == '000' and len(data.get('list', [])) > 0:
+        print(f"   데이터 건수: {len(data['list'])}건")
+        # 주요 계정 찾기
+        for item in data['list']:
+            account_nm = item.get('account_nm', '')
+            thstrm_amount = item.get('thstrm_amount', '0')
+            if account_nm in ['매출액', '당기순이익', '영업이익']:
+                print(f"   - [{item.get('fs_div')}] {account_nm}: {thstrm_amount}")
+    else:
+        print(f"❌ {data.get('status')} - {data.get('message', '')}")
 
 def main():
     print("="*80)
     print("🔍 DART 최신 실적 데이터 확인")
     print("="*80)
 
-    # 삼성전자
-    check_latest_report('00126380', '삼성전자')
+    if not DART_API_KEY:
+        print(f"❌ DART_API_KEY가 설정되지 않았습니다")
+        return
+
+    # 고유번호는 DART 고유번호 인덱스에서 조회
+    try:
+        corp_index = get_corp_index()
+    except FileNotFoundError:
+        print("❌ 고유번호 인덱스가 없습니다. sync_dart_corp_codes.py를 먼저 실행하세요.")
+        return
 
-    # SK하이닉스
-    check_latest_report('00164779', 'SK하이닉스')
+    # 삼성전자, SK하이닉스
+    companies = {}
+    for stock_code in ['005930', '000660']:
+        corp_code = corp_index.corp_code(stock_code)
+        if not corp_code:
+            print(f"❌ {stock_code}: 고유번호 없음")
+            continue
+        companies[corp_code] = corp_index.corp_name(corp_code)
+
+    this_year = datetime.now().year
+    with get_db_connection() as conn, get_db_connection() as quota_conn:
+        # 확인 기한이 지난 셀만 한 번에 확인 (요청은 dart_quota 일일 한도에서 예약)
+        budget = QuotaBudget(quota_conn, block=10)
+        try:
+            refresh_availability(conn, list(companies), [this_year - 1, this_year],
+                                 corp_index=corp_index, budget=budget)
+        finally:
+            budget.close()
+        conn.commit()
+        with conn.cursor() as cur:
+            for corp_code, corp_name in companies.items():
+                check_latest_report(cur, corp_code, corp_name)
 
     print("\n" + "="*80)
     print("참고: DART 분기보고서는 통상 분기 종료 후 45일 이내 공시됩니다")
@@ -2,11 +2,18 @@
 # -*- coding: utf-8 -*-
 """
 DB 상태 확인 및 시가총액 계산
+
+사용법:
+    python3 check_db_status.py          # 전체 스캔 (테이블당 한 번)
+    python3 check_db_status.py fast     # daily_prices 1% 표본 (근사값)
 """
 
 import psycopg2
 import os
+import sys
 from dotenv import load_dotenv
+from common.database import stream_query
+from common.profiler import profile_table
 
 load_dotenv()
 
@@ -23,73 +30,70 @@ def main():
     try:
         conn = psycopg2.connect(**DB_CONFIG)
         cur = conn.cursor()
+        sample_percent = 1 if 'fast' in sys.argv[1:] else None
 
         print("="*80)
         print("📊 DB 상태 확인")
         print("="*80)
 
         # 1. 시장별 종목 수
-        cur.execute("""
+        print("\n1️⃣ 시장별 종목 수:")
+        for row in stream_query("""
             SELECT market_type, COUNT(*) as count
             FROM stocks
             GROUP BY market_type
             ORDER BY market_type
-        """)
-        print("\n1️⃣ 시장별 종목 수:")
-        for row in cur.fetchall():
+        """, conn=conn):
             print(f"  {row[0]}: {row[1]:,}개")
 
-        # 2. 최근 거래일 확인
-        cur.execute("""
-            SELECT MAX(trade_date) as last_date
-            FROM daily_prices
-        """)
-        last_date = cur.fetchone()[0]
-        print(f"\n2️⃣ 최근 거래일: {last_date}")
+        # 테이블당 한 번의 스캔으로 전체 컬럼 행 수/결측/최소/최대 계산
+        prices = profile_table(cur, 'daily_prices', sample_percent=sample_percent)
+        stocks = profile_table(cur, 'stocks')
+        conn.commit()
+        approx = " (표본 추정)" if sample_percent else ""
+
+        # 2. 최근 거래일 확인 (표본은 최근 거래일을 놓칠 수 있으므로 인덱스로 정확히 조회)
+        cur.execute("SELECT MAX(trade_date) FROM daily_prices")
+        print(f"\n2️⃣ 최근 거래일: {cur.fetchone()[0]}")
 
         # 3. 일별 시세 레코드 수
-        cur.execute("SELECT COUNT(*) FROM daily_prices")
-        price_count = cur.fetchone()[0]
-        print(f"3️⃣ 일별 시세 레코드: {price_count:,}건")
+        print(f"3️⃣ 일별 시세 레코드: {prices['trade_date']['row_count']:,}건{approx}")
 
         # 4. 시가총액이 null인 종목 수
-        cur.execute("SELECT COUNT(*) FROM stocks WHERE market_cap IS NULL")
-        null_cap = cur.fetchone()[0]
-        print(f"4️⃣ 시가총액 미설정 종목: {null_cap:,}개")
+        cap = stocks['market_cap']
+        print(f"4️⃣ 시가총액 미설정 종목: {cap['null_count']:,}개")
 
         # 5. 시가총액 있는 종목 수 확인
         print(f"\n5️⃣ 시가총액 통계:")
-        cur.execute("SELECT COUNT(*) FROM stocks WHERE market_cap IS NOT NULL AND market_cap > 0")
-        cap_count = cur.fetchone()[0]
-        print(f"  시가총액 설정된 종목: {cap_count:,}개")
+        cur.execute("SELECT COUNT(*) FROM stocks WHERE market_cap > 0")
+        print(f"  시가총액 설정된 종목: {cur.fetchone()[0]:,}개")
+        print(f"  시가총액 범위: {cap['min_value']} ~ {cap['max_value']}")
 
         # 6. 업데이트 후 시가총액 상위 10개 확인
         print(f"\n6️⃣ KOSPI 시가총액 상위 10개:")
-        cur.execute("""
+        for i, row in enumerate(stream_query("""
             SELECT stock_code, stock_name, market_cap
             FROM stocks
             WHERE market_type = 'KOSPI'
             ORDER BY market_cap DESC NULLS LAST
             LIMIT 10
-        """)
-        for i, row in enumerate(cur.fetchall(), 1):
+        """, conn=conn), 1):
             cap_trillion = row[2] / 1_000_000_000_000 if row[2] else 0
             print(f"  {i}. {row[1]} ({row[0]}): {cap_trillion:.2f}조")
 
         print(f"\n7️⃣ KOSDAQ 시가총액 상위 10개:")
-        cur.execute("""
+        for i, row in enumerate(stream_query("""
             SELECT stock_code, stock_name, market_cap
             FROM stocks
             WHERE market_type = 'KOSDAQ'
             ORDER BY market_cap DESC NULLS LAST
             LIMIT 10
-        """)
-        for i, row in enumerate(cur.fetchall(), 1):
+        """, conn=conn), 1):
             cap_hundred_million = row[2] / 100_000_000 if row[2] else 0
             print(f"  {i}. {row[1]} ({row[0]}): {cap_hundred_million:.0f}억")
 
         print(f"\n8️⃣ ETF 거래대금 상위 10개:")
-        cur.execute("""
+        for i, row in enumerate(stream_query("""
             SELECT s.stock_code, s.stock_name,
                    dp.close_price, dp.volume,
                    (CAST(dp.close_price AS BIGINT) * dp.volume) as trading_value
@@ -104,8 +108,7 @@ def main():
             WHERE s.market_type = 'ETF'
             ORDER BY trading_value DESC NULLS LAST
             LIMIT 10
-        """)
-        for i, row in enumerate(cur.fetchall(), 1):
+        """, conn=conn), 1):
             trading_billion = row[4] / 100_000_000 if row[4] else 0
             print(f"  {i}. {row[1]} ({row[0]}): {trading_billion:.0f}억원")
 
@@ -8,6 +8,9 @@ import psycopg2
 import os
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
+import numpy as np
+from common.database import stream_query
+from analytics.coverage import CoverageIndex
 
 load_dotenv()
 
@@ -25,7 +28,6 @@ def check_missing_data():
     conn = None
     try:
         conn = psycopg2.connect(**DB_CONFIG)
-        cur = conn.cursor()
 
         print("="*80)
         print("최근 30일 데이터 누락 확인")
@@ -33,18 +35,27 @@ def check_missing_data():
 
         # 1. 종목 수 확인
         print("\n[1. 종목 수]")
-        cur.execute('''
-            SELECT market_type, COUNT(*)
+        market_codes = {}
+        stock_names = {}
+        for row in stream_query('''
+            SELECT stock_code, stock_name, market_type
             FROM stocks
             WHERE market_type != 'KONEX'
-            GROUP BY market_type
-            ORDER BY market_type
-        ''')
-
-        market_counts = {}
-        for row in cur.fetchall():
-            market_counts[row[0]] = row[1]
-            print(f"  {row[0]:10s}: {row[1]:5d}개")
+            ORDER BY market_type, stock_code
+        ''', conn=conn):
+            market_codes.setdefault(row[2], []).append(row[0])
+            stock_names[row[0]] = row[1]
+
+        market_counts = {market: len(codes) for market, codes in market_codes.items()}
+        for market, count in market_counts.items():
+            print(f"  {market:10s}: {count:5d}개")
+
+        # 거래일 × 시장구분 수집 현황 요약 (수집기가 시세 저장 시 기록)
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('daily_coverage') IS NOT NULL")
+            if not cur.fetchone()[0]:
+                print("\n❌ daily_coverage 테이블이 없습니다. 먼저 실행: python3 rebuild_analytics.py daily_coverage")
+                return []
 
         # 2. 최근 30일 날짜별 데이터 현황
         end_date = datetime.now().date()
@@ -52,41 +63,38 @@ def check_missing_data():
 
         print(f"\n[2. 최근 30일 데이터 현황 ({start_date} ~ {end_date})]")
 
-        cur.execute('''
-            SELECT
-                trade_date,
-                COUNT(DISTINCT dp.stock_code) as total_count,
-                COUNT(DISTINCT CASE WHEN s.market_type = 'KOSPI' THEN dp.stock_code END) as kospi_count,
-                COUNT(DISTINCT CASE WHEN s.market_type = 'KOSDAQ' THEN dp.stock_code END) as kosdaq_count,
-                COUNT(DISTINCT CASE WHEN s.market_type = 'ETF' THEN dp.stock_code END) as etf_count
-            FROM daily_prices dp
-            JOIN stocks s ON dp.stock_code = s.stock_code
-            WHERE trade_date >= %s AND trade_date <= %s
-              AND s.market_type != 'KONEX'
-            GROUP BY trade_date
-            ORDER BY trade_date DESC
-        ''', (start_date, end_date))
-
-        date_data = cur.fetchall()
-
-        if date_data:
+        summary = {}
+        with conn.cursor() as cur:
+            cur.execute('''
+                SELECT trade_date, market_type, row_count, expected_count
+                FROM daily_coverage
+                WHERE trade_date BETWEEN %s AND %s
+            ''', (start_date, end_date))
+            for trade_date, market, row_count, expected_count in cur.fetchall():
+                summary.setdefault(trade_date, {})[market] = (row_count, expected_count)
+
+        if summary:
             print(f"\n  {'날짜':<12} {'전체':>8} {'KOSPI':>8} {'KOSDAQ':>8} {'ETF':>8} {'상태'}")
             print("  " + "-"*60)
-            for row in date_data:
-                status = ""
-                if row[2] < market_counts.get('KOSPI', 0) * 0.9:
-                    status += "⚠️KOSPI "
-                if row[3] < market_counts.get('KOSDAQ', 0) * 0.9:
-                    status += "⚠️KOSDAQ "
-                if row[4] < market_counts.get('ETF', 0) * 0.9:
-                    status += "⚠️ETF "
-                if not status:
-                    status = "✅"
-                print(f"  {row[0]!s:<12} {row[1]:>8} {row[2]:>8} {row[3]:>8} {row[4]:>8} {status}")
-        else:
+
+        for trade_date in sorted(summary, reverse=True):
+            markets = summary[trade_date]
+            status = ""
+            for market in ('KOSPI', 'KOSDAQ', 'ETF'):
+                row_count, expected_count = markets.get(market, (0, 0))
+                if row_count < market_counts.get(market, 0) * 0.9 or row_count < expected_count * 0.9:
+                    status += f"⚠️{market} "
+            if not status:
+                status = "✅"
+            total = sum(row_count for market, (row_count, _) in markets.items() if market != 'KONEX')
+            counts = {market: markets.get(market, (0, 0))[0] for market in ('KOSPI', 'KOSDAQ', 'ETF')}
+            print(f"  {trade_date!s:<12} {total:>8} {counts['KOSPI']:>8} "
+                  f"{counts['KOSDAQ']:>8} {counts['ETF']:>8} {status}")
+
+        if not summary:
             print("  최근 30일 데이터 없음")
 
-        # 3. 누락된 날짜 확인
+        # 3. 누락된 거래일 확인
         print(f"\n[3. 누락된 거래일 확인]")
 
         # 모든 평일 생성 (주말 제외)
@@ -98,15 +106,8 @@ def check_missing_data():
                 all_dates.append(current)
             current += timedelta(days=1)
 
-        # DB에 있는 날짜
-        cur.execute('''
-            SELECT DISTINCT trade_date
-            FROM daily_prices
-            WHERE trade_date >= %s AND trade_date <= %s
-            ORDER BY trade_date
-        ''', (start_date, end_date))
-
-        existing_dates = {row[0] for row in cur.fetchall()}
+        # 수집 현황 요약에 있는 날짜
+        existing_dates = set(summary)
 
         missing_dates = [d for d in all_dates if d not in existing_dates]
 
@@ -120,53 +121,36 @@ def check_missing_data():
 
         # 4. 최신 데이터 날짜
         print(f"\n[4. 최신 데이터 날짜]")
-        cur.execute('''
-            SELECT
-                s.market_type,
-                MAX(dp.trade_date) as latest_date,
-                COUNT(DISTINCT dp.stock_code) as stock_count
-            FROM daily_prices dp
-            JOIN stocks s ON dp.stock_code = s.stock_code
-            WHERE s.market_type != 'KONEX'
-            GROUP BY s.market_type
-            ORDER BY s.market_type
-        ''')
-
-        for row in cur.fetchall():
-            print(f"  {row[0]:10s}: {row[1]} ({row[2]}개 종목)")
+        with conn.cursor() as cur:
+            cur.execute('''
+                SELECT DISTINCT ON (market_type) market_type, trade_date, row_count
+                FROM daily_coverage
+                WHERE market_type != 'KONEX'
+                ORDER BY market_type, trade_date DESC
+            ''')
+            for market, trade_date, row_count in cur.fetchall():
+                print(f"  {market:10s}: {trade_date} ({row_count}개 종목)")
 
         # 5. 가격 데이터 없는 종목 확인
         print(f"\n[5. 가격 데이터 없는 종목]")
-        cur.execute('''
-            SELECT
-                s.market_type,
-                COUNT(*) as no_price_count
-            FROM stocks s
-            LEFT JOIN daily_prices dp ON s.stock_code = dp.stock_code
-            WHERE dp.stock_code IS NULL
-              AND s.market_type != 'KONEX'
-            GROUP BY s.market_type
-            ORDER BY s.market_type
-        ''')
-
-        no_price_data = cur.fetchall()
-        if no_price_data:
-            for row in no_price_data:
-                print(f"  ⚠️ {row[0]:10s}: {row[1]:5d}개")
-
-                # 샘플 출력
-                cur.execute('''
-                    SELECT stock_code, stock_name
-                    FROM stocks
-                    WHERE market_type = %s
-                      AND stock_code NOT IN (SELECT DISTINCT stock_code FROM daily_prices)
-                    LIMIT 5
-                ''', (row[0],))
-
-                samples = cur.fetchall()
-                for sample in samples:
-                    print(f"      {sample[0]} - {sample[1]}")
-        else:
+        # 종목×거래일 커버리지 비트맵 (없으면 daily_prices에서 한 번 생성)
+        coverage = CoverageIndex.load_or_build(conn=conn)
+        trading_days = coverage.trading_days()
+        has_no_price_data = False
+        priced_codes = set(np.array(coverage.codes)[trading_days > 0])
+        for market, codes in market_codes.items():
+            no_price_codes = [code for code in codes if code not in priced_codes]
+            if not no_price_codes:
+                continue
+
+            has_no_price_data = True
+            print(f"  ⚠️ {market:10s}: {len(no_price_codes):5d}개")
+
+            # 샘플 출력
+            for code in no_price_codes[:5]:
+                print(f"      {code} - {stock_names[code]}")
+
+        if not has_no_price_data:
             print("  ✅ 모든 종목에 가격 데이터 있음")
 
         print("\n" + "="*80)
@@ -11,6 +11,10 @@ import requests
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import psycopg2
+from analytics.daily_coverage import coverage_rows, save_coverage_rows
+from analytics.market_cap import market_cap_rows, save_market_cap_rows
+from analytics.pipeline import run_post_ingest
+from common.assets import SOURCE_STOCK, register_assets, stock_market_type
 
 # .env 파일 로드
 load_dotenv(os.path.join(os.path.dirname(__file__), '../.env'))
@@ -72,74 +76,99 @@ def fetch_stock_data(date_str):
         return []
 
 def save_stock_data(conn, date_str, items):
-    """주식 데이터 저장"""
+    """
+    주식 데이터 저장
+
+    종목마다 SAVEPOINT를 두어 한 종목이 실패해도 나머지는 저장하고, 자산 구분 레지스트리,
+    일별 시가총액, 수집 현황 요약은 실제로 저장된 종목으로만 반영한다 (같은 트랜잭션).
+    """
     cursor = conn.cursor()
-    saved_count = 0
-
-    for item in items:
-        try:
-            # 종목 정보 UPSERT
-            cursor.execute("""
-                INSERT INTO stocks (
-                    stock_code, stock_name, market_type, asset_type,
-                    isin_code, listed_shares, market_cap
-                )
-                VALUES (%s, %s, %s, 'STOCK', %s, %s, %s)
-                ON CONFLICT (stock_code)
-                DO UPDATE SET
-                    stock_name = EXCLUDED.stock_name,
-                    market_type = EXCLUDED.market_type,
-                    isin_code = EXCLUDED.isin_code,
-                    listed_shares = EXCLUDED.listed_shares,
-                    market_cap = EXCLUDED.market_cap
-            """, (
-                item.get('srtnCd'),
-                item.get('itmsNm'),
-                item.get('mrktCtg'),
-                item.get('isinCd'),
-                int(item.get('lstgStCnt', 0)) if item.get('lstgStCnt') else None,
-                int(item.get('mrktTotAmt', 0)) if item.get('mrktTotAmt') else None
-            ))
-
-            # 일별 시세 UPSERT
-            cursor.execute("""
-                INSERT INTO daily_prices (
-                    stock_code, trade_date, open_price, high_price, low_price,
-                    close_price, volume, vs, change_rate, trading_value
-                )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (stock_code, trade_date)
-                DO UPDATE SET
-                    open_price = EXCLUDED.open_price,
-                    high_price = EXCLUDED.high_price,
-                    low_price = EXCLUDED.low_price,
-                    close_price = EXCLUDED.close_price,
-                    volume = EXCLUDED.volume,
-                    vs = EXCLUDED.vs,
-                    change_rate = EXCLUDED.change_rate,
-                    trading_value = EXCLUDED.trading_value
-            """, (
-                item.get('srtnCd'),
-                date_str[:4] + '-' + date_str[4:6] + '-' + date_str[6:8],
-                int(item.get('mkp', 0)) if item.get('mkp') else None,
-                int(item.get('hipr', 0)) if item.get('hipr') else None,
-                int(item.get('lopr', 0)) if item.get('lopr') else None,
-                int(item.get('clpr', 0)) if item.get('clpr') else None,
-                int(item.get('trqu', 0)) if item.get('trqu') else None,
-                int(item.get('vs', 0)) if item.get('vs') else None,
-                float(item.get('fltRt', 0)) if item.get('fltRt') else None,
-                int(item.get('trPrc', 0)) if item.get('trPrc') else None
-            ))
-
-            saved_count += 1
-
-        except Exception as e:
-            print(f"⚠️  데이터 저장 오류 ({item.get('srtnCd')}): {e}")
-            continue
-
-    conn.commit()
-    cursor.close()
-    return saved_count
+    trade_date = date_str[:4] + '-' + date_str[4:6] + '-' + date_str[6:8]
+    written = set()
+
+    try:
+        for item in items:
+            cursor.execute("SAVEPOINT save_item")
+            try:
+                # 종목 정보 UPSERT
+                cursor.execute("""
+                    INSERT INTO stocks (
+                        stock_code, stock_name, market_type, asset_type,
+                        isin_code, listed_shares, market_cap
+                    )
+                    VALUES (%s, %s, %s, 'STOCK', %s, %s, %s)
+                    ON CONFLICT (stock_code)
+                    DO UPDATE SET
+                        stock_name = EXCLUDED.stock_name,
+                        market_type = EXCLUDED.market_type,
+                        isin_code = EXCLUDED.isin_code,
+                        listed_shares = EXCLUDED.listed_shares,
+                        market_cap = EXCLUDED.market_cap
+                """, (
+                    item.get('srtnCd'),
+                    item.get('itmsNm'),
+                    # 시장 구분 (mrktCtg 그대로, ETF 여부는 아래 레지스트리 반영 시 결정)
+                    stock_market_type(item.get('mrktCtg')),
+                    item.get('isinCd'),
+                    int(item.get('lstgStCnt', 0)) if item.get('lstgStCnt') else None,
+                    int(item.get('mrktTotAmt', 0)) if item.get('mrktTotAmt') else None
+                ))
+
+                # 일별 시세 UPSERT
+                cursor.execute("""
+                    INSERT INTO daily_prices (
+                        stock_code, trade_date, open_price, high_price, low_price,
+                        close_price, volume, vs, change_rate, trading_value
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (stock_code, trade_date)
+                    DO UPDATE SET
+                        open_price = EXCLUDED.open_price,
+                        high_price = EXCLUDED.high_price,
+                        low_price = EXCLUDED.low_price,
+                        close_price = EXCLUDED.close_price,
+                        volume = EXCLUDED.volume,
+                        vs = EXCLUDED.vs,
+                        change_rate = EXCLUDED.change_rate,
+                        trading_value = EXCLUDED.trading_value
+                """, (
+                    item.get('srtnCd'),
+                    trade_date,
+                    int(item.get('mkp', 0)) if item.get('mkp') else None,
+                    int(item.get('hipr', 0)) if item.get('hipr') else None,
+                    int(item.get('lopr', 0)) if item.get('lopr') else None,
+                    int(item.get('clpr', 0)) if item.get('clpr') else None,
+                    int(item.get('trqu', 0)) if item.get('trqu') else None,
+                    int(item.get('vs', 0)) if item.get('vs') else None,
+                    float(item.get('fltRt', 0)) if item.get('fltRt') else None,
+                    int(item.get('trPrc', 0)) if item.get('trPrc') else None
+                ))
+
+                cursor.execute("RELEASE SAVEPOINT save_item")
+                written.add(item.get('srtnCd'))
+
+            except Exception as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT save_item")
+                print(f"⚠️  데이터 저장 오류 ({item.get('srtnCd')}): {e}")
+                continue
+
+        written_items = [item for item in items if item.get('srtnCd') in written]
+        # 엔드포인트 기준 자산 구분 반영 (같은 트랜잭션)
+        register_assets(cursor, written_items, SOURCE_STOCK, trade_date)
+        # 일별 시가총액/상장주식수 (API 값 그대로, 같은 트랜잭션)
+        save_market_cap_rows(cursor, market_cap_rows(written_items, trade_date))
+        # 거래일 × 시장구분 수집 현황 요약 (같은 트랜잭션)
+        save_coverage_rows(cursor, coverage_rows(items, trade_date, SOURCE_STOCK, written=written))
+
+        conn.commit()
+        return len(written)
+
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ 저장 실패 ({trade_date}): {e}")
+        return 0
+    finally:
+        cursor.close()
 
 def main():
     print("=" * 60)
@@ -157,6 +186,7 @@ def main():
 
     # 데이터 수집
     total_saved = 0
+    ingested_dates = []
 
     for idx, date_str in enumerate(business_days, 1):
         formatted_date = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:8]}"
@@ -169,6 +199,8 @@ def main():
             # 데이터 저장
             saved_count = save_stock_data(conn, date_str, items)
             total_saved += saved_count
+            if saved_count > 0:
+                ingested_dates.append(formatted_date)
             print(f"✅ {saved_count}건 저장 (누적: {total_saved:,}건)")
         else:
             print("⚠️  데이터 없음")
@@ -179,6 +211,10 @@ def main():
 
     conn.close()
 
+    # 파생 데이터 증분 갱신 (수집 기간 전체를 한 번에)
+    if ingested_dates:
+        run_post_ingest(ingested_dates)
+
     print("\n" + "=" * 60)
     print(f"✅ 수집 완료!")
     print(f"   - 총 영업일: {total_days}일")
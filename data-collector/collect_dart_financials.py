@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DART 재무제표 일괄 수집
+
+상장 주식 전체의 재무제표를 DART API로 동시에 조회하여 financial_data에 저장한다.
+일일 요청 한도는 dart_quota 테이블로 다른 스크립트와 나눠 쓰며, 한도가 소진되면
+거기까지 저장하고 종료한다 (다음 실행은 캐시와 저장된 보고서를 건너뛰고 이어서 수집).
+
+사용법:
+    python3 collect_dart_financials.py [사업연도] [분기 1~4] [refresh]
+    (사업연도 생략 시 전년도와 올해, 분기 생략 시 전체 분기)
+"""
+
+import asyncio
+import sys
+import time
+from datetime import datetime
+from common.database import get_db_connection
+from common.logger import get_logger
+from analytics.fundamentals import update_after_filings
+from dart.availability import available_cells, refresh_availability
+from dart.client import QUARTER_REPORTS
+from dart.corp_codes import get_corp_index
+from dart.financials import fetch_financials, financial_targets, save_financial_rows
+from dart.quota import QuotaBudget
+
+logger = get_logger(__name__, 'collect_dart_financials.log')
+
+def main():
+    logger.info("="*80)
+    logger.info("📊 DART 재무제표 일괄 수집")
+    logger.info("="*80)
+
+    args = sys.argv[1:]
+    refresh = 'refresh' in args
+    numbers = [int(arg) for arg in args if arg.isdigit()]
+    this_year = datetime.now().year
+    years = [numbers[0]] if numbers else [this_year - 1, this_year]
+    quarters = [numbers[1]] if len(numbers) > 1 else [1, 2, 3, 4]
+    reprt_codes = [QUARTER_REPORTS[quarter] for quarter in quarters]
+
+    try:
+        corp_index = get_corp_index()
+    except FileNotFoundError:
+        logger.error("❌ 고유번호 인덱스가 없습니다. sync_dart_corp_codes.py를 먼저 실행하세요.")
+        return
+
+    start_time = time.time()
+    with get_db_connection() as conn, get_db_connection() as quota_conn:
+        budget = QuotaBudget(quota_conn)
+        try:
+            # 제출 여부 인덱스를 먼저 갱신하여 제출된 보고서만 요청 (회사 100개씩 묶어 확인)
+            corp_codes = list(corp_index.corp_codes().values())
+            refresh_availability(conn, corp_codes, years, corp_index=corp_index, budget=budget)
+            with conn.cursor() as cur:
+                available = available_cells(cur, corp_codes, years)
+                targets = financial_targets(cur, corp_index, years, reprt_codes, refresh=refresh,
+                                            available=available)
+            conn.commit()
+            logger.info(f"📋 수집 대상 {len(targets):,}건 (사업연도 {years}, 분기 {quarters})")
+            if not targets:
+                return
+
+            rows, missing, failed = asyncio.run(fetch_financials(targets, budget=budget))
+        finally:
+            budget.close()
+
+        try:
+            with conn.cursor() as cur:
+                saved = save_financial_rows(cur, rows)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"❌ 저장 실패: {e}")
+            return
+
+        # 새 재무 데이터를 TTM과 일별 PER/PBR에 반영
+        try:
+            update_after_filings(conn, [row[0] for row in rows])
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"❌ 밸류에이션 갱신 실패: {e}")
+
+    elapsed = time.time() - start_time
+    logger.info(f"  ✅ {saved:,}건 저장, 보고서 없음 {len(missing):,}건, 실패 {len(failed):,}건")
+    logger.info(f"  📡 API 요청 {budget.used:,}건, 소요 시간 {elapsed:.1f}초")
+    if budget.exhausted:
+        logger.warning("  ⚠️  일일 요청 한도 소진, 내일 다시 실행하면 이어서 수집합니다.")
+
+if __name__ == '__main__':
+    main()
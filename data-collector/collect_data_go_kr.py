@@ -14,6 +14,11 @@ from datetime import datetime, timedelta
 import sys
 import xml.etree.ElementTree as ET
 from common.logger import get_logger, log_exception, log_api_call, log_db_operation
+from analytics.activity import detect_unusual_activity
+from analytics.daily_coverage import coverage_rows, save_coverage_rows
+from analytics.market_cap import market_cap_rows, save_market_cap_rows
+from analytics.pipeline import run_post_ingest
+from common.assets import SOURCE_STOCK, register_assets, stock_market_type
 
 load_dotenv()
 
@@ -103,7 +108,7 @@ def get_stock_price_data(base_date, page_no=1, num_of_rows=1000):
         log_api_call(logger, 'getStockPriceInfo', {'base_date': base_date}, success=False, error=str(e))
         return []
 
-def insert_stock_batch(stocks_data):
+def insert_stock_batch(stocks_data, trade_date=None):
     """종목 정보 배치 삽입 - API의 모든 필드 저장"""
     if not stocks_data:
         return
@@ -140,26 +145,8 @@ def insert_stock_batch(stocks_data):
             except (ValueError, TypeError):
                 pass
 
-            # 시장 구분 매핑 (종목명 기반으로 ETF 판별)
-            # ETF는 종목명에 KODEX, TIGER, ARIRANG, KBSTAR 등 특정 ETF 브랜드명이 포함됨
-            # KB, NH, MIRAE, KIWOOM 같은 일반 증권사명은 제외 (일반 종목과 혼동)
-            etf_keywords = ['KODEX', 'TIGER', 'ARIRANG', 'KBSTAR', 'KOSEF', 'TREX', 'SOL ', 'ACE ',
-                           'TIMEFOLIO', 'RISE', 'PLUS', 'HANARO', 'SMART', 'KINDEX', 'SYNTH',
-                           'TRUE', 'MULTI', 'FOCUS', 'ITF', 'ALPHA', 'KTOP', 'QV',
-                           '1Q', 'HK ', '마이티', '에셋플러스']
-
-            is_etf = any(keyword in stock_name for keyword in etf_keywords)
-
-            if is_etf:
-                market_type = 'ETF'
-            elif market_type == 'KOSPI':
-                market_type = 'KOSPI'
-            elif market_type == 'KOSDAQ':
-                market_type = 'KOSDAQ'
-            elif market_type == 'KONEX':
-                market_type = 'KONEX'
-            else:
-                market_type = 'ETC'
+            # 시장 구분 (mrktCtg, ETF 여부는 아래 레지스트리 반영 시 결정)
+            market_type = stock_market_type(market_type)
 
             cur.execute("""
                 INSERT INTO stocks (
@@ -177,6 +164,9 @@ def insert_stock_batch(stocks_data):
             """, (stock_code, stock_name, market_type, 'STOCK',
                   isin_code, listed_shares, market_cap))
 
+        # 엔드포인트 기준 자산 구분 반영 (같은 트랜잭션)
+        register_assets(cur, stocks_data, SOURCE_STOCK, trade_date)
+
         conn.commit()
         logger.info(f"  ✅ {len(stocks_data)}개 종목 정보 저장 (ISIN, 상장주식수, 시가총액 포함)")
 
@@ -260,6 +250,13 @@ def insert_daily_price_batch(prices_data, trade_date):
 
             inserted += cur.rowcount
 
+        # 일별 시가총액/상장주식수 (같은 트랜잭션에서 일괄 저장)
+        save_market_cap_rows(cur, market_cap_rows(prices_data, trade_date))
+        # 거래량 급증/급등락 탐지 (같은 트랜잭션)
+        detect_unusual_activity(cur, prices_data, trade_date)
+        # 거래일 × 시장구분 수집 현황 요약 (같은 트랜잭션)
+        save_coverage_rows(cur, coverage_rows(prices_data, trade_date, SOURCE_STOCK))
+
         conn.commit()
         return inserted
 
@@ -287,6 +284,7 @@ def collect_date_range(start_date, end_date):
     total_days = (end - current_date).days + 1
     processed_days = 0
     total_records = 0
+    ingested_dates = []
 
     while current_date <= end:
         date_str = current_date.strftime('%Y%m%d')
@@ -318,17 +316,23 @@ def collect_date_range(start_date, end_date):
 
         if all_items:
             # 종목 정보 저장
-            insert_stock_batch(all_items)
+            insert_stock_batch(all_items, date_formatted)
 
             # 가격 데이터 저장
             count = insert_daily_price_batch(all_items, date_formatted)
             logger.info(f"  ✅ {count}건 가격 데이터 저장")
             total_records += count
+            if count > 0:
+                ingested_dates.append(date_formatted)
 
         # 다음 날짜로
         current_date += timedelta(days=1)
         time.sleep(1)  # API 제한 방지
 
+    # 파생 데이터 증분 갱신 (수집 기간 전체를 한 번에, 거래일마다 전체 히스토리를 다시 읽지 않음)
+    if ingested_dates:
+        run_post_ingest(ingested_dates)
+
     return total_records
 
 def main():
@@ -13,6 +13,11 @@ from dotenv import load_dotenv
 from datetime import datetime, timedelta
 import logging
 import sys
+from analytics.activity import detect_unusual_activity
+from analytics.daily_coverage import coverage_rows, save_coverage_rows
+from analytics.market_cap import market_cap_rows, save_market_cap_rows
+from analytics.pipeline import run_post_ingest
+from common.assets import SOURCE_ETF, register_assets
 
 load_dotenv()
 
@@ -101,7 +106,7 @@ def get_etf_price_data(base_date, page_no=1, num_of_rows=1000):
         logging.error(f"  ❌ 데이터 처리 실패: {e}")
         return []
 
-def insert_etf_batch(etfs_data):
+def insert_etf_batch(etfs_data, trade_date=None):
     """ETF 정보 배치 삽입 - API의 모든 필드 저장"""
     if not etfs_data:
         return
@@ -178,6 +183,9 @@ def insert_etf_batch(etfs_data):
                   isin_code, listed_shares, nav, net_asset_total,
                   base_index_name, base_index_close))
 
+        # 엔드포인트 기준 자산 구분 반영 (같은 트랜잭션)
+        register_assets(cur, etfs_data, SOURCE_ETF, trade_date)
+
         conn.commit()
         logging.info(f"  ✅ {len(etfs_data)}개 ETF 정보 저장 (ISIN, NAV, 순자산총액 등 포함)")
 
@@ -264,6 +272,13 @@ def insert_daily_price_batch(prices_data, trade_date):
 
             inserted += cur.rowcount
 
+        # 일별 시가총액/상장주식수 (같은 트랜잭션에서 일괄 저장)
+        save_market_cap_rows(cur, market_cap_rows(prices_data, trade_date))
+        # 거래량 급증/급등락 탐지 (같은 트랜잭션)
+        detect_unusual_activity(cur, prices_data, trade_date)
+        # 거래일 × 시장구분 수집 현황 요약 (같은 트랜잭션)
+        save_coverage_rows(cur, coverage_rows(prices_data, trade_date, SOURCE_ETF))
+
         conn.commit()
         return inserted
 
@@ -291,6 +306,7 @@ def collect_date_range(start_date, end_date):
     total_days = (end - current_date).days + 1
     processed_days = 0
     total_records = 0
+    ingested_dates = []
 
     while current_date <= end:
         date_str = current_date.strftime('%Y%m%d')
@@ -322,17 +338,23 @@ def collect_date_range(start_date, end_date):
 
         if all_items:
             # ETF 정보 저장
-            insert_etf_batch(all_items)
+            insert_etf_batch(all_items, date_formatted)
 
             # 가격 데이터 저장
             count = insert_daily_price_batch(all_items, date_formatted)
             logging.info(f"  ✅ {count}건 가격 데이터 저장")
             total_records += count
+            if count > 0:
+                ingested_dates.append(date_formatted)
 
         # 다음 날짜로
         current_date += timedelta(days=1)
         time.sleep(1)  # API 제한 방지
 
+    # 파생 데이터 증분 갱신 (수집 기간 전체를 한 번에, 거래일마다 전체 히스토리를 다시 읽지 않음)
+    if ingested_dates:
+        run_post_ingest(ingested_dates)
+
     return total_records
 
 def main():
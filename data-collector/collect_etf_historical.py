@@ -12,6 +12,11 @@ from dotenv import load_dotenv
 from datetime import datetime, timedelta
 import logging
 import sys
+from analytics.activity import detect_unusual_activity
+from analytics.daily_coverage import coverage_rows, save_coverage_rows
+from analytics.market_cap import market_cap_rows, save_market_cap_rows
+from analytics.pipeline import run_post_ingest
+from common.assets import SOURCE_ETF, register_assets
 
 load_dotenv()
 
@@ -82,7 +87,7 @@ def get_etf_price_data(base_date, page_no=1, num_of_rows=1000):
         logging.error(f"  ❌ API 호출 실패: {e}")
         return [], 0
 
-def save_etf_info(etf_list):
+def save_etf_info(etf_list, trade_date=None):
     """ETF 종목 정보 저장"""
     if not etf_list:
         return 0
@@ -113,6 +118,9 @@ def save_etf_info(etf_list):
 
             inserted += cur.rowcount
 
+        # 엔드포인트 기준 자산 구분 반영 (같은 트랜잭션)
+        register_assets(cur, etf_list, SOURCE_ETF, trade_date)
+
         conn.commit()
         return inserted
 
@@ -202,6 +210,13 @@ def save_etf_prices(prices_data, trade_date):
 
             inserted += cur.rowcount
 
+        # 일별 시가총액/상장주식수 (같은 트랜잭션에서 일괄 저장)
+        save_market_cap_rows(cur, market_cap_rows(prices_data, trade_date))
+        # 거래량 급증/급등락 탐지 (같은 트랜잭션)
+        detect_unusual_activity(cur, prices_data, trade_date)
+        # 거래일 × 시장구분 수집 현황 요약 (같은 트랜잭션)
+        save_coverage_rows(cur, coverage_rows(prices_data, trade_date, SOURCE_ETF))
+
         conn.commit()
         return inserted
 
@@ -227,7 +242,7 @@ def collect_single_date(date_str):
         return 0
 
     # 종목 정보 저장
-    save_etf_info(data)
+    save_etf_info(data, trade_date)
 
     # 가격 데이터 저장
     saved = save_etf_prices(data, trade_date)
@@ -242,6 +257,7 @@ def collect_date_range(start_date_str, end_date_str):
     current_date = start_date
     total_records = 0
     day_count = 0
+    ingested_dates = []
     total_days = (end_date - start_date).days + 1
 
     while current_date <= end_date:
@@ -257,12 +273,17 @@ def collect_date_range(start_date_str, end_date_str):
         if saved > 0:
             logging.info(f"  ✅ {saved}건 저장 완료")
             total_records += saved
+            ingested_dates.append(current_date.strftime('%Y-%m-%d'))
         else:
             logging.warning(f"  ⚠️  데이터 없음")
 
         current_date += timedelta(days=1)
         time.sleep(0.5)  # API 호출 간 대기
 
+    # 파생 데이터 증분 갱신 (수집 기간 전체를 한 번에)
+    if ingested_dates:
+        run_post_ingest(ingested_dates)
+
     return total_records
 
 def main():
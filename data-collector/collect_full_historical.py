@@ -13,6 +13,11 @@ from dotenv import load_dotenv
 from datetime import datetime, timedelta
 import logging
 import sys
+from analytics.activity import detect_unusual_activity
+from analytics.daily_coverage import coverage_rows, save_coverage_rows
+from analytics.market_cap import market_cap_rows, save_market_cap_rows
+from analytics.pipeline import run_post_ingest
+from common.assets import SOURCE_ETF, SOURCE_STOCK, register_assets, stock_market_type
 
 load_dotenv()
 
@@ -96,7 +101,7 @@ def get_api_data(api_url, base_date, page_no=1, num_of_rows=1000):
         logging.error(f"  ❌ 데이터 처리 실패: {e}")
         return []
 
-def insert_stock_batch(stocks_data):
+def insert_stock_batch(stocks_data, trade_date=None):
     """종목 정보 배치 삽입"""
     if not stocks_data:
         return
@@ -132,15 +137,8 @@ def insert_stock_batch(stocks_data):
             except (ValueError, TypeError):
                 pass
 
-            # 시장 구분
-            if market_type == 'KOSPI':
-                market_type = 'KOSPI'
-            elif market_type == 'KOSDAQ':
-                market_type = 'KOSDAQ'
-            elif market_type == 'KONEX':
-                market_type = 'ETF'
-            else:
-                market_type = 'ETC'
+            # 시장 구분 (mrktCtg 그대로, ETF 여부는 아래 레지스트리 반영 시 결정)
+            market_type = stock_market_type(market_type)
 
             cur.execute("""
                 INSERT INTO stocks (
@@ -158,6 +156,9 @@ def insert_stock_batch(stocks_data):
             """, (stock_code, stock_name, market_type, 'STOCK',
                   isin_code, listed_shares, market_cap))
 
+        # 엔드포인트 기준 자산 구분 반영 (같은 트랜잭션)
+        register_assets(cur, stocks_data, SOURCE_STOCK, trade_date)
+
         conn.commit()
 
     except Exception as e:
@@ -169,7 +170,7 @@ def insert_stock_batch(stocks_data):
             cur.close()
             conn.close()
 
-def insert_etf_batch(etfs_data):
+def insert_etf_batch(etfs_data, trade_date=None):
     """ETF 정보 배치 삽입"""
     if not etfs_data:
         return
@@ -245,6 +246,9 @@ def insert_etf_batch(etfs_data):
                   isin_code, listed_shares, nav, net_asset_total,
                   base_index_name, base_index_close))
 
+        # 엔드포인트 기준 자산 구분 반영 (같은 트랜잭션)
+        register_assets(cur, etfs_data, SOURCE_ETF, trade_date)
+
         conn.commit()
 
     except Exception as e:
@@ -256,8 +260,8 @@ def insert_etf_batch(etfs_data):
             cur.close()
             conn.close()
 
-def insert_daily_price_batch(prices_data, trade_date):
-    """일별 시세 배치 삽입"""
+def insert_daily_price_batch(prices_data, trade_date, source=SOURCE_STOCK):
+    """일별 시세 배치 삽입 (source: 응답 엔드포인트)"""
     if not prices_data:
         return 0
 
@@ -330,6 +334,13 @@ def insert_daily_price_batch(prices_data, trade_date):
 
             inserted += cur.rowcount
 
+        # 일별 시가총액/상장주식수 (같은 트랜잭션에서 일괄 저장)
+        save_market_cap_rows(cur, market_cap_rows(prices_data, trade_date))
+        # 거래량 급증/급등락 탐지 (같은 트랜잭션)
+        detect_unusual_activity(cur, prices_data, trade_date)
+        # 거래일 × 시장구분 수집 현황 요약 (같은 트랜잭션)
+        save_coverage_rows(cur, coverage_rows(prices_data, trade_date, source))
+
         conn.commit()
         return inserted
 
@@ -367,7 +378,7 @@ def collect_date_data(date_str, date_formatted):
         time.sleep(0.3)
 
     if all_stock_items:
-        insert_stock_batch(all_stock_items)
+        insert_stock_batch(all_stock_items, date_formatted)
         count = insert_daily_price_batch(all_stock_items, date_formatted)
         logging.info(f"  ✅ 주식 {count}건 저장")
         total_records += count
@@ -392,8 +403,8 @@ def collect_date_data(date_str, date_formatted):
         time.sleep(0.3)
 
     if all_etf_items:
-        insert_etf_batch(all_etf_items)
-        count = insert_daily_price_batch(all_etf_items, date_formatted)
+        insert_etf_batch(all_etf_items, date_formatted)
+        count = insert_daily_price_batch(all_etf_items, date_formatted, SOURCE_ETF)
         logging.info(f"  ✅ ETF {count}건 저장")
         total_records += count
 
@@ -414,6 +425,7 @@ def collect_full_historical(start_date, end_date):
     processed_days = 0
     total_records = 0
     success_days = 0
+    ingested_dates = []
 
     logging.info(f"\n{'='*80}")
     logging.info(f"📅 수집 기간: {current_date.strftime('%Y-%m-%d')} ~ {end.strftime('%Y-%m-%d')}")
@@ -443,6 +455,7 @@ def collect_full_historical(start_date, end_date):
                 total_records += records
                 success_days += 1
                 logging.info(f"  ✅ 총 {records}건 저장 완료")
+                ingested_dates.append(date_formatted)
             else:
                 logging.info(f"  ℹ️  데이터 없음 (휴장일 가능)")
 
@@ -458,6 +471,10 @@ def collect_full_historical(start_date, end_date):
         current_date += timedelta(days=1)
         time.sleep(1)  # API 제한 방지
 
+    # 파생 데이터 증분 갱신 (수집 기간 전체를 한 번에, 거래일마다 전체 히스토리를 다시 읽지 않음)
+    if ingested_dates:
+        run_post_ingest(ingested_dates)
+
     return total_records, success_days
 
 def main():
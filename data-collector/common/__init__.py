@@ -4,6 +4,9 @@ from .database import (
     get_db_connection,
     get_db_cursor,
     execute_query,
+    stream_query,
+    stream_query_chunks,
+    bulk_upsert,
     upsert_stock,
     upsert_daily_price
 )
@@ -16,6 +19,9 @@ __all__ = [
     'get_db_connection',
     'get_db_cursor',
     'execute_query',
+    'stream_query',
+    'stream_query_chunks',
+    'bulk_upsert',
     'upsert_stock',
     'upsert_daily_price',
     'get_logger'
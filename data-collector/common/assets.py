@@ -0,0 +1,148 @@
+"""종목 자산 구분 레지스트리
+
+종목명 키워드 추정 대신 어느 API 응답에 등장했는지로 자산 구분을 정한다.
+
+- getETFPriceInfo 응답 종목 → ETF (한 번 ETF로 확인되면 유지)
+- getStockPriceInfo 응답 종목 → STOCK, 시장구분은 응답의 mrktCtg
+
+수집기가 종목 정보를 저장하는 트랜잭션 안에서 asset_registry를 갱신하고
+해당 종목의 stocks.asset_type/market_type을 레지스트리 기준으로 맞춘다.
+"""
+from psycopg2.extras import execute_values
+
+SOURCE_STOCK = 'getStockPriceInfo'
+SOURCE_ETF = 'getETFPriceInfo'
+
+MARKET_TYPES = ('KOSPI', 'KOSDAQ', 'KONEX')
+
+CREATE_ASSET_REGISTRY_SQL = """
+    CREATE TABLE IF NOT EXISTS asset_registry (
+        stock_code VARCHAR(10) PRIMARY KEY,
+        asset_type VARCHAR(10) NOT NULL,
+        market_type VARCHAR(20) NOT NULL,
+        source VARCHAR(30) NOT NULL,
+        first_seen DATE,
+        last_seen DATE,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_asset_registry_market ON asset_registry(market_type);
+"""
+
+# ETF 엔드포인트에서 확인된 종목은 주식 엔드포인트 응답으로 덮어쓰지 않음
+UPSERT_ASSET_SQL = """
+    INSERT INTO asset_registry (stock_code, asset_type, market_type, source, first_seen, last_seen)
+    VALUES %s
+    ON CONFLICT (stock_code) DO UPDATE SET
+        asset_type = CASE WHEN asset_registry.asset_type = 'ETF' THEN 'ETF' ELSE EXCLUDED.asset_type END,
+        market_type = CASE WHEN asset_registry.asset_type = 'ETF' THEN 'ETF' ELSE EXCLUDED.market_type END,
+        source = CASE WHEN asset_registry.asset_type = 'ETF' THEN asset_registry.source ELSE EXCLUDED.source END,
+        first_seen = LEAST(asset_registry.first_seen, EXCLUDED.first_seen),
+        last_seen = GREATEST(asset_registry.last_seen, EXCLUDED.last_seen),
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+SYNC_STOCKS_SQL = """
+    UPDATE stocks s
+    SET asset_type = r.asset_type,
+        market_type = r.market_type
+    FROM asset_registry r
+    WHERE s.stock_code = r.stock_code
+      AND r.stock_code = ANY(%s)
+      AND (s.asset_type IS DISTINCT FROM r.asset_type OR s.market_type IS DISTINCT FROM r.market_type)
+"""
+
+
+def stock_market_type(mrkt_ctg):
+    """주식 엔드포인트 시장구분(mrktCtg) → stocks.market_type (알 수 없으면 ETC)"""
+    return mrkt_ctg if mrkt_ctg in MARKET_TYPES else 'ETC'
+
+
+def asset_rows(items, source, trade_date=None):
+    """
+    API 응답 항목 → asset_registry 행 (종목코드 중복 제거)
+
+    Args:
+        items: API 응답 항목 (srtnCd, mrktCtg)
+        source: SOURCE_STOCK 또는 SOURCE_ETF
+        trade_date: 응답 기준일 ('YYYY-MM-DD', None이면 기록 안 함)
+
+    Returns:
+        list: [(stock_code, asset_type, market_type, source, first_seen, last_seen), ...]
+    """
+    rows = {}
+    for item in items:
+        stock_code = item.get('srtnCd')
+        if not stock_code:
+            continue
+        if source == SOURCE_ETF:
+            asset_type, market_type = 'ETF', 'ETF'
+        else:
+            asset_type, market_type = 'STOCK', stock_market_type(item.get('mrktCtg'))
+        rows[stock_code] = (stock_code, asset_type, market_type, source, trade_date, trade_date)
+    return list(rows.values())
+
+
+def register_assets(cursor, items, source, trade_date=None):
+    """
+    API 응답 종목을 레지스트리에 반영하고 stocks 구분을 맞춤 (커밋은 호출자 담당)
+
+    stocks 행을 저장한 뒤 같은 트랜잭션에서 호출한다.
+
+    Args:
+        cursor: 종목 정보를 저장한 트랜잭션의 커서
+        items: API 응답 항목
+        source: SOURCE_STOCK 또는 SOURCE_ETF
+        trade_date: 응답 기준일 ('YYYY-MM-DD')
+
+    Returns:
+        int: 구분이 바뀐 stocks 행 수
+    """
+    rows = asset_rows(items, source, trade_date)
+    if not rows:
+        return 0
+
+    cursor.execute(CREATE_ASSET_REGISTRY_SQL)
+    execute_values(cursor, UPSERT_ASSET_SQL, rows, page_size=5000)
+    cursor.execute(SYNC_STOCKS_SQL, ([row[0] for row in rows],))
+    return cursor.rowcount
+
+
+def seed_asset_registry(cursor):
+    """
+    기존 stocks.asset_type으로 레지스트리 초기 적재 (이미 등록된 종목은 유지, 커밋은 호출자 담당)
+
+    asset_type='ETF'는 ETF 엔드포인트 수집기만 기록하므로 그대로 신뢰한다.
+    종목명 추정으로 market_type이 ETF가 된 일반 종목은 원래 시장구분을 알 수 없으므로
+    주식 엔드포인트 응답으로 등록될 때까지 건너뛴다.
+
+    Returns:
+        int: 새로 등록된 종목 수
+    """
+    cursor.execute(CREATE_ASSET_REGISTRY_SQL)
+    cursor.execute("""
+        INSERT INTO asset_registry (stock_code, asset_type, market_type, source)
+        SELECT stock_code,
+               CASE WHEN asset_type = 'ETF' THEN 'ETF' ELSE 'STOCK' END,
+               CASE WHEN asset_type = 'ETF' THEN 'ETF'
+                    WHEN market_type IN %s THEN market_type
+                    ELSE 'ETC' END,
+               CASE WHEN asset_type = 'ETF' THEN %s ELSE %s END
+        FROM stocks
+        WHERE asset_type = 'ETF' OR market_type IS DISTINCT FROM 'ETF'
+        ON CONFLICT (stock_code) DO NOTHING
+    """, (MARKET_TYPES, SOURCE_ETF, SOURCE_STOCK))
+    return cursor.rowcount
+
+
+def sync_all_stocks(cursor):
+    """레지스트리에 등록된 전체 종목의 stocks 구분을 맞춤 (커밋은 호출자 담당)"""
+    cursor.execute(CREATE_ASSET_REGISTRY_SQL)
+    cursor.execute("""
+        UPDATE stocks s
+        SET asset_type = r.asset_type,
+            market_type = r.market_type
+        FROM asset_registry r
+        WHERE s.stock_code = r.stock_code
+          AND (s.asset_type IS DISTINCT FROM r.asset_type OR s.market_type IS DISTINCT FROM r.market_type)
+    """)
+    return cursor.rowcount
@@ -18,6 +18,9 @@ DB_CONFIG = {
 DATA_GO_KR_API_KEY = os.getenv('DATA_GO_KR_API_KEY')
 DART_API_KEY = os.getenv('DART_API_KEY')
 
+# DART 일일 요청 한도 (개인 키 기준 약 20,000건)
+DART_DAILY_LIMIT = int(os.getenv('DART_DAILY_LIMIT', '20000'))
+
 # API 엔드포인트
 DATA_GO_KR_BASE_URL = 'http://apis.data.go.kr/1160100/service/GetStockSecuritiesInfoService'
 DART_BASE_URL = 'https://opendart.fss.or.kr/api'
@@ -25,3 +28,6 @@ DART_BASE_URL = 'https://opendart.fss.or.kr/api'
 # 로그 설정
 LOG_DIR = os.path.join(os.path.dirname(__file__), '../logs')
 os.makedirs(LOG_DIR, exist_ok=True)
+
+# 로컬 캐시 설정 (DataFrame 캐시 등)
+CACHE_DIR = os.getenv('COLLECTOR_CACHE_DIR', os.path.join(os.path.dirname(__file__), '../cache'))
@@ -1,6 +1,8 @@
 """데이터베이스 유틸리티 모듈"""
+import itertools
 import psycopg2
 from psycopg2 import pool
+from psycopg2.extras import execute_values
 from contextlib import contextmanager
 from .config import DB_CONFIG
 from .logger import get_logger
@@ -63,6 +65,111 @@ def execute_query(query, params=None, fetch=False):
             return cursor.fetchall()
         return cursor.rowcount
 
+_cursor_counter = itertools.count(1)
+
+def _stream_rows(conn, query, params, itersize, chunk_size, name):
+    """서버사이드(named) 커서로 결과를 청크 단위로 읽어 반환"""
+    cursor_name = name or f"stream_cursor_{next(_cursor_counter)}"
+    with conn.cursor(name=cursor_name) as cursor:
+        cursor.itersize = itersize
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk_size or itersize)
+            if not rows:
+                break
+            yield [desc[0] for desc in cursor.description], rows
+
+def stream_query(query, params=None, itersize=2000, conn=None, name=None):
+    """
+    서버사이드 커서 스트리밍 조회 (행 단위)
+
+    결과 전체를 클라이언트 메모리에 올리지 않고 itersize 단위로
+    받아오면서 한 행씩 반환한다.
+
+    Args:
+        query: SQL 쿼리 (SELECT 한 문장)
+        params: 쿼리 파라미터
+        itersize: 서버에서 한 번에 가져올 행 수
+        conn: 사용할 연결 (None이면 커넥션 풀 사용)
+        name: 서버사이드 커서 이름 (None이면 자동 생성)
+
+    Yields:
+        tuple: 결과 행
+    """
+    for _, rows in stream_query_chunks(query, params, itersize, conn=conn, name=name):
+        yield from rows
+
+def stream_query_chunks(query, params=None, chunk_size=10000, columnar=False, conn=None, name=None):
+    """
+    서버사이드 커서 스트리밍 조회 (청크 단위)
+
+    Args:
+        query: SQL 쿼리 (SELECT 한 문장)
+        params: 쿼리 파라미터
+        chunk_size: 청크당 행 수 (itersize로도 사용)
+        columnar: True면 {컬럼명: 값 튜플} 형태의 컬럼 배열로 반환
+        conn: 사용할 연결 (None이면 커넥션 풀 사용)
+        name: 서버사이드 커서 이름 (None이면 자동 생성)
+
+    Yields:
+        list 또는 dict: 행 목록 또는 컬럼별 값 배열
+    """
+    def _chunks(connection):
+        for columns, rows in _stream_rows(connection, query, params, chunk_size, chunk_size, name):
+            if columnar:
+                yield dict(zip(columns, zip(*rows)))
+            else:
+                yield rows
+
+    if conn is not None:
+        yield from _chunks(conn)
+        return
+
+    with get_db_connection() as pooled_conn:
+        try:
+            yield from _chunks(pooled_conn)
+        finally:
+            # 읽기 전용 트랜잭션 종료 (커서 해제)
+            pooled_conn.rollback()
+
+def bulk_upsert(cursor, table, columns, rows, conflict_columns, update_columns=None, page_size=1000):
+    """
+    다건 UPSERT (execute_values 기반 벌크 쓰기)
+
+    Args:
+        cursor: 데이터베이스 커서 (커밋은 호출자가 담당)
+        table: 테이블명
+        columns: 컬럼명 목록
+        rows: 값 튜플 목록
+        conflict_columns: ON CONFLICT 대상 컬럼 목록
+        update_columns: 갱신할 컬럼 목록 (None이면 충돌 컬럼 외 전체, 빈 목록이면 DO NOTHING)
+        page_size: 한 번에 전송할 행 수
+
+    Returns:
+        int: 처리된 행 수
+    """
+    if not rows:
+        return 0
+
+    if update_columns is None:
+        update_columns = [c for c in columns if c not in conflict_columns]
+
+    if update_columns:
+        conflict_action = "DO UPDATE SET " + ", ".join(
+            f"{c} = EXCLUDED.{c}" for c in update_columns
+        )
+    else:
+        conflict_action = "DO NOTHING"
+
+    query = f"""
+        INSERT INTO {table} ({", ".join(columns)})
+        VALUES %s
+        ON CONFLICT ({", ".join(conflict_columns)})
+        {conflict_action}
+    """
+    execute_values(cursor, query, rows, page_size=page_size)
+    return len(rows)
+
 def upsert_stock(stock_data):
     """종목 정보 UPSERT"""
     query = """
@@ -0,0 +1,370 @@
+"""압축 dtype DataFrame 로더 모듈 (워터마크 기반 디스크 캐시)
+
+분석 스크립트가 같은 히스토리를 반복 조회할 때 매번 Postgres에서
+object 폭으로 읽어오지 않도록, 압축 dtype으로 변환한 결과를
+Arrow IPC(Feather) 파일로 로컬 디스크에 캐시한다.
+
+캐시 키는 (조회 구간, 종목 필터, 워터마크)이며 워터마크는
+daily_prices의 마지막 적재 거래일과 수집기의 마지막 적재 시각이다.
+수집기가 거래일을 커밋하면 워터마크가 바뀌어 기존 캐시는 자동으로 무효화된다.
+"""
+import glob
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.feather as feather
+
+from .config import CACHE_DIR
+from .database import get_db_cursor, stream_query_chunks
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+FRAME_CACHE_DIR = os.path.join(CACHE_DIR, 'frames')
+
+# 일별 시세 컬럼별 Arrow 타입 (가격 int32, 거래량/거래대금 int64, 날짜 date32)
+PRICE_COLUMN_TYPES = {
+    'stock_code': pa.string(),
+    'trade_date': pa.date32(),
+    'open_price': pa.int32(),
+    'high_price': pa.int32(),
+    'low_price': pa.int32(),
+    'close_price': pa.int32(),
+    'volume': pa.int64(),
+    'vs': pa.int32(),
+    'change_rate': pa.float32(),
+    'trading_value': pa.int64(),
+}
+
+# 종목 정보 컬럼별 Arrow 타입
+STOCK_COLUMN_TYPES = {
+    'stock_code': pa.string(),
+    'stock_name': pa.string(),
+    'market_type': pa.string(),
+    'asset_type': pa.string(),
+    'listed_shares': pa.int64(),
+    'market_cap': pa.int64(),
+    'nav': pa.float64(),
+    'net_asset_total': pa.int64(),
+    'base_index_name': pa.string(),
+    'base_index_close': pa.float64(),
+}
+
+# 카테고리(dictionary)로 인코딩할 컬럼
+CATEGORICAL_COLUMNS = ('stock_code', 'market_type', 'asset_type', 'base_index_name')
+
+# NULL이 없는 컬럼은 numpy dtype, NULL 가능 컬럼은 pandas nullable dtype으로 변환
+_PANDAS_TYPES = {
+    pa.int32(): pd.Int32Dtype(),
+    pa.int64(): pd.Int64Dtype(),
+    pa.float32(): pd.Float32Dtype(),
+    pa.float64(): pd.Float64Dtype(),
+    pa.date32(): pd.ArrowDtype(pa.date32()),
+    pa.string(): pd.StringDtype(),
+}
+
+# OHLCV는 수집기가 0으로 채워 저장하므로 NOT NULL로 취급
+_NOT_NULL_PRICE_COLUMNS = ('open_price', 'high_price', 'low_price', 'close_price', 'volume')
+
+
+CREATE_INGEST_WATERMARK_SQL = """
+    CREATE TABLE IF NOT EXISTS ingest_watermark (
+        id SMALLINT PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+        last_trade_date DATE NOT NULL,
+        ingested_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+def mark_ingested(cursor, trade_date):
+    """
+    수집기가 거래일을 커밋했음을 기록 (커밋은 호출자 담당)
+
+    과거 거래일을 재수집(backfill)해도 MAX(trade_date)는 바뀌지 않으므로,
+    적재 시각을 함께 기록하여 워터마크가 항상 바뀌도록 한다.
+    """
+    cursor.execute(CREATE_INGEST_WATERMARK_SQL)
+    cursor.execute("""
+        INSERT INTO ingest_watermark (id, last_trade_date, ingested_at)
+        VALUES (1, %s, clock_timestamp())
+        ON CONFLICT (id)
+        DO UPDATE SET
+            last_trade_date = EXCLUDED.last_trade_date,
+            ingested_at = EXCLUDED.ingested_at
+    """, (trade_date,))
+
+
+def get_watermark(cursor):
+    """마지막 적재 거래일 + 적재 시각 조회 (캐시 무효화 기준)"""
+    cursor.execute("""
+        SELECT (SELECT MAX(trade_date) FROM daily_prices),
+               to_regclass('ingest_watermark') IS NOT NULL
+    """)
+    last_date, has_watermark_table = cursor.fetchone()
+    watermark = last_date.isoformat() if last_date else 'empty'
+
+    if has_watermark_table:
+        cursor.execute("SELECT ingested_at FROM ingest_watermark WHERE id = 1")
+        row = cursor.fetchone()
+        if row:
+            watermark = f"{watermark}_{row[0].strftime('%Y%m%d%H%M%S%f')}"
+    return watermark
+
+
+def _window_key(kind, params):
+    """조회 구간/필터로 캐시 파일 접두어 생성"""
+    payload = json.dumps({'kind': kind, **params}, sort_keys=True, default=str)
+    return f"{kind}_{hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]}"
+
+
+def _cache_path(window_key, watermark):
+    return os.path.join(FRAME_CACHE_DIR, f"{window_key}_{watermark}.feather")
+
+
+def _read_cache(window_key, watermark):
+    path = _cache_path(window_key, watermark)
+    if not os.path.exists(path):
+        return None
+    try:
+        return feather.read_table(path, memory_map=True)
+    except Exception as e:
+        logger.warning(f"캐시 파일 읽기 실패, 재조회합니다: {path} ({e})")
+        return None
+
+
+def _write_cache(window_key, watermark, table):
+    """캐시 저장 후 같은 구간의 이전 워터마크 파일 정리"""
+    os.makedirs(FRAME_CACHE_DIR, exist_ok=True)
+    path = _cache_path(window_key, watermark)
+    tmp_path = f"{path}.tmp"
+    feather.write_feather(table, tmp_path, compression='lz4')
+    os.replace(tmp_path, path)
+
+    for stale in glob.glob(os.path.join(FRAME_CACHE_DIR, f"{window_key}_*.feather")):
+        if stale != path:
+            os.remove(stale)
+
+
+def _copy_to_table(cursor, query, params, column_types):
+    """COPY ... TO STDOUT 결과를 Arrow Table로 변환"""
+    sql = cursor.mogrify(query, params).decode('utf-8')
+    buffer = io.BytesIO()
+    cursor.copy_expert(f"COPY ({sql}) TO STDOUT WITH CSV HEADER", buffer)
+    buffer.seek(0)
+
+    table = pa_csv.read_csv(
+        buffer,
+        convert_options=pa_csv.ConvertOptions(
+            column_types=column_types,
+            strings_can_be_null=True
+        )
+    )
+
+    for name in CATEGORICAL_COLUMNS:
+        index = table.schema.get_field_index(name)
+        if index >= 0:
+            table = table.set_column(index, name, table.column(name).dictionary_encode())
+    return table
+
+
+def _to_frame(table, not_null_columns=()):
+    """Arrow Table을 압축 dtype DataFrame으로 변환"""
+    df = table.to_pandas(types_mapper=_PANDAS_TYPES.get)
+    for name in not_null_columns:
+        if name in df.columns:
+            df[name] = df[name].fillna(0).to_numpy(dtype=table.schema.field(name).type.to_pandas_dtype())
+    return df
+
+
+def _load(kind, params, query, query_params, column_types, not_null_columns, use_cache):
+    with get_db_cursor(commit=False) as cursor:
+        watermark = get_watermark(cursor)
+        window_key = _window_key(kind, params)
+
+        table = _read_cache(window_key, watermark) if use_cache else None
+        if table is not None:
+            logger.debug(f"캐시 적중: {kind} (워터마크 {watermark})")
+        else:
+            table = _copy_to_table(cursor, query, query_params, column_types)
+            if use_cache:
+                _write_cache(window_key, watermark, table)
+            logger.info(f"DB 조회: {kind} {table.num_rows:,}건 (워터마크 {watermark})")
+
+    return _to_frame(table, not_null_columns)
+
+
+def load_daily_prices(start_date=None, end_date=None, stock_codes=None, use_cache=True):
+    """
+    일별 시세를 압축 dtype DataFrame으로 조회
+
+    Args:
+        start_date: 시작일 (date 또는 'YYYY-MM-DD', None이면 제한 없음)
+        end_date: 종료일 (date 또는 'YYYY-MM-DD', None이면 제한 없음)
+        stock_codes: 종목코드 목록 (None이면 전체)
+        use_cache: 디스크 캐시 사용 여부
+
+    Returns:
+        pandas.DataFrame: stock_code(category), trade_date(date32),
+            OHLC(int32), volume(int64), vs(Int32), change_rate(Float32),
+            trading_value(Int64)
+    """
+    codes = sorted(set(stock_codes)) if stock_codes else None
+    params = {'start_date': start_date, 'end_date': end_date, 'stock_codes': codes}
+
+    query = """
+        SELECT stock_code, trade_date, open_price, high_price, low_price,
+               close_price, volume, vs, change_rate, trading_value
+        FROM daily_prices
+        WHERE (%(start_date)s::date IS NULL OR trade_date >= %(start_date)s::date)
+          AND (%(end_date)s::date IS NULL OR trade_date <= %(end_date)s::date)
+          AND (%(stock_codes)s::text[] IS NULL OR stock_code = ANY(%(stock_codes)s::text[]))
+        ORDER BY stock_code, trade_date
+    """
+    return _load('daily_prices', params, query, params, PRICE_COLUMN_TYPES,
+                 _NOT_NULL_PRICE_COLUMNS, use_cache)
+
+
+def load_stocks(market_types=None, use_cache=True):
+    """
+    종목 정보를 압축 dtype DataFrame으로 조회
+
+    Args:
+        market_types: 시장구분 목록 (None이면 전체)
+        use_cache: 디스크 캐시 사용 여부
+
+    Returns:
+        pandas.DataFrame: stock_code/market_type/asset_type(category) 등
+    """
+    markets = sorted(set(market_types)) if market_types else None
+    params = {'market_types': markets}
+
+    query = """
+        SELECT stock_code, stock_name, market_type, asset_type,
+               listed_shares, market_cap, nav, net_asset_total,
+               base_index_name, base_index_close
+        FROM stocks
+        WHERE (%(market_types)s::text[] IS NULL OR market_type = ANY(%(market_types)s::text[]))
+        ORDER BY stock_code
+    """
+    return _load('stocks', params, query, params, STOCK_COLUMN_TYPES, (), use_cache)
+
+
+def read_frame(query, params=None, conn=None, chunk_size=50000):
+    """
+    쿼리 결과를 서버사이드 커서로 스트리밍하여 DataFrame으로 조회
+
+    수집기 트랜잭션 안에서 (conn 지정) 증분 계산용 데이터를 읽을 때 사용한다.
+    캐시는 사용하지 않는다.
+
+    Args:
+        query: SQL 쿼리
+        params: 쿼리 파라미터
+        conn: 사용할 연결 (None이면 커넥션 풀 사용)
+        chunk_size: 청크당 행 수
+
+    Returns:
+        pandas.DataFrame: 조회 결과 (결과가 없으면 빈 DataFrame)
+    """
+    frames = [
+        pd.DataFrame(chunk)
+        for chunk in stream_query_chunks(query, params, chunk_size, columnar=True, conn=conn)
+    ]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+def as_day_array(values):
+    """날짜 값(date 객체, 문자열, date32 컬럼 등)을 datetime64[D] 배열로 변환"""
+    if isinstance(values, (str, np.datetime64)) or not hasattr(values, '__len__'):
+        values = [values]
+    return np.asarray(pd.to_datetime(pd.Series(values)), dtype='datetime64[D]')
+
+
+def current_state_codes(saved, days, conn=None):
+    """
+    저장된 이동 상태를 적재 거래일에 이어 붙일 수 있는 종목코드 집합
+
+    상태 기준일이 종목의 첫 적재일 직전 거래일(daily_prices의 마지막 유효 시세일)과 같고,
+    적재 구간 사이에 적재 대상이 아닌 시세일이 끼어 있지 않은 종목만 포함한다.
+    나머지(상태 이후 시세가 보충된 종목, 재적재 등)는 호출자가 전체 히스토리로 다시 계산한다.
+
+    Args:
+        saved: stock_code, trade_date 컬럼을 가진 상태 DataFrame
+        days: 적재 거래일 (정렬된 datetime64[D] 배열)
+        conn: 사용할 연결 (None이면 커넥션 풀 사용)
+
+    Returns:
+        set: 이어서 계산할 수 있는 종목코드
+    """
+    if saved.empty:
+        return set()
+
+    codes = saved['stock_code'].astype(str).tolist()
+    # 종목별 첫 적재일 직전 유효 시세일 ((stock_code, trade_date) 인덱스로 종목당 한 행만 읽음)
+    previous = read_frame("""
+        SELECT c.stock_code, p.trade_date
+        FROM unnest(%s::text[]) AS c(stock_code)
+        CROSS JOIN LATERAL (
+            SELECT dp.trade_date
+            FROM daily_prices dp
+            WHERE dp.stock_code = c.stock_code AND dp.trade_date < %s AND dp.close_price > 0
+            ORDER BY dp.trade_date DESC
+            LIMIT 1
+        ) p
+    """, (codes, str(days[0])), conn=conn)
+    if previous.empty:
+        return set()
+
+    previous_days = dict(zip(previous['stock_code'].astype(str), as_day_array(previous['trade_date'])))
+    state_days = as_day_array(saved['trade_date'])
+    current = {
+        code for code, day in zip(codes, state_days)
+        if code in previous_days and previous_days[code] == day
+    }
+
+    if current and len(days) > 1:
+        # 적재 구간 안에 적재 대상이 아닌 시세일이 있으면 상태를 이어 붙일 수 없음
+        gaps = read_frame("""
+            SELECT DISTINCT stock_code
+            FROM daily_prices
+            WHERE stock_code = ANY(%s) AND trade_date > %s AND trade_date < %s
+              AND close_price > 0 AND NOT (trade_date = ANY(%s::date[]))
+        """, (sorted(current), str(days[0]), str(days[-1]), [str(d) for d in days]), conn=conn)
+        if not gaps.empty:
+            current -= set(gaps['stock_code'].astype(str))
+
+    return current
+
+
+def frame_rows(df, columns):
+    """
+    DataFrame을 DB 쓰기용 튜플 목록으로 변환
+
+    numpy 스칼라는 파이썬 기본 타입으로, datetime64 컬럼은 date로,
+    NaN/NA는 None으로 바꿔 psycopg2가 그대로 어댑트할 수 있게 한다.
+    """
+    converted = {}
+    for name in columns:
+        column = df[name]
+        if pd.api.types.is_datetime64_any_dtype(column):
+            column = column.dt.date
+        column = column.astype(object)
+        converted[name] = column.where(column.notna(), None)
+    return list(zip(*(converted[name] for name in columns)))
+
+
+def clear_frame_cache():
+    """DataFrame 디스크 캐시 전체 삭제"""
+    removed = 0
+    for path in glob.glob(os.path.join(FRAME_CACHE_DIR, '*.feather')):
+        os.remove(path)
+        removed += 1
+    logger.info(f"DataFrame 캐시 삭제: {removed}개 파일")
+    return removed
@@ -0,0 +1,184 @@
+"""테이블 컬럼 프로파일러
+
+테이블의 모든 컬럼에 대한 결측 수, 최소/최대값, 고유값 수 추정을 FILTER 집계로
+한 번의 스캔에서 계산한다. TABLESAMPLE 모드는 표본 블록만 읽어 근사값을 빠르게 반환한다.
+결과는 스캔 시각과 함께 column_stats 테이블에 저장하여 max_age 이내면 다시 스캔하지 않는다.
+
+- 고유값 수: 기본은 플래너 통계(pg_stats.n_distinct) 기반 추정, exact_distinct=True면 같은 스캔에서 COUNT(DISTINCT)
+- 표본 모드의 행 수/결측 수는 표본 비율로 환산한 근사값
+"""
+import time
+from datetime import datetime, timedelta
+
+from psycopg2 import sql
+
+from .database import bulk_upsert
+
+STATS_COLUMNS = [
+    'table_name', 'column_name', 'data_type', 'row_count', 'null_count', 'min_value', 'max_value',
+    'distinct_estimate', 'sample_percent', 'scanned_at', 'scan_ms'
+]
+
+CREATE_COLUMN_STATS_SQL = """
+    CREATE TABLE IF NOT EXISTS column_stats (
+        table_name VARCHAR(63) NOT NULL,
+        column_name VARCHAR(63) NOT NULL,
+        data_type VARCHAR(63),
+        row_count BIGINT,
+        null_count BIGINT,
+        min_value TEXT,
+        max_value TEXT,
+        distinct_estimate BIGINT,
+        sample_percent REAL,
+        scanned_at TIMESTAMP NOT NULL,
+        scan_ms INTEGER,
+        PRIMARY KEY (table_name, column_name)
+    );
+"""
+
+# 최소/최대값을 계산하지 않는 타입 (순서가 없거나 값이 큼)
+_UNORDERED_TYPES = ('boolean', 'json', 'jsonb', 'bytea', 'ARRAY', 'USER-DEFINED')
+
+
+def table_columns(cursor, table):
+    """테이블 컬럼 목록 [(컬럼명, 데이터 타입), ...] (정의 순서)"""
+    cursor.execute("""
+        SELECT column_name, data_type
+        FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = %s
+        ORDER BY ordinal_position
+    """, (table,))
+    return cursor.fetchall()
+
+
+def _distinct_estimates(cursor, table, row_count):
+    """플래너 통계의 n_distinct를 행 수 기준 고유값 수로 환산 (ANALYZE 전이면 비어 있음)"""
+    cursor.execute("""
+        SELECT attname, n_distinct
+        FROM pg_stats
+        WHERE schemaname = current_schema() AND tablename = %s
+    """, (table,))
+    # n_distinct가 음수면 행 수 대비 비율
+    return {
+        name: int(round(-n_distinct * row_count)) if n_distinct < 0 else int(n_distinct)
+        for name, n_distinct in cursor.fetchall()
+    }
+
+
+def _profile_query(table, columns, sample_percent, exact_distinct):
+    """컬럼별 FILTER 집계를 한 문장으로 구성 (결과: 전체 행 수 + 컬럼마다 결측/최소/최대[/고유값])"""
+    expressions = [sql.SQL("COUNT(*)")]
+    for name, data_type in columns:
+        column = sql.Identifier(name)
+        expressions.append(sql.SQL("COUNT(*) FILTER (WHERE {} IS NULL)").format(column))
+        if data_type in _UNORDERED_TYPES:
+            expressions.extend([sql.SQL("NULL"), sql.SQL("NULL")])
+        else:
+            expressions.append(sql.SQL("MIN({})::text").format(column))
+            expressions.append(sql.SQL("MAX({})::text").format(column))
+        if exact_distinct:
+            expressions.append(
+                sql.SQL("NULL") if data_type in _UNORDERED_TYPES
+                else sql.SQL("COUNT(DISTINCT {})").format(column)
+            )
+
+    sample = sql.SQL("")
+    if sample_percent:
+        sample = sql.SQL(" TABLESAMPLE SYSTEM ({})").format(sql.Literal(float(sample_percent)))
+    return sql.SQL("SELECT {} FROM {}{}").format(sql.SQL(", ").join(expressions), sql.Identifier(table), sample)
+
+
+def load_cached_profile(cursor, table, max_age=None, sample_percent=None):
+    """
+    column_stats에 저장된 프로파일 조회
+
+    Args:
+        cursor: 데이터베이스 커서
+        table: 테이블명
+        max_age: 허용할 최대 경과 시간 (timedelta, None이면 경과 시간 무시)
+        sample_percent: None이면 전체 스캔 결과만, 값이 있으면 표본 결과도 허용
+
+    Returns:
+        dict 또는 None: profile_table과 같은 형식 (조건에 맞는 캐시가 없으면 None)
+    """
+    cursor.execute("SELECT to_regclass('column_stats') IS NOT NULL")
+    if not cursor.fetchone()[0]:
+        return None
+
+    cursor.execute(f"SELECT {', '.join(STATS_COLUMNS)} FROM column_stats WHERE table_name = %s", (table,))
+    records = [dict(zip(STATS_COLUMNS, row)) for row in cursor.fetchall()]
+    if not records:
+        return None
+
+    scanned_at = min(record['scanned_at'] for record in records)
+    if max_age is not None and scanned_at < datetime.now() - max_age:
+        return None
+    if sample_percent is None and any(record['sample_percent'] for record in records):
+        return None
+    return {record['column_name']: record for record in records}
+
+
+def profile_table(cursor, table, sample_percent=None, exact_distinct=False, max_age=None):
+    """
+    테이블 전체 컬럼 프로파일 (한 번의 스캔, 결과는 column_stats에 저장, 커밋은 호출자 담당)
+
+    Args:
+        cursor: 데이터베이스 커서
+        table: 테이블명
+        sample_percent: TABLESAMPLE SYSTEM 비율(%) (None이면 전체 스캔)
+        exact_distinct: True면 같은 스캔에서 COUNT(DISTINCT)로 정확한 고유값 수 계산 (느림)
+        max_age: 저장된 프로파일이 이 시간(timedelta 또는 초) 이내면 스캔하지 않고 반환
+
+    Returns:
+        dict: {컬럼명: {row_count, null_count, min_value, max_value, distinct_estimate,
+                        sample_percent, scanned_at, scan_ms, ...}}
+    """
+    if max_age is not None:
+        if not isinstance(max_age, timedelta):
+            max_age = timedelta(seconds=max_age)
+        cached = load_cached_profile(cursor, table, max_age=max_age, sample_percent=sample_percent)
+        if cached is not None:
+            return cached
+
+    columns = table_columns(cursor, table)
+    if not columns:
+        raise ValueError(f"테이블이 없습니다: {table}")
+
+    started = time.perf_counter()
+    cursor.execute(_profile_query(table, columns, sample_percent, exact_distinct))
+    values = cursor.fetchone()
+    scan_ms = int((time.perf_counter() - started) * 1000)
+    scanned_at = datetime.now()
+
+    # 표본 모드는 표본 비율로 환산
+    scale = 100.0 / sample_percent if sample_percent else 1.0
+    row_count = int(round(values[0] * scale))
+    estimates = {} if exact_distinct else _distinct_estimates(cursor, table, row_count)
+
+    width = 4 if exact_distinct else 3
+    profile = {}
+    for i, (name, data_type) in enumerate(columns):
+        null_count, min_value, max_value = values[1 + i * width: 4 + i * width]
+        # 표본 모드의 COUNT(DISTINCT)는 표본 내 고유값 수 (하한값)
+        distinct = values[4 + i * width] if exact_distinct else estimates.get(name)
+        profile[name] = {
+            'table_name': table,
+            'column_name': name,
+            'data_type': data_type,
+            'row_count': row_count,
+            'null_count': int(round(null_count * scale)),
+            'min_value': min_value,
+            'max_value': max_value,
+            'distinct_estimate': distinct,
+            'sample_percent': sample_percent,
+            'scanned_at': scanned_at,
+            'scan_ms': scan_ms,
+        }
+
+    # 삭제된 컬럼의 이전 결과 제거 후 저장
+    cursor.execute(CREATE_COLUMN_STATS_SQL)
+    cursor.execute("DELETE FROM column_stats WHERE table_name = %s", (table,))
+    bulk_upsert(cursor, 'column_stats', STATS_COLUMNS,
+                [tuple(stats[column] for column in STATS_COLUMNS) for stats in profile.values()],
+                conflict_columns=['table_name', 'column_name'])
+    return profile
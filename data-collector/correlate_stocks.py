@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+종목 상관 분석 (수정주가 로그수익률, 상관 행렬은 cache/correlation/에 캐시)
+
+종목을 하나 지정하면 전체 주식(ETF 제외) 중 상관이 높은 종목을, 여러 개를 콤마로 지정하면
+종목 간 상관 행렬과 최근 이동 상관을 출력한다.
+
+사용법:
+    python3 correlate_stocks.py <종목코드> [상위 N] [거래일 수]
+    python3 correlate_stocks.py <종목코드,종목코드,...> [거래일 수]
+    python3 correlate_stocks.py 005930 20 250
+    python3 correlate_stocks.py 005930,000660,035420 120
+"""
+
+import sys
+import numpy as np
+import pandas as pd
+from analytics.adjustments import load_adjusted_prices
+from analytics.correlation import correlation_matrix, return_matrix, rolling_correlation, top_correlated
+from common.frames import load_stocks
+from common.logger import get_logger
+
+logger = get_logger(__name__, 'correlate_stocks.log')
+
+DEFAULT_WINDOW = 250
+ROLLING_WINDOW = 60
+
+def show_top_correlated(stock_code, n, window, names):
+    """전체 주식 상관 행렬에서 stock_code와 상관이 높은 종목 n개"""
+    result = correlation_matrix(window=window)
+    pairs = top_correlated(result, stock_code, n=n)
+    if not pairs:
+        logger.error(f"❌ {stock_code}: 구간 내 관측이 부족하거나 시세가 없습니다.")
+        return
+
+    logger.info(f"📐 {stock_code} {names.get(stock_code, '')} 상관 상위 {len(pairs)}개 "
+                f"({result['start_date'][0]} ~ {result['end_date'][0]}, {len(result['codes']):,}개 종목)")
+    table = pd.DataFrame(pairs, columns=['stock_code', 'corr'])
+    table.insert(1, 'stock_name', table['stock_code'].map(names))
+    logger.info(f"\n{table.to_string(index=False, float_format='{:.3f}'.format)}")
+
+def show_matrix(stock_codes, window, names):
+    """지정 종목 간 상관 행렬과 최근 ROLLING_WINDOW 거래일 이동 상관"""
+    result = correlation_matrix(window=window, stock_codes=stock_codes, min_coverage=0.5)
+    codes = result['codes'].tolist()
+    if len(codes) < 2:
+        logger.error("❌ 구간 내 관측이 충분한 종목이 2개 미만입니다.")
+        return
+
+    labels = [f"{code} {names.get(code, '')}".strip() for code in codes]
+    logger.info(f"📐 상관 행렬 ({result['start_date'][0]} ~ {result['end_date'][0]})")
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        logger.info(f"\n{pd.DataFrame(result['corr'], index=labels, columns=codes).round(3).to_string()}")
+
+    returns, calendar, return_codes = return_matrix(load_adjusted_prices(stock_codes=codes))
+    columns = [int(np.flatnonzero(return_codes == code)[0]) for code in codes]
+    rolling = rolling_correlation(returns[-window:, columns], ROLLING_WINDOW)
+    if not len(rolling):
+        return
+    logger.info(f"📈 최근 {ROLLING_WINDOW}거래일 이동 상관 ({calendar[-1]})")
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        logger.info(f"\n{pd.DataFrame(rolling[-1], index=labels, columns=codes).round(3).to_string()}")
+
+def main():
+    if len(sys.argv) < 2:
+        logger.error(__doc__)
+        return
+
+    stock_codes = [code.strip() for code in sys.argv[1].split(',') if code.strip()]
+    try:
+        if len(stock_codes) == 1:
+            n = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+            window = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_WINDOW
+        else:
+            window = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_WINDOW
+    except ValueError:
+        logger.error(__doc__)
+        return
+
+    stocks = load_stocks()
+    names = dict(zip(stocks['stock_code'].astype(str), stocks['stock_name'].astype(str)))
+
+    if len(stock_codes) == 1:
+        show_top_correlated(stock_codes[0], n, window, names)
+    else:
+        show_matrix(stock_codes, window, names)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+"""DART(전자공시) 연동 모듈 (기업 고유번호, 재무제표, 공시 목록)"""
@@ -0,0 +1,135 @@
+"""DART 재무제표 계정 → 표준 필드 매핑 모듈
+
+회사마다 계정명이 조금씩 다르므로(매출액/수익(매출액)/영업수익 등) IFRS 계정 ID와
+공백을 제거한 계정명을 표준 필드로 바꾸는 조회 테이블을 모듈 로드 시 한 번 만들어 둔다.
+API 응답(JSON)과 일괄 다운로드 파일(TSV)이 같은 테이블을 쓴다.
+
+- 손익 항목은 손익계산서(IS)/포괄손익계산서(CIS), 재무상태 항목은 재무상태표(BS)에서만 매핑
+- 계정 ID가 표준(ifrs-full_*, dart_*)이면 ID로, 회사 자체 ID(entity*)이면 계정명으로 매핑
+"""
+
+FIELDS = [
+    'revenue',
+    'operating_profit',
+    'net_profit',
+    'net_profit_controlling',
+    'total_assets',
+    'total_liabilities',
+    'total_equity',
+    'equity_controlling',
+]
+
+# 재무상태표 항목 (시점 잔액), 나머지는 손익 항목 (기간 누적)
+BALANCE_FIELDS = {'total_assets', 'total_liabilities', 'total_equity', 'equity_controlling'}
+
+INCOME_STATEMENTS = ('IS', 'CIS')
+BALANCE_STATEMENTS = ('BS',)
+
+_ACCOUNT_IDS = {
+    'revenue': [
+        'ifrs-full_Revenue', 'ifrs_Revenue',
+        'ifrs-full_RevenueFromContractsWithCustomers',
+    ],
+    'operating_profit': ['dart_OperatingIncomeLoss'],
+    'net_profit': ['ifrs-full_ProfitLoss', 'ifrs_ProfitLoss'],
+    'net_profit_controlling': [
+        'ifrs-full_ProfitLossAttributableToOwnersOfParent',
+        'ifrs_ProfitLossAttributableToOwnersOfParent',
+    ],
+    'total_assets': ['ifrs-full_Assets', 'ifrs_Assets'],
+    'total_liabilities': ['ifrs-full_Liabilities', 'ifrs_Liabilities'],
+    'total_equity': ['ifrs-full_Equity', 'ifrs_Equity'],
+    'equity_controlling': [
+        'ifrs-full_EquityAttributableToOwnersOfParent',
+        'ifrs_EquityAttributableToOwnersOfParent',
+    ],
+}
+
+# 공백 제거 후 비교
+_ACCOUNT_NAMES = {
+    'revenue': [
+        '매출액', '매출', '수익(매출액)', '매출액(수익)', '영업수익', '수익', '매출및지분법손익',
+    ],
+    'operating_profit': [
+        '영업이익', '영업이익(손실)', '영업손실', '영업손익',
+    ],
+    'net_profit': [
+        '당기순이익', '당기순이익(손실)', '당기순손실', '당기순손익',
+        '분기순이익', '분기순이익(손실)', '반기순이익', '반기순이익(손실)',
+        '연결당기순이익', '연결분기순이익', '연결반기순이익',
+    ],
+    'net_profit_controlling': [
+        '지배기업의소유주에게귀속되는당기순이익', '지배기업의소유주에게귀속되는당기순이익(손실)',
+        '지배기업소유주지분', '지배기업의소유주지분', '지배기업소유주귀속당기순이익',
+        '지배기업의소유주에게귀속되는분기순이익', '지배기업의소유주에게귀속되는반기순이익',
+    ],
+    'total_assets': ['자산총계'],
+    'total_liabilities': ['부채총계'],
+    'total_equity': ['자본총계'],
+    'equity_controlling': [
+        '지배기업의소유주에게귀속되는자본', '지배기업소유주지분', '지배기업의소유주지분',
+    ],
+}
+
+_WHITESPACE = str.maketrans('', '', ' \t\r\n　')
+
+
+def _statement_group(field):
+    return BALANCE_STATEMENTS if field in BALANCE_FIELDS else INCOME_STATEMENTS
+
+
+def _build_lookup(mapping, normalize):
+    lookup = {}
+    for field, keys in mapping.items():
+        for sj_div in _statement_group(field):
+            for key in keys:
+                lookup.setdefault((sj_div, normalize(key)), field)
+    return lookup
+
+
+def normalize_account_name(name):
+    """계정명 비교용 정규화 (공백 제거)"""
+    return name.translate(_WHITESPACE) if name else ''
+
+
+# (재무제표 구분, 계정 ID/정규화 계정명) → 표준 필드
+ACCOUNT_ID_LOOKUP = _build_lookup(_ACCOUNT_IDS, lambda key: key)
+ACCOUNT_NAME_LOOKUP = _build_lookup(_ACCOUNT_NAMES, normalize_account_name)
+
+
+def canonical_field(sj_div, account_id=None, account_nm=None):
+    """
+    계정 → 표준 필드명
+
+    Args:
+        sj_div: 재무제표 구분 (BS, IS, CIS, ...)
+        account_id: 계정 ID (ifrs-full_Revenue 등, 없으면 None)
+        account_nm: 계정명
+
+    Returns:
+        str 또는 None: FIELDS 중 하나 (매핑 대상이 아니면 None)
+    """
+    if account_id:
+        field = ACCOUNT_ID_LOOKUP.get((sj_div, account_id))
+        if field:
+            return field
+    return ACCOUNT_NAME_LOOKUP.get((sj_div, normalize_account_name(account_nm)))
+
+
+def parse_amount(value):
+    """금액 문자열 → int ('1,234', '-1,234', '(1,234)' 지원, 빈 값은 None)"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = value.strip().replace(',', '')
+    if not text or text == '-':
+        return None
+    negative = text.startswith('(') and text.endswith(')')
+    if negative:
+        text = text[1:-1]
+    try:
+        amount = int(float(text))
+    except ValueError:
+        return None
+    return -amount if negative else amount
@@ -0,0 +1,265 @@
+"""DART 보고서 제출 여부 인덱스
+
+회사 × (사업연도, 보고서) 셀마다 보고서가 있는지, 언제 확인했는지, 없다는 결과를 언제까지
+믿을지(expires_at)를 dart_report_availability에 저장한다. "최신 보고서"는 이 테이블 조회로 끝나고,
+만료된 셀만 다중회사 주요계정(fnlttMultiAcnt.json, 요청당 최대 100개 회사)으로 묶어 동시에 확인한다.
+
+- 있음: 만료 없음 (저장된 재무 데이터, 수집한 정기보고서 공시로도 채움)
+- 없음: 제출기한 전에는 1일, 기한 후 30일까지는 3일(지연 제출), 그 뒤에는 30일 뒤 다시 확인
+- 보고기간이 끝나지 않은 셀은 확인하지 않음
+"""
+import asyncio
+from datetime import date, datetime, timedelta
+
+from psycopg2.extras import execute_values
+
+from common.database import bulk_upsert
+from common.logger import get_logger
+
+from .client import QUARTER_REPORTS, REPORT_QUARTERS, STATUS_OK, DartClient
+from .disclosures import CREATE_DART_DISCLOSURES_SQL
+from .financials import CREATE_FINANCIAL_DATA_SQL
+
+logger = get_logger(__name__)
+
+PROBE_ENDPOINT = 'fnlttMultiAcnt.json'
+PROBE_BATCH = 100
+
+# 보고기간 종료 월, 종료 후 제출기한 (일)
+_PERIOD_END_MONTH = {'11013': 3, '11012': 6, '11014': 9, '11011': 12}
+_FILING_DAYS = {'11013': 45, '11012': 45, '11014': 45, '11011': 90}
+
+AVAILABILITY_COLUMNS = ['corp_code', 'bsns_year', 'reprt_code', 'available', 'rcept_no', 'checked_at', 'expires_at']
+
+CREATE_AVAILABILITY_SQL = """
+    CREATE TABLE IF NOT EXISTS dart_report_availability (
+        corp_code VARCHAR(8) NOT NULL,
+        bsns_year INTEGER NOT NULL,
+        reprt_code VARCHAR(5) NOT NULL,
+        available BOOLEAN NOT NULL,
+        rcept_no VARCHAR(14),
+        checked_at TIMESTAMP NOT NULL,
+        expires_at TIMESTAMP,
+        PRIMARY KEY (corp_code, bsns_year, reprt_code)
+    );
+    CREATE INDEX IF NOT EXISTS idx_report_availability_latest
+        ON dart_report_availability(corp_code, bsns_year DESC) WHERE available;
+"""
+
+# 저장된 재무 데이터와 정기보고서 공시로 있음 표시 (이미 있음이면 유지)
+SYNC_LOCAL_SQL = """
+    INSERT INTO dart_report_availability
+        (corp_code, bsns_year, reprt_code, available, rcept_no, checked_at, expires_at)
+    SELECT corp_code, bsns_year, reprt_code, TRUE, MAX(rcept_no), CURRENT_TIMESTAMP, NULL
+    FROM (
+        SELECT corp_code, year AS bsns_year, reprt_code, rcept_no
+        FROM financial_data
+        WHERE corp_code IS NOT NULL AND reprt_code IS NOT NULL AND source IS NOT NULL
+        UNION ALL
+        SELECT corp_code, bsns_year, reprt_code, rcept_no
+        FROM dart_disclosures
+        WHERE reprt_code IS NOT NULL
+    ) filed
+    GROUP BY corp_code, bsns_year, reprt_code
+    ON CONFLICT (corp_code, bsns_year, reprt_code) DO UPDATE SET
+        available = TRUE,
+        rcept_no = COALESCE(EXCLUDED.rcept_no, dart_report_availability.rcept_no),
+        checked_at = EXCLUDED.checked_at,
+        expires_at = NULL
+    WHERE NOT dart_report_availability.available
+"""
+
+
+def period_end(bsns_year, reprt_code):
+    """보고기간 종료일 (12월 결산 기준)"""
+    month = _PERIOD_END_MONTH[reprt_code]
+    return date(bsns_year + 1, 1, 1) - timedelta(days=1) if month == 12 else \
+        date(bsns_year, month + 1, 1) - timedelta(days=1)
+
+
+def filing_deadline(bsns_year, reprt_code):
+    """법정 제출기한 (분기/반기 45일, 사업보고서 90일)"""
+    return period_end(bsns_year, reprt_code) + timedelta(days=_FILING_DAYS[reprt_code])
+
+
+def negative_expiry(bsns_year, reprt_code, now=None):
+    """없음 결과의 만료 시각 (제출기한에 가까울수록 자주 확인)"""
+    now = now or datetime.now()
+    deadline = datetime.combine(filing_deadline(bsns_year, reprt_code), datetime.min.time())
+    if now < deadline + timedelta(days=1):
+        return now + timedelta(days=1)
+    if now < deadline + timedelta(days=30):
+        return now + timedelta(days=3)
+    return now + timedelta(days=30)
+
+
+def candidate_cells(years, today=None):
+    """보고기간이 끝난 (사업연도, 보고서 코드) 목록 (최근 순)"""
+    today = today or date.today()
+    return [
+        (year, QUARTER_REPORTS[quarter])
+        for year in sorted(years, reverse=True)
+        for quarter in (4, 3, 2, 1)
+        if period_end(year, QUARTER_REPORTS[quarter]) < today
+    ]
+
+
+def sync_local(cursor):
+    """financial_data/dart_disclosures에 있는 보고서를 있음으로 표시 (커밋은 호출자 담당)"""
+    cursor.execute(CREATE_AVAILABILITY_SQL)
+    cursor.execute(CREATE_FINANCIAL_DATA_SQL)
+    cursor.execute(CREATE_DART_DISCLOSURES_SQL)
+    cursor.execute(SYNC_LOCAL_SQL)
+    return cursor.rowcount
+
+
+def stale_cells(cursor, corp_codes, years):
+    """
+    확인이 필요한 셀 (기록이 없거나, 없음 결과가 만료된 셀)
+
+    Returns:
+        list: [(corp_code, bsns_year, reprt_code), ...]
+    """
+    cells = candidate_cells(years)
+    if not cells or not corp_codes:
+        return []
+    cursor.execute(CREATE_AVAILABILITY_SQL)
+    cursor.execute("""
+        SELECT corp_code, bsns_year, reprt_code
+        FROM dart_report_availability
+        WHERE corp_code = ANY(%s) AND bsns_year = ANY(%s)
+          AND (available OR expires_at > CURRENT_TIMESTAMP)
+    """, (list(corp_codes), list(years)))
+    fresh = set(cursor.fetchall())
+    return [
+        (corp_code, year, reprt_code)
+        for year, reprt_code in cells
+        for corp_code in corp_codes
+        if (corp_code, year, reprt_code) not in fresh
+    ]
+
+
+async def probe_cells(cells, corp_index=None, budget=None, client=None):
+    """
+    셀 확인 (같은 사업연도·보고서의 회사를 PROBE_BATCH개씩 묶어 동시 요청)
+
+    Args:
+        cells: [(corp_code, bsns_year, reprt_code), ...]
+        corp_index: 응답의 종목코드를 고유번호로 바꿀 CorpIndex (응답에 고유번호가 없을 때)
+
+    Returns:
+        list: AVAILABILITY_COLUMNS 순서의 행 (요청이 실패한 묶음은 제외)
+    """
+    groups = {}
+    for corp_code, year, reprt_code in cells:
+        groups.setdefault((year, reprt_code), []).append(corp_code)
+    batches = [
+        (year, reprt_code, codes[i:i + PROBE_BATCH])
+        for (year, reprt_code), codes in sorted(groups.items())
+        for i in range(0, len(codes), PROBE_BATCH)
+    ]
+
+    async def _probe(dart, year, reprt_code, codes):
+        data = await dart.get(PROBE_ENDPOINT, {
+            'corp_code': ','.join(codes), 'bsns_year': str(year), 'reprt_code': reprt_code,
+        })
+        if data is None:
+            return []
+
+        filed = {}
+        if data.get('status') == STATUS_OK:
+            for item in data.get('list', []):
+                corp_code = item.get('corp_code')
+                if not corp_code and corp_index is not None:
+                    corp_code = corp_index.corp_code((item.get('stock_code') or '').strip())
+                if corp_code:
+                    filed[corp_code] = item.get('rcept_no') or filed.get(corp_code)
+
+        now = datetime.now()
+        expires = negative_expiry(year, reprt_code, now)
+        return [
+            (code, year, reprt_code, code in filed, filed.get(code), now, None if code in filed else expires)
+            for code in codes
+        ]
+
+    async def _run(dart):
+        results = await asyncio.gather(*[_probe(dart, *batch) for batch in batches])
+        return [row for rows in results for row in rows]
+
+    if client is not None:
+        return await _run(client)
+    async with DartClient(budget=budget) as dart:
+        return await _run(dart)
+
+
+def save_availability(cursor, rows):
+    """확인 결과 저장 (있음으로 기록된 셀은 없음으로 덮어쓰지 않음, 커밋은 호출자 담당)"""
+    if not rows:
+        return 0
+    cursor.execute(CREATE_AVAILABILITY_SQL)
+    positives = [row for row in rows if row[3]]
+    negatives = [row for row in rows if not row[3]]
+    bulk_upsert(cursor, 'dart_report_availability', AVAILABILITY_COLUMNS, positives,
+                conflict_columns=['corp_code', 'bsns_year', 'reprt_code'])
+    if negatives:
+        execute_values(cursor, f"""
+            INSERT INTO dart_report_availability ({', '.join(AVAILABILITY_COLUMNS)})
+            VALUES %s
+            ON CONFLICT (corp_code, bsns_year, reprt_code) DO UPDATE SET
+                checked_at = EXCLUDED.checked_at,
+                expires_at = EXCLUDED.expires_at
+            WHERE NOT dart_report_availability.available
+        """, negatives, page_size=1000)
+    return len(rows)
+
+
+def refresh_availability(conn, corp_codes, years, corp_index=None, budget=None):
+    """
+    로컬 데이터로 있음 표시 후 만료된 셀만 확인하여 저장 (커밋은 호출자 담당)
+
+    Returns:
+        int: 확인한 셀 수
+    """
+    with conn.cursor() as cursor:
+        sync_local(cursor)
+        cells = stale_cells(cursor, corp_codes, years)
+    if not cells:
+        return 0
+
+    rows = asyncio.run(probe_cells(cells, corp_index=corp_index, budget=budget))
+    with conn.cursor() as cursor:
+        save_availability(cursor, rows)
+    logger.info(f"  🗓️  보고서 제출 여부 {len(rows):,}/{len(cells):,}개 셀 확인 "
+                f"(있음 {sum(1 for row in rows if row[3]):,})")
+    return len(rows)
+
+
+def available_cells(cursor, corp_codes, years):
+    """제출된 것으로 기록된 셀 집합 {(corp_code, bsns_year, reprt_code), ...}"""
+    cursor.execute(CREATE_AVAILABILITY_SQL)
+    cursor.execute("""
+        SELECT corp_code, bsns_year, reprt_code
+        FROM dart_report_availability
+        WHERE corp_code = ANY(%s) AND bsns_year = ANY(%s) AND available
+    """, (list(corp_codes), list(years)))
+    return set(cursor.fetchall())
+
+
+def latest_available(cursor, corp_code):
+    """
+    제출된 가장 최근 보고서 (로컬 조회)
+
+    Returns:
+        tuple 또는 None: (사업연도, 분기, 보고서 코드, 접수번호)
+    """
+    cursor.execute(CREATE_AVAILABILITY_SQL)
+    cursor.execute("""
+        SELECT bsns_year, reprt_code, rcept_no
+        FROM dart_report_availability
+        WHERE corp_code = %s AND available
+    """, (corp_code,))
+    rows = cursor.fetchall()
+    if not rows:
+        return None
+    year, reprt_code, rcept_no = max(rows, key=lambda row: (row[0], REPORT_QUARTERS[row[1]]))
+    return year, REPORT_QUARTERS[reprt_code], reprt_code, rcept_no
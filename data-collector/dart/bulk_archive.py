@@ -0,0 +1,201 @@
+"""DART 재무정보 일괄 다운로드 파일 적재 모듈
+
+DART 재무정보 일괄 다운로드(분기별 재무상태표/손익계산서 zip, 탭 구분 cp949 텍스트)를
+압축을 풀면서 한 줄씩 읽어 회사별 표준 필드만 모으고, COPY로 임시 테이블에 넣은 뒤
+financial_data에 한 번에 반영한다. 한 분기 전체 시장을 API 요청 없이 한 번에 적재한다.
+
+- 메모리: 파일 크기와 관계없이 회사 × 연결/별도별 표준 필드 값만 보관
+- 헤더 이름으로 컬럼 위치를 찾음 (종목코드는 [005930] 형식)
+- 금액: 손익은 '당기 ... 누적' 컬럼(없으면 '당기'), 재무상태는 '당기' 컬럼
+- 계정은 dart/accounts.py 조회 테이블로 매핑 (항목코드 우선, 없으면 항목명)
+- 연결재무제표 값이 있는 회사는 연결, 없으면 별도 사용
+- 파일별로 재무상태표/손익계산서가 나뉘어 있으므로 저장 시 비어 있는 필드는 기존 값 유지
+"""
+import csv
+import io
+import os
+import zipfile
+from datetime import datetime
+
+from common.logger import get_logger
+
+from .accounts import BALANCE_FIELDS, FIELDS, canonical_field, parse_amount
+from .client import REPORT_QUARTERS
+from .financials import FINANCIAL_COLUMNS, ensure_financial_table
+
+logger = get_logger(__name__)
+
+SOURCE_BULK = 'dart_bulk'
+ENCODING = 'cp949'
+
+REPORT_CODES = {
+    '1분기보고서': '11013',
+    '반기보고서': '11012',
+    '3분기보고서': '11014',
+    '사업보고서': '11011',
+}
+
+# 재무제표종류 문구 → 재무제표 구분 (포괄손익계산서를 손익계산서보다 먼저 확인)
+_STATEMENT_KINDS = (('포괄손익계산서', 'CIS'), ('손익계산서', 'IS'), ('재무상태표', 'BS'))
+
+_UPDATE_COLUMNS = [c for c in FINANCIAL_COLUMNS if c not in ('stock_code', 'year', 'quarter')]
+
+
+def _statement_kind(text):
+    """재무제표종류 → (sj_div, fs_div) (대상이 아니면 (None, None))"""
+    for keyword, sj_div in _STATEMENT_KINDS:
+        if keyword in text:
+            return sj_div, 'CFS' if '연결' in text else 'OFS'
+    return None, None
+
+
+def _header_index(header):
+    """헤더 → 필요한 컬럼 위치 (금액 컬럼은 손익용/재무상태용을 따로 찾음)"""
+    names = [name.strip() for name in header]
+
+    def find(*candidates):
+        for candidate in candidates:
+            if candidate in names:
+                return names.index(candidate)
+        raise ValueError(f"일괄 다운로드 파일 헤더에 {candidates[0]} 컬럼이 없습니다: {names[:12]}")
+
+    current = [i for i, name in enumerate(names) if name.startswith('당기')]
+    if not current:
+        raise ValueError(f"일괄 다운로드 파일 헤더에 당기 금액 컬럼이 없습니다: {names}")
+    cumulative = next((i for i in current if '누적' in names[i]), current[0])
+    return {
+        'kind': find('재무제표종류'),
+        'stock_code': find('종목코드'),
+        'period_end': find('결산기준일'),
+        'report': find('보고서종류'),
+        'account_id': find('항목코드'),
+        'account_nm': find('항목명'),
+        'flow_amount': cumulative,
+        'balance_amount': current[0],
+    }
+
+
+def _archive_members(path):
+    """zip 파일(또는 zip/텍스트 파일이 든 디렉터리) → (이름, 바이너리 스트림 열기 함수)"""
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            yield from _archive_members(os.path.join(path, name))
+        return
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if info.filename.lower().endswith('.txt'):
+                    yield info.filename, lambda info=info: archive.open(info)
+        return
+    if path.lower().endswith('.txt'):
+        yield os.path.basename(path), lambda: open(path, 'rb')
+
+
+def iter_statement_values(stream):
+    """
+    일괄 다운로드 텍스트 한 파일을 스트리밍 파싱
+
+    Yields:
+        tuple: (stock_code, fs_div, year, reprt_code, field, amount)
+    """
+    reader = csv.reader(io.TextIOWrapper(stream, encoding=ENCODING, errors='replace', newline=''),
+                        delimiter='\t', quoting=csv.QUOTE_NONE)
+    header = next(reader, None)
+    if header is None:
+        return
+    index = _header_index(header)
+
+    for row in reader:
+        if len(row) < index['account_nm'] + 1:
+            continue
+        sj_div, fs_div = _statement_kind(row[index['kind']])
+        reprt_code = REPORT_CODES.get(row[index['report']].strip())
+        if sj_div is None or reprt_code is None:
+            continue
+        field = canonical_field(sj_div, row[index['account_id']].strip(), row[index['account_nm']])
+        if field is None:
+            continue
+        column = index['balance_amount'] if field in BALANCE_FIELDS else index['flow_amount']
+        amount = parse_amount(row[column]) if column < len(row) else None
+        if amount is None:
+            continue
+        stock_code = row[index['stock_code']].strip().strip('[]')
+        period_end = row[index['period_end']].strip()
+        if not stock_code or len(period_end) < 4:
+            continue
+        yield stock_code, fs_div, int(period_end[:4]), reprt_code, field, amount
+
+
+def collect_archive(paths, corp_index=None):
+    """
+    일괄 다운로드 파일들 → financial_data 행
+
+    Args:
+        paths: zip/텍스트 파일 또는 디렉터리 경로 목록 (로컬 샘플 파일도 가능)
+        corp_index: 종목코드 → 고유번호 변환용 CorpIndex (없으면 corp_code는 NULL)
+
+    Returns:
+        list: FINANCIAL_COLUMNS 순서의 행 (연결 우선)
+    """
+    # (종목코드, 사업연도, 보고서) → {fs_div: {필드: 금액}}
+    companies = {}
+    lines = 0
+    for path in paths:
+        for name, open_member in _archive_members(path):
+            with open_member() as stream:
+                for stock_code, fs_div, year, reprt_code, field, amount in iter_statement_values(stream):
+                    values = companies.setdefault((stock_code, year, reprt_code), {}).setdefault(fs_div, {})
+                    # IS와 CIS에 같은 계정이 있으면 먼저 나온 값 사용
+                    values.setdefault(field, amount)
+                    lines += 1
+            logger.info(f"  📄 {name} 처리 (누적 매핑 항목 {lines:,}건)")
+
+    updated_at = datetime.now()
+    rows = []
+    for (stock_code, year, reprt_code), by_fs in sorted(companies.items()):
+        fs_div = 'CFS' if by_fs.get('CFS') else 'OFS'
+        values = by_fs[fs_div]
+        corp_code = corp_index.corp_code(stock_code) if corp_index is not None else None
+        rows.append((
+            stock_code, corp_code, year, REPORT_QUARTERS[reprt_code], reprt_code, fs_div,
+            *(values.get(field) for field in FIELDS),
+            None, None, SOURCE_BULK, updated_at,
+        ))
+    return rows
+
+
+def copy_financial_rows(cursor, rows):
+    """
+    COPY로 임시 테이블에 넣은 뒤 financial_data에 반영 (비어 있는 필드는 기존 값 유지, 커밋은 호출자 담당)
+
+    Returns:
+        int: 반영된 행 수
+    """
+    if not rows:
+        return 0
+    ensure_financial_table(cursor)
+    cursor.execute(f"""
+        CREATE TEMP TABLE IF NOT EXISTS financial_import
+        ON COMMIT DROP AS
+        SELECT {', '.join(FINANCIAL_COLUMNS)} FROM financial_data WITH NO DATA
+    """)
+    cursor.execute("TRUNCATE financial_import")
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(['' if value is None else value for value in row])
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY financial_import ({', '.join(FINANCIAL_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                       buffer)
+
+    updates = ",\n".join(
+        f"{column} = COALESCE(EXCLUDED.{column}, financial_data.{column})" for column in _UPDATE_COLUMNS
+    )
+    cursor.execute(f"""
+        INSERT INTO financial_data ({', '.join(FINANCIAL_COLUMNS)})
+        SELECT {', '.join(FINANCIAL_COLUMNS)} FROM financial_import
+        ON CONFLICT (stock_code, year, quarter) DO UPDATE SET
+        {updates}
+    """)
+    return cursor.rowcount
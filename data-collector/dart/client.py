@@ -0,0 +1,113 @@
+"""DART API 비동기 클라이언트
+
+aiohttp 세션 하나로 동시 요청 수를 세마포어로 제한하면서 여러 요청을 동시에 보낸다.
+요청마다 QuotaBudget에서 일일 한도를 차감하고, DART가 한도 초과(020)를 응답하면
+이후 요청을 모두 중단한다.
+
+- 응답 상태: 000 정상, 013 데이터 없음, 020 요청 한도 초과, 800 점검 중
+- 네트워크 오류/타임아웃은 지수 백오프로 재시도 (재시도도 한도에서 차감)
+"""
+import asyncio
+
+import aiohttp
+
+from common.config import DART_API_KEY, DART_BASE_URL
+from common.logger import get_logger
+
+logger = get_logger(__name__)
+
+STATUS_OK = '000'
+STATUS_NO_DATA = '013'
+STATUS_QUOTA_EXCEEDED = '020'
+
+# 보고서 코드 ↔ 분기 (4분기는 사업보고서)
+REPORT_QUARTERS = {
+    '11013': 1,  # 1분기보고서
+    '11012': 2,  # 반기보고서
+    '11014': 3,  # 3분기보고서
+    '11011': 4,  # 사업보고서
+}
+QUARTER_REPORTS = {quarter: code for code, quarter in REPORT_QUARTERS.items()}
+
+
+class DartClient:
+    """
+    DART API 비동기 클라이언트 (async with로 사용)
+
+    Args:
+        budget: QuotaBudget (None이면 한도 관리 안 함)
+        concurrency: 동시 요청 수
+        retries: 네트워크 오류 재시도 횟수
+    """
+
+    def __init__(self, budget=None, concurrency=10, retries=2, timeout=30, api_key=DART_API_KEY,
+                 base_url=DART_BASE_URL):
+        if not api_key:
+            raise ValueError("DART_API_KEY가 설정되지 않았습니다")
+        self.api_key = api_key
+        self.base_url = base_url
+        self.budget = budget
+        self.concurrency = concurrency
+        self.retries = retries
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.semaphore = None
+        self.session = None
+        self.request_count = 0
+        self.stopped = False
+
+    async def __aenter__(self):
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.session = aiohttp.ClientSession(
+            timeout=self.timeout,
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    @property
+    def exhausted(self):
+        return self.stopped or (self.budget is not None and self.budget.exhausted)
+
+    async def get(self, endpoint, params):
+        """
+        API 요청 (JSON 응답)
+
+        Args:
+            endpoint: 'fnlttSinglAcntAll.json' 등
+            params: crtfc_key를 제외한 요청 파라미터
+
+        Returns:
+            dict 또는 None: 응답 JSON (한도 소진, 점검, 재시도 실패 시 None)
+        """
+        async with self.semaphore:
+            for attempt in range(self.retries + 1):
+                if self.stopped or (self.budget is not None and not self.budget.acquire()):
+                    return None
+                self.request_count += 1
+                try:
+                    async with self.session.get(f"{self.base_url}/{endpoint}",
+                                                params={'crtfc_key': self.api_key, **params}) as response:
+                        response.raise_for_status()
+                        data = await response.json(content_type=None)
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                    if attempt == self.retries:
+                        logger.warning(f"DART 요청 실패 ({endpoint} {params}): {e}")
+                        return None
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+
+                status = data.get('status')
+                if status == STATUS_QUOTA_EXCEEDED:
+                    if not self.stopped:
+                        self.stopped = True
+                        logger.warning("⚠️  DART 일일 요청 한도 초과, 이후 요청 중단")
+                        if self.budget is not None:
+                            self.budget.mark_exhausted()
+                    return None
+                if status not in (STATUS_OK, STATUS_NO_DATA):
+                    logger.warning(f"DART 응답 오류 ({endpoint} {params}): {status} {data.get('message')}")
+                    return None
+                return data
+        return None
@@ -0,0 +1,234 @@
+"""DART 기업 고유번호(corp_code) 마스터 모듈
+
+DART API는 종목코드 대신 8자리 고유번호를 사용한다. 전체 고유번호 파일(corpCode.xml zip,
+약 10만 개 기업)을 내려받아 iterparse로 스트리밍 파싱하고 dart_corp 테이블과
+로컬 인덱스 파일(cache/dart/corp_index.json)에 저장한다.
+
+- 파싱: zip 안의 XML을 압축 해제하면서 <list> 단위로 읽고 즉시 해제 (메모리 일정)
+- 갱신: zip 안 XML의 CRC32·크기가 마지막 적재 때와 같으면 파싱/저장을 건너뜀
+  (zip 자체는 내려받을 때마다 생성 시각이 달라지므로 내용 기준으로 비교)
+- 조회: CorpIndex가 종목코드↔고유번호를 dict로 O(1) 조회 (상장사만 보관)
+"""
+import json
+import os
+import zipfile
+import xml.etree.ElementTree as ET
+
+import requests
+
+from common.config import CACHE_DIR, DART_API_KEY, DART_BASE_URL
+from common.database import bulk_upsert
+from common.logger import get_logger
+
+from .state import get_state, set_state
+
+logger = get_logger(__name__)
+
+DART_CACHE_DIR = os.path.join(CACHE_DIR, 'dart')
+CORP_CODE_ZIP_PATH = os.path.join(DART_CACHE_DIR, 'corpCode.zip')
+CORP_INDEX_PATH = os.path.join(DART_CACHE_DIR, 'corp_index.json')
+
+STATE_KEY = 'corp_code_checksum'
+BATCH_SIZE = 5000
+
+CORP_COLUMNS = ['corp_code', 'corp_name', 'corp_eng_name', 'stock_code', 'modify_date']
+
+CREATE_DART_CORP_SQL = """
+    CREATE TABLE IF NOT EXISTS dart_corp (
+        corp_code VARCHAR(8) PRIMARY KEY,
+        corp_name VARCHAR(200) NOT NULL,
+        corp_eng_name VARCHAR(300),
+        stock_code VARCHAR(10),
+        modify_date DATE,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_dart_corp_stock ON dart_corp(stock_code) WHERE stock_code IS NOT NULL;
+"""
+
+
+def download_corp_codes(path=CORP_CODE_ZIP_PATH, api_key=DART_API_KEY):
+    """
+    고유번호 zip 파일 다운로드 (스트리밍, 임시 파일에 쓴 뒤 교체)
+
+    Returns:
+        str: 저장된 파일 경로
+    """
+    if not api_key:
+        raise ValueError("DART_API_KEY가 설정되지 않았습니다")
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with requests.get(f"{DART_BASE_URL}/corpCode.xml", params={'crtfc_key': api_key},
+                      stream=True, timeout=60) as response:
+        response.raise_for_status()
+        with open(tmp_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=1 << 16):
+                f.write(chunk)
+
+    # 키 오류 등은 zip 대신 XML/JSON 오류 본문으로 응답
+    if not zipfile.is_zipfile(tmp_path):
+        with open(tmp_path, 'rb') as f:
+            body = f.read(500).decode('utf-8', errors='replace')
+        os.remove(tmp_path)
+        raise ValueError(f"고유번호 파일이 아닌 응답: {body}")
+
+    os.replace(tmp_path, path)
+    return path
+
+
+def _xml_entry(archive):
+    return next(info for info in archive.infolist() if info.filename.lower().endswith('.xml'))
+
+
+def file_checksum(path):
+    """zip 안 XML의 내용 체크섬 (압축 해제 없이 zip 헤더의 CRC32와 크기로 구성)"""
+    with zipfile.ZipFile(path) as archive:
+        info = _xml_entry(archive)
+    return f"{info.CRC:08x}-{info.file_size}"
+
+
+def _text(elem, tag):
+    value = elem.findtext(tag)
+    value = value.strip() if value else ''
+    return value or None
+
+
+def iter_corp_codes(path):
+    """
+    고유번호 zip을 스트리밍 파싱
+
+    Args:
+        path: corpCode.zip 경로 (로컬 fixture 파일도 가능)
+
+    Yields:
+        tuple: (corp_code, corp_name, corp_eng_name, stock_code, modify_date)
+               (비상장사는 stock_code None, modify_date는 'YYYY-MM-DD')
+    """
+    with zipfile.ZipFile(path) as archive:
+        with archive.open(_xml_entry(archive)) as f:
+            context = ET.iterparse(f, events=('start', 'end'))
+            _, root = next(context)
+            for event, elem in context:
+                if event != 'end' or elem.tag != 'list':
+                    continue
+                modify_date = _text(elem, 'modify_date')
+                yield (
+                    _text(elem, 'corp_code'),
+                    _text(elem, 'corp_name') or '',
+                    _text(elem, 'corp_eng_name'),
+                    _text(elem, 'stock_code'),
+                    f"{modify_date[:4]}-{modify_date[4:6]}-{modify_date[6:8]}" if modify_date else None,
+                )
+                # 처리한 요소는 루트에서 떼어내 메모리를 일정하게 유지
+                root.clear()
+
+
+class CorpIndex:
+    """상장사 종목코드↔고유번호 조회 인덱스"""
+
+    def __init__(self, stock_to_corp, corp_names, checksum=None):
+        self.stock_to_corp = stock_to_corp
+        self.corp_to_stock = {corp: stock for stock, corp in stock_to_corp.items()}
+        self.corp_names = corp_names
+        self.checksum = checksum
+
+    def __len__(self):
+        return len(self.stock_to_corp)
+
+    def corp_code(self, stock_code):
+        """종목코드 → 고유번호 (없으면 None)"""
+        return self.stock_to_corp.get(stock_code)
+
+    def stock_code(self, corp_code):
+        """고유번호 → 종목코드 (비상장이면 None)"""
+        return self.corp_to_stock.get(corp_code)
+
+    def corp_name(self, corp_code):
+        return self.corp_names.get(corp_code)
+
+    def corp_codes(self, stock_codes=None):
+        """종목코드 목록 → {종목코드: 고유번호} (None이면 상장사 전체)"""
+        if stock_codes is None:
+            return dict(self.stock_to_corp)
+        return {code: self.stock_to_corp[code] for code in stock_codes if code in self.stock_to_corp}
+
+    def save(self, path=CORP_INDEX_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'checksum': self.checksum, 'stock_to_corp': self.stock_to_corp,
+                       'corp_names': self.corp_names}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=CORP_INDEX_PATH):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['stock_to_corp'], data['corp_names'], data.get('checksum'))
+
+    @classmethod
+    def from_db(cls, cursor):
+        """dart_corp 테이블로 인덱스 구성 (인덱스 파일이 없을 때)"""
+        cursor.execute("SELECT corp_code, corp_name, stock_code FROM dart_corp WHERE stock_code IS NOT NULL")
+        rows = cursor.fetchall()
+        return cls({stock: corp for corp, _, stock in rows}, {corp: name for corp, name, _ in rows})
+
+
+def refresh_corp_codes(conn, path=None, force=False):
+    """
+    고유번호 파일을 dart_corp 테이블과 로컬 인덱스에 반영 (커밋은 호출자 담당)
+
+    Args:
+        conn: 데이터베이스 연결
+        path: 로컬 corpCode.zip 경로 (None이면 DART에서 다운로드)
+        force: True면 체크섬이 같아도 다시 적재
+
+    Returns:
+        int: 적재된 기업 수 (파일이 바뀌지 않았으면 0)
+    """
+    if path is None:
+        path = download_corp_codes()
+    checksum = file_checksum(path)
+
+    with conn.cursor() as cursor:
+        if not force and get_state(cursor, STATE_KEY) == checksum and os.path.exists(CORP_INDEX_PATH):
+            logger.info("  📇 DART 고유번호 파일 변경 없음")
+            return 0
+
+        cursor.execute(CREATE_DART_CORP_SQL)
+        total = 0
+        batch = []
+        listed = {}
+        names = {}
+        for row in iter_corp_codes(path):
+            if not row[0]:
+                continue
+            batch.append(row)
+            if row[3]:
+                listed[row[3]] = row[0]
+                names[row[0]] = row[1]
+            if len(batch) >= BATCH_SIZE:
+                total += bulk_upsert(cursor, 'dart_corp', CORP_COLUMNS, batch,
+                                     conflict_columns=['corp_code'], page_size=BATCH_SIZE)
+                batch = []
+        total += bulk_upsert(cursor, 'dart_corp', CORP_COLUMNS, batch,
+                             conflict_columns=['corp_code'], page_size=BATCH_SIZE)
+        set_state(cursor, STATE_KEY, checksum)
+
+    CorpIndex(listed, names, checksum).save()
+    logger.info(f"  📇 DART 고유번호 {total:,}개 적재 (상장사 {len(listed):,}개)")
+    return total
+
+
+_corp_index = None
+_corp_index_mtime = None
+
+
+def get_corp_index(path=CORP_INDEX_PATH):
+    """프로세스 공용 고유번호 인덱스 (인덱스 파일이 갱신되면 다시 로드)"""
+    global _corp_index, _corp_index_mtime
+    mtime = os.stat(path).st_mtime_ns
+    if _corp_index is None or mtime != _corp_index_mtime:
+        _corp_index = CorpIndex.load(path)
+        _corp_index_mtime = mtime
+    return _corp_index
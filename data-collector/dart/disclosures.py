@@ -0,0 +1,278 @@
+"""DART 공시 목록 증분 수집 모듈
+
+공시검색(list.json)을 날짜 범위로 조회하여 새 공시를 dart_disclosures에 저장하고,
+정기보고서(분기/반기/사업보고서)를 낸 회사만 재무제표를 다시 수집한다.
+회사×분기 조합을 차례로 조회하여 새 보고서를 찾는 대신 실제 공시가 있을 때만 요청한다.
+
+- 커서: 마지막으로 본 접수일/접수번호를 dart_sync_state('disclosure_cursor')에 저장
+- 같은 날 뒤늦게 올라오는 공시를 놓치지 않도록 커서 접수일부터 다시 조회하고,
+  이미 저장된 접수번호를 제외한 것만 새 공시로 처리
+- 회사를 지정하지 않은 조회는 기간이 3개월로 제한되므로 긴 기간은 90일 단위로 나눠 조회
+- 보고서명의 (YYYY.MM)으로 사업연도/보고서 코드를 판정 (12월 결산 법인 기준)
+- 정기보고서 공시마다 재무제표 수집 완료 시각(financials_fetched_at)을 기록하고, 비어 있는 공시는
+  다음 실행에서 다시 수집 (요청 실패/한도 소진으로 놓친 보고서도 이어서 처리)
+- 재무제표 API는 공시 목록보다 늦게 반영되므로, 보고서 없음(013)으로 응답한 공시는 접수일로부터
+  MISSING_RETRY_DAYS일이 지날 때까지 완료로 기록하지 않고 다시 수집
+"""
+import asyncio
+import re
+from datetime import datetime, timedelta
+
+from common.database import bulk_upsert
+from common.logger import get_logger
+
+from .client import STATUS_OK, DartClient
+from .state import get_state, set_state
+
+logger = get_logger(__name__)
+
+LIST_ENDPOINT = 'list.json'
+PAGE_COUNT = 100
+WINDOW_DAYS = 90
+CURSOR_KEY = 'disclosure_cursor'
+# 보고서 없음(013) 응답 공시를 다시 수집하는 기간 (접수일 기준)
+MISSING_RETRY_DAYS = 14
+
+DISCLOSURE_COLUMNS = [
+    'rcept_no', 'rcept_dt', 'corp_code', 'corp_name', 'stock_code', 'corp_cls',
+    'report_nm', 'flr_nm', 'rm', 'bsns_year', 'reprt_code',
+]
+
+CREATE_DART_DISCLOSURES_SQL = """
+    CREATE TABLE IF NOT EXISTS dart_disclosures (
+        rcept_no VARCHAR(14) PRIMARY KEY,
+        rcept_dt DATE NOT NULL,
+        corp_code VARCHAR(8) NOT NULL,
+        corp_name VARCHAR(200),
+        stock_code VARCHAR(10),
+        corp_cls VARCHAR(1),
+        report_nm VARCHAR(300),
+        flr_nm VARCHAR(200),
+        rm VARCHAR(20),
+        bsns_year INTEGER,
+        reprt_code VARCHAR(5),
+        financials_fetched_at TIMESTAMP,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    -- 컬럼 추가 전에 저장된 공시는 이전 방식으로 이미 수집했으므로 완료로 채우고, 이후 행은 NULL로 시작
+    ALTER TABLE dart_disclosures ADD COLUMN IF NOT EXISTS financials_fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+    ALTER TABLE dart_disclosures ALTER COLUMN financials_fetched_at DROP DEFAULT;
+    CREATE INDEX IF NOT EXISTS idx_dart_disclosures_date ON dart_disclosures(rcept_dt DESC);
+    CREATE INDEX IF NOT EXISTS idx_dart_disclosures_stock ON dart_disclosures(stock_code, rcept_dt DESC);
+    CREATE INDEX IF NOT EXISTS idx_dart_disclosures_pending ON dart_disclosures(rcept_no)
+        WHERE reprt_code IS NOT NULL AND financials_fetched_at IS NULL;
+"""
+
+# [기재정정] 분기보고서 (2024.09) 등
+_PERIODIC_RE = re.compile(r'(사업|반기|분기)보고서\s*\((\d{4})\.(\d{2})\)')
+
+
+def periodic_report(report_nm):
+    """
+    정기보고서명 → (사업연도, 보고서 코드)
+
+    Returns:
+        tuple 또는 None: 정기보고서가 아니면 None
+    """
+    match = _PERIODIC_RE.search(report_nm or '')
+    if not match:
+        return None
+    kind, year, month = match.group(1), int(match.group(2)), int(match.group(3))
+    if kind == '사업':
+        return year, '11011'
+    if kind == '반기':
+        return year, '11012'
+    return year, '11013' if month <= 6 else '11014'
+
+
+def disclosure_rows(items):
+    """list.json 항목 → dart_disclosures 행 (접수번호 기준 중복 제거)"""
+    rows = {}
+    for item in items:
+        rcept_no = item.get('rcept_no')
+        if not rcept_no or not item.get('corp_code'):
+            continue
+        rcept_dt = item.get('rcept_dt') or rcept_no[:8]
+        periodic = periodic_report(item.get('report_nm'))
+        rows[rcept_no] = (
+            rcept_no,
+            f"{rcept_dt[:4]}-{rcept_dt[4:6]}-{rcept_dt[6:8]}",
+            item['corp_code'],
+            item.get('corp_name'),
+            (item.get('stock_code') or '').strip() or None,
+            item.get('corp_cls'),
+            (item.get('report_nm') or '').strip(),
+            item.get('flr_nm'),
+            (item.get('rm') or '').strip() or None,
+            periodic[0] if periodic else None,
+            periodic[1] if periodic else None,
+        )
+    return [rows[key] for key in sorted(rows)]
+
+
+async def _fetch_window(client, bgn_de, end_de):
+    """한 기간의 공시 전체 (첫 페이지로 전체 페이지 수를 확인한 뒤 나머지는 동시 요청, 실패 시 None)"""
+    params = {'bgn_de': bgn_de, 'end_de': end_de, 'sort': 'date', 'sort_mth': 'asc',
+              'page_count': str(PAGE_COUNT)}
+    first = await client.get(LIST_ENDPOINT, {**params, 'page_no': '1'})
+    if first is None:
+        return None
+    if first.get('status') != STATUS_OK:
+        return []
+
+    pages = [first]
+    total_page = int(first.get('total_page') or 1)
+    if total_page > 1:
+        pages += await asyncio.gather(*[
+            client.get(LIST_ENDPOINT, {**params, 'page_no': str(page_no)})
+            for page_no in range(2, total_page + 1)
+        ])
+    if any(page is None for page in pages):
+        return None
+    return [item for page in pages for item in page.get('list', [])]
+
+
+async def fetch_disclosures(bgn_de, end_de, budget=None, client=None):
+    """
+    기간 내 공시 목록 조회 (90일 단위로 나눠 요청)
+
+    Args:
+        bgn_de, end_de: 'YYYYMMDD'
+        budget: QuotaBudget
+        client: 이미 열린 DartClient (None이면 새로 생성)
+
+    Returns:
+        list 또는 None: list.json 항목 (한 페이지라도 실패하면 None)
+    """
+    async def _run(dart):
+        start = datetime.strptime(bgn_de, '%Y%m%d')
+        end = datetime.strptime(end_de, '%Y%m%d')
+        items = []
+        while start <= end:
+            window_end = min(start + timedelta(days=WINDOW_DAYS - 1), end)
+            window = await _fetch_window(dart, start.strftime('%Y%m%d'), window_end.strftime('%Y%m%d'))
+            if window is None:
+                return None
+            items.extend(window)
+            start = window_end + timedelta(days=1)
+        return items
+
+    if client is not None:
+        return await _run(client)
+    async with DartClient(budget=budget) as dart:
+        return await _run(dart)
+
+
+def save_new_disclosures(cursor, rows):
+    """
+    저장되지 않은 공시만 저장 (커밋은 호출자 담당)
+
+    Returns:
+        list: 새로 저장된 행
+    """
+    if not rows:
+        return []
+    cursor.execute(CREATE_DART_DISCLOSURES_SQL)
+    cursor.execute("SELECT rcept_no FROM dart_disclosures WHERE rcept_no = ANY(%s)",
+                   ([row[0] for row in rows],))
+    known = {row[0] for row in cursor.fetchall()}
+    new_rows = [row for row in rows if row[0] not in known]
+    bulk_upsert(cursor, 'dart_disclosures', DISCLOSURE_COLUMNS, new_rows,
+                conflict_columns=['rcept_no'], update_columns=[])
+    return new_rows
+
+
+def pending_filings(cursor):
+    """
+    재무제표를 아직 수집하지 못한 정기보고서 공시
+
+    Returns:
+        list: DISCLOSURE_COLUMNS 순서의 행 (접수번호 순)
+    """
+    cursor.execute(CREATE_DART_DISCLOSURES_SQL)
+    cursor.execute(f"""
+        SELECT {', '.join(DISCLOSURE_COLUMNS)}
+        FROM dart_disclosures
+        WHERE reprt_code IS NOT NULL AND financials_fetched_at IS NULL
+        ORDER BY rcept_no
+    """)
+    return cursor.fetchall()
+
+
+def mark_financials_fetched(cursor, rows, failed=(), missing=(), retry_days=MISSING_RETRY_DAYS):
+    """
+    공시의 재무제표 수집 완료 기록 (커밋은 호출자 담당)
+
+    실패한 대상의 공시는 다음 실행에서 다시 수집한다. 보고서 없음(013)으로 응답한 대상의 공시는
+    재무제표 API 반영이 늦을 수 있으므로 접수일로부터 retry_days일이 지나기 전까지 다시 수집한다.
+
+    Args:
+        rows: pending_filings 행
+        failed: 수집에 실패한 대상 [(stock_code, corp_code, bsns_year, reprt_code), ...]
+        missing: 보고서 없음으로 응답한 대상 (형식은 failed와 같음)
+        retry_days: 보고서 없음 공시를 다시 수집하는 기간 (접수일 기준 일수)
+
+    Returns:
+        int: 완료로 기록한 공시 수
+    """
+    failed_keys = {(corp_code, year, reprt_code) for _, corp_code, year, reprt_code in failed}
+    missing_keys = {(corp_code, year, reprt_code) for _, corp_code, year, reprt_code in missing}
+    cutoff = datetime.now().date() - timedelta(days=retry_days)
+    index = {name: i for i, name in enumerate(DISCLOSURE_COLUMNS)}
+
+    done = []
+    for row in rows:
+        key = (row[index['corp_code']], row[index['bsns_year']], row[index['reprt_code']])
+        if key in failed_keys:
+            continue
+        if key in missing_keys and row[index['rcept_dt']] > cutoff:
+            continue
+        done.append(row[index['rcept_no']])
+    if not done:
+        return 0
+    cursor.execute("""
+        UPDATE dart_disclosures SET financials_fetched_at = CURRENT_TIMESTAMP
+        WHERE rcept_no = ANY(%s)
+    """, (done,))
+    return cursor.rowcount
+
+
+def filing_targets(rows, corp_index=None):
+    """
+    공시 중 상장사 정기보고서 → 재무제표 수집 대상
+
+    Returns:
+        list: [(stock_code, corp_code, bsns_year, reprt_code), ...] (중복 제거)
+    """
+    targets = set()
+    for row in rows:
+        record = dict(zip(DISCLOSURE_COLUMNS, row))
+        if not record['reprt_code']:
+            continue
+        stock_code = record['stock_code'] or (corp_index.stock_code(record['corp_code']) if corp_index else None)
+        if stock_code:
+            targets.add((stock_code, record['corp_code'], record['bsns_year'], record['reprt_code']))
+    return sorted(targets)
+
+
+def load_cursor(cursor, lookback_days=7):
+    """
+    저장된 커서 (없으면 lookback_days 전부터)
+
+    Returns:
+        dict: {'rcept_dt': 'YYYYMMDD', 'rcept_no': str 또는 None}
+    """
+    default = {'rcept_dt': (datetime.now() - timedelta(days=lookback_days)).strftime('%Y%m%d'), 'rcept_no': None}
+    return get_state(cursor, CURSOR_KEY, default)
+
+
+def advance_cursor(cursor, rows, previous):
+    """본 공시 중 가장 최근 접수번호로 커서 이동 (커밋은 호출자 담당)"""
+    if not rows:
+        return previous
+    last = max(row[0] for row in rows)
+    if previous.get('rcept_no') and previous['rcept_no'] >= last:
+        return previous
+    value = {'rcept_dt': last[:8], 'rcept_no': last}
+    set_state(cursor, CURSOR_KEY, value)
+    return value
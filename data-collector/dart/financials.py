@@ -0,0 +1,248 @@
+"""DART 재무제표 일괄 수집 모듈
+
+(고유번호, 사업연도, 보고서) 단위 요청을 DartClient로 동시에 보내고, 응답 원본은
+cache/dart/raw/에 요청별 JSON으로 저장한 뒤 표준 필드로 정규화하여 financial_data에
+한 번에 저장한다. 원본이 캐시에 있으면 요청하지 않으므로 중단 후 재실행해도 한도를 다시 쓰지 않는다.
+
+- 연결재무제표(CFS)를 우선 요청하고 없으면(013) 별도재무제표(OFS) 요청
+- 손익 항목은 사업연도 누적 금액 (분기보고서는 thstrm_add_amount, 사업보고서는 thstrm_amount)
+- 재무상태 항목은 보고서 기준일 잔액
+- rcept_dt(접수일)는 접수번호 앞 8자리로 채움 (밸류에이션 적용 시작일로 사용)
+"""
+import asyncio
+import json
+import os
+from datetime import datetime
+
+from common.database import bulk_upsert
+from common.logger import get_logger
+
+from .accounts import BALANCE_FIELDS, FIELDS, canonical_field, parse_amount
+from .client import REPORT_QUARTERS, STATUS_OK, DartClient
+from .corp_codes import DART_CACHE_DIR
+
+logger = get_logger(__name__)
+
+RAW_CACHE_DIR = os.path.join(DART_CACHE_DIR, 'raw')
+STATEMENT_ENDPOINT = 'fnlttSinglAcntAll.json'
+FS_DIVS = ('CFS', 'OFS')
+SOURCE_API = 'dart_api'
+
+FINANCIAL_COLUMNS = ['stock_code', 'corp_code', 'year', 'quarter', 'reprt_code', 'fs_div'] + FIELDS + \
+    ['rcept_no', 'rcept_dt', 'source', 'updated_at']
+
+CREATE_FINANCIAL_DATA_SQL = """
+    CREATE TABLE IF NOT EXISTS financial_data (
+        id SERIAL PRIMARY KEY,
+        stock_code VARCHAR(20) NOT NULL,
+        year INTEGER NOT NULL,
+        quarter INTEGER NOT NULL,
+        revenue BIGINT,
+        operating_profit BIGINT,
+        net_profit BIGINT,
+        total_assets BIGINT,
+        total_equity BIGINT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(stock_code, year, quarter)
+    );
+    ALTER TABLE financial_data
+        ADD COLUMN IF NOT EXISTS corp_code VARCHAR(8),
+        ADD COLUMN IF NOT EXISTS reprt_code VARCHAR(5),
+        ADD COLUMN IF NOT EXISTS fs_div VARCHAR(3),
+        ADD COLUMN IF NOT EXISTS net_profit_controlling BIGINT,
+        ADD COLUMN IF NOT EXISTS total_liabilities BIGINT,
+        ADD COLUMN IF NOT EXISTS equity_controlling BIGINT,
+        ADD COLUMN IF NOT EXISTS rcept_no VARCHAR(14),
+        ADD COLUMN IF NOT EXISTS rcept_dt DATE,
+        ADD COLUMN IF NOT EXISTS source VARCHAR(20),
+        ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;
+    CREATE INDEX IF NOT EXISTS idx_financial_data_rcept_dt ON financial_data(rcept_dt);
+"""
+
+# 예전 수집 스크립트가 넣은 빈 행 (모든 금액이 NULL)
+DELETE_PLACEHOLDER_SQL = """
+    DELETE FROM financial_data
+    WHERE source IS NULL
+      AND revenue IS NULL AND operating_profit IS NULL AND net_profit IS NULL
+      AND total_assets IS NULL AND total_equity IS NULL
+"""
+
+
+def ensure_financial_table(cursor):
+    """financial_data 테이블/컬럼 보장 및 빈 행 정리"""
+    cursor.execute(CREATE_FINANCIAL_DATA_SQL)
+    cursor.execute(DELETE_PLACEHOLDER_SQL)
+
+
+def _cache_path(corp_code, year, reprt_code, fs_div):
+    return os.path.join(RAW_CACHE_DIR, str(year), reprt_code, f"{corp_code}_{fs_div}.json")
+
+
+def _load_cached(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _save_cached(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def statement_amount(item, field, reprt_code):
+    """계정 항목의 저장 금액 (손익은 사업연도 누적, 재무상태는 잔액)"""
+    if field in BALANCE_FIELDS or reprt_code == '11011':
+        return parse_amount(item.get('thstrm_amount'))
+    cumulative = parse_amount(item.get('thstrm_add_amount'))
+    return cumulative if cumulative is not None else parse_amount(item.get('thstrm_amount'))
+
+
+def receipt_date(rcept_no):
+    """접수번호(YYYYMMDD + 일련번호) → 접수일 'YYYY-MM-DD'"""
+    if not rcept_no or len(rcept_no) < 8:
+        return None
+    try:
+        return datetime.strptime(rcept_no[:8], '%Y%m%d').strftime('%Y-%m-%d')
+    except ValueError:
+        return None
+
+
+def normalize_statement(items, stock_code, corp_code, year, reprt_code, fs_div, source=SOURCE_API):
+    """
+    재무제표 응답 항목 → financial_data 행
+
+    Returns:
+        tuple 또는 None: FINANCIAL_COLUMNS 순서 (매핑된 계정이 없으면 None)
+    """
+    values = {}
+    rcept_no = None
+    for item in items:
+        rcept_no = rcept_no or item.get('rcept_no')
+        field = canonical_field(item.get('sj_div'), item.get('account_id'), item.get('account_nm'))
+        # 같은 필드가 IS와 CIS에 모두 있으면 먼저 나온 값 사용
+        if field is None or values.get(field) is not None:
+            continue
+        values[field] = statement_amount(item, field, reprt_code)
+
+    if not any(value is not None for value in values.values()):
+        return None
+    return (
+        stock_code, corp_code, int(year), REPORT_QUARTERS[reprt_code], reprt_code, fs_div,
+        *(values.get(field) for field in FIELDS),
+        rcept_no, receipt_date(rcept_no), source, datetime.now(),
+    )
+
+
+async def fetch_statement(client, corp_code, year, reprt_code, refresh=False):
+    """
+    한 회사·보고서의 전체 재무제표 조회 (연결 우선, 없으면 별도)
+
+    Returns:
+        tuple: (fs_div, 항목 목록) (보고서가 없으면 (None, []), 요청 실패/한도 소진이면 None)
+    """
+    for fs_div in FS_DIVS:
+        path = _cache_path(corp_code, year, reprt_code, fs_div)
+        data = None if refresh else _load_cached(path)
+        if data is None:
+            data = await client.get(STATEMENT_ENDPOINT, {
+                'corp_code': corp_code,
+                'bsns_year': str(year),
+                'reprt_code': reprt_code,
+                'fs_div': fs_div,
+            })
+            if data is None:
+                return None
+            # 없는 보고서는 나중에 공시될 수 있으므로 정상 응답만 캐시
+            if data.get('status') == STATUS_OK:
+                _save_cached(path, data)
+        if data.get('status') == STATUS_OK and data.get('list'):
+            return fs_div, data['list']
+    return None, []
+
+
+async def fetch_financials(targets, budget=None, concurrency=10, refresh=False, client=None):
+    """
+    재무제표 동시 수집
+
+    Args:
+        targets: [(stock_code, corp_code, year, reprt_code), ...]
+        budget: QuotaBudget (None이면 한도 관리 안 함)
+        concurrency: 동시 요청 수
+        refresh: True면 캐시를 무시하고 다시 요청
+        client: 이미 열린 DartClient (None이면 새로 생성)
+
+    Returns:
+        tuple: (financial_data 행 목록, 보고서가 없는(013) 대상 목록, 실패한 대상 목록)
+    """
+    async def _run(dart):
+        async def _one(target):
+            stock_code, corp_code, year, reprt_code = target
+            return target, await fetch_statement(dart, corp_code, year, reprt_code, refresh)
+
+        rows, missing, failed = [], [], []
+        for task in asyncio.as_completed([_one(target) for target in targets]):
+            target, result = await task
+            stock_code, corp_code, year, reprt_code = target
+            if result is None:
+                failed.append(target)
+                continue
+            fs_div, items = result
+            row = normalize_statement(items, stock_code, corp_code, year, reprt_code, fs_div) if items else None
+            if row is None:
+                missing.append(target)
+            else:
+                rows.append(row)
+        return rows, missing, failed
+
+    if client is not None:
+        return await _run(client)
+    async with DartClient(budget=budget, concurrency=concurrency) as dart:
+        return await _run(dart)
+
+
+def save_financial_rows(cursor, rows):
+    """정규화된 재무 행 저장 (커밋은 호출자 담당)"""
+    if not rows:
+        return 0
+    ensure_financial_table(cursor)
+    return bulk_upsert(cursor, 'financial_data', FINANCIAL_COLUMNS, rows,
+                       conflict_columns=['stock_code', 'year', 'quarter'])
+
+
+def financial_targets(cursor, corp_index, years, reprt_codes, stock_codes=None, refresh=False, available=None):
+    """
+    수집 대상 (상장 주식 중 고유번호가 있고 아직 저장되지 않은 회사·보고서)
+
+    Args:
+        available: 제출된 셀 집합 {(corp_code, year, reprt_code)} (지정하면 제출된 보고서만 요청)
+
+    Returns:
+        list: [(stock_code, corp_code, year, reprt_code), ...]
+    """
+    if stock_codes is None:
+        cursor.execute("SELECT stock_code FROM stocks WHERE asset_type IS DISTINCT FROM 'ETF'")
+        stock_codes = [row[0] for row in cursor.fetchall()]
+    corp_codes = corp_index.corp_codes(stock_codes)
+
+    stored = set()
+    if not refresh:
+        ensure_financial_table(cursor)
+        cursor.execute("""
+            SELECT stock_code, year, reprt_code FROM financial_data
+            WHERE year = ANY(%s) AND reprt_code = ANY(%s) AND source IS NOT NULL
+        """, (list(years), list(reprt_codes)))
+        stored = set(cursor.fetchall())
+
+    return [
+        (stock_code, corp_code, year, reprt_code)
+        for year in years
+        for reprt_code in reprt_codes
+        for stock_code, corp_code in sorted(corp_codes.items())
+        if (stock_code, year, reprt_code) not in stored
+        and (available is None or (corp_code, year, reprt_code) in available)
+    ]
@@ -0,0 +1,120 @@
+"""DART 일일 요청 한도 관리 모듈
+
+DART API는 키당 하루 요청 수가 제한되어 있어(기본 20,000건) 여러 수집 스크립트가
+같은 키를 쓰면 한도를 나눠 써야 한다. 날짜별 사용량을 dart_quota 테이블에 누적하고,
+요청 전에 한도 안에서만 원자적으로 예약한다.
+
+- 예약은 block 단위로 한 번에 받아 요청마다 DB를 왕복하지 않음
+- 예약은 즉시 커밋 (다른 프로세스가 바로 볼 수 있도록 별도 연결 사용 권장)
+- 쓰지 못한 예약분은 close()에서 반납
+"""
+from datetime import date
+
+from common.config import DART_DAILY_LIMIT
+
+CREATE_DART_QUOTA_SQL = """
+    CREATE TABLE IF NOT EXISTS dart_quota (
+        usage_date DATE PRIMARY KEY,
+        request_count INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+
+def reserve_requests(conn, count, limit=DART_DAILY_LIMIT, usage_date=None):
+    """
+    오늘 사용량에 최대 count건을 예약 (한도를 넘는 만큼은 예약하지 않음, 즉시 커밋)
+
+    Returns:
+        int: 실제 예약된 건수 (0이면 한도 소진)
+    """
+    usage_date = usage_date or date.today()
+    with conn.cursor() as cursor:
+        cursor.execute(CREATE_DART_QUOTA_SQL)
+        cursor.execute("""
+            INSERT INTO dart_quota (usage_date, request_count) VALUES (%s, 0)
+            ON CONFLICT (usage_date) DO NOTHING
+        """, (usage_date,))
+        # 행 잠금 후 한도까지만 증가 (동시 예약도 한도를 넘지 않음)
+        cursor.execute("""
+            UPDATE dart_quota q
+            SET request_count = LEAST(q.request_count + %s, %s),
+                updated_at = CURRENT_TIMESTAMP
+            FROM (SELECT request_count FROM dart_quota WHERE usage_date = %s FOR UPDATE) old
+            WHERE q.usage_date = %s
+            RETURNING q.request_count - old.request_count
+        """, (count, limit, usage_date, usage_date))
+        granted = max(cursor.fetchone()[0], 0)
+    conn.commit()
+    return granted
+
+
+def release_requests(conn, count, usage_date=None):
+    """쓰지 않은 예약분 반납 (즉시 커밋)"""
+    if count <= 0:
+        return
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            UPDATE dart_quota
+            SET request_count = GREATEST(request_count - %s, 0),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE usage_date = %s
+        """, (count, usage_date or date.today()))
+    conn.commit()
+
+
+def remaining_requests(cursor, limit=DART_DAILY_LIMIT):
+    """오늘 남은 요청 수"""
+    cursor.execute(CREATE_DART_QUOTA_SQL)
+    cursor.execute("SELECT request_count FROM dart_quota WHERE usage_date = %s", (date.today(),))
+    row = cursor.fetchone()
+    return max(limit - (row[0] if row else 0), 0)
+
+
+class QuotaBudget:
+    """
+    요청 예산 (block 단위 예약 후 요청마다 하나씩 차감)
+
+    Args:
+        conn: 예약 전용 데이터베이스 연결 (예약할 때마다 커밋됨)
+        block: 한 번에 예약할 요청 수
+        limit: 일일 한도
+    """
+
+    def __init__(self, conn, block=100, limit=DART_DAILY_LIMIT):
+        self.conn = conn
+        self.block = block
+        self.limit = limit
+        self.usage_date = date.today()
+        self.available = 0
+        self.used = 0
+        self.exhausted = False
+
+    def acquire(self):
+        """요청 1건 차감 (한도가 소진되었으면 False)"""
+        if self.exhausted:
+            return False
+        if date.today() != self.usage_date:
+            # 날짜가 바뀌면 남은 예약은 전날 분이므로 버리고 새로 예약
+            release_requests(self.conn, self.available, self.usage_date)
+            self.usage_date = date.today()
+            self.available = 0
+        if self.available == 0:
+            self.available = reserve_requests(self.conn, self.block, self.limit, self.usage_date)
+            if self.available == 0:
+                self.exhausted = True
+                return False
+        self.available -= 1
+        self.used += 1
+        return True
+
+    def mark_exhausted(self):
+        """DART가 한도 초과(020)를 응답했을 때 이후 요청 중단 (다른 프로세스도 멈추도록 사용량을 한도로 기록)"""
+        self.exhausted = True
+        self.available = 0
+        reserve_requests(self.conn, self.limit, self.limit, self.usage_date)
+
+    def close(self):
+        """남은 예약 반납"""
+        release_requests(self.conn, self.available, self.usage_date)
+        self.available = 0
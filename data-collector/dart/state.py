@@ -0,0 +1,37 @@
+"""DART 동기화 상태 저장 모듈
+
+고유번호 파일 체크섬, 공시 목록 커서 등 작업별 마지막 처리 위치를
+dart_sync_state 테이블에 키-값으로 보관한다.
+"""
+import json
+
+CREATE_SYNC_STATE_SQL = """
+    CREATE TABLE IF NOT EXISTS dart_sync_state (
+        state_key VARCHAR(50) PRIMARY KEY,
+        state_value TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+
+def get_state(cursor, key, default=None):
+    """저장된 상태 값 조회 (JSON으로 저장된 값은 복원)"""
+    cursor.execute(CREATE_SYNC_STATE_SQL)
+    cursor.execute("SELECT state_value FROM dart_sync_state WHERE state_key = %s", (key,))
+    row = cursor.fetchone()
+    if row is None or row[0] is None:
+        return default
+    return json.loads(row[0])
+
+
+def set_state(cursor, key, value):
+    """상태 값 저장 (커밋은 호출자 담당)"""
+    cursor.execute(CREATE_SYNC_STATE_SQL)
+    cursor.execute("""
+        INSERT INTO dart_sync_state (state_key, state_value, updated_at)
+        VALUES (%s, %s, CURRENT_TIMESTAMP)
+        ON CONFLICT (state_key)
+        DO UPDATE SET
+            state_value = EXCLUDED.state_value,
+            updated_at = EXCLUDED.updated_at
+    """, (key, json.dumps(value, ensure_ascii=False)))
@@ -1,6 +1,7 @@
 import requests
 import os
 from dotenv import load_dotenv
+from dart.client import QUARTER_REPORTS
 
 load_dotenv('../.env')
 
@@ -18,13 +19,13 @@ def get_company_info(stock_code):
     return response.json()
 
 def get_financial_statement(corp_code, year, quarter):
-    """재무제표 조회"""
+    """재무제표 조회 (단건, 전체 종목 수집은 collect_dart_financials.py 사용)"""
     url = f"{BASE_URL}/fnlttSinglAcntAll.json"
     params = {
         'crtfc_key': DART_API_KEY,
         'corp_code': corp_code,
         'bsns_year': year,
-        'reprt_code': f'{quarter}Q'  # 11013(1분기), 11012(반기), 11014(3분기), 11011(사업보고서)
+        'reprt_code': QUARTER_REPORTS[quarter]  # 11013(1분기), 11012(반기), 11014(3분기), 11011(사업보고서)
     }
     response = requests.get(url, params=params)
     return response.json()
@@ -9,33 +9,35 @@ import os
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 import time
+from common.database import get_db_connection
+from dart.availability import latest_available, refresh_availability
+from dart.corp_codes import get_corp_index
+from dart.quota import QuotaBudget
 
 load_dotenv()
 
 DART_API_KEY = os.getenv('DART_API_KEY')
-SK_HYNIX_CORP_CODE = '00164779'  # SK하이닉스 고유번호
 SK_HYNIX_STOCK_CODE = '000660'
 
-def get_latest_quarter():
-    """현재 시점 기준 최신 분기 결정"""
-    now = datetime.now()
-    year = now.year
-    month = now.month
-
-    # 분기별 공시 가능 시점 (대략적)
-    # 1분기(Q1): 5월 중순 이후
-    # 2분기(Q2): 8월 중순 이후
-    # 3분기(Q3): 11월 중순 이후
-    # 4분기(연간): 다음년도 3월 말 이후
-
-    if month >= 11:
-        return year, 3, '11013'  # 3분기
-    elif month >= 8:
-        return year, 2, '11012'  # 2분기
-    elif month >= 5:
-        return year, 1, '11011'  # 1분기
-    else:
-        return year - 1, 4, '11011'  # 전년도 연간보고서
+def get_latest_quarter(corp_code, corp_index=None):
+    """보고서 제출 여부 인덱스 기준 최신 보고서 (확인 기한이 지난 셀만 DART에 확인)"""
+    this_year = datetime.now().year
+    with get_db_connection() as conn, get_db_connection() as quota_conn:
+        # 요청은 dart_quota 일일 한도에서 예약 (한도는 별도 연결에서 바로 커밋)
+        budget = QuotaBudget(quota_conn, block=10)
+        try:
+            refresh_availability(conn, [corp_code], [this_year - 1, this_year],
+                                 corp_index=corp_index, budget=budget)
+        finally:
+            budget.close()
+        conn.commit()
+        with conn.cursor() as cur:
+            latest = latest_available(cur, corp_code)
+
+    if latest is None:
+        return None
+    year, quarter, reprt_code, _ = latest
+    return year, quarter, reprt_code
 
 def get_financial_statement(corp_code, year, reprt_code):
     """재무제표 조회"""
@@ -180,14 +182,27 @@ def main():
 
     print()
 
-    # 3. 최신 분기 결정
-    year, quarter, reprt_code = get_latest_quarter()
+    # 3. 최신 분기 결정 (고유번호는 DART 고유번호 인덱스에서 조회)
+    try:
+        corp_index = get_corp_index()
+    except FileNotFoundError:
+        corp_index = None
+    corp_code = corp_index.corp_code(SK_HYNIX_STOCK_CODE) if corp_index else None
+    if not corp_code:
+        print("  ❌ 고유번호 인덱스에 없습니다. sync_dart_corp_codes.py를 먼저 실행하세요.")
+        return
+
+    latest = get_latest_quarter(corp_code, corp_index=corp_index)
+    if latest is None:
+        print("  ❌ 제출된 정기보고서가 없습니다.")
+        return
+    year, quarter, reprt_code = latest
     quarter_names = {1: '1분기', 2: '2분기', 3: '3분기', 4: '연간'}
 
     print(f"📈 재무제표 조회 중... ({year}년 {quarter_names.get(quarter, '연간')})")
 
     # 4. 재무제표 조회
-    statement = get_financial_statement(SK_HYNIX_CORP_CODE, year, reprt_code)
+    statement = get_financial_statement(corp_code, year, reprt_code)
 
     if not statement:
         print("  ❌ 재무제표를 가져올 수 없습니다.")
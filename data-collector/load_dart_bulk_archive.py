@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DART 재무정보 일괄 다운로드 파일 적재
+
+DART 재무정보 일괄 다운로드 zip(재무상태표/손익계산서, 분기별)을 스트리밍 파싱하여
+financial_data에 한 번에 반영하고 TTM과 일별 PER/PBR을 갱신한다. API 요청을 쓰지 않으므로
+과거 분기 전체를 처음 채우거나 다시 채울 때 사용한다.
+
+사용법:
+    python3 load_dart_bulk_archive.py <zip|디렉터리|txt> [...]
+"""
+
+import sys
+import time
+from common.database import get_db_connection
+from common.logger import get_logger
+from analytics.fundamentals import update_after_filings
+from dart.bulk_archive import collect_archive, copy_financial_rows
+from dart.corp_codes import get_corp_index
+
+logger = get_logger(__name__, 'load_dart_bulk_archive.log')
+
+def main():
+    logger.info("="*80)
+    logger.info("📦 DART 재무정보 일괄 다운로드 파일 적재")
+    logger.info("="*80)
+
+    paths = sys.argv[1:]
+    if not paths:
+        logger.error("❌ 사용법: python3 load_dart_bulk_archive.py <zip|디렉터리|txt> [...]")
+        return
+
+    # 고유번호는 있으면 함께 저장 (제출 여부 인덱스가 사용)
+    try:
+        corp_index = get_corp_index()
+    except FileNotFoundError:
+        logger.warning("⚠️  고유번호 인덱스가 없어 corp_code 없이 적재합니다 (sync_dart_corp_codes.py)")
+        corp_index = None
+
+    start_time = time.time()
+    rows = collect_archive(paths, corp_index=corp_index)
+    logger.info(f"📋 회사·보고서 {len(rows):,}건 파싱 ({time.time() - start_time:.1f}초)")
+    if not rows:
+        return
+
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cur:
+                saved = copy_financial_rows(cur, rows)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"❌ 저장 실패: {e}")
+            return
+
+        # 새 재무 데이터를 TTM과 일별 PER/PBR에 반영
+        try:
+            update_after_filings(conn, sorted({row[0] for row in rows}))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"❌ 밸류에이션 갱신 실패: {e}")
+
+    elapsed = time.time() - start_time
+    logger.info(f"  ✅ {saved:,}건 저장, 소요 시간 {elapsed:.1f}초")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DART 공시 목록 증분 수집
+
+마지막으로 본 공시 이후의 공시 목록을 dart_disclosures에 저장하고,
+정기보고서(분기/반기/사업보고서)를 낸 상장사만 재무제표를 수집하여
+financial_data와 일별 PER/PBR을 갱신한다. 재무제표 수집에 실패한 공시는 완료로 기록하지 않으므로
+다음 실행에서 다시 수집한다. 주기적으로(예: 장중 30분마다) 실행한다.
+
+사용법:
+    python3 poll_dart_disclosures.py [시작일 YYYYMMDD]   (생략 시 저장된 커서부터, 처음이면 최근 7일)
+"""
+
+import asyncio
+import sys
+from datetime import datetime
+from common.database import get_db_connection
+from common.logger import get_logger
+from analytics.fundamentals import update_after_filings
+from dart.corp_codes import get_corp_index
+from dart.disclosures import (advance_cursor, disclosure_rows, fetch_disclosures, filing_targets, load_cursor,
+                              mark_financials_fetched, pending_filings, save_new_disclosures)
+from dart.financials import fetch_financials, save_financial_rows
+from dart.quota import QuotaBudget
+
+logger = get_logger(__name__, 'poll_dart_disclosures.log')
+
+def main():
+    logger.info("="*80)
+    logger.info("📰 DART 공시 목록 증분 수집")
+    logger.info("="*80)
+
+    try:
+        corp_index = get_corp_index()
+    except FileNotFoundError:
+        corp_index = None
+
+    with get_db_connection() as conn, get_db_connection() as quota_conn:
+        with conn.cursor() as cur:
+            position = load_cursor(cur)
+        conn.commit()
+        bgn_de = sys.argv[1] if len(sys.argv) > 1 else position['rcept_dt']
+        end_de = datetime.now().strftime('%Y%m%d')
+        logger.info(f"📅 조회 기간: {bgn_de} ~ {end_de} (마지막 접수번호 {position.get('rcept_no') or '-'})")
+
+        budget = QuotaBudget(quota_conn, block=20)
+        try:
+            items = asyncio.run(fetch_disclosures(bgn_de, end_de, budget=budget))
+            if items is None:
+                # 목록 조회에 실패해도 이전에 놓친 보고서의 재무제표는 이어서 수집
+                logger.error("❌ 공시 목록 조회 실패 (커서 유지)")
+            else:
+                rows = disclosure_rows(items)
+                try:
+                    with conn.cursor() as cur:
+                        new_rows = save_new_disclosures(cur, rows)
+                        advance_cursor(cur, rows, position)
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    logger.error(f"❌ 공시 저장 실패: {e}")
+                    return
+                logger.info(f"  ✅ 공시 {len(rows):,}건 조회, 새 공시 {len(new_rows):,}건")
+
+            # 재무제표 수집이 끝나지 않은 정기보고서 (이번에 저장한 공시 + 이전 실행에서 실패한 공시)
+            with conn.cursor() as cur:
+                pending = pending_filings(cur)
+            conn.commit()
+            if not pending:
+                return
+            targets = filing_targets(pending, corp_index)
+            logger.info(f"  📑 재무제표 수집 대기 정기보고서 {len(pending):,}건, 수집 대상 {len(targets):,}건")
+
+            # 새 보고서/정정 보고서이므로 캐시를 무시하고 다시 조회
+            financial_rows, missing, failed = [], [], []
+            if targets:
+                financial_rows, missing, failed = asyncio.run(
+                    fetch_financials(targets, budget=budget, refresh=True))
+        finally:
+            budget.close()
+
+        # 재무 데이터 저장과 공시별 수집 완료 기록을 같은 트랜잭션으로
+        # (실패한 대상과 접수일이 최근인 보고서 없음 대상은 다음 실행에서 다시 수집)
+        try:
+            with conn.cursor() as cur:
+                saved = save_financial_rows(cur, financial_rows)
+                mark_financials_fetched(cur, pending, failed, missing)
+            conn.commit()
+            update_after_filings(conn, [row[0] for row in financial_rows])
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"❌ 재무 데이터 저장 실패: {e}")
+            return
+
+    logger.info(f"  📊 재무제표 {saved:,}건 저장 (보고서 없음 {len(missing):,}건, 실패 {len(failed):,}건 → 다음 실행에서 재시도)")
+    logger.info(f"  📡 API 요청 {budget.used:,}건")
+
+if __name__ == '__main__':
+    main()
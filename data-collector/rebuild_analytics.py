@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+파생 데이터(주봉/월봉 등) 전체 재계산
+최초 도입 시 또는 과거 데이터를 재수집한 뒤 한 번 실행
+"""
+
+import sys
+from datetime import datetime
+from analytics.pipeline import REBUILD_STAGES, run_rebuild
+from common.logger import get_logger
+
+logger = get_logger(__name__, 'rebuild_analytics.log')
+
+def main():
+    logger.info("="*80)
+    logger.info("🔄 파생 데이터 전체 재계산")
+    logger.info("="*80)
+    logger.info(f"실행 시각: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    # 인자로 단계 키를 주면 해당 단계만 실행 (예: python3 rebuild_analytics.py bars)
+    stage_keys = sys.argv[1:] or None
+    labels = {key: label for key, label, _ in REBUILD_STAGES}
+    if stage_keys:
+        unknown = [key for key in stage_keys if key not in labels]
+        if unknown:
+            logger.error(f"❌ 알 수 없는 단계: {', '.join(unknown)}")
+            logger.error(f"  사용 가능: {', '.join(labels)}")
+            return
+
+    results = run_rebuild(stage_keys)
+
+    logger.info(f"\n{'='*80}")
+    for key, ok in results.items():
+        logger.info(f"  {'✅' if ok else '❌'} {labels[key]}")
+    logger.info(f"완료 시각: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    logger.info(f"{'='*80}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+전략 백테스트 파라미터 스윕 (수정주가 패널, 조합별 성과를 샤프 내림차순으로 출력)
+
+그리드 JSON의 값은 목록(모든 조합 실행) 또는 단일 값(고정 파라미터)이다.
+
+사용법:
+    python3 run_backtest.py <전략> '<그리드 JSON>' [시작일] [시장구분,...]
+    python3 run_backtest.py momentum '{"lookback": [60, 120, 250], "skip": [0, 20], "max_positions": 20}'
+    python3 run_backtest.py sma_cross '{"fast": [5, 10, 20], "slow": [60, 120]}' 2018-01-01 KOSPI
+"""
+
+import json
+import sys
+import time
+import pandas as pd
+from analytics.backtest import STRATEGIES, load_panel, run_sweep
+from common.logger import get_logger
+
+logger = get_logger(__name__, 'run_backtest.log')
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in STRATEGIES:
+        logger.error(__doc__)
+        logger.error(f"   전략: {', '.join(STRATEGIES)}")
+        return
+
+    strategy = sys.argv[1]
+    try:
+        grid = json.loads(sys.argv[2])
+    except json.JSONDecodeError as e:
+        logger.error(f"❌ 그리드 JSON 오류: {e}")
+        return
+    if not isinstance(grid, dict) or not grid:
+        logger.error("❌ 그리드는 {파라미터: [값, ...]} 형식의 JSON 객체여야 합니다.")
+        return
+    grid = {name: values if isinstance(values, list) else [values] for name, values in grid.items()}
+
+    start_date = sys.argv[3] if len(sys.argv) > 3 else None
+    market_types = sys.argv[4].split(',') if len(sys.argv) > 4 else None
+
+    logger.info("="*80)
+    logger.info(f"🧪 {strategy} 백테스트 (시작일 {start_date or '전체'}, 시장 {market_types or '전체 주식'})")
+    logger.info("="*80)
+
+    start_time = time.time()
+    panel = load_panel(start_date, market_types=market_types)
+    if not len(panel['codes']):
+        logger.error("❌ 백테스트할 시세가 없습니다.")
+        return
+
+    try:
+        results = run_sweep(panel, strategy, grid)
+    except TypeError as e:
+        logger.error(f"❌ 전략 파라미터 오류: {e}")
+        return
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        logger.info(f"\n{results.head(20).to_string(index=False, float_format='{:.4f}'.format)}")
+    logger.info(f"  ✅ {len(results):,}개 조합, 소요 시간 {time.time() - start_time:.1f}초")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+종목 스크리닝 (수집 후처리에서 만든 스냅샷 사용, DB 조회 없음)
+
+사용법:
+    python3 screen_stocks.py "<필터 식>" ["<정렬 식>"] [최대 행 수]
+    python3 screen_stocks.py "market_cap >= 1e12 and ret_20 > 0.1" "ret_20 desc" 30
+"""
+
+import os
+import sys
+import pandas as pd
+from analytics.screener import DEFAULT_COLUMNS, SNAPSHOT_PATH, get_screener
+from common.logger import get_logger
+
+logger = get_logger(__name__, 'screen_stocks.log')
+
+def main():
+    if len(sys.argv) < 2:
+        logger.error(__doc__)
+        return
+
+    if not os.path.exists(SNAPSHOT_PATH):
+        logger.error("❌ 스크리너 스냅샷이 없습니다. 먼저 실행: python3 rebuild_analytics.py screener")
+        return
+
+    where = sys.argv[1]
+    order_by = sys.argv[2] if len(sys.argv) > 2 else None
+    limit = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+    screener = get_screener()
+    try:
+        mask = screener.mask(where)
+        result = screener.screen(order_by=order_by, limit=limit, columns=DEFAULT_COLUMNS + ['ret_20', 'trading_value'],
+                                 mask=mask)
+    except ValueError as e:
+        logger.error(f"❌ {e}")
+        return
+
+    logger.info(f"🔎 {screener.trade_date:%Y-%m-%d} 기준 {mask.sum():,}/{screener.size:,}개 종목 일치")
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        logger.info(f"\n{result.to_string(index=False)}")
+
+if __name__ == '__main__':
+    main()
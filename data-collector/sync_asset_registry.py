@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+자산 구분 레지스트리 초기 적재 및 stocks 구분 정리
+
+평소에는 수집기가 API 응답을 저장할 때 레지스트리를 갱신하므로 실행할 필요가 없다.
+레지스트리 도입 시 한 번 실행하여 기존 stocks.asset_type으로 초기 적재하고,
+기준일의 주식/ETF 시세 응답 종목으로 구분을 확정한 뒤 stocks를 맞춘다.
+
+사용법:
+    python3 sync_asset_registry.py [기준일 YYYYMMDD]   (생략 시 최근 7일 중 데이터가 있는 날)
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+from collect_data_go_kr import get_stock_price_data
+from collect_etf_go_kr import get_etf_price_data
+from common.assets import SOURCE_ETF, SOURCE_STOCK, register_assets, seed_asset_registry, sync_all_stocks
+from common.database import get_db_connection
+from common.logger import get_logger
+
+logger = get_logger(__name__, 'sync_asset_registry.log')
+
+def fetch_all(fetch, base_date):
+    """페이지를 끝까지 조회"""
+    page_no = 1
+    all_items = []
+    while True:
+        items = fetch(base_date, page_no=page_no, num_of_rows=1000)
+        if not items:
+            break
+        all_items.extend(items)
+        if len(items) < 1000:
+            break
+        page_no += 1
+        time.sleep(0.5)  # API 제한 방지
+    return all_items
+
+def main():
+    logger.info("="*80)
+    logger.info("🗂️  자산 구분 레지스트리 동기화")
+    logger.info("="*80)
+
+    if len(sys.argv) > 1:
+        candidates = [sys.argv[1]]
+    else:
+        today = datetime.now()
+        candidates = [(today - timedelta(days=i)).strftime('%Y%m%d') for i in range(1, 8)]
+
+    stock_items, base_date = [], None
+    for candidate in candidates:
+        stock_items = fetch_all(get_stock_price_data, candidate)
+        if stock_items:
+            base_date = candidate
+            break
+
+    if not stock_items:
+        logger.error("❌ 기준일 주식 시세 응답이 없습니다.")
+        return
+
+    etf_items = fetch_all(get_etf_price_data, base_date)
+    trade_date = datetime.strptime(base_date, '%Y%m%d').strftime('%Y-%m-%d')
+    logger.info(f"📅 기준일 {trade_date}: 주식 {len(stock_items):,}개, ETF {len(etf_items):,}개")
+
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cur:
+                seeded = seed_asset_registry(cur)
+                register_assets(cur, stock_items, SOURCE_STOCK, trade_date)
+                register_assets(cur, etf_items, SOURCE_ETF, trade_date)
+                changed = sync_all_stocks(cur)
+
+                cur.execute('SELECT market_type, COUNT(*) FROM stocks GROUP BY market_type ORDER BY market_type')
+                summary = cur.fetchall()
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"❌ 동기화 실패: {e}")
+            return
+
+    logger.info(f"  ✅ 기존 stocks에서 {seeded:,}개 초기 적재, {changed:,}개 종목 구분 변경")
+    for market_type, count in summary:
+        logger.info(f"  {market_type}: {count:,}개")
+
+if __name__ == '__main__':
+    main()
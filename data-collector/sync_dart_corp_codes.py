@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DART 기업 고유번호 마스터 갱신
+
+DART 고유번호 파일(corpCode.xml zip)을 내려받아 dart_corp 테이블과
+로컬 인덱스(cache/dart/corp_index.json)를 갱신한다. 파일이 바뀌지 않았으면 건너뛴다.
+
+사용법:
+    python3 sync_dart_corp_codes.py [zip 경로] [force]
+    (zip 경로 생략 시 DART에서 다운로드, force 지정 시 변경 여부와 관계없이 다시 적재)
+"""
+
+import sys
+from common.database import get_db_connection
+from common.logger import get_logger
+from dart.corp_codes import get_corp_index, refresh_corp_codes
+
+logger = get_logger(__name__, 'sync_dart_corp_codes.log')
+
+def main():
+    logger.info("="*80)
+    logger.info("📇 DART 고유번호 마스터 갱신")
+    logger.info("="*80)
+
+    args = sys.argv[1:]
+    force = 'force' in args
+    paths = [arg for arg in args if arg != 'force']
+    path = paths[0] if paths else None
+
+    with get_db_connection() as conn:
+        try:
+            count = refresh_corp_codes(conn, path=path, force=force)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"❌ 고유번호 갱신 실패: {e}")
+            return
+
+    corp_index = get_corp_index()
+    if count:
+        logger.info(f"  ✅ {count:,}개 기업 적재")
+    logger.info(f"  📇 상장사 인덱스 {len(corp_index):,}개")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DART 재무정보 일괄 다운로드 파일 파싱 테스트 (로컬 샘플 zip 사용, DB/API 없음)
+
+fixtures/dart_bulk_2024_3Q.zip: 2024년 3분기보고서 재무상태표/손익계산서/포괄손익계산서 (cp949 탭 구분)
+- 005930: 연결 + 별도, 분기순이익이 손익계산서와 포괄손익계산서에 모두 있음 (값이 다름)
+- 000660: 별도만
+
+실행:
+    python3 -m pytest tests/test_dart_bulk_archive.py
+    python3 tests/test_dart_bulk_archive.py
+"""
+
+import os
+import sys
+
+# data-collector 디렉토리를 sys.path에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dart.accounts import FIELDS
+from dart.bulk_archive import SOURCE_BULK, collect_archive
+from dart.corp_codes import CorpIndex
+from dart.financials import FINANCIAL_COLUMNS
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'dart_bulk_2024_3Q.zip')
+
+
+def _records(rows):
+    return {row[0]: dict(zip(FINANCIAL_COLUMNS, row)) for row in rows}
+
+
+def test_collect_archive_fields():
+    records = _records(collect_archive([FIXTURE_PATH]))
+    assert sorted(records) == ['000660', '005930']
+
+    samsung = records['005930']
+    assert (samsung['year'], samsung['quarter'], samsung['reprt_code']) == (2024, 3, '11014')
+    assert {field: samsung[field] for field in FIELDS} == {
+        'revenue': 300,                 # 당기 3분기 누적
+        'operating_profit': 30,         # 회사 자체 항목코드 → 항목명으로 매핑
+        'net_profit': 20,               # 손익계산서 값 (포괄손익계산서의 999보다 먼저 나옴)
+        'net_profit_controlling': 18,   # 포괄손익계산서에만 있는 항목
+        'total_assets': 1000,           # 쉼표 포함 금액
+        'total_liabilities': 400,
+        'total_equity': 600,
+        'equity_controlling': 550,
+    }
+    assert samsung['source'] == SOURCE_BULK
+    assert samsung['rcept_no'] is None and samsung['rcept_dt'] is None
+
+
+def test_consolidated_preferred():
+    records = _records(collect_archive([FIXTURE_PATH]))
+    # 연결과 별도가 모두 있으면 연결 값만 사용 (별도 자산총계 800, 매출 240은 버림)
+    assert records['005930']['fs_div'] == 'CFS'
+    assert records['005930']['total_assets'] == 1000
+
+    # 별도만 있는 회사는 별도 사용
+    hynix = records['000660']
+    assert hynix['fs_div'] == 'OFS'
+    assert (hynix['revenue'], hynix['operating_profit']) == (150, -12)
+    assert (hynix['total_assets'], hynix['total_liabilities']) == (700, 300)
+    assert hynix['net_profit'] is None
+
+
+def test_corp_code_from_index():
+    index = CorpIndex({'005930': '00126380'}, {'00126380': '삼성전자'})
+    records = _records(collect_archive([FIXTURE_PATH], corp_index=index))
+    assert records['005930']['corp_code'] == '00126380'
+    assert records['000660']['corp_code'] is None
+
+
+def main():
+    test_collect_archive_fields()
+    test_consolidated_preferred()
+    test_corp_code_from_index()
+    print("✅ DART 일괄 다운로드 파일 테스트 통과")
+
+
+if __name__ == '__main__':
+    main()
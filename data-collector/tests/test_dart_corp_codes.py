@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DART 고유번호 파싱/인덱스 테스트 (로컬 fixture zip 사용, DB/API 없음)
+
+실행:
+    python3 -m pytest tests/test_dart_corp_codes.py
+    python3 tests/test_dart_corp_codes.py
+"""
+
+import os
+import sys
+
+# data-collector 디렉토리를 sys.path에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dart.corp_codes import CorpIndex, file_checksum, iter_corp_codes
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'corpCode.zip')
+
+
+def _fixture_index():
+    """refresh_corp_codes와 같은 방식으로 상장사만 인덱스 구성"""
+    rows = list(iter_corp_codes(FIXTURE_PATH))
+    listed = {row[3]: row[0] for row in rows if row[3]}
+    names = {row[0]: row[1] for row in rows if row[3]}
+    return CorpIndex(listed, names, file_checksum(FIXTURE_PATH))
+
+
+def test_iter_corp_codes():
+    rows = list(iter_corp_codes(FIXTURE_PATH))
+    assert len(rows) == 4
+    assert rows[0] == ('00126380', '삼성전자', 'SAMSUNG ELECTRONICS CO,.LTD', '005930', '2024-06-24')
+    assert rows[1][3] == '000660'
+
+
+def test_unlisted_stock_code_is_none():
+    rows = {row[0]: row for row in iter_corp_codes(FIXTURE_PATH)}
+    # 비상장사는 stock_code가 공백 한 칸으로 내려옴
+    assert rows['00434003'][3] is None
+    assert rows['00430964'][3] is None
+
+
+def test_modify_date_format():
+    rows = {row[0]: row for row in iter_corp_codes(FIXTURE_PATH)}
+    assert rows['00434003'][4] == '2017-06-30'
+    assert rows['00430964'][4] is None
+    assert rows['00430964'][2] is None
+
+
+def test_corp_index_lookups(tmp_path):
+    index = _fixture_index()
+    assert len(index) == 2
+    assert index.corp_code('005930') == '00126380'
+    assert index.stock_code('00164779') == '000660'
+    assert index.corp_name('00164779') == '에스케이하이닉스'
+    assert index.corp_code('999999') is None
+    assert index.stock_code('00434003') is None
+    assert index.corp_codes(['000660', '999999']) == {'000660': '00164779'}
+
+    # 저장 후 다시 읽어도 같은 조회 결과
+    path = str(tmp_path / 'corp_index.json')
+    index.save(path)
+    loaded = CorpIndex.load(path)
+    assert loaded.corp_code('000660') == '00164779'
+    assert loaded.stock_code('00126380') == '005930'
+    assert loaded.checksum == index.checksum
+
+
+def main():
+    import tempfile
+    from pathlib import Path
+
+    test_iter_corp_codes()
+    test_unlisted_stock_code_is_none()
+    test_modify_date_format()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        test_corp_index_lookups(Path(tmp_dir))
+    print("✅ DART 고유번호 테스트 통과")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,11 +2,18 @@
 # -*- coding: utf-8 -*-
 """
 새로 추가된 필드가 제대로 저장되었는지 검증
+
+사용법:
+    python3 verify_new_fields.py          # 전체 스캔 (테이블당 한 번)
+    python3 verify_new_fields.py fast     # daily_prices 1% 표본 (근사값)
 """
 
 import psycopg2
 import os
+import sys
 from dotenv import load_dotenv
+from common.database import stream_query
+from common.profiler import profile_table
 
 load_dotenv()
 
@@ -23,6 +30,7 @@ def main():
     try:
         conn = psycopg2.connect(**DB_CONFIG)
         cur = conn.cursor()
+        sample_percent = 1 if 'fast' in sys.argv[1:] else None
 
         print("="*80)
         print("🔍 새로 추가된 필드 검증")
@@ -32,29 +40,19 @@ def main():
         print("\n1️⃣ STOCKS 테이블 - 새 필드 데이터 확인")
         print("-"*80)
 
-        # ISIN 코드가 있는 종목 수
-        cur.execute("SELECT COUNT(*) FROM stocks WHERE isin_code IS NOT NULL")
-        isin_count = cur.fetchone()[0]
-        print(f"ISIN 코드 설정된 종목: {isin_count:,}개")
+        # 전체 컬럼 결측 수를 한 번의 스캔으로 계산
+        stocks = profile_table(cur, 'stocks')
 
-        # 상장주식수가 있는 종목 수
-        cur.execute("SELECT COUNT(*) FROM stocks WHERE listed_shares IS NOT NULL")
-        shares_count = cur.fetchone()[0]
-        print(f"상장주식수 설정된 종목: {shares_count:,}개")
+        def filled(profile, column):
+            return profile[column]['row_count'] - profile[column]['null_count']
 
-        # 시가총액이 있는 종목 수
-        cur.execute("SELECT COUNT(*) FROM stocks WHERE market_cap IS NOT NULL")
-        cap_count = cur.fetchone()[0]
-        print(f"시가총액 설정된 종목: {cap_count:,}개")
+        print(f"ISIN 코드 설정된 종목: {filled(stocks, 'isin_code'):,}개")
+        print(f"상장주식수 설정된 종목: {filled(stocks, 'listed_shares'):,}개")
+        print(f"시가총액 설정된 종목: {filled(stocks, 'market_cap'):,}개")
 
         # ETF 전용 필드
-        cur.execute("SELECT COUNT(*) FROM stocks WHERE nav IS NOT NULL")
-        nav_count = cur.fetchone()[0]
-        print(f"NAV 설정된 ETF: {nav_count:,}개")
-
-        cur.execute("SELECT COUNT(*) FROM stocks WHERE base_index_name IS NOT NULL")
-        idx_count = cur.fetchone()[0]
-        print(f"기초지수명 설정된 ETF: {idx_count:,}개")
+        print(f"NAV 설정된 ETF: {filled(stocks, 'nav'):,}개")
+        print(f"기초지수명 설정된 ETF: {filled(stocks, 'base_index_name'):,}개")
 
         # 샘플 데이터 확인 (KOSPI 1개)
         print("\n📋 KOSPI 샘플 데이터:")
@@ -95,32 +93,25 @@ def main():
         print("\n2️⃣ DAILY_PRICES 테이블 - 새 필드 데이터 확인")
         print("-"*80)
 
-        # vs(전일대비)가 있는 레코드 수
-        cur.execute("SELECT COUNT(*) FROM daily_prices WHERE vs IS NOT NULL")
-        vs_count = cur.fetchone()[0]
-        print(f"전일대비(vs) 설정된 레코드: {vs_count:,}건")
-
-        # change_rate(등락율)가 있는 레코드 수
-        cur.execute("SELECT COUNT(*) FROM daily_prices WHERE change_rate IS NOT NULL")
-        rate_count = cur.fetchone()[0]
-        print(f"등락율(change_rate) 설정된 레코드: {rate_count:,}건")
+        prices = profile_table(cur, 'daily_prices', sample_percent=sample_percent)
+        conn.commit()
+        approx = f" (표본 {sample_percent}% 추정)" if sample_percent else ""
+        print(f"프로파일 스캔: {prices['vs']['scan_ms']:,}ms{approx}")
 
-        # trading_value(거래대금)가 있는 레코드 수
-        cur.execute("SELECT COUNT(*) FROM daily_prices WHERE trading_value IS NOT NULL")
-        value_count = cur.fetchone()[0]
-        print(f"거래대금(trading_value) 설정된 레코드: {value_count:,}건")
+        print(f"전일대비(vs) 설정된 레코드: {filled(prices, 'vs'):,}건")
+        print(f"등락율(change_rate) 설정된 레코드: {filled(prices, 'change_rate'):,}건")
+        print(f"거래대금(trading_value) 설정된 레코드: {filled(prices, 'trading_value'):,}건")
 
         # 샘플 데이터 확인
         print("\n📋 일별 시세 샘플 데이터 (최근 거래일):")
-        cur.execute("""
+        for i, row in enumerate(stream_query("""
             SELECT s.stock_name, dp.trade_date, dp.close_price, dp.vs, dp.change_rate, dp.trading_value
             FROM daily_prices dp
             JOIN stocks s ON dp.stock_code = s.stock_code
             WHERE dp.vs IS NOT NULL AND dp.change_rate IS NOT NULL
             ORDER BY dp.trade_date DESC, dp.trading_value DESC NULLS LAST
             LIMIT 3
-        """)
-        for i, row in enumerate(cur.fetchall(), 1):
+        """, conn=conn), 1):
             print(f"\n  {i}. {row[0]}")
             print(f"     거래일: {row[1]}")
             print(f"     종가: {row[2]:,}원")
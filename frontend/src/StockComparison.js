@@ -41,9 +41,9 @@ function StockComparison({ selectedStocks, onClose }) {
     setLoading(true);
     setError(null);
 
-    // 각 종목의 일별 데이터 가져오기
+    // 각 종목의 일별 데이터 가져오기 (분할/병합이 반영된 수정주가)
     const promises = selectedStocks.map(stock =>
-      stockAPI.getDailyPrices(stock.stock_code)
+      stockAPI.getDailyPrices(stock.stock_code, 100, true)
     );
 
     const results = await Promise.all(promises);
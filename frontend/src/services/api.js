@@ -82,9 +82,119 @@ export const stockAPI = {
   },
 
   // 일별 시세 조회
-  getDailyPrices: async (stockCode, limit = 100) => {
+  getDailyPrices: async (stockCode, limit = 100, adjusted = false) => {
     try {
       const response = await apiClient.get(`/stocks/${stockCode}/daily`, {
+        params: adjusted ? { limit, adjusted } : { limit }
+      });
+      return { data: response.data, error: null };
+    } catch (error) {
+      return { data: null, ...handleAPIError(error) };
+    }
+  },
+
+  // 주봉/월봉 조회 (장기 차트용, interval: 'weekly' | 'monthly')
+  getBars: async (stockCode, interval = 'weekly', limit = 520) => {
+    try {
+      const response = await apiClient.get(`/stocks/${stockCode}/bars`, {
+        params: { interval, limit }
+      });
+      return { data: response.data, error: null };
+    } catch (error) {
+      return { data: null, ...handleAPIError(error) };
+    }
+  },
+
+  // 축소 차트 시계열 조회 (type: 'line' | 'ohlc', points: 최대 포인트 수)
+  getChartSeries: async (stockCode, type = 'line', points = 500) => {
+    try {
+      const response = await apiClient.get(`/stocks/${stockCode}/chart`, {
+        params: { type, points }
+      });
+      return { data: response.data, error: null };
+    } catch (error) {
+      return { data: null, ...handleAPIError(error) };
+    }
+  },
+
+  // 거래일별 상위 순위 조회 (metric: 'market_cap' | 'trading_value' | 'volume' | 'return', date 생략 시 최근 거래일)
+  getRankings: async (marketType = 'KOSPI', metric = 'market_cap', limit = 50, date = null) => {
+    try {
+      const params = { market_type: marketType, metric, limit };
+      if (date) params.date = date;
+      const response = await apiClient.get('/stocks/ranks', { params });
+      return { data: response.data, error: null };
+    } catch (error) {
+      return { data: null, ...handleAPIError(error) };
+    }
+  },
+
+  // 종목 순위 이력 조회
+  getRankHistory: async (stockCode, metric = 'market_cap', limit = 365) => {
+    try {
+      const response = await apiClient.get(`/stocks/${stockCode}/ranks`, {
+        params: { metric, limit }
+      });
+      return { data: response.data, error: null };
+    } catch (error) {
+      return { data: null, ...handleAPIError(error) };
+    }
+  },
+
+  // 기술적 지표 조회 (SMA/EMA/MACD/RSI/볼린저 밴드/ATR)
+  getIndicators: async (stockCode, limit = 365) => {
+    try {
+      const response = await apiClient.get(`/stocks/${stockCode}/indicators`, {
+        params: { limit }
+      });
+      return { data: response.data, error: null };
+    } catch (error) {
+      return { data: null, ...handleAPIError(error) };
+    }
+  },
+
+  // 52주 신고가/신저가 종목 조회 (type: high/low, date 생략 시 최근 거래일)
+  getExtremes: async (type = 'high', marketType = null, limit = 100, date = null) => {
+    try {
+      const params = { type, limit };
+      if (marketType) params.market_type = marketType;
+      if (date) params.date = date;
+      const response = await apiClient.get('/stocks/extremes', { params });
+      return { data: response.data, error: null };
+    } catch (error) {
+      return { data: null, ...handleAPIError(error) };
+    }
+  },
+
+  // 종목 52주 최고/최저 및 낙폭 이력 조회
+  getExtremeHistory: async (stockCode, limit = 365) => {
+    try {
+      const response = await apiClient.get(`/stocks/${stockCode}/extremes`, {
+        params: { limit }
+      });
+      return { data: response.data, error: null };
+    } catch (error) {
+      return { data: null, ...handleAPIError(error) };
+    }
+  },
+
+  // 이상 거래 종목 조회 (eventType: volume_spike/price_jump/price_drop, date 생략 시 최근 탐지일)
+  getUnusualActivity: async (eventType = null, limit = 100, date = null) => {
+    try {
+      const params = { limit };
+      if (eventType) params.event_type = eventType;
+      if (date) params.date = date;
+      const response = await apiClient.get('/stocks/unusual-activity', { params });
+      return { data: response.data, error: null };
+    } catch (error) {
+      return { data: null, ...handleAPIError(error) };
+    }
+  },
+
+  // 종목 변동성/베타 이력 조회
+  getRiskMetrics: async (stockCode, limit = 365) => {
+    try {
+      const response = await apiClient.get(`/stocks/${stockCode}/risk`, {
         params: { limit }
       });
       return { data: response.data, error: null };